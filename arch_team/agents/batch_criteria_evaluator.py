@@ -13,10 +13,13 @@ Usage:
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
+
+from backend.core import llm_cache
 
 logger = logging.getLogger(__name__)
 
@@ -103,6 +106,54 @@ RESPOND WITH ONLY THIS JSON STRUCTURE (no markdown, no explanation outside JSON)
 }}"""
 
 
+SUBSET_EVALUATION_PROMPT = """You are an expert requirements analyst evaluating a software requirement against IEEE 29148 quality criteria.
+
+REQUIREMENT TO EVALUATE:
+"{requirement_text}"
+
+Evaluate this requirement against ONLY the {count} criteria below. For each criterion, provide:
+- score: A decimal from 0.0 to 1.0 (0.0 = completely fails, 1.0 = perfectly meets)
+- reason: ONE sentence explaining the score
+
+CRITERIA:
+{criteria_lines}
+
+RESPOND WITH ONLY THIS JSON STRUCTURE (no markdown, no explanation outside JSON):
+{{
+{json_lines}
+}}"""
+
+
+def _build_prompt(requirement_text: str, criteria: Optional[Iterable[str]] = None) -> str:
+    """Full 9-criteria prompt, or a reduced prompt for a subset of criteria."""
+    if criteria is None:
+        return BATCH_EVALUATION_PROMPT.format(requirement_text=requirement_text)
+    keys = [c for c in CRITERIA_DEFINITIONS if c in set(criteria)]
+    return SUBSET_EVALUATION_PROMPT.format(
+        requirement_text=requirement_text,
+        count=len(keys),
+        criteria_lines="\n".join(
+            f"{i}. {key}: {CRITERIA_DEFINITIONS[key]['description']}" for i, key in enumerate(keys, 1)
+        ),
+        json_lines=",\n".join(f'  "{key}": {{"score": 0.0, "reason": "..."}}' for key in keys),
+    )
+
+
+def _strip_code_fence(content: str) -> str:
+    """Remove a surrounding markdown code fence (```json ... ```) if present."""
+    if content.startswith("```"):
+        content = content.split("```")[1]
+        if content.startswith("json"):
+            content = content[4:]
+        content = content.strip()
+    return content
+
+
+def _score_of(value: Any) -> Any:
+    """Score of one criterion entry ({"score": x, ...} or a bare number); None if absent."""
+    return value.get("score") if isinstance(value, dict) else value
+
+
 class BatchCriteriaEvaluator:
     """
     Evaluates all 9 IEEE 29148 criteria in a SINGLE LLM call.
@@ -136,27 +187,54 @@ class BatchCriteriaEvaluator:
         logger.info(f"BatchCriteriaEvaluator initialized with model={self.model}")
     
     def _get_client(self):
-        """Get or create the LLM client using the same pattern as backend/core/llm.py."""
+        """Get the shared pooled LLM client (backend/core/llm_clients.py)."""
         if self._client is None:
             try:
-                from openai import OpenAI as OpenAIClient
                 from backend.core import settings
+                from backend.core.llm_clients import get_openai_client
                 
                 llm_config = settings.get_llm_config()
-                self._client = OpenAIClient(
-                    api_key=llm_config["api_key"],
-                    base_url=llm_config["base_url"]
-                )
+                self._client = get_openai_client(llm_config["api_key"], llm_config["base_url"])
                 logger.info(f"BatchCriteriaEvaluator connected to {llm_config['base_url']}")
             except Exception as e:
                 logger.error(f"Failed to create LLM client: {e}")
                 raise
         return self._client
     
+    def _complete(self, client, prompt: str, max_tokens: int, keys: Iterable[str] = ()) -> str:
+        """
+        Run the evaluation prompt through the persistent LLM response cache.
+        Only responses that parse as JSON and score every criterion in keys are
+        cached, so a retry after an incomplete answer asks the LLM again.
+        """
+        request = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature,
+            "max_tokens": max_tokens,
+        }
+        key = llm_cache.make_key(request, kind="batch_criteria", provider=getattr(client, "base_url", None))
+        cached = llm_cache.lookup(key)
+        if cached is not None:
+            return cached
+
+        # Use synchronous call (OpenAI v1 client); callers run this in a worker thread
+        response = client.chat.completions.create(**request)
+        content = response.choices[0].message.content.strip()
+        try:
+            result = json.loads(_strip_code_fence(content))
+        except ValueError:
+            return content
+        if isinstance(result, dict) and all(_score_of(result.get(k)) is not None for k in keys):
+            llm_cache.store(key, content, kind="batch_criteria", model=self.model)
+        return content
+
     async def evaluate(
         self,
         requirement_text: str,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        criteria: Optional[Iterable[str]] = None,
+        neutral_fallback: bool = True
     ) -> Dict[str, float]:
         """
         Evaluate a requirement against all 9 criteria in a single LLM call.
@@ -164,62 +242,54 @@ class BatchCriteriaEvaluator:
         Args:
             requirement_text: The requirement text to evaluate
             context: Optional context (not used currently)
+            criteria: Optional subset of criterion keys; only these are
+                scored (still one call, with a shorter prompt)
+            neutral_fallback: Fill missing/failed criteria with 0.5 (default).
+                If False, errors are raised and criteria without a score in
+                the response are omitted, so callers can tell them apart.
         
         Returns:
             Dict mapping criterion name to score (0.0-1.0)
         """
+        keys = [c for c in CRITERIA_DEFINITIONS if criteria is None or c in set(criteria)]
         try:
             client = self._get_client()
             
-            prompt = BATCH_EVALUATION_PROMPT.format(
-                requirement_text=requirement_text
-            )
+            prompt = _build_prompt(requirement_text, criteria)
             
-            # Use synchronous call (OpenAI v1 client)
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=1000
+            # Blocking HTTP call off the event loop; to_thread copies the context
+            # (e.g. the governor's batch priority)
+            content = await asyncio.to_thread(
+                self._complete, client, prompt, 1000 if criteria is None else 120 * len(keys) + 100, keys
             )
             
-            content = response.choices[0].message.content.strip()
-            
-            # Parse JSON response
-            # Handle potential markdown code blocks
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-            
-            result = json.loads(content)
+            # Parse JSON response (handles potential markdown code blocks)
+            result = json.loads(_strip_code_fence(content))
             
             # Extract just the scores - FIX: use score_data correctly
             scores = {}
-            for criterion in CRITERIA_DEFINITIONS.keys():
-                if criterion in result:
-                    score_data = result[criterion]
-                    if isinstance(score_data, dict):
-                        scores[criterion] = float(score_data.get("score", 0.5))
-                    else:
-                        scores[criterion] = float(score_data)
-                else:
+            for criterion in keys:
+                score_data = _score_of(result.get(criterion))
+                if score_data is not None:
+                    scores[criterion] = float(score_data)
+                elif neutral_fallback:
                     scores[criterion] = 0.5  # Default neutral score
             
             logger.info(f"Batch evaluation complete: {scores}")
             return scores
             
         except json.JSONDecodeError as e:
+            if not neutral_fallback:
+                raise
             logger.error(f"Failed to parse LLM response as JSON: {e}")
             # Return neutral scores on parse error
-            return {criterion: 0.5 for criterion in CRITERIA_DEFINITIONS.keys()}
+            return {criterion: 0.5 for criterion in keys}
         except Exception as e:
+            if not neutral_fallback:
+                raise
             logger.error(f"Batch evaluation failed: {e}", exc_info=True)
             # Return neutral scores on error
-            return {criterion: 0.5 for criterion in CRITERIA_DEFINITIONS.keys()}
+            return {criterion: 0.5 for criterion in keys}
     
     async def evaluate_with_reasons(
         self,
@@ -243,25 +313,10 @@ class BatchCriteriaEvaluator:
                 requirement_text=requirement_text
             )
             
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=1500
-            )
-            
-            content = response.choices[0].message.content.strip()
+            content = await asyncio.to_thread(self._complete, client, prompt, 1500, CRITERIA_DEFINITIONS)
             
             # Handle potential markdown code blocks
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-            
-            result = json.loads(content)
+            result = json.loads(_strip_code_fence(content))
             
             # Ensure all criteria are present
             for criterion in CRITERIA_DEFINITIONS.keys():
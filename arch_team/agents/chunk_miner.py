@@ -3,7 +3,10 @@ from __future__ import annotations
 
 import json
 import os
-from typing import Any, Dict, List, Optional, Union
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Collection, Dict, Iterator, List, Mapping, Optional, Tuple, Union
 
 from ..runtime.logging import get_logger
 from ..runtime.agent_base import AgentBase, AgentId, MessageContext
@@ -12,18 +15,35 @@ from .req_worker import ReqWorkerAgent
 from .extraction_schema import REQUIREMENT_EXTRACTION_TOOL, EXTRACTION_SYSTEM_PROMPT
 
 # Reuse ingestion helpers directly to avoid Qdrant dependency during mining
-from backend.core.ingest import extract_texts, chunk_payloads  # noqa: E402
+from backend.core.ingest import extract_texts_many, chunk_payloads, chunk_hash  # noqa: E402
+from backend.core import llm_cache  # noqa: E402
+from backend.core.llm_governor import llm_priority  # noqa: E402
 
 logger = get_logger("agents.chunk_miner")
 
+# Parallelität beim Chunk-Mining:
+# - CHUNK_MINER_CONCURRENCY: max. gleichzeitige LLM-Requests je Mining-Lauf
+# - Provider-weite Begrenzung über den globalen LLM-Governor (backend/core/llm_governor.py),
+#   Mining-Requests laufen dort mit Batch-Priorität
+# - CHUNK_MINER_RATE_LIMIT_RETRIES: Retries mit Backoff bei HTTP 429 / Rate-Limit
+DEFAULT_MINING_CONCURRENCY = int(os.environ.get("CHUNK_MINER_CONCURRENCY", "4"))
+RATE_LIMIT_RETRIES = int(os.environ.get("CHUNK_MINER_RATE_LIMIT_RETRIES", "3"))
+
+
+def _is_rate_limit_error(exc: BaseException) -> bool:
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    msg = str(exc).lower()
+    return "429" in msg or "rate limit" in msg or "rate_limit" in msg
+
 
 def _coerce_files_or_texts(files_or_texts: List[Union[str, bytes, Dict[str, Any]]]) -> List[Dict[str, Any]]:
     """
-    Normalisiert Eingaben auf eine Liste von {filename, data, content_type}.
+    Normalisiert Eingaben auf eine Liste von {filename, data|path, content_type}.
     Erlaubte Eingaben:
     - str: roher Text (als .txt)
     - bytes: roher Text/Bytes (als .txt)
-    - dict: {filename, data, content_type?} oder {text}
+    - dict: {filename, data, content_type?}, {filename, path, content_type?} oder {text}
     """
     out: List[Dict[str, Any]] = []
     for i, item in enumerate(files_or_texts or []):
@@ -35,6 +55,10 @@ def _coerce_files_or_texts(files_or_texts: List[Union[str, bytes, Dict[str, Any]
             if "text" in item:
                 txt = str(item.get("text") or "")
                 out.append({"filename": f"input_{i}.txt", "data": txt.encode("utf-8"), "content_type": "text/plain"})
+            elif item.get("path"):
+                # Gespoolter Upload: der Extraktions-Worker liest selbst von Platte
+                fn = str(item.get("filename") or f"input_{i}.txt")
+                out.append({"filename": fn, "path": item["path"], "content_type": str(item.get("content_type") or "")})
             else:
                 fn = str(item.get("filename") or f"input_{i}.txt")
                 data = item.get("data") or b""
@@ -139,6 +163,7 @@ class ChunkMinerAgent(AgentBase):
                     "sourceFile": payload.get("sourceFile") or payload.get("source") or "",
                     "sha1": payload.get("sha1") or "",
                     "chunkIndex": payload.get("chunkIndex") or 0,
+                    "chunkHash": payload.get("chunkHash") or "",
                 }
             ]
         if additional_evidence:
@@ -179,6 +204,7 @@ class ChunkMinerAgent(AgentBase):
                 "sourceFile": payload.get("sourceFile") or payload.get("source") or "",
                 "sha1": payload.get("sha1") or "",
                 "chunkIndex": payload.get("chunkIndex") or 0,
+                "chunkHash": payload.get("chunkHash") or "",
             }
         ]
 
@@ -211,33 +237,83 @@ class ChunkMinerAgent(AgentBase):
 
         return result
 
-    def _mine_chunk(self, chunk_text: str, payload: Dict[str, Any], model_override: Optional[str]) -> List[Dict[str, Any]]:
-        """Extract requirements using tool calling for structured, high-quality output"""
-        sha1 = str(payload.get("sha1") or "")
-        chunk_idx = int(payload.get("chunkIndex") or 0)
-        suggested_req_id = f"REQ-{(sha1 or 'X')[:6]}-{chunk_idx:03d}"
+    def _create_with_backoff(self, messages: List[Dict[str, Any]], model_override: Optional[str]) -> Any:
+        """
+        LLM-Aufruf mit Batch-Priorität im LLM-Governor. Bei Rate-Limit (429) exponentielles Backoff mit Jitter,
+        andere Fehler werden direkt durchgereicht.
+        """
+        attempt = 0
+        while True:
+            try:
+                with llm_priority("batch"):
+                    return self.adapter.create(
+                        messages=messages,
+                        temperature=self.temperature,
+                        model=model_override,
+                        tools=[REQUIREMENT_EXTRACTION_TOOL],
+                        tool_choice={"type": "function", "function": {"name": "submit_requirements"}}
+                    )
+            except Exception as e:
+                if attempt >= RATE_LIMIT_RETRIES or not _is_rate_limit_error(e):
+                    raise
+                delay = min(30.0, 2.0 ** attempt) + random.uniform(0, 0.5)
+                logger.info("Chunk mining rate-limited, retry %d/%d in %.1fs", attempt + 1, RATE_LIMIT_RETRIES, delay)
+                time.sleep(delay)
+                attempt += 1
+
+    def _mine_payloads(
+        self,
+        payloads: List[Dict[str, Any]],
+        model: Optional[str],
+        max_concurrency: Optional[int] = None,
+        skip_chunk_hashes: Optional[Mapping[str, Collection[str]]] = None,
+    ) -> Iterator[Tuple[int, Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Mint alle Chunks mit bis zu max_concurrency parallelen LLM-Requests.
+        Liefert (idx, payload, items) in Chunk-Reihenfolge, sobald der jeweilige Chunk fertig ist;
+        leere Chunks und Chunks, deren chunkHash in skip_chunk_hashes[sourceFile] steht
+        (Delta-Mining), werden übersprungen.
+        """
+        skip = skip_chunk_hashes or {}
+        jobs: List[Tuple[int, str, Dict[str, Any]]] = []
+        skipped = 0
+        for idx, p in enumerate(payloads):
+            chunk_text = str(p.get("text") or "")
+            if not chunk_text.strip():
+                continue
+            payload = dict(p.get("payload") or {})
+            payload.setdefault("chunkHash", chunk_hash(chunk_text))
+            src = payload.get("sourceFile") or payload.get("source") or ""
+            if payload["chunkHash"] in skip.get(src, ()):
+                skipped += 1
+                continue
+            jobs.append((idx, chunk_text, payload))
+        if skipped:
+            logger.info("ChunkMiner: %d unveränderte Chunk(s) übersprungen (Delta)", skipped)
+        if not jobs:
+            return
 
-        # Build messages for tool-based extraction
-        messages = [
-            {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
-            {
-                "role": "user",
-                "content": (
-                    f"Extract all requirements from the following text chunk.\n"
-                    f"Use '{suggested_req_id}' as the base for req_id, adding -a, -b, -c... for multiple requirements.\n\n"
-                    f"Text:\n---\n{chunk_text.strip()}\n---"
-                )
-            }
-        ]
+        workers = max(1, min(int(max_concurrency or DEFAULT_MINING_CONCURRENCY), len(jobs)))
+        if workers == 1:
+            for idx, chunk_text, payload in jobs:
+                yield idx, payload, self._mine_chunk(chunk_text, payload, model_override=model)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk-miner") as pool:
+            futures = [
+                (idx, payload, pool.submit(self._mine_chunk, chunk_text, payload, model))
+                for idx, chunk_text, payload in jobs
+            ]
+            for idx, payload, fut in futures:
+                yield idx, payload, fut.result()
 
+    def _extract_items(self, messages: List[Dict[str, Any]], model_override: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Tool-Call-Extraktion für einen Chunk. None bei Fehlern und bei Fallback-Parses
+        ohne Items (evtl. nur eine kaputte Antwort) – beides wird nicht gecacht.
+        """
         try:
-            response = self.adapter.create(
-                messages=messages,
-                temperature=self.temperature,
-                model=model_override,
-                tools=[REQUIREMENT_EXTRACTION_TOOL],
-                tool_choice={"type": "function", "function": {"name": "submit_requirements"}}
-            )
+            response = self._create_with_backoff(messages, model_override)
 
             # Check if we got a tool call response
             if hasattr(response, 'choices'):
@@ -249,15 +325,60 @@ class ChunkMinerAgent(AgentBase):
                     items = requirements_data.get("requirements", [])
                 else:
                     logger.warning("Tool call expected but not received - fallback to parsing")
-                    items = self._parse_items(str(message.content or "").strip())
+                    items = self._parse_items(str(message.content or "").strip()) or None
             else:
                 # Backward compatibility: string response (fallback to old JSON parsing)
                 logger.warning("String response received instead of tool call - using legacy parser")
-                items = self._parse_items(str(response or "").strip())
+                items = self._parse_items(str(response or "").strip()) or None
 
         except Exception as e:
             logger.warning("Chunk mining failed (adapter): %s", e)
-            return []
+            return None
+        return items
+
+    def _mine_chunk(self, chunk_text: str, payload: Dict[str, Any], model_override: Optional[str]) -> List[Dict[str, Any]]:
+        """Extract requirements using tool calling for structured, high-quality output"""
+        sha1 = str(payload.get("sha1") or "")
+        chunk_idx = int(payload.get("chunkIndex") or 0)
+        suggested_req_id = f"REQ-{(sha1 or 'X')[:6]}-{chunk_idx:03d}"
+
+        # Build messages for tool-based extraction
+        messages = [
+            {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": (
+                    f"Extract all requirements from the following text chunk.\n"
+                    f"Use '{suggested_req_id}' as the base for req_id, adding -a, -b, -c... for multiple requirements.\n\n"
+                    f"Text:\n---\n{chunk_text.strip()}\n---"
+                )
+            }
+        ]
+
+        # Inhaltsadressierter Cache: identischer Chunk + Prompt + Modell → keine erneute LLM-Anfrage
+        cache_key = llm_cache.make_key(
+            {
+                "model": model_override or self.adapter.default_model,
+                "messages": messages,
+                "temperature": self.temperature,
+                "tools": [REQUIREMENT_EXTRACTION_TOOL],
+                "tool_choice": "submit_requirements",
+            },
+            kind="mine",
+        )
+        items: Optional[List[Dict[str, Any]]] = None
+        cached = llm_cache.lookup(cache_key)
+        if cached is not None:
+            try:
+                items = json.loads(cached)
+            except Exception:
+                items = None
+
+        if items is None:
+            items = self._extract_items(messages, model_override)
+            if items is None:
+                return []
+            llm_cache.store(cache_key, json.dumps(items, ensure_ascii=False), kind="mine", model=str(model_override or self.adapter.default_model))
 
         # Process extracted items and ensure required fields
         # Add unique suffixes -a, -b, -c... if multiple requirements from same chunk
@@ -281,18 +402,17 @@ class ChunkMinerAgent(AgentBase):
         *,
         model: Optional[str] = None,
         neighbor_refs: bool = False,
+        max_concurrency: Optional[int] = None,
     ) -> int:
         """
         Führt Mining end-to-end aus. Gibt die Anzahl generierter DTOs zurück.
+
+        Chunks werden mit bis zu max_concurrency parallelen LLM-Requests gemint
+        (Default: CHUNK_MINER_CONCURRENCY); die Ausgabe-Reihenfolge bleibt die Chunk-Reihenfolge.
         """
         normalized = _coerce_files_or_texts(files_or_texts)
-        raw_records: List[Dict[str, Any]] = []
-        for rec in normalized:
-            try:
-                parts = extract_texts(rec["filename"], rec["data"], rec.get("content_type") or "")
-                raw_records.extend(parts)
-            except Exception as e:
-                logger.warning("extract_texts failed for %s: %s", rec.get("filename"), e)
+        # PDF/DOCX parallel im Prozess-Pool; Fehler je Datei werden geloggt und übersprungen
+        raw_records: List[Dict[str, Any]] = extract_texts_many(normalized)
 
         if not raw_records:
             logger.info("ChunkMiner: keine extrahierten Rohtexte – Abbruch")
@@ -356,13 +476,7 @@ class ChunkMinerAgent(AgentBase):
                     )
             return evs
 
-        for idx, p in enumerate(payloads):
-            chunk_text = str(p.get("text") or "")
-            payload = dict(p.get("payload") or {})
-            if not chunk_text.strip():
-                continue
-
-            items = self._mine_chunk(chunk_text, payload, model_override=model)
+        for idx, payload, items in self._mine_payloads(payloads, model, max_concurrency):
             if not items:
                 continue
 
@@ -386,6 +500,8 @@ class ChunkMinerAgent(AgentBase):
         model: Optional[str] = None,
         neighbor_refs: bool = False,
         chunk_options: Optional[Dict[str, Any]] = None,
+        max_concurrency: Optional[int] = None,
+        skip_chunk_hashes: Optional[Mapping[str, Collection[str]]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Wie mine_files_or_texts(), sammelt jedoch alle erzeugten DTOs und gibt sie als Liste zurück
@@ -393,15 +509,13 @@ class ChunkMinerAgent(AgentBase):
 
         Args:
             chunk_options: Optional dict mit 'max_tokens', 'min_tokens', 'overlap_tokens'
+            max_concurrency: Max. parallele LLM-Requests (Default: CHUNK_MINER_CONCURRENCY)
+            skip_chunk_hashes: Delta-Mining – {sourceFile: {chunkHash, ...}} bereits geminter Chunks
+                (z. B. db.get_mined_chunk_hashes); diese werden nicht erneut an das LLM gegeben
         """
         normalized = _coerce_files_or_texts(files_or_texts)
-        raw_records: List[Dict[str, Any]] = []
-        for rec in normalized:
-            try:
-                parts = extract_texts(rec["filename"], rec["data"], rec.get("content_type") or "")
-                raw_records.extend(parts)
-            except Exception as e:
-                logger.warning("extract_texts failed for %s: %s", rec.get("filename"), e)
+        # PDF/DOCX parallel im Prozess-Pool; Fehler je Datei werden geloggt und übersprungen
+        raw_records: List[Dict[str, Any]] = extract_texts_many(normalized)
 
         if not raw_records:
             logger.info("ChunkMiner: keine extrahierten Rohtexte – Abbruch")
@@ -468,13 +582,7 @@ class ChunkMinerAgent(AgentBase):
 
         items_out: List[Dict[str, Any]] = []
 
-        for idx, p in enumerate(payloads):
-            chunk_text = str(p.get("text") or "")
-            payload = dict(p.get("payload") or {})
-            if not chunk_text.strip():
-                continue
-
-            items = self._mine_chunk(chunk_text, payload, model_override=model)
+        for idx, payload, items in self._mine_payloads(payloads, model, max_concurrency, skip_chunk_hashes):
             if not items:
                 continue
 
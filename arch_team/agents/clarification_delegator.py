@@ -16,6 +16,8 @@ import time
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Callable
 
+from backend.core.llm_governor import llm_priority
+
 from .clarification_agent import (
     ClarificationAgent,
     ClarificationTask,
@@ -196,8 +198,9 @@ class ClarificationDelegator:
             )
             tasks.append(task)
         
-        # Process in parallel
-        results = await agent.analyze_batch(tasks)
+        # Process in parallel (batch priority in the global LLM governor)
+        with llm_priority("batch"):
+            results = await agent.analyze_batch(tasks)
         
         # Aggregate results
         all_questions = []
@@ -22,10 +22,11 @@ import logging
 import os
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from backend.core import settings
 from backend.core.llm import _make_chat_args, _extract_json_string
+from backend.core.llm_clients import get_async_openai_client
 
 # Load criteria config at module level for efficient access
 _CRITERIA_CONFIG: Dict[str, Dict[str, Any]] = {}
@@ -48,10 +49,10 @@ def _load_criteria_config() -> Dict[str, Dict[str, Any]]:
 
 # OpenAI client (v1 API)
 try:
-    from openai import OpenAI as _OpenAIClient
+    from openai import AsyncOpenAI as _AsyncOpenAIClient
     OPENAI_AVAILABLE = True
 except Exception:
-    _OpenAIClient = None
+    _AsyncOpenAIClient = None
     OPENAI_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
@@ -77,7 +78,8 @@ class CriterionSpecialistAgent(ABC):
         """
         self.criterion_name = criterion_name
         self.description = description
-        self.client: Optional[Any] = None
+        # (api_key, base_url) for the shared async client; None = mock mode
+        self.client: Optional[Tuple[str, Optional[str]]] = None
 
         # Load criteria config to get tier and threshold from config file
         config = _load_criteria_config()
@@ -96,11 +98,8 @@ class CriterionSpecialistAgent(ABC):
             base_url = llm_config.get("base_url")
 
             if api_key:
-                # Initialize client with OpenRouter configuration
-                self.client = _OpenAIClient(
-                    api_key=api_key,
-                    base_url=base_url
-                )
+                # Requests go through the shared AsyncOpenAI client (see _chat)
+                self.client = (api_key, base_url)
                 logger.info(f"{self.__class__.__name__} initialized with OpenRouter API (tier={self.tier}, threshold={self.threshold})")
             else:
                 logger.warning(f"{self.__class__.__name__}: OPENROUTER_API_KEY not configured, falling back to mock mode")
@@ -144,13 +143,36 @@ class CriterionSpecialistAgent(ABC):
         else:  # polish
             return "info" if score >= 0.4 else "warning"
 
-    async def evaluate(self, requirement_text: str, context: Optional[Dict[str, Any]] = None) -> float:
+    async def _chat(self, chat_args: Dict[str, Any]) -> str:
+        """
+        Run one chat completion without blocking the event loop.
+
+        All specialists share one pooled AsyncOpenAI client, so the
+        9-criterion fan-out in RequirementOrchestrator runs concurrently.
+
+        Returns:
+            Message content of the first choice ("{}" if empty)
+        """
+        api_key, base_url = self.client
+        client = get_async_openai_client(api_key, base_url)
+        response = await client.chat.completions.create(**chat_args)
+        return response.choices[0].message.content or "{}"
+
+    async def evaluate(
+        self,
+        requirement_text: str,
+        context: Optional[Dict[str, Any]] = None,
+        neutral_fallback: bool = True
+    ) -> float:
         """
         Evaluate the criterion for a requirement
 
         Args:
             requirement_text: The requirement to evaluate
             context: Optional context (metadata, project info, etc.)
+            neutral_fallback: Return 0.5 on errors or a missing score (default).
+                If False, these are raised so callers can tell a measured
+                score from the fallback.
 
         Returns:
             Score between 0.0 (fails criterion) and 1.0 (perfect)
@@ -167,12 +189,12 @@ class CriterionSpecialistAgent(ABC):
             }
 
             chat_args = _make_chat_args(system_prompt, user_payload)
-            response = self.client.chat.completions.create(**chat_args)
-
-            content = response.choices[0].message.content or "{}"
+            content = await self._chat(chat_args)
             json_str = _extract_json_string(content)
             result = json.loads(json_str)
 
+            if "score" not in result and not neutral_fallback:
+                raise ValueError(f"No score in {self.criterion_name} evaluation response")
             score = float(result.get("score", 0.5))
             feedback = result.get("feedback", "")
 
@@ -180,6 +202,8 @@ class CriterionSpecialistAgent(ABC):
             return max(0.0, min(1.0, score))  # Clamp to [0, 1]
 
         except Exception as e:
+            if not neutral_fallback:
+                raise
             logger.error(f"Error evaluating {self.criterion_name}: {e}")
             return 0.5  # Neutral score on error
 
@@ -208,9 +232,7 @@ class CriterionSpecialistAgent(ABC):
             }
 
             chat_args = _make_chat_args(system_prompt, user_payload)
-            response = self.client.chat.completions.create(**chat_args)
-
-            content = response.choices[0].message.content or "{}"
+            content = await self._chat(chat_args)
             json_str = _extract_json_string(content)
             result = json.loads(json_str)
 
@@ -247,9 +269,7 @@ class CriterionSpecialistAgent(ABC):
             }
 
             chat_args = _make_chat_args(system_prompt, user_payload)
-            response = self.client.chat.completions.create(**chat_args)
-
-            content = response.choices[0].message.content or "{}"
+            content = await self._chat(chat_args)
             json_str = _extract_json_string(content)
             result = json.loads(json_str)
 
@@ -303,9 +323,7 @@ class CriterionSpecialistAgent(ABC):
             }
 
             chat_args = _make_chat_args(system_prompt, user_payload)
-            response = self.client.chat.completions.create(**chat_args)
-
-            content = response.choices[0].message.content or "{}"
+            content = await self._chat(chat_args)
             json_str = _extract_json_string(content)
             result = json.loads(json_str)
 
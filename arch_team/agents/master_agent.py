@@ -113,17 +113,21 @@ def _create_ask_user_tool(correlation_id: Optional[str] = None):
             except Exception as e:
                 logger.warning(f"Failed to broadcast via SSE: {e}")
 
-        # File-based polling for response
+        # Response file written by /api/clarification/answer
         response_file = tmp_dir / f"clarification_{correlation_id}.txt"
 
-        # Wait for user to answer (file appears)
+        # Wait for user to answer: the answer endpoint wakes us immediately in-process;
+        # the file is re-checked every fallback_interval for answers from other processes
         logger.info(f"[ask_user] Waiting for response file: {response_file}")
 
+        from backend.services.clarification_service import answer_notifier
+
         timeout = 300  # 5 minutes
-        poll_interval = 1  # 1 second
-        elapsed = 0
+        fallback_interval = 5
+        deadline = time.monotonic() + timeout
 
-        while elapsed < timeout:
+        while True:
+            seen = answer_notifier.snapshot([correlation_id])
             if response_file.exists():
                 try:
                     answer = response_file.read_text(encoding='utf-8').strip()
@@ -132,11 +136,10 @@ def _create_ask_user_tool(correlation_id: Optional[str] = None):
                     return answer
                 except Exception as e:
                     logger.error(f"Failed to read response file: {e}")
-                    time.sleep(poll_interval)
-                    elapsed += poll_interval
-            else:
-                time.sleep(poll_interval)
-                elapsed += poll_interval
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            answer_notifier.wait_sync(seen, timeout=min(remaining, fallback_interval))
 
         # Timeout - return default
         logger.warning(f"[ask_user] Timeout after {timeout}s, using default answer")
@@ -237,6 +240,12 @@ async def create_master_agent(
     }
     if base_url:
         client_kwargs["base_url"] = base_url
+    try:
+        # Route AutoGen's requests through the process-wide LLM governor
+        from backend.core.llm_clients import get_governed_async_http_client
+        client_kwargs["http_client"] = get_governed_async_http_client(base_url)
+    except ImportError:
+        pass
 
     model_client = OpenAIChatCompletionClient(**client_kwargs)
 
@@ -550,8 +559,8 @@ Execute all phases and signal WORKFLOW_COMPLETE when done.
         # Use parallel ValidationDelegatorAgent instead of sequential loop
         from arch_team.agents.validation_delegator import ValidationDelegatorAgent
 
-        max_concurrent = int(os.environ.get("VALIDATION_MAX_CONCURRENT", "5"))
-        delegator = ValidationDelegatorAgent(max_concurrent=max_concurrent)
+        # max_concurrent: VALIDATION_MAX_CONCURRENT or the transport's LLM concurrency
+        delegator = ValidationDelegatorAgent()
         
         batch_result = await delegator.validate_batch(
             requirements=requirements,
@@ -24,11 +24,13 @@ Usage:
 from __future__ import annotations
 
 import asyncio
+import copy
+import hashlib
 import json
 import logging
 import re
 import os
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
@@ -40,10 +42,15 @@ from arch_team.agents.criterion_specialists import (
 
 # Import batch evaluator for faster evaluation (9 criteria in 1 call)
 from arch_team.agents.batch_criteria_evaluator import BatchCriteriaEvaluator, get_batch_evaluator
+from backend.core.llm_governor import llm_priority
 
 # Feature flag: Use batch evaluator for 9x faster evaluation
 USE_BATCH_EVALUATOR = os.environ.get("USE_BATCH_EVALUATOR", "true").lower() == "true"
 
+# Feature flag: After fixes, only re-score the criteria that were fixed and carry
+# the remaining scores over (a pass is always confirmed on the final text)
+INCREMENTAL_EVALUATION = os.environ.get("ORCHESTRATOR_INCREMENTAL_EVAL", "true").lower() == "true"
+
 # Import existing RequirementsAtomicityAgent for splitting
 try:
     from backend.core.agents import RequirementsAtomicityAgent
@@ -55,6 +62,11 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def _text_key(text: str) -> str:
+    """Key for per-text score caching (sha1 over the exact requirement text)"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
 class ValidationIteration:
     """Represents one iteration of validation with all criterion scores"""
 
@@ -159,7 +171,8 @@ class RequirementOrchestrator:
         self,
         threshold: float = 0.7,
         max_iterations: int = 5,
-        stream_callback: Optional[callable] = None
+        stream_callback: Optional[callable] = None,
+        incremental_eval: Optional[bool] = None
     ):
         """
         Initialize the requirement orchestrator
@@ -168,10 +181,13 @@ class RequirementOrchestrator:
             threshold: Minimum acceptable score for each criterion (default: 0.7)
             max_iterations: Maximum number of fix iterations (default: 5)
             stream_callback: Optional async callback(event_type, data) for streaming updates
+            incremental_eval: Re-score only fixed criteria after fixes
+                (default: ORCHESTRATOR_INCREMENTAL_EVAL, true)
         """
         self.threshold = threshold
         self.max_iterations = max_iterations
         self.stream_callback = stream_callback
+        self.incremental_eval = INCREMENTAL_EVALUATION if incremental_eval is None else incremental_eval
         self.specialists = {agent.criterion_name: agent for agent in get_all_specialists()}
         self.criteria_config = self._load_criteria_config()
         logger.info(f"RequirementOrchestrator initialized: threshold={threshold}, max_iterations={max_iterations}")
@@ -435,6 +451,10 @@ class RequirementOrchestrator:
                 logger.warning(f"Health check failed for {requirement_id}, proceeding with caution: {health['guidance']}")
 
             current_text = requirement_text
+            # Measured scores per text hash: identical texts are never scored twice
+            score_cache: Dict[str, Dict[str, float]] = {}
+            # Incremental mode: scores carried over from the last evaluation
+            carried: Optional[Dict[str, float]] = None
 
             for iteration_num in range(1, self.max_iterations + 1):
                 logger.info(f"Iteration {iteration_num}/{self.max_iterations} for {requirement_id}")
@@ -448,11 +468,14 @@ class RequirementOrchestrator:
                     "text": current_text
                 })
 
-                scores = await self._evaluate_all_criteria(current_text, context)
+                scores = await self._evaluate_all_criteria(current_text, context, score_cache, carried)
+                tier_result = self._calculate_tier_score(scores)
+                if tier_result["passed"] and carried:
+                    scores = await self._confirm_scores(current_text, context, scores, score_cache)
+                    tier_result = self._calculate_tier_score(scores)
                 iteration.criterion_scores = scores
 
                 # Use tier-based scoring for weighted average and pass/fail logic
-                tier_result = self._calculate_tier_score(scores)
                 iteration.overall_score = tier_result["overall_score"]
 
                 logger.info(f"Iteration {iteration_num} scores: {scores}")
@@ -533,7 +556,8 @@ class RequirementOrchestrator:
                         current_text,
                         scores[criterion],
                         context,
-                        iteration_num
+                        iteration_num,
+                        score_cache
                     )
 
                     if fix_result["fixed"]:
@@ -562,8 +586,23 @@ class RequirementOrchestrator:
                 if iteration.fixes_applied:
                     logger.info(f"Re-evaluating after {len(iteration.fixes_applied)} fixes to check if criteria pass...")
 
-                    new_scores = await self._evaluate_all_criteria(current_text, context)
+                    # Incremental: while an unfixed criterion still fails, criteria no
+                    # fix targeted keep their scores and only the fixed ones are
+                    # re-scored (one call for the subset). Otherwise a pass is likely,
+                    # so everything not yet measured on the new text is scored at once.
+                    fixed = {fix["criterion"] for fix in iteration.fixes_applied}
+                    stuck = [c for c in failing_criteria if c not in fixed]
+                    carried = (
+                        {c: s for c, s in scores.items() if c not in fixed}
+                        if self.incremental_eval and stuck else None
+                    )
+                    new_scores = await self._evaluate_all_criteria(current_text, context, score_cache, carried)
                     new_tier_result = self._calculate_tier_score(new_scores)
+                    if new_tier_result["passed"] and carried:
+                        new_scores = await self._confirm_scores(current_text, context, new_scores, score_cache)
+                        new_tier_result = self._calculate_tier_score(new_scores)
+                    if self.incremental_eval:
+                        carried = new_scores
 
                     logger.info(f"Post-fix evaluation - Overall weighted score: {new_tier_result['overall_score']:.2f}")
                     logger.info(f"Post-fix evaluation - Gating passed: {new_tier_result['gating_passed']}")
@@ -637,52 +676,111 @@ class RequirementOrchestrator:
     async def _evaluate_all_criteria(
         self,
         requirement_text: str,
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        score_cache: Optional[Dict[str, Dict[str, float]]] = None,
+        carried: Optional[Dict[str, float]] = None
     ) -> Dict[str, float]:
         """
         Evaluate all 9 criteria.
 
         Uses BatchCriteriaEvaluator (1 LLM call) by default for ~9x faster performance.
         Falls back to individual specialists (9 LLM calls) if USE_BATCH_EVALUATOR=false.
+        Criteria already known for this text (score_cache) or carried over from
+        the previous evaluation are not re-scored; only the rest is evaluated.
 
         Args:
             requirement_text: Text to evaluate
             context: Context dictionary
+            score_cache: Optional measured scores per text hash (read and updated)
+            carried: Optional scores to reuse without re-evaluation
 
         Returns:
             Dict mapping criterion name to score
         """
+        measured = score_cache.setdefault(_text_key(requirement_text), {}) if score_cache is not None else {}
+        known = {**(carried or {}), **measured}
+        missing = [c for c in self.specialists if c not in known]
+
+        if missing:
+            logger.debug(f"Scoring {len(missing)}/{len(self.specialists)} criteria: {missing}")
+            scored = await self._score_criteria(requirement_text, context, missing)
+            measured.update(scored)
+            known.update(scored)
+            failed = [c for c in missing if c not in scored]
+            if failed:
+                # Neutraler Score nur für diese Runde, nicht gecacht → nächster Aufruf versucht es erneut
+                logger.warning(f"No score for {failed}, using neutral 0.5 (not cached)")
+                known.update({c: 0.5 for c in failed})
+
+        return {c: known[c] for c in self.specialists}
+
+    async def _score_criteria(
+        self,
+        requirement_text: str,
+        context: Dict[str, Any],
+        criteria: List[str]
+    ) -> Dict[str, float]:
+        """
+        Score the given criteria via LLM (one batch call, or one call per specialist)
+
+        Returns:
+            Scores only for criteria that were actually scored; failed ones are
+            omitted so that no neutral fallback ends up in the score cache
+        """
+        result: Dict[str, float] = {}
         if USE_BATCH_EVALUATOR:
-            # FAST PATH: Single LLM call for all 9 criteria
+            # FAST PATH: Single LLM call for all requested criteria
             try:
                 evaluator = get_batch_evaluator()
-                scores = await evaluator.evaluate(requirement_text, context)
-                logger.debug(f"Batch evaluation complete: {scores}")
-                return scores
+                subset = None if len(criteria) == len(self.specialists) else criteria
+                result = await evaluator.evaluate(requirement_text, context, criteria=subset, neutral_fallback=False)
+                logger.debug(f"Batch evaluation complete: {result}")
+                if all(c in result for c in criteria):
+                    return result
+                logger.warning(f"Batch evaluation missed {[c for c in criteria if c not in result]}, falling back to individual")
             except Exception as e:
                 logger.warning(f"Batch evaluation failed, falling back to individual: {e}")
                 # Fall through to individual evaluation
         
-        # SLOW PATH: 9 separate LLM calls (fallback)
+        # SLOW PATH: one LLM call per remaining criterion (fallback)
         tasks = []
         criteria_names = []
 
-        for criterion_name, specialist in self.specialists.items():
-            tasks.append(specialist.evaluate(requirement_text, context))
+        for criterion_name in criteria:
+            if criterion_name in result:
+                continue
+            tasks.append(self.specialists[criterion_name].evaluate(requirement_text, context, neutral_fallback=False))
             criteria_names.append(criterion_name)
 
         scores = await asyncio.gather(*tasks, return_exceptions=True)
 
-        result = {}
         for i, criterion_name in enumerate(criteria_names):
             if isinstance(scores[i], Exception):
                 logger.error(f"Error evaluating {criterion_name}: {scores[i]}")
-                result[criterion_name] = 0.5  # Neutral score on error
             else:
                 result[criterion_name] = scores[i]
 
         return result
 
+    async def _confirm_scores(
+        self,
+        requirement_text: str,
+        context: Dict[str, Any],
+        scores: Dict[str, float],
+        score_cache: Dict[str, Dict[str, float]]
+    ) -> Dict[str, float]:
+        """
+        Re-score carried-over criteria on the final text before accepting a pass
+
+        Returns:
+            Scores measured on requirement_text for every criterion
+        """
+        measured = score_cache.get(_text_key(requirement_text), {})
+        if all(c in measured for c in scores):
+            return scores
+        logger.info("Confirming carried-over scores on final text before passing")
+        return await self._evaluate_all_criteria(requirement_text, context, score_cache)
+
     async def _handle_atomic_split(
         self,
         requirement_id: str,
@@ -750,7 +848,8 @@ class RequirementOrchestrator:
         current_text: str,
         current_score: float,
         context: Dict[str, Any],
-        iteration: int
+        iteration: int,
+        score_cache: Optional[Dict[str, Dict[str, float]]] = None
     ) -> Dict[str, Any]:
         """
         Fix a failing criterion using its specialist agent
@@ -762,6 +861,8 @@ class RequirementOrchestrator:
             current_score: Current criterion score
             context: Context dictionary
             iteration: Current iteration number
+            score_cache: Optional per-text score cache; the verification
+                score of the new text is recorded there
 
         Returns:
             Dict with fixed status, new_text, suggestion, etc.
@@ -783,8 +884,11 @@ class RequirementOrchestrator:
             # Step 2: Apply fix
             new_text = await specialist.apply_fix(current_text, suggestion, context)
 
-            # Step 3: Re-evaluate criterion to verify improvement
-            new_score = await specialist.evaluate(new_text, context)
+            # Step 3: Re-evaluate criterion to verify improvement (a failed check
+            # raises, so the fix is not applied and nothing is cached)
+            new_score = await specialist.evaluate(new_text, context, neutral_fallback=False)
+            if score_cache is not None:
+                score_cache.setdefault(_text_key(new_text), {})[criterion] = new_score
 
             # Check if fix actually improved the score
             improved = new_score > current_score
@@ -828,54 +932,147 @@ class RequirementOrchestrator:
 # ==============================================================================
 
 class BatchOrchestrator:
-    """Orchestrates validation for multiple requirements"""
+    """
+    Orchestrates validation for multiple requirements
+
+    Requirements are processed concurrently by up to max_concurrent workers
+    (ORCHESTRATOR_BATCH_CONCURRENCY, default 5; 1 = sequential). Results are
+    streamed in input order via iter_batch(); every requirement's progress
+    events go to the shared stream_callback, tagged with batch_index, plus
+    batch_started / batch_progress / batch_completed events for the session.
+    """
 
     def __init__(
         self,
         threshold: float = 0.7,
         max_iterations: int = 3,
-        stream_callback: Optional[callable] = None
+        stream_callback: Optional[callable] = None,
+        max_concurrent: Optional[int] = None
     ):
+        self.stream_callback = stream_callback
+        self.max_concurrent = max(1, max_concurrent or int(
+            os.environ.get("ORCHESTRATOR_BATCH_CONCURRENCY", "5")
+        ))
         self.orchestrator = RequirementOrchestrator(
             threshold=threshold,
             max_iterations=max_iterations,
             stream_callback=stream_callback
         )
 
-    async def process_batch(
+    async def _emit(self, event_type: str, data: Dict[str, Any]) -> None:
+        if self.stream_callback:
+            try:
+                await self.stream_callback(event_type, data)
+            except Exception as e:
+                logger.error(f"Error in stream callback: {e}")
+
+    def _orchestrator_for(self, batch_index: int) -> RequirementOrchestrator:
+        """Shallow copy sharing specialists/config, with events tagged by batch_index."""
+        orchestrator = copy.copy(self.orchestrator)
+        if self.stream_callback:
+            async def tagged(event_type: str, data: Dict[str, Any]) -> None:
+                await self.stream_callback(event_type, {**data, "batch_index": batch_index})
+            orchestrator.stream_callback = tagged
+        return orchestrator
+
+    async def iter_batch(
         self,
         requirements: List[Dict[str, str]],
         context: Optional[Dict[str, Any]] = None,
         session_id: Optional[str] = None
-    ) -> List[RequirementValidationResult]:
+    ) -> AsyncIterator[RequirementValidationResult]:
         """
-        Process a batch of requirements
+        Process a batch of requirements concurrently and yield results in input order
 
         Args:
             requirements: List of dicts with 'id' and 'text' keys
             context: Optional shared context
             session_id: Optional session ID for streaming
 
-        Returns:
-            List of RequirementValidationResult
+        Yields:
+            RequirementValidationResult per non-empty requirement, in input order
         """
         context = context or {}
-        results = []
-
+        jobs: List[Tuple[str, str]] = []
         for req in requirements:
-            req_id = req.get("id", f"REQ-{len(results)+1}")
+            req_id = req.get("id", f"REQ-{len(jobs)+1}")
             req_text = req.get("text", "")
 
             if not req_text:
                 logger.warning(f"Skipping empty requirement: {req_id}")
                 continue
+            jobs.append((req_id, req_text))
+
+        total = len(jobs)
+        if not total:
+            return
+
+        loop = asyncio.get_running_loop()
+        pending = [loop.create_future() for _ in jobs]
+        next_job = iter(range(total))
+        completed = 0
+        passed = 0
+        start = loop.time()
+
+        async def worker() -> None:
+            nonlocal completed, passed
+            # Workers pull the next index as soon as they are free (no chunk barriers)
+            for idx in next_job:
+                req_id, req_text = jobs[idx]
+                try:
+                    result = await self._orchestrator_for(idx).process(
+                        requirement_id=req_id,
+                        requirement_text=req_text,
+                        context=context,
+                        session_id=session_id
+                    )
+                except Exception as e:
+                    pending[idx].set_exception(e)
+                    continue
+                pending[idx].set_result(result)
+                completed += 1
+                passed += int(bool(result.passed))
+                await self._emit("batch_progress", {
+                    "requirement_id": req_id,
+                    "batch_index": idx,
+                    "completed": completed,
+                    "total": total
+                })
 
-            result = await self.orchestrator.process(
-                requirement_id=req_id,
-                requirement_text=req_text,
-                context=context,
-                session_id=session_id
-            )
-            results.append(result)
+        concurrency = min(self.max_concurrent, total)
+        await self._emit("batch_started", {"total": total, "concurrency": concurrency})
+        # Worker tasks inherit the batch priority for the global LLM governor
+        with llm_priority("batch"):
+            workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for fut in pending:
+                yield await fut
+            await self._emit("batch_completed", {
+                "total": total,
+                "passed": passed,
+                "failed": total - passed,
+                "duration_ms": int((loop.time() - start) * 1000)
+            })
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
-        return results
+    async def process_batch(
+        self,
+        requirements: List[Dict[str, str]],
+        context: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
+    ) -> List[RequirementValidationResult]:
+        """
+        Process a batch of requirements
+
+        Args:
+            requirements: List of dicts with 'id' and 'text' keys
+            context: Optional shared context
+            session_id: Optional session ID for streaming
+
+        Returns:
+            List of RequirementValidationResult (input order)
+        """
+        return [r async for r in self.iter_batch(requirements, context, session_id)]
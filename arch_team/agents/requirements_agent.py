@@ -97,6 +97,12 @@ def _init_model_client(model_name: Optional[str] = None) -> OpenAIChatCompletion
     }
     if base_url:
         client_kwargs["base_url"] = base_url
+    try:
+        # Route AutoGen's requests through the process-wide LLM governor
+        from backend.core.llm_clients import get_governed_async_http_client
+        client_kwargs["http_client"] = get_governed_async_http_client(base_url)
+    except ImportError:
+        pass
 
     return OpenAIChatCompletionClient(**client_kwargs)
 
@@ -22,7 +22,6 @@ Part of the Requirements-Management-System.
 
 from __future__ import annotations
 
-import asyncio
 import logging
 import os
 import time
@@ -48,13 +47,14 @@ class OrchestratorConfig:
     quality_threshold: float = 0.7      # Min score to pass validation
     max_iterations: int = 5             # Max workflow iterations
     max_rewrite_attempts: int = 3       # Max rewrite attempts per requirement
-    validation_concurrent: int = 10     # Concurrent validation workers (increased from 5)
+    validation_concurrent: Optional[int] = None  # Concurrent validation workers (None = transport/LLM concurrency)
     rewrite_concurrent: int = 10        # Concurrent rewrite workers (increased from 3)
     clarification_concurrent: int = 10  # Concurrent clarification workers (increased from 5)
     decision_concurrent: int = 10       # Concurrent decision workers (increased from 5)
     auto_fix_threshold: float = 0.5     # Below this, need user input
     accept_threshold: float = 0.65      # Above this, may accept as-is
     wait_for_answers_timeout: int = 300 # Timeout waiting for user answers (seconds)
+    answer_poll_fallback_s: float = 30.0  # DB re-check while waiting (cross-process answers), 0 = only on wakeup
     mode: WorkflowMode = WorkflowMode.AUTO  # AUTO or MANUAL mode
 
     @classmethod
@@ -67,13 +67,14 @@ class OrchestratorConfig:
             quality_threshold=float(os.environ.get("QUALITY_THRESHOLD", "0.7")),
             max_iterations=int(os.environ.get("MAX_ITERATIONS", "5")),
             max_rewrite_attempts=int(os.environ.get("REWRITE_MAX_ATTEMPTS", "3")),
-            validation_concurrent=int(os.environ.get("VALIDATION_MAX_CONCURRENT", "5")),
+            validation_concurrent=int(os.environ["VALIDATION_MAX_CONCURRENT"]) if os.environ.get("VALIDATION_MAX_CONCURRENT") else None,
             rewrite_concurrent=int(os.environ.get("REWRITE_MAX_CONCURRENT", "3")),
             clarification_concurrent=int(os.environ.get("CLARIFICATION_MAX_CONCURRENT", "5")),
             decision_concurrent=int(os.environ.get("DECISION_MAX_CONCURRENT", "5")),
             auto_fix_threshold=float(os.environ.get("AUTO_FIX_THRESHOLD", "0.5")),
             accept_threshold=float(os.environ.get("ACCEPT_THRESHOLD", "0.65")),
             wait_for_answers_timeout=int(os.environ.get("CLARIFICATION_TIMEOUT", "300")),
+            answer_poll_fallback_s=float(os.environ.get("CLARIFICATION_POLL_FALLBACK_S", "30")),
             mode=mode
         )
 
@@ -786,22 +787,24 @@ class RequirementsOrchestrator:
             total=len(questions)
         )
         
-        # Wait for answers with timeout
-        start = time.time()
-        timeout = self.config.wait_for_answers_timeout
-        poll_interval = 2
+        # Wait for answers with timeout. Answers submitted in this process wake the
+        # workflow immediately (answer_notifier); the DB is re-checked only on wakeup
+        # and every answer_poll_fallback_s for answers written by other processes.
+        deadline = time.monotonic() + self.config.wait_for_answers_timeout
+        fallback = self.config.answer_poll_fallback_s
         
         answered = []
         
         try:
             from backend.core import db as _db
-            from backend.services.clarification_service import ClarificationService
+            from backend.services.clarification_service import ClarificationService, answer_notifier
             
             service = ClarificationService()
+            keys = [self.workflow_id, correlation_id]
             
-            while (time.time() - start) < timeout:
-                conn = _db.get_db()
-                try:
+            while True:
+                seen = answer_notifier.snapshot(keys)
+                with _db.db_session() as conn:
                     summary = service.get_questions_summary(
                         conn,
                         validation_id=self.workflow_id
@@ -822,11 +825,14 @@ class RequirementsOrchestrator:
                         
                         answered = [dict(q) for q in all_questions]
                         break
-                    
-                finally:
-                    conn.close()
                 
-                await asyncio.sleep(poll_interval)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                await answer_notifier.wait(
+                    seen,
+                    timeout=min(remaining, fallback) if fallback > 0 else remaining
+                )
             
         except Exception as e:
             logger.error(f"Error waiting for answers: {e}")
@@ -20,6 +20,8 @@ import time
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Callable
 
+from backend.core.llm_governor import llm_priority
+
 from .rewrite_worker import RewriteTask, RewriteResult, RewriteWorkerAgent
 from .validation_worker import ValidationTask, ValidationResult, ValidationWorkerAgent
 
@@ -220,11 +222,13 @@ class RewriteDelegatorAgent:
             
             return result
         
-        # Execute all rewrites in parallel (semaphore limits concurrency)
-        results = await asyncio.gather(
-            *[rewrite_with_worker(task) for task in tasks],
-            return_exceptions=True
-        )
+        # Execute all rewrites in parallel (semaphore limits concurrency);
+        # tasks inherit the batch priority for the global LLM governor
+        with llm_priority("batch"):
+            results = await asyncio.gather(
+                *[rewrite_with_worker(task) for task in tasks],
+                return_exceptions=True
+            )
         
         # Process results
         rewrite_results: List[RewriteResult] = []
@@ -67,6 +67,7 @@ except ImportError:
     OpenAIChatCompletionClient = None
 
 from backend.core import settings
+from backend.core.llm_clients import get_governed_async_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -385,6 +386,7 @@ NEED_STAKEHOLDER: [what specific information is needed]"""
                     model=model,
                     api_key=api_key,
                     base_url=base_url,
+                    http_client=get_governed_async_http_client(base_url),
                     model_info={
                         "vision": False,
                         "function_calling": True,
@@ -395,7 +397,8 @@ NEED_STAKEHOLDER: [what specific information is needed]"""
             else:
                 self.model_client = OpenAIChatCompletionClient(
                     model=model,
-                    api_key=api_key
+                    api_key=api_key,
+                    http_client=get_governed_async_http_client()
                 )
             
             self._initialized = True
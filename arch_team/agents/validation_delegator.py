@@ -19,6 +19,9 @@ import time
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Callable
 
+from backend.core.llm_governor import llm_priority
+
+from ..tools.validation_transport import ValidationTransport, get_validation_transport
 from .validation_worker import ValidationTask, ValidationResult, ValidationWorkerAgent
 
 logger = logging.getLogger("arch_team.validation_delegator")
@@ -57,17 +60,21 @@ class ValidationDelegatorAgent:
     def __init__(
         self,
         max_concurrent: Optional[int] = None,
-        sse_callback: Optional[Callable[[str, str, str], None]] = None
+        sse_callback: Optional[Callable[[str, str, str], None]] = None,
+        transport: Optional[ValidationTransport] = None
     ):
         """
         Initialize the validation delegator.
         
         Args:
-            max_concurrent: Maximum parallel validations (default from env)
+            max_concurrent: Maximum parallel validations (default from env,
+                otherwise the transport's LLM concurrency)
             sse_callback: Optional callback(correlation_id, message_type, message) for SSE
+            transport: Evaluation transport (default: process-wide, see validation_transport)
         """
+        self.transport = transport or get_validation_transport()
         self.max_concurrent = max_concurrent or int(
-            os.environ.get("VALIDATION_MAX_CONCURRENT", "5")
+            os.environ.get("VALIDATION_MAX_CONCURRENT", self.transport.max_concurrency)
         )
         self.sse_callback = sse_callback
         self._semaphore: Optional[asyncio.Semaphore] = None
@@ -181,15 +188,18 @@ class ValidationDelegatorAgent:
             worker = ValidationWorkerAgent(
                 worker_id=f"worker-{task.index % self.max_concurrent}",
                 semaphore=semaphore,
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                transport=self.transport
             )
             return await worker.validate(task, total)
         
-        # Execute all validations in parallel (semaphore limits concurrency)
-        results = await asyncio.gather(
-            *[validate_with_worker(task) for task in tasks],
-            return_exceptions=True
-        )
+        # Execute all validations in parallel (semaphore limits concurrency);
+        # tasks inherit the batch priority for the global LLM governor
+        with llm_priority("batch"):
+            results = await asyncio.gather(
+                *[validate_with_worker(task) for task in tasks],
+                return_exceptions=True
+            )
         
         # Process results
         validation_results: List[ValidationResult] = []
@@ -18,6 +18,8 @@ import time
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Callable
 
+from ..tools.validation_transport import ValidationTransport, get_validation_transport
+
 logger = logging.getLogger("arch_team.validation_worker")
 
 
@@ -63,7 +65,8 @@ class ValidationWorkerAgent:
         self,
         worker_id: str,
         semaphore: asyncio.Semaphore,
-        progress_callback: Optional[Callable[[str, int, int, str], None]] = None
+        progress_callback: Optional[Callable[[str, int, int, str], None]] = None,
+        transport: Optional[ValidationTransport] = None
     ):
         """
         Initialize validation worker.
@@ -72,10 +75,12 @@ class ValidationWorkerAgent:
             worker_id: Unique identifier for this worker
             semaphore: Shared AsyncSemaphore for rate limiting
             progress_callback: Optional callback(worker_id, completed, total, message)
+            transport: Evaluation transport (default: process-wide, see validation_transport)
         """
         self.worker_id = worker_id
         self.semaphore = semaphore
         self.progress_callback = progress_callback
+        self.transport = transport
         self._timeout = int(os.environ.get("VALIDATION_TIMEOUT", "120"))
     
     async def validate(self, task: ValidationTask, total_tasks: int = 1) -> ValidationResult:
@@ -104,12 +109,9 @@ class ValidationWorkerAgent:
                 )
             
             try:
-                # Call validation API (wrapped in asyncio.to_thread for blocking HTTP call)
+                # Call validation transport (in-process or pooled async HTTP)
                 result = await asyncio.wait_for(
-                    asyncio.to_thread(
-                        self._call_validation_api,
-                        task
-                    ),
+                    self._call_validation_api(task),
                     timeout=self._timeout
                 )
                 
@@ -153,18 +155,15 @@ class ValidationWorkerAgent:
                     processing_time_ms=int((time.time() - start_time) * 1000)
                 )
 
-    def _call_validation_api(self, task: ValidationTask) -> Dict[str, Any]:
+    async def _call_validation_api(self, task: ValidationTask) -> Dict[str, Any]:
         """
-        Call the validation API synchronously.
+        Evaluate the requirement via the configured transport.
         
-        This is run in a thread pool to avoid blocking the event loop.
+        In-process when co-located with the backend, otherwise a pooled
+        async HTTP client - no thread or HTTP hop per requirement.
         """
-        from ..tools.validation_tools import evaluate_requirement
-        
-        return evaluate_requirement(
-            requirement_text=task.text,
-            criteria_keys=task.criteria_keys
-        )
+        transport = self.transport or get_validation_transport()
+        return await transport.evaluate(task.text, task.criteria_keys)
 
 
 __all__ = ["ValidationTask", "ValidationResult", "ValidationWorkerAgent"]
\ No newline at end of file
@@ -0,0 +1,450 @@
+# -*- coding: utf-8 -*-
+"""
+In-Process-Adjazenzindex für den Knowledge Graph (kg_nodes/kg_edges).
+
+- Kompakte Integer-IDs je Knoten (node_id -> int) und je Relation (rel -> int)
+- Kanten als parallele int-Arrays (src, dst, rel); Nachbarschaft im CSR-Format
+  (offsets + Kantenindizes) getrennt für ausgehende und eingehende Kanten
+- Inkrementelle Updates aus upsert_nodes/upsert_edges: neue Kanten landen in
+  einem Delta je Knoten, das beim Überschreiten einer Schwelle in das CSR
+  kompaktiert wird; geänderte Kanten werden per Tombstone ersetzt
+- Optionaler JSON-Snapshot auf Platte (KG_INDEX_SNAPSHOT), geschrieben bei
+  Kompaktierung und beim Prozessende statt nach jedem Upsert
+
+Traversals (neighbors, neighborhood, degree, subgraph, export) laufen damit
+ohne Qdrant-Round-Trip; Qdrant bleibt für die semantische Suche zuständig.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..runtime.logging import get_logger
+
+logger = get_logger("memory.kg_index")
+
+_SNAPSHOT_VERSION = 1
+
+# Zeitstempel für "nie gebaut/geprüft": jede Differenz zu time.monotonic() ist unendlich alt
+NEVER = float("-inf")
+
+
+def _edge_key(pl: Dict[str, Any]) -> str:
+    return str(pl.get("edge_id") or f"{pl.get('from_node_id')}|{pl.get('rel')}|{pl.get('to_node_id')}")
+
+
+class _CSR:
+    """Compressed Sparse Row: Kantenindizes je Knoten, gruppiert über offsets."""
+
+    __slots__ = ("offsets", "items")
+
+    def __init__(self) -> None:
+        self.offsets = array("l", [0])
+        self.items = array("l")
+
+    @classmethod
+    def build(cls, n_nodes: int, keys: array, alive: bytearray) -> "_CSR":
+        csr = cls()
+        counts = [0] * (n_nodes + 1)
+        for e, k in enumerate(keys):
+            if alive[e]:
+                counts[k + 1] += 1
+        for i in range(n_nodes):
+            counts[i + 1] += counts[i]
+        csr.offsets = array("l", counts)
+        fill = counts[:-1]
+        items = [0] * counts[-1]
+        for e, k in enumerate(keys):
+            if alive[e]:
+                items[fill[k]] = e
+                fill[k] += 1
+        csr.items = array("l", items)
+        return csr
+
+    def row(self, ix: int) -> array:
+        if ix + 1 >= len(self.offsets):
+            return array("l")
+        return self.items[self.offsets[ix] : self.offsets[ix + 1]]
+
+
+class KGAdjacencyIndex:
+    """
+    Adjazenzindex über Knoten- und Kanten-Payloads (Format wie in QdrantKGClient).
+    Thread-safe; alle Methoden liefern Payload-Dicts wie die Qdrant-Pfade.
+    """
+
+    def __init__(self, compact_threshold: int = 1024) -> None:
+        self._lock = threading.RLock()
+        self.compact_threshold = max(1, int(compact_threshold))
+        # Änderungszähler (Snapshot nur wenn dirty), Kompaktierungen, Zeitpunkte für Staleness-Checks
+        self.version = 0
+        self.compactions = 0
+        self._saved_version = -1
+        self.built_at = NEVER
+        self.checked_at = NEVER
+        self._clear()
+
+    def _clear(self) -> None:
+        self._node_ix: Dict[str, int] = {}
+        self._node_keys: List[str] = []
+        self._node_payload: List[Optional[Dict[str, Any]]] = []
+        self._rel_ix: Dict[str, int] = {}
+        self._edge_ix: Dict[str, int] = {}
+        self._edge_payload: List[Dict[str, Any]] = []
+        self._src = array("l")
+        self._dst = array("l")
+        self._rel = array("l")
+        self._alive = bytearray()
+        self._out = _CSR()
+        self._in = _CSR()
+        self._delta_out: Dict[int, List[int]] = {}
+        self._delta_in: Dict[int, List[int]] = {}
+        self._delta_count = 0
+        self._dead = 0
+        # Beim Aufbau übersprungene Punkte (ohne ID, doppelte IDs) → Abgleich mit Qdrant-Punktzahlen
+        self._skipped: Tuple[int, int] = (0, 0)
+
+    # -----------------------------
+    # Aufbau / inkrementelle Updates
+    # -----------------------------
+    def _intern_node(self, node_id: str) -> int:
+        ix = self._node_ix.get(node_id)
+        if ix is None:
+            ix = len(self._node_keys)
+            self._node_ix[node_id] = ix
+            self._node_keys.append(node_id)
+            self._node_payload.append(None)
+        return ix
+
+    def add_nodes(self, payloads: Iterable[Dict[str, Any]]) -> int:
+        n = 0
+        with self._lock:
+            for pl in payloads:
+                nid = str(pl.get("node_id") or "")
+                if not nid:
+                    continue
+                self._node_payload[self._intern_node(nid)] = dict(pl)
+                n += 1
+            self.version += 1
+        return n
+
+    def add_edges(self, payloads: Iterable[Dict[str, Any]]) -> int:
+        n = 0
+        with self._lock:
+            for pl in payloads:
+                fr = str(pl.get("from_node_id") or "")
+                to = str(pl.get("to_node_id") or "")
+                if not fr or not to:
+                    continue
+                key = _edge_key(pl)
+                s, d = self._intern_node(fr), self._intern_node(to)
+                r = self._rel_ix.setdefault(str(pl.get("rel") or "RELATES_TO"), len(self._rel_ix))
+                old = self._edge_ix.get(key)
+                if old is not None and self._src[old] == s and self._dst[old] == d:
+                    # gleiche Endpunkte → nur Payload/REL ersetzen
+                    self._edge_payload[old] = dict(pl)
+                    self._rel[old] = r
+                    n += 1
+                    continue
+                if old is not None:
+                    self._alive[old] = 0
+                    self._dead += 1
+                e = len(self._edge_payload)
+                self._edge_ix[key] = e
+                self._edge_payload.append(dict(pl))
+                self._src.append(s)
+                self._dst.append(d)
+                self._rel.append(r)
+                self._alive.append(1)
+                self._delta_out.setdefault(s, []).append(e)
+                self._delta_in.setdefault(d, []).append(e)
+                self._delta_count += 1
+                n += 1
+            self.version += 1
+            if self._delta_count + self._dead >= max(self.compact_threshold, len(self._edge_payload) // 4):
+                self.compact()
+        return n
+
+    def compact(self) -> None:
+        """
+        Baut die CSR-Arrays neu (Delta einmischen, Tombstones entfernen).
+        """
+        with self._lock:
+            if self._dead:
+                keep = [e for e in range(len(self._edge_payload)) if self._alive[e]]
+                self._edge_payload = [self._edge_payload[e] for e in keep]
+                self._src = array("l", (self._src[e] for e in keep))
+                self._dst = array("l", (self._dst[e] for e in keep))
+                self._rel = array("l", (self._rel[e] for e in keep))
+                self._alive = bytearray(b"\x01" * len(keep))
+                self._edge_ix = {_edge_key(pl): i for i, pl in enumerate(self._edge_payload)}
+                self._dead = 0
+            n = len(self._node_keys)
+            self._out = _CSR.build(n, self._src, self._alive)
+            self._in = _CSR.build(n, self._dst, self._alive)
+            self._delta_out.clear()
+            self._delta_in.clear()
+            self._delta_count = 0
+            self.compactions += 1
+
+    def rebuild(self, nodes: Iterable[Dict[str, Any]], edges: Iterable[Dict[str, Any]]) -> None:
+        seen = [0, 0]
+
+        def tally(payloads: Iterable[Dict[str, Any]], kind: int) -> Iterator[Dict[str, Any]]:
+            for pl in payloads:
+                seen[kind] += 1
+                yield pl
+
+        with self._lock:
+            self._clear()
+            self.add_nodes(tally(nodes, 0))
+            self.add_edges(tally(edges, 1))
+            self.compact()
+            n_nodes, n_edges = self.counts()
+            self._skipped = (seen[0] - n_nodes, seen[1] - n_edges)
+            self.built_at = self.checked_at = time.monotonic()
+
+    def adopt(self, other: "KGAdjacencyIndex", since_version: Optional[int] = None) -> None:
+        """
+        Übernimmt den Stand eines separat aufgebauten Index in einem Schritt (Hintergrund-Rebuild);
+        Leser sehen bis dahin den alten Stand. Hat sich dieser Index seit since_version geändert,
+        fehlen diese Updates evtl. im neuen Stand → checked_at = NEVER, der nächste Zugriff prüft erneut.
+        """
+        with self._lock:
+            changed = since_version is not None and self.version != since_version
+            for name, value in vars(other).items():
+                if name.startswith("_") and name not in ("_lock", "_saved_version"):
+                    setattr(self, name, value)
+            self.version += 1
+            self.built_at = other.built_at
+            self.checked_at = NEVER if changed else other.checked_at
+
+    # -----------------------------
+    # Abfragen
+    # -----------------------------
+    def _edges_of(self, ix: int, direction: str) -> Iterable[int]:
+        if direction in ("out", "both"):
+            yield from self._out.row(ix)
+            yield from self._delta_out.get(ix, ())
+        if direction in ("in", "both"):
+            for e in self._in.row(ix):
+                # Self-Loops bei "both" nicht doppelt liefern
+                if direction != "both" or self._src[e] != ix:
+                    yield e
+            for e in self._delta_in.get(ix, ()):
+                if direction != "both" or self._src[e] != ix:
+                    yield e
+
+    def _rel_filter(self, rels: Optional[List[str]]) -> Optional[set]:
+        if not rels:
+            return None
+        return {self._rel_ix[r] for r in rels if r in self._rel_ix}
+
+    def _node_payloads(self, ixs: Iterable[int]) -> List[Dict[str, Any]]:
+        out = []
+        for ix in ixs:
+            pl = self._node_payload[ix]
+            if pl is not None:
+                out.append(dict(pl))
+        return out
+
+    def neighborhood(
+        self,
+        node_ids: List[str],
+        depth: int = 1,
+        rels: Optional[List[str]] = None,
+        direction: str = "both",
+        limit: int = 1000,
+    ) -> Dict[str, Any]:
+        """
+        BFS bis depth Hops; Semantik wie QdrantKGClient.neighborhood().
+        """
+        limit = max(1, int(limit or 200))
+        with self._lock:
+            rel_ok = self._rel_filter(rels)
+            if rel_ok is not None and not rel_ok:
+                return {"nodes": [], "edges": []}
+            frontier = [self._node_ix[n] for n in dict.fromkeys(str(x) for x in node_ids or []) if n in self._node_ix]
+            visited = set(frontier)
+            seen_edges: Dict[int, None] = {}
+            ends: Dict[int, None] = {}
+            for _ in range(max(1, int(depth or 1))):
+                nxt: List[int] = []
+                for ix in frontier:
+                    for e in self._edges_of(ix, direction):
+                        if e in seen_edges or not self._alive[e]:
+                            continue
+                        if rel_ok is not None and self._rel[e] not in rel_ok:
+                            continue
+                        seen_edges[e] = None
+                        for end in (self._src[e], self._dst[e]):
+                            ends.setdefault(end, None)
+                            if end not in visited:
+                                visited.add(end)
+                                nxt.append(end)
+                        if len(seen_edges) >= limit:
+                            break
+                    if len(seen_edges) >= limit:
+                        break
+                frontier = nxt
+                if not frontier or len(seen_edges) >= limit:
+                    break
+            return {
+                "nodes": self._node_payloads(ends),
+                "edges": [dict(self._edge_payload[e]) for e in seen_edges],
+            }
+
+    def neighbors(
+        self,
+        node_id: str,
+        rels: Optional[List[str]] = None,
+        direction: str = "both",
+        limit: int = 200,
+    ) -> Dict[str, Any]:
+        return self.neighborhood([node_id], depth=1, rels=rels, direction=direction, limit=limit)
+
+    def degree(self, node_id: str, direction: str = "both") -> int:
+        with self._lock:
+            ix = self._node_ix.get(str(node_id))
+            if ix is None:
+                return 0
+            return sum(1 for e in self._edges_of(ix, direction) if self._alive[e])
+
+    def subgraph(self, node_ids: List[str]) -> Dict[str, Any]:
+        """
+        Induzierter Teilgraph: die Knoten node_ids und alle Kanten zwischen ihnen.
+        """
+        with self._lock:
+            ixs = {self._node_ix[str(n)] for n in node_ids or [] if str(n) in self._node_ix}
+            edges = [
+                dict(self._edge_payload[e])
+                for ix in ixs
+                for e in self._edges_of(ix, "out")
+                if self._alive[e] and self._dst[e] in ixs
+            ]
+            return {"nodes": self._node_payloads(sorted(ixs)), "edges": edges}
+
+    def export(self, limit: int = 10000) -> Dict[str, Any]:
+        limit = max(0, int(limit))
+        with self._lock:
+            nodes = [dict(pl) for pl in self._node_payload if pl is not None][:limit]
+            edges = [dict(pl) for e, pl in enumerate(self._edge_payload) if self._alive[e]][:limit]
+        return {"nodes": nodes, "edges": edges}
+
+    def counts(self) -> Tuple[int, int]:
+        with self._lock:
+            nodes = sum(1 for pl in self._node_payload if pl is not None)
+            return nodes, len(self._edge_payload) - self._dead
+
+    def point_counts(self) -> Tuple[int, int]:
+        """Erwartete Punktzahlen der Qdrant-Collections: counts() plus beim Aufbau übersprungene Punkte."""
+        with self._lock:
+            nodes, edges = self.counts()
+            return nodes + self._skipped[0], edges + self._skipped[1]
+
+    # -----------------------------
+    # Snapshot
+    # -----------------------------
+    @property
+    def dirty(self) -> bool:
+        """Geändert seit dem letzten save()/load()."""
+        return self.version != self._saved_version
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            version = self.version
+            data = self.export(limit=len(self._edge_payload) + len(self._node_payload))
+            skipped = list(self._skipped)
+        d = os.path.dirname(os.path.abspath(path))
+        if d:
+            os.makedirs(d, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": _SNAPSHOT_VERSION, **data, "skipped": skipped}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self._saved_version = version
+
+    def load(self, path: str) -> bool:
+        """
+        Lädt einen Snapshot; False wenn Datei fehlt oder unlesbar ist.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != _SNAPSHOT_VERSION:
+                return False
+            self.rebuild(data.get("nodes") or [], data.get("edges") or [])
+            nodes_skipped, edges_skipped = data.get("skipped") or (0, 0)
+            self._skipped = (int(nodes_skipped), int(edges_skipped))
+            self._saved_version = self.version
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning("KG index snapshot %s unreadable: %s", path, e)
+            return False
+
+
+_indexes: Dict[Tuple[str, str, str], KGAdjacencyIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_kg_index(
+    qdrant_url: str,
+    nodes_collection: str,
+    edges_collection: str,
+    loader: Callable[[KGAdjacencyIndex], None],
+) -> KGAdjacencyIndex:
+    """
+    Prozessweiter Index je (URL, Collections). Beim ersten Zugriff befüllt
+    loader() den Index (Snapshot oder Qdrant-Scroll); schlägt er fehl, wird
+    nichts registriert und der Fehler durchgereicht.
+    """
+    key = (str(qdrant_url), nodes_collection, edges_collection)
+    idx = _indexes.get(key)
+    if idx is not None:
+        return idx
+    with _indexes_lock:
+        idx = _indexes.get(key)
+        if idx is None:
+            idx = KGAdjacencyIndex()
+            loader(idx)
+            _indexes[key] = idx
+        return idx
+
+
+def peek_kg_index(qdrant_url: str, nodes_collection: str, edges_collection: str) -> Optional[KGAdjacencyIndex]:
+    """Bereits geladener Index oder None (ohne ihn aufzubauen)."""
+    return _indexes.get((str(qdrant_url), nodes_collection, edges_collection))
+
+
+_snapshot_paths: Dict[int, str] = {}
+_snapshot_lock = threading.Lock()
+
+
+def save_at_exit(idx: KGAdjacencyIndex, path: str) -> None:
+    """Schreibt den Snapshot beim Prozessende, falls sich der Index seitdem geändert hat."""
+    with _snapshot_lock:
+        first = id(idx) not in _snapshot_paths
+        _snapshot_paths[id(idx)] = path
+    if not first:
+        return
+
+    def _flush() -> None:
+        if idx.dirty:
+            try:
+                idx.save(_snapshot_paths[id(idx)])
+            except Exception as e:
+                logger.warning("KG index snapshot write at exit failed: %s", e)
+
+    atexit.register(_flush)
+
+
+def drop_kg_index(qdrant_url: str, nodes_collection: str, edges_collection: str) -> None:
+    with _indexes_lock:
+        _indexes.pop((str(qdrant_url), nodes_collection, edges_collection), None)
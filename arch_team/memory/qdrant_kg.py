@@ -2,11 +2,14 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
 import uuid
 from typing import Any, Dict, List, Optional, Tuple
 
 from ..runtime.logging import get_logger
 from backend.core.embeddings import build_embeddings, get_embeddings_dim
+from .kg_index import KGAdjacencyIndex, drop_kg_index, get_kg_index, peek_kg_index, save_at_exit
 
 # Import centralized port configuration
 try:
@@ -17,6 +20,15 @@ except ImportError:
 
 logger = get_logger("memory.qdrant_kg")
 
+# Nur ein Thread prüft/rebuildet einen veralteten Index, die anderen lesen weiter
+# (der Rebuild läuft im Hintergrund und hält den Lock bis zum Tausch)
+_index_check_lock = threading.Lock()
+
+
+def _point_id(key: str) -> str:
+    """Qdrant verlangt int/UUID als Point-ID: deterministische UUID5 aus der stabilen Knoten-/Kanten-ID."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, str(key)))
+
 
 class QdrantKGClient:
     """
@@ -40,9 +52,6 @@ class QdrantKGClient:
       - QDRANT_API_KEY (optional)
     """
 
-    # Klassenweiter Schalter: Collections nur einmal pro Prozess sicherstellen
-    _collections_ready: bool = False
-
     def __init__(
         self,
         qdrant_url: Optional[str] = None,
@@ -75,10 +84,18 @@ class QdrantKGClient:
 
         # Batch-Größe für Upserts (anpassbar via ENV QDRANT_UPSERT_BATCH)
         self.batch_size = int(os.environ.get("QDRANT_UPSERT_BATCH", "500"))
-        # einfacher In-Memory Embedding-Cache (Text -> Vektor)
-        self._embed_cache: Dict[str, List[float]] = {}
+
+        # In-Process-Adjazenzindex für Traversals (arch_team/memory/kg_index.py)
+        self.use_index = os.environ.get("KG_INDEX_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+        self.index_snapshot = os.environ.get("KG_INDEX_SNAPSHOT", "")  # leer = kein Snapshot
+        # Andere Worker/Prozesse schreiben ebenfalls: Punktzahlen in Qdrant spätestens alle
+        # KG_INDEX_CHECK_S vergleichen, nach KG_INDEX_MAX_AGE_S immer neu aufbauen (0 = nie);
+        # der Neuaufbau läuft im Hintergrund, bis zum Tausch wird der alte Index ausgeliefert
+        self.index_check_s = float(os.environ.get("KG_INDEX_CHECK_S", "5"))
+        self.index_max_age_s = float(os.environ.get("KG_INDEX_MAX_AGE_S", "300"))
 
         self._qdrant = None  # type: ignore
+        self._index_rebuild: Optional[threading.Thread] = None
 
     # -----------------------------
     # Lazy Import + Client
@@ -94,17 +111,23 @@ class QdrantKGClient:
     def _client(self):
         if self._qdrant is None:
             QdrantClient, _ = self._lazy_import()
-            self._qdrant = QdrantClient(url=self.qdrant_url, api_key=self.api_key)
+            from backend.core.qdrant_pool import get_shared_client
+
+            self._qdrant = get_shared_client(self.qdrant_url, self.api_key, factory=QdrantClient)
         return self._qdrant
 
     # -----------------------------
     # Ensure Collections
     # -----------------------------
     def ensure_collections(self) -> None:
-        # Skip, falls bereits erledigt
-        if QdrantKGClient._collections_ready:
-            return
+        from backend.core import qdrant_pool
+
         client = self._client()
+        # Skip, falls für diesen (geteilten) Client bereits erledigt
+        if qdrant_pool.collection_known(client, self.nodes_collection) and qdrant_pool.collection_known(
+            client, self.edges_collection
+        ):
+            return
         _, qmodels = self._lazy_import()
         try:
             cols = client.get_collections()
@@ -122,8 +145,9 @@ class QdrantKGClient:
                     collection_name=self.edges_collection,
                     vectors_config=qmodels.VectorParams(size=self.dim, distance=qmodels.Distance.COSINE),
                 )
-            # einmalig markieren
-            QdrantKGClient._collections_ready = True
+            # einmalig je Client markieren
+            qdrant_pool.remember_collection(client, self.nodes_collection)
+            qdrant_pool.remember_collection(client, self.edges_collection)
         except Exception as e:
             raise RuntimeError(f"QdrantKGClient.ensure_collections() fehlgeschlagen: {e}")
 
@@ -133,33 +157,8 @@ class QdrantKGClient:
     def _embed_texts(self, texts: List[str]) -> List[List[float]]:
         if not texts:
             return []
-        # Cache beachten und fehlende Texte in einem Batch nachziehen
-        out: List[Optional[List[float]]] = [None] * len(texts)
-        missing: List[str] = []
-        missing_idx: List[int] = []
-        for i, t in enumerate(texts):
-            v = self._embed_cache.get(t)
-            if v is not None:
-                out[i] = v
-            else:
-                missing.append(t)
-                missing_idx.append(i)
-        if missing:
-            # innerhalb der fehlenden deduplizieren
-            uniq: List[str] = []
-            idx_map: Dict[str, int] = {}
-            for t in missing:
-                if t not in idx_map:
-                    idx_map[t] = len(uniq)
-                    uniq.append(t)
-            vecs = build_embeddings(uniq)
-            for t, vec in zip(uniq, vecs):
-                self._embed_cache[t] = vec
-            for pos, i in enumerate(missing_idx):
-                t = texts[i]
-                out[i] = self._embed_cache[t]
-        # type: ignore - alle None sollten gefüllt sein
-        return out  # type: ignore
+        # Deduplizierung + persistenter (model, text)-Cache passieren in build_embeddings
+        return build_embeddings(texts)
 
     # -----------------------------
     # Upserts
@@ -204,7 +203,7 @@ class QdrantKGClient:
             raise RuntimeError(f"KG Node-Embeddings fehlgeschlagen: {e}")
 
         # Qdrant verlangt als Point-ID int oder UUID. Wir erzeugen deterministische UUID5 aus der stabilen Knoten-ID.
-        point_ids = [str(uuid.uuid5(uuid.NAMESPACE_URL, str(nid))) for nid in ids]
+        point_ids = [_point_id(nid) for nid in ids]
 
         total = 0
         # batch upsert zur Reduktion von Payload-Spitzen
@@ -220,6 +219,7 @@ class QdrantKGClient:
             except Exception as e:
                 raise RuntimeError(f"KG Node-Upsert fehlgeschlagen: {e}")
 
+        self._sync_index(nodes=payloads)
         return total, ids
 
     def upsert_edges(self, edges: List[Dict[str, Any]]) -> Tuple[int, List[str]]:
@@ -264,7 +264,7 @@ class QdrantKGClient:
             raise RuntimeError(f"KG Edge-Embeddings fehlgeschlagen: {e}")
 
         # deterministische UUID5 aus stabiler Kanten-ID
-        point_ids = [str(uuid.uuid5(uuid.NAMESPACE_URL, str(eid))) for eid in ids]
+        point_ids = [_point_id(eid) for eid in ids]
 
         total = 0
         # batch upsert zur Reduktion von Payload-Spitzen (analog zu Nodes)
@@ -280,6 +280,7 @@ class QdrantKGClient:
             except Exception as e:
                 raise RuntimeError(f"KG Edge-Upsert fehlgeschlagen: {e}")
 
+        self._sync_index(edges=payloads)
         return total, ids
 
     # -----------------------------
@@ -323,6 +324,55 @@ class QdrantKGClient:
         except Exception as e:
             raise RuntimeError(f"KG Edge-Suche fehlgeschlagen: {e}")
 
+    def _edge_filter(self, node_ids: List[str], rels: Optional[List[str]], direction: str):
+        """
+        Ein Filter für alle Kanten an node_ids: Richtung "both" als OR (should)
+        über from/to, mehrere RELs als MatchAny statt je REL ein Scroll.
+        """
+        from qdrant_client.models import Filter, FieldCondition, MatchAny  # type: ignore
+
+        ids = [str(n) for n in node_ids]
+        ends = []
+        if direction in ("out", "both"):
+            ends.append(FieldCondition(key="from_node_id", match=MatchAny(any=ids)))
+        if direction in ("in", "both"):
+            ends.append(FieldCondition(key="to_node_id", match=MatchAny(any=ids)))
+        must = [FieldCondition(key="rel", match=MatchAny(any=list(rels)))] if rels else []
+        if len(ends) == 1:
+            return Filter(must=must + ends)
+        return Filter(must=must or None, should=ends)
+
+    def _scroll_edges(self, flt, limit: int) -> List[Dict[str, Any]]:
+        """
+        Scrollt Kanten seitenweise bis limit (Qdrant-Seitengröße max. batch_size).
+        """
+        client = self._client()
+        out: List[Dict[str, Any]] = []
+        offset = None
+        while len(out) < limit:
+            result = client.scroll(
+                collection_name=self.edges_collection,
+                limit=min(max(1, self.batch_size), limit - len(out)),
+                with_payload=True,
+                scroll_filter=flt,
+                offset=offset,
+            )
+            points, offset = result if isinstance(result, tuple) else (result, None)
+            out.extend(dict(getattr(p, "payload", {}) or {}) for p in (points or []))
+            if not offset:
+                break
+        return out
+
+    @staticmethod
+    def _edge_end_ids(edges_payload: List[Dict[str, Any]]) -> List[str]:
+        seen: Dict[str, None] = {}
+        for pl in edges_payload:
+            for key in ("from_node_id", "to_node_id"):
+                nid = str(pl.get(key) or "")
+                if nid:
+                    seen.setdefault(nid, None)
+        return list(seen)
+
     def neighbors(
         self,
         node_id: str,
@@ -334,141 +384,271 @@ class QdrantKGClient:
         Liefert 1-Hop Nachbarschaft:
           - edges: alle Kanten, die from_node_id==node_id (out) bzw. to_node_id==node_id (in) haben
           - nodes: alle beteiligten Gegenknoten (inkl. self node optional)
-        Hinweis: Qdrant unterstützt Filter; wir nutzen scroll mit Filter.
+        Aus dem Adjazenzindex; ohne Index ein Scroll für die Kanten (RELs per
+        MatchAny) und ein retrieve für die Knoten.
         """
         if not node_id:
             return {"nodes": [], "edges": []}
+        return self.neighborhood([node_id], depth=1, rels=rels, direction=direction, limit=limit)
 
-        self.ensure_collections()
-        client = self._client()
-
-        try:
-            # Filter-Modellobjekte importieren
-            from qdrant_client.models import Filter, FieldCondition, MatchValue  # type: ignore
-        except Exception:
-            # Kein Filter verfügbar
-            logger.error("KG neighbors: qdrant_client.models nicht verfügbar")
+    def neighborhood(
+        self,
+        node_ids: List[str],
+        depth: int = 1,
+        rels: Optional[List[str]] = None,
+        direction: str = "both",
+        limit: int = 1000,
+    ) -> Dict[str, Any]:
+        """
+        Multi-Hop Nachbarschaft (BFS) um node_ids bis zur Tiefe depth.
+        Je Hop ein Kanten-Scroll für die gesamte Frontier, am Ende ein gebündelter
+        Knoten-Lookup → O(depth) statt O(Knoten) Round-Trips.
+        limit begrenzt die Gesamtzahl der Kanten.
+        """
+        start = [str(n) for n in (node_ids or []) if n]
+        if not start:
             return {"nodes": [], "edges": []}
 
-        must_conditions = []
-        if direction in ("out", "both"):
-            must_conditions.append(FieldCondition(key="from_node_id", match=MatchValue(value=node_id)))
-        if direction in ("in", "both"):
-            must_conditions.append(FieldCondition(key="to_node_id", match=MatchValue(value=node_id)))
-        if rels:
-            # Einfache OR über mehrere RELs bilden: hier iterativ aufrufen (vereinfachend)
-            edges_payload: List[Dict[str, Any]] = []
-            for r in rels:
-                flt = Filter(must=must_conditions + [FieldCondition(key="rel", match=MatchValue(value=r))])
-                try:
-                    result = client.scroll(collection_name=self.edges_collection, limit=max(1, int(limit or 200)), with_payload=True, scroll_filter=flt)
-                    points = result[0] if isinstance(result, tuple) else result
-                    for p in (points or []):
-                        edges_payload.append(dict(getattr(p, "payload", {}) or {}))
-                except Exception as e:
-                    logger.error("KG neighbors scroll failed (rel=%s): %s", r, e)
-            # resolve nodes
-            node_ids = set()
-            for pl in edges_payload:
-                node_ids.add(str(pl.get("from_node_id") or ""))
-                node_ids.add(str(pl.get("to_node_id") or ""))
-            node_ids.discard("")
-            nodes_payload = self._fetch_nodes_by_ids(list(node_ids))
-            return {"nodes": nodes_payload, "edges": edges_payload}
-
-        # Ohne REL-Filter
-        flt = Filter(must=must_conditions)
-        try:
-            result = client.scroll(collection_name=self.edges_collection, limit=max(1, int(limit or 200)), with_payload=True, scroll_filter=flt)
-            points = result[0] if isinstance(result, tuple) else result
-            edges_payload = [dict(getattr(p, "payload", {}) or {}) for p in (points or [])]
-        except Exception as e:
-            logger.error("KG neighbors scroll failed: %s", e)
-            edges_payload = []
+        idx = self._index()
+        if idx is not None:
+            return idx.neighborhood(start, depth=depth, rels=rels, direction=direction, limit=limit)
 
-        node_ids = set()
-        for pl in edges_payload:
-            node_ids.add(str(pl.get("from_node_id") or ""))
-            node_ids.add(str(pl.get("to_node_id") or ""))
-        node_ids.discard("")
-        nodes_payload = self._fetch_nodes_by_ids(list(node_ids))
+        self.ensure_collections()
+        limit = max(1, int(limit or 200))
+        visited: Dict[str, None] = dict.fromkeys(start)
+        frontier = list(start)
+        edges: Dict[str, Dict[str, Any]] = {}
+        for _ in range(max(1, int(depth or 1))):
+            if not frontier or len(edges) >= limit:
+                break
+            try:
+                hop = self._scroll_edges(self._edge_filter(frontier, rels, direction), limit - len(edges))
+            except Exception as e:
+                logger.error("KG neighbors scroll failed: %s", e)
+                break
+            for pl in hop:
+                key = str(pl.get("edge_id") or (pl.get("from_node_id"), pl.get("rel"), pl.get("to_node_id")))
+                edges.setdefault(key, pl)
+            frontier = [nid for nid in self._edge_end_ids(hop) if nid not in visited]
+            visited.update(dict.fromkeys(frontier))
+
+        edges_payload = list(edges.values())
+        nodes_payload = self._fetch_nodes_by_ids(self._edge_end_ids(edges_payload))
         return {"nodes": nodes_payload, "edges": edges_payload}
 
     # -----------------------------
     # Export all nodes and edges
     # -----------------------------
+    def degree(self, node_id: str, direction: str = "both") -> int:
+        """Anzahl Kanten an node_id (Richtung wie bei neighbors)."""
+        idx = self._index()
+        if idx is not None:
+            return idx.degree(node_id, direction=direction)
+        return len(self.neighbors(node_id, direction=direction, limit=1_000_000)["edges"])
+
+    def subgraph(self, node_ids: List[str]) -> Dict[str, Any]:
+        """Induzierter Teilgraph: die Knoten node_ids und alle Kanten zwischen ihnen."""
+        idx = self._index()
+        if idx is not None:
+            return idx.subgraph(node_ids)
+        wanted = {str(n) for n in node_ids or []}
+        data = self.neighborhood(list(wanted), depth=1, direction="out", limit=1_000_000)
+        edges = [e for e in data["edges"] if str(e.get("to_node_id")) in wanted]
+        return {"nodes": self._fetch_nodes_by_ids(list(wanted)), "edges": edges}
+
     def export_all(self, limit: int = 10000) -> Dict[str, Any]:
         """
         Export all nodes and edges from KG collections.
         Returns: {"nodes": [...], "edges": [...]}
         """
+        idx = self._index()
+        if idx is not None:
+            return idx.export(limit=limit)
         self.ensure_collections()
-        client = self._client()
-
         nodes: List[Dict[str, Any]] = []
         edges: List[Dict[str, Any]] = []
-
         try:
-            # Scroll through all nodes
-            offset = None
-            while True:
-                result = client.scroll(
-                    collection_name=self.nodes_collection,
-                    limit=min(100, limit - len(nodes)),
-                    with_payload=True,
-                    offset=offset
-                )
-                points, next_offset = result if isinstance(result, tuple) else (result, None)
-                for p in (points or []):
-                    nodes.append(dict(getattr(p, "payload", {}) or {}))
-                if not next_offset or len(nodes) >= limit:
-                    break
-                offset = next_offset
+            nodes = self._scroll_all(self.nodes_collection, limit)
         except Exception as e:
             logger.error("KG export nodes failed: %s", e)
+        try:
+            edges = self._scroll_all(self.edges_collection, limit)
+        except Exception as e:
+            logger.error("KG export edges failed: %s", e)
+        return {"nodes": nodes, "edges": edges}
+
+    def _scroll_all(self, collection: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        client = self._client()
+        out: List[Dict[str, Any]] = []
+        offset = None
+        page = max(1, self.batch_size)
+        while limit is None or len(out) < limit:
+            result = client.scroll(
+                collection_name=collection,
+                limit=page if limit is None else min(page, limit - len(out)),
+                with_payload=True,
+                offset=offset,
+            )
+            points, offset = result if isinstance(result, tuple) else (result, None)
+            out.extend(dict(getattr(p, "payload", {}) or {}) for p in (points or []))
+            if not offset:
+                break
+        return out
 
+    # -----------------------------
+    # Adjazenzindex
+    # -----------------------------
+    def _index(self) -> Optional[KGAdjacencyIndex]:
+        """
+        Prozessweiter Adjazenzindex für diese Collections; wird beim ersten Zugriff
+        aus dem Snapshot (falls aktuell) oder per vollständigem Qdrant-Scroll aufgebaut.
+        None wenn deaktiviert (KG_INDEX_ENABLED=false) oder der Aufbau fehlschlägt.
+        """
+        if not self.use_index:
+            return None
         try:
-            # Scroll through all edges
-            offset = None
-            while True:
-                result = client.scroll(
-                    collection_name=self.edges_collection,
-                    limit=min(100, limit - len(edges)),
-                    with_payload=True,
-                    offset=offset
+            idx = get_kg_index(self.qdrant_url, self.nodes_collection, self.edges_collection, self._load_index)
+            self._revalidate_index(idx)
+            return idx
+        except Exception as e:
+            logger.warning("KG index unavailable, falling back to Qdrant scrolls: %s", e)
+            drop_kg_index(self.qdrant_url, self.nodes_collection, self.edges_collection)
+            return None
+
+    def _qdrant_counts(self) -> Tuple[int, int]:
+        client = self._client()
+        return (
+            int(client.count(collection_name=self.nodes_collection, exact=True).count),
+            int(client.count(collection_name=self.edges_collection, exact=True).count),
+        )
+
+    def _revalidate_index(self, idx: KGAdjacencyIndex) -> None:
+        """
+        Staleness-Check vor dem Ausliefern: weichen die Punktzahlen in Qdrant ab
+        (Upserts anderer Worker, delete_collection) oder ist der Index älter als
+        index_max_age_s, wird er im Hintergrund aus Qdrant neu aufgebaut.
+        """
+        now = time.monotonic()
+        if now - idx.checked_at < self.index_check_s:
+            return
+        if not _index_check_lock.acquire(blocking=False):
+            return  # ein anderer Thread prüft oder baut gerade neu auf
+        handed_off = False
+        try:
+            if time.monotonic() - idx.checked_at < self.index_check_s:
+                return
+            expected = self._qdrant_counts()
+            too_old = self.index_max_age_s > 0 and now - idx.built_at >= self.index_max_age_s
+            if idx.point_counts() != expected or too_old:
+                logger.info("KG index stale (%s != %s, age %.0fs), rebuilding", idx.point_counts(), expected, now - idx.built_at)
+                self._index_rebuild = threading.Thread(
+                    target=self._rebuild_index, args=(idx,), name="kg-index-rebuild", daemon=True
                 )
-                points, next_offset = result if isinstance(result, tuple) else (result, None)
-                for p in (points or []):
-                    edges.append(dict(getattr(p, "payload", {}) or {}))
-                if not next_offset or len(edges) >= limit:
-                    break
-                offset = next_offset
+                self._index_rebuild.start()
+                handed_off = True
+            else:
+                idx.checked_at = time.monotonic()
+        finally:
+            if not handed_off:
+                _index_check_lock.release()
+
+    def _rebuild_index(self, idx: KGAdjacencyIndex) -> None:
+        """Baut einen frischen Index aus Qdrant und tauscht ihn ein; gibt danach _index_check_lock frei."""
+        try:
+            version = idx.version
+            fresh = KGAdjacencyIndex(idx.compact_threshold)
+            fresh.rebuild(self._scroll_all(self.nodes_collection), self._scroll_all(self.edges_collection))
+            idx.adopt(fresh, since_version=version)
+            logger.info("KG index rebuilt from Qdrant (%d nodes, %d edges)", *idx.counts())
+            self._save_index(idx)
         except Exception as e:
-            logger.error("KG export edges failed: %s", e)
+            logger.warning("KG index rebuild failed, keeping previous index: %s", e)
+        finally:
+            _index_check_lock.release()
 
-        return {"nodes": nodes, "edges": edges}
+    def _load_index(self, idx: KGAdjacencyIndex, use_snapshot: bool = True) -> None:
+        self.ensure_collections()
+        if use_snapshot and self.index_snapshot and idx.load(self.index_snapshot):
+            expected = self._qdrant_counts()
+            if idx.point_counts() == expected:
+                logger.info("KG index loaded from snapshot %s (%d nodes, %d edges)", self.index_snapshot, *expected)
+                return
+            logger.info("KG index snapshot stale (%s != %s), rebuilding", idx.point_counts(), expected)
+        idx.rebuild(self._scroll_all(self.nodes_collection), self._scroll_all(self.edges_collection))
+        logger.info("KG index built from Qdrant (%d nodes, %d edges)", *idx.counts())
+        self._save_index(idx)
+
+    def _save_index(self, idx: KGAdjacencyIndex) -> None:
+        if not self.index_snapshot:
+            return
+        save_at_exit(idx, self.index_snapshot)
+        try:
+            idx.save(self.index_snapshot)
+        except Exception as e:
+            logger.warning("KG index snapshot write failed: %s", e)
+
+    def _sync_index(self, nodes: Optional[List[Dict[str, Any]]] = None, edges: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Inkrementelles Update nach erfolgreichem Upsert (nur falls der Index schon geladen ist;
+        sonst enthält ihn der spätere Aufbau aus Qdrant ohnehin).
+        """
+        if not self.use_index:
+            return
+        idx = peek_kg_index(self.qdrant_url, self.nodes_collection, self.edges_collection)
+        if idx is None:
+            return
+        compactions = idx.compactions
+        if nodes:
+            idx.add_nodes(nodes)
+        if edges:
+            idx.add_edges(edges)
+        # Snapshot nur bei Kompaktierung (sonst beim Prozessende), nicht nach jedem Batch
+        if idx.compactions != compactions:
+            self._save_index(idx)
+
+    def refresh_index(self) -> Optional[KGAdjacencyIndex]:
+        """Baut den Index neu aus Qdrant auf (z. B. nach Schreibzugriffen anderer Prozesse)."""
+        idx = peek_kg_index(self.qdrant_url, self.nodes_collection, self.edges_collection)
+        if idx is None:
+            return self._index()
+        self._load_index(idx, use_snapshot=False)
+        return idx
 
     # -----------------------------
     # Helper: fetch nodes by ids
     # -----------------------------
     def _fetch_nodes_by_ids(self, node_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Knoten-Payloads per retrieve über die deterministischen UUID5-Point-IDs
+        (siehe upsert_nodes), gebündelt zu batch_size IDs je Call.
+        Fallback bei Fehlern: ein Scroll mit MatchAny auf node_id je Bündel.
+        """
         if not node_ids:
             return []
         client = self._client()
-        try:
-            # Quick path: scroll by id not directly supported; we can search by payload filter node_id
-            from qdrant_client.models import Filter, FieldCondition, MatchValue  # type: ignore
-        except Exception:
-            return []
-        out: List[Dict[str, Any]] = []
-        for nid in node_ids:
+        ids = list(dict.fromkeys(str(n) for n in node_ids if n))
+        step = max(1, self.batch_size)
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(ids), step):
+            part = ids[start : start + step]
             try:
-                flt = Filter(must=[FieldCondition(key="node_id", match=MatchValue(value=nid))])
-                res = client.scroll(collection_name=self.nodes_collection, limit=1, with_payload=True, scroll_filter=flt)
-                points = res[0] if isinstance(res, tuple) else res
-                if points:
-                    p = points[0]
-                    out.append(dict(getattr(p, "payload", {}) or {}))
-            except Exception:
-                continue
-        return out
\ No newline at end of file
+                points = client.retrieve(
+                    collection_name=self.nodes_collection,
+                    ids=[_point_id(nid) for nid in part],
+                    with_payload=True,
+                    with_vectors=False,
+                )
+            except Exception as e:
+                logger.warning("KG retrieve failed, falling back to scroll: %s", e)
+                try:
+                    from qdrant_client.models import Filter, FieldCondition, MatchAny  # type: ignore
+
+                    flt = Filter(must=[FieldCondition(key="node_id", match=MatchAny(any=part))])
+                    res = client.scroll(collection_name=self.nodes_collection, limit=len(part), with_payload=True, scroll_filter=flt)
+                    points = res[0] if isinstance(res, tuple) else res
+                except Exception:
+                    continue
+            for p in (points or []):
+                pl = dict(getattr(p, "payload", {}) or {})
+                by_id[str(pl.get("node_id") or "")] = pl
+        return [by_id[nid] for nid in ids if nid in by_id]
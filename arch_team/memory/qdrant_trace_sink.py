@@ -60,8 +60,10 @@ class QdrantTraceSink:
     def _client(self):
         if self._qdrant is None:
             QdrantClient, _, _ = self._lazy_imports()
+            from backend.core.qdrant_pool import get_shared_client
+
             # qdrant_url kann http://host:port oder http(s)://host sein; QdrantClient akzeptiert 'url'
-            self._qdrant = QdrantClient(url=self.qdrant_url, api_key=self.api_key)
+            self._qdrant = get_shared_client(self.qdrant_url, self.api_key, factory=QdrantClient)
         return self._qdrant
 
     def _model(self):
@@ -77,11 +79,32 @@ class QdrantTraceSink:
                 self._dim = 384
         return self._st_model
 
+    def _encode(self, text: str):
+        """
+        Sentence-Transformer-Embedding über den persistenten Embedding-Cache
+        (Schlüssel: st_model_name + Text-Hash).
+        """
+        from backend.core.embedding_cache import get_embedding_cache
+
+        cache = get_embedding_cache()
+        if cache is not None:
+            hit = cache.get_many(self.st_model_name, [text])[0]
+            if hit is not None:
+                return hit
+        vec = [float(x) for x in self._st_model.encode([text])[0]]  # type: ignore
+        if cache is not None:
+            cache.put_many(self.st_model_name, [text], [vec])
+        return vec
+
     def ensure(self) -> None:
         """
         Stellt sicher, dass die Collection existiert.
         """
+        from backend.core import qdrant_pool
+
         client = self._client()
+        if qdrant_pool.collection_known(client, self.collection):
+            return
         _, qmodels, _ = self._lazy_imports()
         try:
             collections = client.get_collections()
@@ -92,6 +115,7 @@ class QdrantTraceSink:
                     collection_name=self.collection,
                     vectors_config=qmodels.VectorParams(size=self._dim, distance=qmodels.Distance.COSINE),
                 )
+            qdrant_pool.remember_collection(client, self.collection)
         except Exception as e:
             raise RuntimeError(f"QdrantTraceSink.ensure() fehlgeschlagen: {e}")
 
@@ -125,7 +149,7 @@ class QdrantTraceSink:
             ]
         ).strip()
         try:
-            vec = self._st_model.encode([text])[0]  # type: ignore
+            vec = self._encode(text)
         except Exception as e:
             raise RuntimeError(f"Trace-Embedding fehlgeschlagen: {e}")
 
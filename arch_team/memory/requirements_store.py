@@ -19,13 +19,16 @@ import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
-# Force reload environment variables
 from dotenv import load_dotenv
-load_dotenv(override=True)
 
-from ..runtime.logging import get_logger
+from backend.core import qdrant_pool
 from backend.core.embeddings import build_embeddings, get_embeddings_dim
 
+from ..runtime.logging import get_logger
+
+# Force reload environment variables
+load_dotenv(override=True)
+
 # Import centralized port configuration
 try:
     from backend.core.ports import get_ports
@@ -77,7 +80,6 @@ class RequirementsStore:
         self.api_key = api_key or os.environ.get("QDRANT_API_KEY") or None
         self.dim = int(dim or get_embeddings_dim())
         self.batch_size = int(os.environ.get("QDRANT_UPSERT_BATCH", "500"))
-        self._embed_cache: Dict[str, List[float]] = {}
         self._qdrant = None
     
     def _lazy_import(self):
@@ -91,41 +93,14 @@ class RequirementsStore:
     def _client(self):
         if self._qdrant is None:
             QdrantClient, _ = self._lazy_import()
-            self._qdrant = QdrantClient(url=self.qdrant_url, api_key=self.api_key)
+            self._qdrant = qdrant_pool.get_shared_client(self.qdrant_url, self.api_key, factory=QdrantClient)
         return self._qdrant
     
     def _embed_texts(self, texts: List[str]) -> List[List[float]]:
-        """Batch embed texts with caching."""
+        """Batch embed texts (dedupe + persistent cache in build_embeddings)."""
         if not texts:
             return []
-        
-        out: List[Optional[List[float]]] = [None] * len(texts)
-        missing: List[str] = []
-        missing_idx: List[int] = []
-        
-        for i, t in enumerate(texts):
-            v = self._embed_cache.get(t)
-            if v is not None:
-                out[i] = v
-            else:
-                missing.append(t)
-                missing_idx.append(i)
-        
-        if missing:
-            uniq: List[str] = []
-            idx_map: Dict[str, int] = {}
-            for t in missing:
-                if t not in idx_map:
-                    idx_map[t] = len(uniq)
-                    uniq.append(t)
-            vecs = build_embeddings(uniq)
-            for t, vec in zip(uniq, vecs):
-                self._embed_cache[t] = vec
-            for pos, i in enumerate(missing_idx):
-                t = texts[i]
-                out[i] = self._embed_cache[t]
-        
-        return out  # type: ignore
+        return build_embeddings(texts)
     
     def list_versions(self) -> List[Dict[str, Any]]:
         """
@@ -193,6 +168,8 @@ class RequirementsStore:
         _, qmodels = self._lazy_import()
         
         collection_name = self._collection_name(version)
+        if qdrant_pool.collection_known(client, collection_name):
+            return collection_name
         
         try:
             # Check if exists
@@ -205,6 +182,7 @@ class RequirementsStore:
                     collection_name=collection_name,
                     vectors_config=qmodels.VectorParams(size=self.dim, distance=qmodels.Distance.COSINE),
                 )
+            qdrant_pool.remember_collection(client, collection_name)
             
             return collection_name
             
@@ -421,6 +399,7 @@ class RequirementsStore:
         
         try:
             client.delete_collection(collection_name)
+            qdrant_pool.forget_collection(client, collection_name)
             logger.info(f"Deleted collection {collection_name}")
             return True
         except Exception as e:
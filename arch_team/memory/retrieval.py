@@ -140,7 +140,9 @@ class Retriever:
             QdrantClient, _ = self._lazy_import()
             # Erzeuge echten/gefakten Client und wickle ihn in den Adapter,
             # damit Tests problemlos by_req_id/_search_points setzen können.
-            base_client = QdrantClient(url=self.qdrant_url, api_key=self.api_key)
+            from backend.core.qdrant_pool import get_shared_client
+
+            base_client = get_shared_client(self.qdrant_url, self.api_key, factory=QdrantClient)
             self._qdrant = self._ClientAdapter(base_client)
         return self._qdrant
 
@@ -148,7 +150,12 @@ class Retriever:
         """
         Defensive: Wenn Collection fehlt, wird sie mit der erwarteten Dimension erzeugt.
         """
+        from backend.core import qdrant_pool
+
         client = self._client()
+        inner = getattr(client, "_inner", client)
+        if qdrant_pool.collection_known(inner, self.collection):
+            return
         _, qmodels = self._lazy_import()
         try:
             cols = client.get_collections()
@@ -159,6 +166,7 @@ class Retriever:
                     collection_name=self.collection,
                     vectors_config=qmodels.VectorParams(size=self.dim, distance=qmodels.Distance.COSINE),
                 )
+            qdrant_pool.remember_collection(inner, self.collection)
         except Exception as e:
             # Nicht fatal für Retrieval – aber Benutzer informieren
             logger.error("Retriever.ensure failed for collection=%s: %s", self.collection, e)
@@ -8,6 +8,7 @@ from .chat_client import IChatClient, Messages
 
 # Try to import backend settings for provider config
 try:
+    from backend.core.llm_clients import get_openai_client
     from backend.core.settings import get_llm_config
     _has_backend_settings = True
 except ImportError:
@@ -54,8 +55,11 @@ class OpenAIAdapter(IChatClient):
         # Versuch: neues SDK (>=1.0) - this should always work with openai>=1.0
         try:
             from openai import OpenAI  # type: ignore
-            # Pass base_url for OpenRouter support
-            client = OpenAI(api_key=api_key, base_url=base_url) if base_url else OpenAI(api_key=api_key)
+            # Pooled keep-alive client shared process-wide (backend/core/llm_clients.py)
+            if _has_backend_settings:
+                client = get_openai_client(api_key, base_url)
+            else:
+                client = OpenAI(api_key=api_key, base_url=base_url) if base_url else OpenAI(api_key=api_key)
             # Tools (falls vorhanden) nur an das neue SDK weiterreichen
             resp = client.chat.completions.create(
                 model=model_name,
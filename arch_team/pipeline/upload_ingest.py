@@ -1,12 +1,12 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-from typing import Any, Dict, List, Sequence, Union
+from typing import Any, Dict, Iterator, List, Sequence, Union
 
 from ..runtime.logging import get_logger
 
 # Reuse existing helpers from the project
-from backend.core.ingest import extract_texts, chunk_payloads
+from backend.core.ingest import iter_texts, iter_chunk_payloads
 from backend.core.embeddings import build_embeddings, get_embeddings_dim
 
 # Import centralized port configuration
@@ -18,6 +18,9 @@ except ImportError:
 
 logger = get_logger("pipeline.upload_ingest")
 
+# Chunks je Embedding-/Upsert-Runde
+EMBED_BATCH = 64
+
 
 def _lazy_import_qdrant():
     try:
@@ -75,9 +78,9 @@ def _coerce_files_or_texts(files_or_texts: List[Union[str, bytes, Dict[str, Any]
 
 def upload_to_requirements_v2(files_or_texts: List[Union[str, bytes, Dict[str, Any]]], *, collection: str = "requirements_v2") -> List[Dict[str, Any]]:
     """
-    Pipeline:
-    - extract_texts pro Datei
-    - chunk_payloads
+    Pipeline (gestreamt, in Batches zu EMBED_BATCH Chunks):
+    - iter_texts pro Datei (PDF seitenweise)
+    - iter_chunk_payloads
     - build_embeddings
     - upsert in Qdrant (collection=requirements_v2)
     Rückgabe: einfache MEMORY-Referenzen [{id, score?, payload}]
@@ -94,45 +97,46 @@ def upload_to_requirements_v2(files_or_texts: List[Union[str, bytes, Dict[str, A
     dim = int(get_embeddings_dim())
     _ensure_collection(client, qmodels, collection=collection, dim=dim)
 
-    # 1) Extract
-    normalized = _coerce_files_or_texts(files_or_texts)
-    raw_records: List[Dict[str, Any]] = []
-    for rec in normalized:
-        try:
-            parts = extract_texts(rec["filename"], rec["data"], rec.get("content_type") or "")
-            raw_records.extend(parts)
-        except Exception as e:
-            logger.error("extract_texts failed for %s: %s", rec.get("filename"), e)
-
-    if not raw_records:
-        return []
-
-    # 2) Chunk
-    payloads = chunk_payloads(raw_records)
-    texts = [p["text"] for p in payloads]
-    if not texts:
-        return []
-
-    # 3) Embeddings
-    try:
-        vectors = build_embeddings(texts)
-    except Exception as e:
-        # klarer Fehler (fehlender API-Key)
-        raise RuntimeError(f"Embeddings fehlgeschlagen: {e}")
+    # 1) Extract + 2) Chunk als Stream: PDF-Seiten laufen direkt ins Chunking,
+    #    Embedding/Upsert beginnt nach den ersten EMBED_BATCH Chunks
+    def _records() -> Iterator[Dict[str, Any]]:
+        for rec in _coerce_files_or_texts(files_or_texts):
+            try:
+                yield from iter_texts(rec["filename"], rec["data"], rec.get("content_type") or "")
+            except Exception as e:
+                logger.error("extract_texts failed for %s: %s", rec.get("filename"), e)
 
-    # 4) Upsert
-    points = []
     mem_refs: List[Dict[str, Any]] = []
-    for i, p in enumerate(payloads):
-        payload = dict(p.get("payload") or {})
-        payload["text"] = p.get("text") or ""
-        points.append(qmodels.PointStruct(id=None, vector=vectors[i], payload=payload))
+    batch: List[Dict[str, Any]] = []
 
-    try:
-        res = client.upsert(collection_name=collection, points=points)
+    def _flush() -> None:
+        texts = [p["text"] for p in batch]
+        # 3) Embeddings
+        try:
+            vectors = build_embeddings(texts)
+        except Exception as e:
+            # klarer Fehler (fehlender API-Key)
+            raise RuntimeError(f"Embeddings fehlgeschlagen: {e}")
+
+        # 4) Upsert
+        points = []
+        for i, p in enumerate(batch):
+            payload = dict(p.get("payload") or {})
+            payload["text"] = p.get("text") or ""
+            points.append(qmodels.PointStruct(id=None, vector=vectors[i], payload=payload))
+        try:
+            client.upsert(collection_name=collection, points=points)
+        except Exception as e:
+            raise RuntimeError(f"Qdrant upsert fehlgeschlagen: {e}")
         # Wir haben keine IDs gesetzt; Qdrant vergibt sie. Für die Baseline liefern wir die Payloads zurück.
-        for p in payloads:
+        for p in batch:
             mem_refs.append({"id": None, "payload": dict(p.get("payload") or {}), "score": None})
-        return mem_refs
-    except Exception as e:
-        raise RuntimeError(f"Qdrant upsert fehlgeschlagen: {e}")
\ No newline at end of file
+        batch.clear()
+
+    for p in iter_chunk_payloads(_records()):
+        batch.append(p)
+        if len(batch) >= EMBED_BATCH:
+            _flush()
+    if batch:
+        _flush()
+    return mem_refs
@@ -16,6 +16,7 @@ ENV:
 """
 from __future__ import annotations
 
+import contextlib
 import io
 import os
 import mimetypes
@@ -30,6 +31,19 @@ from flask import Flask, request, jsonify, send_from_directory, redirect, Respon
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+# Mining-Agent und KG-Abstraktion (Qdrant)
+from arch_team.agents.chunk_miner import ChunkMinerAgent
+from arch_team.agents.kg_agent import KGAbstractionAgent
+from arch_team.memory.qdrant_kg import QdrantKGClient
+
+# Validation Services (consolidated backend), Manifest Integration
+from backend.core import db as _db
+from backend.core.db import init_db
+from backend.core.dedupe import semantic_duplicate_groups
+from backend.core.llm import llm_rewrite, llm_suggest
+from backend.services import EvaluationService, RequestContext, ServiceError
+from backend.services.manifest_integration import create_manifests_from_chunkminer
+
 # Import centralized port configuration
 try:
     from backend.core.ports import get_ports
@@ -40,20 +54,6 @@ except ImportError:
 # Configure logger
 logger = logging.getLogger(__name__)
 
-# Import des Mining-Agents
-from arch_team.agents.chunk_miner import ChunkMinerAgent
-
-# KG-Abstraktion (Qdrant)
-from arch_team.agents.kg_agent import KGAbstractionAgent
-from arch_team.memory.qdrant_kg import QdrantKGClient
-
-# Validation Services (consolidated backend)
-from backend.services import EvaluationService, RequestContext, ServiceError
-from backend.core.llm import llm_suggest, llm_rewrite
-
-# Manifest Integration
-from backend.services.manifest_integration import create_manifests_from_chunkminer
-from backend.core import db as _db
 # Projektverzeichnisse
 PROJECT_DIR = Path(__file__).resolve().parent.parent  # .../test (Projektwurzel)
 FRONTEND_DIR = PROJECT_DIR / "frontend"               # .../test/frontend
@@ -69,7 +69,6 @@ api_key_status = "SET" if os.environ.get("OPENAI_API_KEY") else "MISSING"
 print(f"[service.py] OPENAI_API_KEY status after load_dotenv: {api_key_status}")
 
 # Initialize database schema if needed (for validation endpoints)
-from backend.core.db import init_db
 try:
     init_db()
     print("[service.py] Database initialized successfully")
@@ -91,12 +90,15 @@ def _truthy(s: str | None) -> bool:
     return s.strip().lower() in ("1", "true", "yes", "on")
 
 
-def _file_to_record(fs) -> Dict[str, Any]:
-    # fs ist eine werkzeug.datastructures.FileStorage Instanz
+def _file_to_record(fs, stack: contextlib.ExitStack) -> Dict[str, Any]:
+    # fs ist eine werkzeug.datastructures.FileStorage Instanz; Upload wird blockweise
+    # in eine Temp-Datei gespoolt (gelöscht beim Schließen von stack) und per Pfad extrahiert
+    from backend.core.ingest import spool_to_path
+
     filename = fs.filename or "upload.bin"
-    data = fs.read() or b""
+    path = stack.enter_context(spool_to_path(fs.stream, os.path.splitext(filename)[1]))
     ct = fs.mimetype or mimetypes.guess_type(filename)[0] or ""
-    return {"filename": filename, "data": data, "content_type": ct}
+    return {"filename": filename, "path": path, "content_type": ct}
 
 
 @app.route("/health", methods=["GET"])
@@ -146,26 +148,41 @@ def mining_upload():
             except ValueError:
                 pass
 
-        # In Agent-Records normalisieren
-        records: List[Dict[str, Any]] = []
-        for fs in files:
-            try:
-                records.append(_file_to_record(fs))
-            except Exception as e:
-                # fahre fort, wenn eine Datei fehlschlägt
-                print(f"[mining] read failed for {getattr(fs, 'filename', '?')}: {e}")
-
-        if not records:
-            return jsonify({"success": False, "message": "Failed to read uploads"}), 400
-
-        # Agent ausführen (sammelt DTOs, sendet sie nicht an ReqWorker)
-        agent = ChunkMinerAgent(source="web", default_model=os.environ.get("MODEL_NAME"))
-        items = agent.mine_files_or_texts_collect(
-            records,
-            model=model,
-            neighbor_refs=neighbor_refs,
-            chunk_options=chunk_options
-        )
+        with contextlib.ExitStack() as stack:
+            # In Agent-Records normalisieren
+            records: List[Dict[str, Any]] = []
+            for fs in files:
+                try:
+                    records.append(_file_to_record(fs, stack))
+                except Exception as e:
+                    # fahre fort, wenn eine Datei fehlschlägt
+                    print(f"[mining] read failed for {getattr(fs, 'filename', '?')}: {e}")
+
+            if not records:
+                return jsonify({"success": False, "message": "Failed to read uploads"}), 400
+
+            # Delta-Mining: Chunks, deren chunkHash bereits im Manifest steht, nicht erneut minen
+            delta = _truthy(request.form.get("delta")) or _truthy(request.args.get("delta"))
+            skip_hashes = None
+            if delta:
+                try:
+                    conn = _db.get_db()
+                    try:
+                        skip_hashes = _db.get_mined_chunk_hashes(conn, [r["filename"] for r in records])
+                    finally:
+                        conn.close()
+                except Exception as e:
+                    logger.warning(f"[mining] Delta lookup failed, mining all chunks: {e}")
+
+            # Agent ausführen (sammelt DTOs, sendet sie nicht an ReqWorker)
+            agent = ChunkMinerAgent(source="web", default_model=os.environ.get("MODEL_NAME"))
+            items = agent.mine_files_or_texts_collect(
+                records,
+                model=model,
+                neighbor_refs=neighbor_refs,
+                chunk_options=chunk_options,
+                skip_chunk_hashes=skip_hashes,
+            )
 
         # Create manifests in database
         manifest_ids = []
@@ -184,7 +201,8 @@ def mining_upload():
             "success": True,
             "count": len(items),
             "items": items,
-            "manifest_ids": manifest_ids
+            "manifest_ids": manifest_ids,
+            "delta": delta,
         })
 
     except Exception as e:
@@ -388,12 +406,13 @@ def kg_export():
 @app.route("/api/kg/neighbors", methods=["GET"])
 def kg_neighbors():
     """
-    1-Hop Nachbarschaft eines Knotens.
+    Nachbarschaft eines Knotens (Default 1 Hop).
     Query-Parameter:
       - node_id: ID des Ausgangsknotens (Pflicht)
       - rel: optionale kommaseparierte Liste von Relationstypen (z. B. "HAS_ACTION,ON_ENTITY")
       - dir: "in" | "out" | "both" (Default "both")
       - limit: Max. Anzahl Kanten (Default 200)
+      - depth: Anzahl Hops (Default 1, max. 5); je Hop ein gebündelter Qdrant-Scroll
     Antwort: { success, nodes: [...], edges: [...] } (Payloads aus Qdrant)
     """
     try:
@@ -406,9 +425,13 @@ def kg_neighbors():
         if rel:
             rels = [r.strip() for r in rel.split(",") if r.strip()]
         limit = int(request.args.get("limit") or "200")
+        depth = max(1, min(5, int(request.args.get("depth") or "1")))
 
         client = QdrantKGClient()
-        data = client.neighbors(node_id=node_id, rels=rels, direction=direction, limit=limit)
+        if depth > 1:
+            data = client.neighborhood([node_id], depth=depth, rels=rels, direction=direction, limit=limit)
+        else:
+            data = client.neighbors(node_id=node_id, rels=rels, direction=direction, limit=limit)
         return jsonify({
             "success": True,
             "nodes": data.get("nodes", []),
@@ -763,101 +786,26 @@ def rag_find_duplicates():
                 }
             })
 
-        # Use Qdrant for semantic duplicate detection
-        client = QdrantKGClient()
-
-        # Build similarity matrix
-        req_texts = [r.get("text", "") for r in requirements]
-        pairs = []  # List of (i, j, similarity)
-
-        for i, req1 in enumerate(req_texts):
-            if not req1.strip():
-                continue
-
-            try:
-                # Search for similar requirements
-                similar = client.search_nodes(req1, top_k=len(req_texts))
-
-                for item in similar:
-                    score = item.get("score", 0.0)
-                    payload = item.get("payload", {})
-                    req2_text = payload.get("text", "")
-
-                    # Find index in original list
-                    try:
-                        j = req_texts.index(req2_text)
-                    except ValueError:
-                        continue
-
-                    # Skip self-comparison
-                    if i >= j:
-                        continue
-
-                    if score >= threshold:
-                        pairs.append((i, j, score))
-
-            except Exception as e:
-                logger.warning(f"[RAG] Duplicate search failed for req {i}: {e}")
-                continue
-
-        # Group duplicates using Union-Find
-        parent = list(range(len(requirements)))
-
-        def find(x):
-            if parent[x] != x:
-                parent[x] = find(parent[x])
-            return parent[x]
+        # Embed the batch once (cached) and group thresholded cosine pairs via union-find
+        req_texts = [r.get("text", "") or "" for r in requirements]
+        groups = semantic_duplicate_groups(req_texts, threshold=threshold)
 
-        def union(x, y):
-            px, py = find(x), find(y)
-            if px != py:
-                parent[px] = py
-
-        # Build groups
-        for i, j, _ in pairs:
-            union(i, j)
-
-        # Collect groups
-        groups_dict = {}
-        for i in range(len(requirements)):
-            root = find(i)
-            if root not in groups_dict:
-                groups_dict[root] = []
-            groups_dict[root].append(i)
-
-        # Filter groups with duplicates (size > 1)
         duplicate_groups = []
-        group_counter = 1
-
-        for indices in groups_dict.values():
-            if len(indices) > 1:
-                # Calculate similarities within group
-                group_reqs = []
-                similarities = []
-
-                for idx in indices:
-                    req = requirements[idx]
-                    # Find max similarity to other members
-                    max_sim = 1.0 if len(indices) == 1 else 0.0
-                    for i, j, sim in pairs:
-                        if (i == idx and j in indices) or (j == idx and i in indices):
-                            max_sim = max(max_sim, sim)
-
-                    group_reqs.append({
-                        "req_id": req.get("req_id", f"REQ-{idx}"),
-                        "text": req.get("text", ""),
-                        "similarity": max_sim
-                    })
-                    similarities.append(max_sim)
-
-                avg_sim = sum(similarities) / len(similarities) if similarities else 0.0
-
-                duplicate_groups.append({
-                    "group_id": f"dup_{group_counter}",
-                    "requirements": group_reqs,
-                    "avg_similarity": avg_sim
+        for group_counter, group in enumerate(groups, start=1):
+            group_reqs = []
+            for idx in group["indices"]:
+                req = requirements[idx]
+                group_reqs.append({
+                    "req_id": req.get("req_id", f"REQ-{idx}"),
+                    "text": req.get("text", ""),
+                    "similarity": group["similarity"][idx]
                 })
-                group_counter += 1
+            similarities = [r["similarity"] for r in group_reqs]
+            duplicate_groups.append({
+                "group_id": f"dup_{group_counter}",
+                "requirements": group_reqs,
+                "avg_similarity": sum(similarities) / len(similarities) if similarities else 0.0
+            })
 
         # Calculate stats
         total_duplicates = sum(len(g["requirements"]) - 1 for g in duplicate_groups)
@@ -1404,6 +1352,10 @@ def clarification_answer():
         response_file = tmp_dir / f"clarification_{correlation_id}.txt"
         response_file.write_text(answer, encoding='utf-8')
 
+        # Wake in-process waiters (ask_user, orchestrator) instead of letting them poll
+        from backend.services.clarification_service import answer_notifier
+        answer_notifier.notify(correlation_id)
+
         print(f"[Clarification] Answer received for {correlation_id}: {answer[:50]}...")
 
         return jsonify({
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Pluggable transports for requirement evaluation.
+
+ValidationWorkerAgent used to POST every requirement to the backend's own
+``/api/v2/evaluate/single`` endpoint via blocking ``requests`` in a thread.
+The transports below replace that hop:
+
+- InProcessValidationTransport: calls ``EvaluationService.evaluate_single``
+  directly when the backend is importable (co-located). The blocking LLM call
+  runs on a dedicated executor sized to the LLM concurrency (``MAX_PARALLEL``).
+- HttpValidationTransport: pooled ``httpx.AsyncClient`` with keep-alive for a
+  remote backend (``VALIDATION_API_BASE``).
+
+Selection via ``VALIDATION_TRANSPORT`` = auto | inprocess | http (default: auto).
+"auto" uses HTTP when ``VALIDATION_API_BASE`` is set, otherwise in-process if
+the backend can be imported.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Protocol
+
+from ..runtime.logging import get_logger
+
+logger = get_logger("tools.validation_transport")
+
+_backend_port = os.environ.get("BACKEND_PORT", "8087")
+API_TIMEOUT = int(os.environ.get("VALIDATION_TIMEOUT", "120"))
+
+
+def _error_result(error: Exception) -> Dict[str, Any]:
+    """Fallback result, identical to validation_tools.evaluate_requirement."""
+    return {"score": 0.0, "verdict": "fail", "evaluation": [], "error": str(error)}
+
+
+class ValidationTransport(Protocol):
+    """Evaluates a single requirement; returns {score, verdict, evaluation, error?}."""
+
+    name: str
+    max_concurrency: int
+
+    async def evaluate(
+        self, requirement_text: str, criteria_keys: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        ...
+
+
+class InProcessValidationTransport:
+    """Direct EvaluationService calls without HTTP/JSON round-trip."""
+
+    name = "inprocess"
+
+    def __init__(self, service: Any = None, max_concurrency: Optional[int] = None):
+        if max_concurrency is None:
+            from backend.core import settings
+
+            max_concurrency = settings.MAX_PARALLEL
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._service = service
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_service(self) -> Any:
+        if self._service is None:
+            from backend.services import EvaluationService
+
+            self._service = EvaluationService()
+        return self._service
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Dedicated pool: caps parallel LLM calls without occupying the default executor
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="validation"
+                )
+            return self._executor
+
+    async def evaluate(
+        self, requirement_text: str, criteria_keys: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        call = partial(self._get_service().evaluate_single, requirement_text, criteria_keys=criteria_keys)
+        # run_in_executor does not propagate contextvars (e.g. the LLM governor priority)
+        call = partial(contextvars.copy_context().run, call)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), call)
+        except Exception as e:
+            logger.error(f"In-process evaluation failed: {e}")
+            return _error_result(e)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+class HttpValidationTransport:
+    """Pooled async HTTP client for a remote evaluation backend."""
+
+    name = "http"
+
+    def __init__(
+        self,
+        api_base: Optional[str] = None,
+        timeout: float = API_TIMEOUT,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.api_base = (api_base or os.environ.get("VALIDATION_API_BASE") or f"http://localhost:{_backend_port}").rstrip("/")
+        self.timeout = timeout
+        self.max_concurrency = max(1, int(max_concurrency or os.environ.get("VALIDATION_MAX_CONCURRENT", "5")))
+        # httpx.AsyncClient is bound to its event loop -> one client per loop
+        self._clients: Dict[int, Any] = {}
+
+    def _get_client(self) -> Any:
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        # Drop clients of loops that have been closed in the meantime
+        self._clients = {k: v for k, v in self._clients.items() if not v[0].is_closed()}
+        loop_client = self._clients.get(id(loop))
+        client = loop_client[1] if loop_client else None
+        if client is None or client.is_closed:
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            )
+            client = httpx.AsyncClient(base_url=self.api_base, timeout=self.timeout, limits=limits)
+            self._clients[id(loop)] = (loop, client)
+        return client
+
+    async def evaluate(
+        self, requirement_text: str, criteria_keys: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        try:
+            response = await self._get_client().post(
+                "/api/v2/evaluate/single",
+                json={"text": requirement_text, "criteria_keys": criteria_keys},
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"Evaluation API call failed: {e}")
+            return _error_result(e)
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for _loop, client in clients:
+            await client.aclose()
+
+
+def _backend_available() -> bool:
+    try:
+        import backend.services  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+_transport: Optional[ValidationTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_validation_transport() -> ValidationTransport:
+    """Process-wide transport chosen via VALIDATION_TRANSPORT (cached)."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            mode = os.environ.get("VALIDATION_TRANSPORT", "auto").strip().lower()
+            if mode == "auto":
+                remote = bool(os.environ.get("VALIDATION_API_BASE"))
+                mode = "http" if remote or not _backend_available() else "inprocess"
+            _transport = InProcessValidationTransport() if mode == "inprocess" else HttpValidationTransport()
+            logger.info(f"Validation transport: {_transport.name}")
+        return _transport
+
+
+def set_validation_transport(transport: Optional[ValidationTransport]) -> None:
+    """Override the process-wide transport (None → re-select on next use)."""
+    global _transport
+    with _transport_lock:
+        _transport = transport
+
+
+__all__ = [
+    "ValidationTransport",
+    "InProcessValidationTransport",
+    "HttpValidationTransport",
+    "get_validation_transport",
+    "set_validation_transport",
+]
@@ -3,10 +3,11 @@
 KORRIGIERTE API V2 - Teil 2: Korrigierte files_ingest Funktion
 """
 
+import contextlib
 import os
 import time
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List
 import traceback
 
 try:
@@ -19,11 +20,17 @@ from .api_v2 import api_bp, build_chunks_absatz, _lx_default_config, _normalize_
 
 # Reuse Backend-Bausteine innerhalb v2
 from backend.core import settings
-from backend.core.ingest import extract_texts, chunk_payloads
+from backend.core.ingest import extract_texts_many, chunk_payloads, chunk_hash, plan_delta, spool_to_path
 from backend.core.embeddings import build_embeddings, get_embeddings_dim
+from backend.core.dedupe import dedupe_keep_longest
 from backend.core.vector_store import get_qdrant_client, upsert_points
 # ÄNDERN: Zusatz‑Importe für Reset/Search (Qdrant)
 from backend.core.vector_store import reset_collection as vs_reset_collection, search as vs_search
+from backend.core.vector_store import (
+    delete_points as vs_delete_points,
+    fetch_chunk_hashes as vs_fetch_chunk_hashes,
+    set_payloads as vs_set_payloads,
+)
 
 # Optional: LangExtract global import (verhindert NameError bei fehlender Lib)
 try:
@@ -52,6 +59,22 @@ def _debug_enabled() -> bool:
     return str(os.environ.get("DEBUG_API", "")).lower() in ("1", "true", "yes", "on")
 
 
+@contextlib.contextmanager
+def _spooled_uploads(files) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Upload-Dateien blockweise in Temp-Dateien spoolen und als
+    {filename, path, content_type} für extract_texts_many() liefern.
+    Die Temp-Dateien werden beim Verlassen des Blocks gelöscht.
+    """
+    with contextlib.ExitStack() as stack:
+        items: List[Dict[str, Any]] = []
+        for f in files:
+            name = f.filename or "unknown"
+            path = stack.enter_context(spool_to_path(f.stream, os.path.splitext(name)[1]))
+            items.append({"filename": name, "path": path, "content_type": f.mimetype or ""})
+        yield items
+
+
 # =========================
 # KORRIGIERTE INGEST-FUNKTION MIT LANGEXTRACT-FIXES
 # =========================
@@ -95,13 +118,8 @@ def files_ingest():
         collection = request.form.get("collection") or getattr(settings, "QDRANT_COLLECTION", "requirements_v1")
 
         # Extract
-        raw_records = []
-        for f in files:
-            filename = f.filename or "unknown"
-            data = f.read() or b""
-            ctype = f.mimetype or ""
-            parts = extract_texts(filename, data, ctype)
-            raw_records.extend(parts)
+        with _spooled_uploads(files) as uploads:
+            raw_records = extract_texts_many(uploads, raise_errors=True)
 
         # v2.1: Chunking abhängig von chunkMode/preserveSources
         payloads: List[Dict[str, Any]] = []
@@ -131,6 +149,34 @@ def files_ingest():
         texts = [str(p.get("text") or "") for p in payloads]
         if not texts:
             return jsonify({"error": "empty", "message": "kein extrahierbarer Text gefunden"}), 200
+        for p in payloads:
+            p["payload"].setdefault("chunkHash", chunk_hash(p["text"]))
+
+        # Delta-Ingest: nur Chunks mit neuem chunkHash werden verarbeitet;
+        # unveränderte behalten ihren Punkt (Position wird aktualisiert), verschwundene werden gelöscht
+        delta_raw = request.form.get("delta")
+        delta = str(delta_raw).lower() in ("1", "true", "yes", "on") if delta_raw is not None else bool(getattr(settings, "INGEST_DELTA", False))
+        delta_ignored = False
+        if delta and chunk_mode != "token" and not preserve_sources:
+            # Kombinierter Modus: alle Uploads landen unter sourceFile="combined", der Abgleich
+            # würde Chunks früherer, unabhängiger Dokumente als veraltet löschen
+            logging.warning("Delta-Ingest ignoriert: chunkMode=paragraph ohne preserveSources (sourceFile=combined)")
+            delta = False
+            delta_ignored = True
+        client, eff_port = get_qdrant_client()
+        work = payloads
+        keep: List[Any] = []
+        stale: List[Any] = []
+        if delta:
+            by_source: Dict[str, List[Dict[str, Any]]] = {}
+            for p in payloads:
+                by_source.setdefault(str(p["payload"].get("sourceFile") or ""), []).append(p)
+            work = []
+            for src, group in by_source.items():
+                plan = plan_delta(group, vs_fetch_chunk_hashes(src, client=client, collection_name=collection))
+                work.extend(plan["new"])
+                keep.extend(plan["keep"])
+                stale.extend(plan["stale"])
 
         # Optional: LangExtract
         structured_flag = str(request.form.get("structured", "")).lower() in ("1", "true", "yes", "on")
@@ -152,9 +198,9 @@ def files_ingest():
                     if hasattr(ex, 'text') and hasattr(ex, 'extractions'):
                         examples_sdk.append(ex)
 
-                logging.info(f"LangExtract: Processing {len(payloads)} chunks with {len(examples_sdk)} examples")
+                logging.info(f"LangExtract: Processing {len(work)} chunks with {len(examples_sdk)} examples")
 
-                for idx, p in enumerate(payloads):
+                for idx, p in enumerate(work):
                     txt = p.get("text") or ""
                     logging.info(f"LangExtract processing chunk {idx}: text length={len(txt)}, first 200 chars='{txt[:200]}'")
 
@@ -200,19 +246,20 @@ def files_ingest():
                 logging.error(f"LangExtract setup failed: {lx_err}")
                 lx_enabled = False
 
-        # Embeddings
-        vectors = build_embeddings(texts, model=getattr(settings, "EMBEDDINGS_MODEL", "text-embedding-3-small"))
+        # Embeddings (nur für zu verarbeitende Chunks)
+        def _embed_items(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            if not chunks:
+                return []
+            vectors = build_embeddings(
+                [str(p.get("text") or "") for p in chunks],
+                model=getattr(settings, "EMBEDDINGS_MODEL", "text-embedding-3-small"),
+            )
+            return [{"vector": vectors[i], "payload": p["payload"] | {"text": p["text"]}} for i, p in enumerate(chunks)]
+
+        items = _embed_items(work)
         dim = get_embeddings_dim()
 
         # Upsert
-        items = []
-        for i, p in enumerate(payloads):
-            items.append({
-                "vector": vectors[i],
-                "payload": p["payload"] | {"text": p["text"]},
-            })
-
-        client, eff_port = get_qdrant_client()
         try:
             upserted = upsert_points(items, client=client, collection_name=collection, dim=dim)
         except Exception as _up_err:
@@ -221,6 +268,10 @@ def files_ingest():
                 try:
                     # Collection mit aktueller Embedding-Dimension neu anlegen
                     vs_reset_collection(client=client, collection_name=collection, dim=int(dim))
+                    if keep:
+                        # Reset verwirft auch die unveränderten Punkte → vollständig neu einspielen
+                        items += _embed_items([p for _, p in keep])
+                        keep, stale = [], []
                     upserted = upsert_points(items, client=client, collection_name=collection, dim=dim)
                 except Exception as _retry_err:
                     raise _retry_err
@@ -229,11 +280,19 @@ def files_ingest():
         finally:
             pass
 
+        if keep:
+            vs_set_payloads([(pid, p["payload"]) for pid, p in keep], client=client, collection_name=collection)
+        deleted = vs_delete_points(stale, client=client, collection_name=collection) if stale else 0
+
         resp = {
             "countFiles": len(files),
             "countBlocks": len(raw_records),
             "countChunks": len(payloads),
             "upserted": upserted,
+            "delta": bool(delta),
+            "deltaIgnored": delta_ignored,
+            "unchanged": len(keep),
+            "deleted": deleted,
             "collection": collection,
             "qdrantPort": eff_port,
             "chunkMode": chunk_mode,
@@ -241,7 +300,7 @@ def files_ingest():
         }
 
         if structured_flag:
-            lx_chunks = len(payloads) if lx_enabled else 0
+            lx_chunks = len(work) if lx_enabled else 0
             lx_cov_avg = round((coverage_sum / lx_chunks), 4) if lx_chunks > 0 else 0.0
 
             lx_preview = []
@@ -666,81 +725,16 @@ def _repair_pass(text: str, prompt: str, examples_sdk: list, temperatures: list[
 
 
 def _dedupe_nearby_by_similarity(items: list[dict], threshold: float = 0.85) -> list[dict]:
-    """Merge near-duplicates using simple Jaccard similarity over token sets. Keep longer text.
-    threshold in [0,1].
+    """Merge near-duplicates using Jaccard similarity over token sets. Keep longer text.
+    threshold in [0,1]. Candidates come from the MinHash/LSH index (backend.core.dedupe).
     """
-    def _norm_tokens(s: str) -> set[str]:
-        s = str(s or "").lower()
-        for ch in [",", ".", ":", ";", "(", ")", "[", "]", "{", "}"]:
-            s = s.replace(ch, " ")
-        toks = [t for t in s.split() if t]
-        return set(toks)
-    def _jaccard(a: set[str], b: set[str]) -> float:
-        if not a and not b:
-            return 1.0
-        inter = len(a & b)
-        den = len(a | b) or 1
-        return inter / den
-    used = [False] * len(items)
-    result: list[dict] = []
-    for i, it in enumerate(items):
-        if used[i]:
-            continue
-        ti = _norm_tokens(it.get("extraction_text"))
-        winner = it
-        used[i] = True
-        for j in range(i + 1, len(items)):
-            if used[j]:
-                continue
-            tj = _norm_tokens(items[j].get("extraction_text"))
-            sim = _jaccard(ti, tj)
-            if sim >= threshold:
-                # merge: prefer longer text; sum votes
-                cand = items[j]
-                if len(str(cand.get("extraction_text") or "")) > len(str(winner.get("extraction_text") or "")):
-                    winner = cand
-                    ti = tj
-                used[j] = True
-        result.append(winner)
-    return result
+    return dedupe_keep_longest(items, "extraction_text", threshold)
 
 
 def _dedupe_mined_items_by_text(items: list[dict], threshold: float = 0.88) -> list[dict]:
     """Dedupe mined items by requirementText using Jaccard similarity; keep longer text.
     """
-    def _norm_tokens(s: str) -> set[str]:
-        s = str(s or "").lower()
-        for ch in [",", ".", ":", ";", "(", ")", "[", "]", "{", "}"]:
-            s = s.replace(ch, " ")
-        toks = [t for t in s.split() if t]
-        return set(toks)
-    def _jaccard(a: set[str], b: set[str]) -> float:
-        if not a and not b:
-            return 1.0
-        inter = len(a & b)
-        den = len(a | b) or 1
-        return inter / den
-    used = [False] * len(items)
-    out: list[dict] = []
-    for i, it in enumerate(items):
-        if used[i]:
-            continue
-        ti = _norm_tokens(it.get("requirementText"))
-        winner = it
-        used[i] = True
-        for j in range(i + 1, len(items)):
-            if used[j]:
-                continue
-            tj = _norm_tokens(items[j].get("requirementText"))
-            sim = _jaccard(ti, tj)
-            if sim >= threshold:
-                cand = items[j]
-                if len(str(cand.get("requirementText") or "")) > len(str(winner.get("requirementText") or "")):
-                    winner = cand
-                    ti = tj
-                used[j] = True
-        out.append(winner)
-    return out
+    return dedupe_keep_longest(items, "requirementText", threshold)
 
 
 # =========================
@@ -1728,13 +1722,8 @@ def lx_extract_endpoint_v2():
             if not files:
                 return jsonify({"error": "invalid_request", "message": "keine Dateien übergeben"}), 400
 
-            raw_records = []
-            for f in files:
-                filename = f.filename or "unknown"
-                data = f.read() or b""
-                ctype = f.mimetype or ""
-                parts = extract_texts(filename, data, ctype)
-                raw_records.extend(parts)
+            with _spooled_uploads(files) as uploads:
+                raw_records = extract_texts_many(uploads, raise_errors=True)
             if chunk_mode == "paragraph":
                 # Absatzbasiert, basierend auf build_chunks_absatz
                 payloads = []
@@ -2016,13 +2005,8 @@ def lx_structure_endpoint():
                     files = [f]
             if not files:
                 return jsonify({"error": "invalid_request", "message": "keine Dateien übergeben"}), 400
-            raw_records = []
-            for f in files:
-                filename = f.filename or "unknown"
-                data = f.read() or b""
-                ctype = f.mimetype or ""
-                parts = extract_texts(filename, data, ctype)
-                raw_records.extend(parts)
+            with _spooled_uploads(files) as uploads:
+                raw_records = extract_texts_many(uploads, raise_errors=True)
             # paragraph-based for stable spans
             payloads = []
             for rec in raw_records:
@@ -2195,9 +2179,8 @@ def lx_structure_sampled():
                 if f: files = [f]
             if not files:
                 return jsonify({"error": "invalid_request", "message": "keine Dateien übergeben"}), 400
-            parts = []
-            for f in files:
-                parts.extend(extract_texts(f.filename or "unknown", f.read() or b"", f.mimetype or ""))
+            with _spooled_uploads(files) as uploads:
+                parts = extract_texts_many(uploads, raise_errors=True)
             base_text = "\n\n".join([str(p.get("text") or "") for p in parts])
             if parts:
                 meta0 = parts[0].get("meta") or {}
@@ -714,7 +714,7 @@ class RequirementsAtomicityAgent(RoutedAgent):
         """LLM-basiertes Splitting in atomare Requirements"""
         import json
         import os
-        from openai import OpenAI
+        from backend.core.llm_clients import get_openai_client
 
         prompt = f"""You are an expert in Requirements Engineering.
 Analyze the following requirement and split it into atomic, independent sub-requirements.
@@ -751,7 +751,7 @@ IMPORTANT: Respond ONLY with the JSON object, no additional text. Write all requ
             if not api_key:
                 raise ValueError("OPENAI_API_KEY nicht gesetzt")
 
-            client = OpenAI(api_key=api_key)
+            client = get_openai_client(api_key)
 
             # OpenAI API call mit JSON response format
             response = client.chat.completions.create(
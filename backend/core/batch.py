@@ -9,20 +9,24 @@ from __future__ import annotations
 import time
 import json
 import logging
+import contextlib
+import sqlite3
+import threading
 import concurrent.futures as futures
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
 
 from backend.core.logging_ext import _json_log as json_log
-from backend.core import settings
+from backend.core import llm_cache, settings
 from backend.core.db import (
-    get_db,
+    db_session,
     load_criteria,
     get_latest_evaluation_by_checksum,
     get_suggestions_for_eval,
     get_latest_rewrite_for_eval,
 )
-from backend.core.llm import llm_evaluate, llm_suggest, llm_rewrite
-from backend.core.utils import parse_context_cell, parse_requirements_md, sha256_text, weighted_score, compute_verdict, chunked
+from backend.core.llm import llm_evaluate, llm_suggest, llm_rewrite, llm_evaluate_suggest_rewrite
+from backend.core.llm_governor import llm_priority
+from backend.core.utils import parse_context_cell, parse_requirements_md, sha256_text, weighted_score, compute_verdict
 
 from backend.services.manifest_integration import (
     start_evaluation_stage,
@@ -32,15 +36,139 @@ from backend.services.manifest_integration import (
     record_atomicity_split,
 )
 
+T = TypeVar("T")
+
+# Persistent worker pool shared by all batch runs (sized by settings.MAX_PARALLEL)
+_executor: Optional[futures.ThreadPoolExecutor] = None
+_executor_size = 0
+_executor_lock = threading.Lock()
+# Running _stream() calls per pool; a replaced pool is shut down by its last user
+_executor_users: Dict[futures.ThreadPoolExecutor, int] = {}
+
+
+def _get_executor() -> Tuple[futures.ThreadPoolExecutor, int]:
+    """
+    Shared pool for one _stream() call; pair with _release_executor(). If MAX_PARALLEL
+    changed, new calls get a fresh pool while running ones keep submitting to theirs.
+    """
+    global _executor, _executor_size
+    size = max(1, int(settings.MAX_PARALLEL))
+    with _executor_lock:
+        if _executor is None or _executor_size != size:
+            old = _executor
+            _executor = futures.ThreadPoolExecutor(max_workers=size, thread_name_prefix="batch")
+            _executor_size = size
+            if old is not None and not _executor_users.get(old):
+                old.shutdown(wait=False)
+        _executor_users[_executor] = _executor_users.get(_executor, 0) + 1
+        return _executor, size
+
+
+def _release_executor(executor: futures.ThreadPoolExecutor) -> None:
+    with _executor_lock:
+        users = _executor_users.get(executor, 1) - 1
+        if users > 0:
+            _executor_users[executor] = users
+            return
+        _executor_users.pop(executor, None)
+        if executor is _executor:
+            return  # shared pool stays warm for the next batch
+    executor.shutdown(wait=False)
+
+
+def _as_batch(worker: Callable[[Dict[str, str]], T], row: Dict[str, str], regenerate: bool = False) -> T:
+    """
+    Pool threads do not inherit the caller's context; tag their LLM calls as batch and,
+    when regenerating, bypass the LLM response cache.
+    """
+    with llm_priority("batch"), (llm_cache.bypass() if regenerate else contextlib.nullcontext()):
+        return worker(row)
+
+
+def _stream(
+    rows: List[Dict[str, str]], worker: Callable[[Dict[str, str]], T], kind: str, regenerate: bool = False
+) -> Iterator[T]:
+    """
+    Run worker over rows on the persistent pool and yield results as they complete.
+
+    There are no chunk barriers: a bounded window (2 x pool size) of rows is in flight
+    and the next row is submitted as soon as any running one finishes, so a slow LLM
+    call only occupies its own slot.
+    """
+    lg = logging.getLogger("app")
+    executor, size = _get_executor()
+    window = size * 2
+    source = iter(rows)
+    pending: set = set()
+
+    def fill() -> None:
+        while len(pending) < window:
+            try:
+                row = next(source)
+            except StopIteration:
+                return
+            pending.add(executor.submit(_as_batch, worker, row, regenerate))
+
+    ts_pool = time.time()
+    json_log(
+        lg, logging.DEBUG, "parallel.pool.start",
+        kind=kind, pool_size=size, queue_depth=len(rows),
+    )
+    processed = 0
+    fill()
+    try:
+        while pending:
+            done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for fut in done:
+                pending.discard(fut)
+                processed += 1
+                yield fut.result()
+            fill()
+    finally:
+        for fut in pending:
+            fut.cancel()
+        _release_executor(executor)
+        json_log(
+            lg, logging.DEBUG, "parallel.pool.end",
+            kind=kind, processed_count=processed,
+            duration_ms=int((time.time() - ts_pool) * 1000),
+        )
+
+
+def stream_rows(
+    rows: List[Dict[str, str]], worker: Callable[[Dict[str, str]], T], kind: str, regenerate: bool = False
+) -> Iterator[T]:
+    """
+    Run a caller-defined worker over rows on the shared batch pool, yielding results as they
+    complete (used by the NDJSON stream routes). The worker should catch its own per-row errors;
+    an exception raised from it ends the stream. regenerate bypasses the LLM response cache.
+    """
+    yield from _stream(rows, worker, kind, regenerate)
+
+
+def _criteria_keys(conn: sqlite3.Connection) -> List[str]:
+    crits = load_criteria(conn)
+    return [c["key"] for c in crits] or ["clarity", "testability", "measurability"]
+
 
 def ensure_evaluation_exists(
-    requirement_text: str, context: Dict[str, Any], criteria_keys: List[str]
+    requirement_text: str,
+    context: Dict[str, Any],
+    criteria_keys: List[str],
+    conn: Optional[sqlite3.Connection] = None,
+    details: Optional[List[Dict[str, Any]]] = None,
+    latency_ms: Optional[int] = None,
 ) -> Tuple[str, Dict[str, Any]]:
     """
     Returns (evaluation_id, summary). Creates a new evaluation if none exists.
     summary = {"score": float, "verdict": str, "model": str, "latencyMs": int}
+
+    If details (and latency_ms) are given, e.g. from the fused evaluate+suggest+rewrite
+    call, they are persisted instead of calling llm_evaluate.
     """
-    conn = get_db()
+    if conn is None:
+        with db_session() as conn:
+            return ensure_evaluation_exists(requirement_text, context, criteria_keys, conn, details, latency_ms)
     checksum = sha256_text(requirement_text)
     row = get_latest_evaluation_by_checksum(conn, checksum)
     if row:
@@ -67,11 +195,13 @@ def ensure_evaluation_exists(
         logging.getLogger(__name__).warning(f"Failed to start evaluation stage: {e}")
 
     ts = time.time()
-    details = llm_evaluate(requirement_text, criteria_keys, context)
+    if details is None:
+        details = llm_evaluate(requirement_text, criteria_keys, context)
     crits = load_criteria(conn, criteria_keys)
     agg_score = weighted_score(details, crits)
     verdict = compute_verdict(agg_score, settings.VERDICT_THRESHOLD)
-    latency_ms = int((time.time() - ts) * 1000)
+    if latency_ms is None:
+        latency_ms = int((time.time() - ts) * 1000)
     eval_id = f"ev_{int(time.time())}_{checksum[:8]}"
 
     with conn:
@@ -79,11 +209,10 @@ def ensure_evaluation_exists(
             "INSERT INTO evaluation(id, requirement_checksum, model, latency_ms, score, verdict) VALUES (?, ?, ?, ?, ?, ?)",
             (eval_id, checksum, settings.OPENAI_MODEL, latency_ms, agg_score, verdict),
         )
-        for d in details:
-            conn.execute(
-                "INSERT INTO evaluation_detail(evaluation_id, criterion_key, score, passed, feedback) VALUES (?, ?, ?, ?, ?)",
-                (eval_id, d["criterion"], float(d["score"]), 1 if d["passed"] else 0, d.get("feedback", "")),
-            )
+        conn.executemany(
+            "INSERT INTO evaluation_detail(evaluation_id, criterion_key, score, passed, feedback) VALUES (?, ?, ?, ?, ?)",
+            [(eval_id, d["criterion"], float(d["score"]), 1 if d["passed"] else 0, d.get("feedback", "")) for d in details],
+        )
 
     if stage_id is not None:
         try:
@@ -163,7 +292,11 @@ def ensure_evaluation_exists(
 
 def merged_markdown(rows: List[Dict[str, str]]) -> str:
     """Build merged markdown table with evaluation columns."""
-    conn = get_db()
+    with db_session() as conn:
+        return _merged_markdown(conn, rows)
+
+
+def _merged_markdown(conn: sqlite3.Connection, rows: List[Dict[str, str]]) -> str:
     out = []
     header = "| id | requirementText | context | evaluationScore | verdict | suggestions | redefinedRequirement |"
     sep = "|----|------------------|---------|-----------------|--------|-------------|----------------------|"
@@ -194,166 +327,186 @@ def merged_markdown(rows: List[Dict[str, str]]) -> str:
     return "\n".join(out)
 
 
-def process_evaluations(rows: List[Dict[str, str]]) -> Dict[str, Any]:
-    """Evaluate a batch of requirements in parallel."""
-    lg = logging.getLogger("app")
-    total = len(rows)
-    batch_size = settings.BATCH_SIZE
-    total_chunks = (total + batch_size - 1) // batch_size
-    conn = get_db()
-    crits = load_criteria(conn)
-    criteria_keys = [c["key"] for c in crits] or ["clarity", "testability", "measurability"]
+def iter_evaluations(rows: List[Dict[str, str]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Evaluate requirements on the shared pool, yielding (id, summary) as each completes."""
+    with db_session() as conn:
+        criteria_keys = _criteria_keys(conn)
 
     def worker(row: Dict[str, str]) -> Tuple[str, Dict[str, Any]]:
-        rid = row["id"]
-        requirement_text = row["requirementText"]
         context = parse_context_cell(row.get("context", ""))
-        eval_id, summ = ensure_evaluation_exists(requirement_text, context, criteria_keys)
-        return rid, {"evaluationId": eval_id, **summ}
+        eval_id, summ = ensure_evaluation_exists(row["requirementText"], context, criteria_keys)
+        return row["id"], {"evaluationId": eval_id, **summ}
 
-    results: Dict[str, Any] = {}
-    for idx_batch, batch in enumerate(chunked(rows, settings.BATCH_SIZE), start=1):
-        json_log(
-            lg, logging.DEBUG, "batch.chunk.start",
-            kind="evaluate", chunk_index=idx_batch, total_chunks=total_chunks, chunk_size=len(batch),
-        )
-        ts_pool = time.time()
-        with futures.ThreadPoolExecutor(max_workers=settings.MAX_PARALLEL) as ex:
-            json_log(
-                lg, logging.DEBUG, "parallel.pool.start",
-                kind="evaluate", pool_size=settings.MAX_PARALLEL, queue_depth=len(batch),
-            )
-            futs = [ex.submit(worker, r) for r in batch]
-            processed = 0
-            for fut in futures.as_completed(futs):
-                rid, data = fut.result()
-                results[rid] = data
-                processed += 1
-            json_log(
-                lg, logging.DEBUG, "parallel.pool.end",
-                kind="evaluate", processed_count=processed,
-                duration_ms=int((time.time() - ts_pool) * 1000),
-            )
-        json_log(
-            lg, logging.DEBUG, "batch.chunk.end",
-            kind="evaluate", chunk_index=idx_batch, processed_count=processed,
-        )
-    return results
+    yield from _stream(rows, worker, "evaluate")
 
 
-def process_suggestions(rows: List[Dict[str, str]]) -> Dict[str, Any]:
-    """Generate suggestions for a batch of requirements in parallel."""
-    lg = logging.getLogger("app")
-    total = len(rows)
-    batch_size = settings.BATCH_SIZE
-    total_chunks = (total + batch_size - 1) // batch_size
-    conn = get_db()
-    crits = load_criteria(conn)
-    criteria_keys = [c["key"] for c in crits] or ["clarity", "testability", "measurability"]
+def iter_suggestions(rows: List[Dict[str, str]], regenerate: bool = False) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Generate suggestions on the shared pool, yielding (id, {"suggestions": atoms}) as each completes.
+    Suggestion rows are written in bulk every BATCH_SIZE results. regenerate bypasses the LLM
+    response cache so repeated requests get fresh suggestions.
+    """
+    with db_session() as conn:
+        criteria_keys = _criteria_keys(conn)
 
     def worker(row: Dict[str, str]) -> Tuple[str, str, List[Dict[str, Any]]]:
-        rid = row["id"]
         requirement_text = row["requirementText"]
         context = parse_context_cell(row.get("context", ""))
         eval_id, _ = ensure_evaluation_exists(requirement_text, context, criteria_keys)
         atoms = llm_suggest(requirement_text, context)
-        return rid, eval_id, atoms
+        return row["id"], eval_id, atoms
 
-    collected: List[Tuple[str, str, List[Dict[str, Any]]]] = []
-    for idx_batch, batch in enumerate(chunked(rows, settings.BATCH_SIZE), start=1):
-        json_log(
-            lg, logging.DEBUG, "batch.chunk.start",
-            kind="suggest", chunk_index=idx_batch, total_chunks=total_chunks, chunk_size=len(batch),
-        )
-        ts_pool = time.time()
-        with futures.ThreadPoolExecutor(max_workers=settings.MAX_PARALLEL) as ex:
-            json_log(
-                lg, logging.DEBUG, "parallel.pool.start",
-                kind="suggest", pool_size=settings.MAX_PARALLEL, queue_depth=len(batch),
-            )
-            futs = [ex.submit(worker, r) for r in batch]
-            processed = 0
-            for fut in futures.as_completed(futs):
-                collected.append(fut.result())
-                processed += 1
-            json_log(
-                lg, logging.DEBUG, "parallel.pool.end",
-                kind="suggest", processed_count=processed,
-                duration_ms=int((time.time() - ts_pool) * 1000),
-            )
-        json_log(
-            lg, logging.DEBUG, "batch.chunk.end",
-            kind="suggest", chunk_index=idx_batch, processed_count=processed,
-        )
+    pending: List[Tuple[str, str, str]] = []
 
-    with get_db() as c2:
-        for rid, eval_id, atoms in collected:
-            for atom in atoms:
-                c2.execute(
-                    "INSERT INTO suggestion(evaluation_id, text, priority) VALUES (?, ?, ?)",
-                    (eval_id, json.dumps(atom, ensure_ascii=False), "atom"),
-                )
+    def flush() -> None:
+        if pending:
+            with db_session() as conn, conn:
+                conn.executemany("INSERT INTO suggestion(evaluation_id, text, priority) VALUES (?, ?, ?)", pending)
+            pending.clear()
 
-    results: Dict[str, Any] = {}
-    for rid, _, atoms in collected:
-        results[rid] = {"suggestions": atoms}
-    return results
+    try:
+        for rid, eval_id, atoms in _stream(rows, worker, "suggest", regenerate):
+            pending.extend((eval_id, json.dumps(atom, ensure_ascii=False), "atom") for atom in atoms)
+            if len(pending) >= settings.BATCH_SIZE:
+                flush()
+            yield rid, {"suggestions": atoms}
+    finally:
+        flush()
 
 
-def process_rewrites(rows: List[Dict[str, str]]) -> Dict[str, Any]:
-    """Rewrite a batch of requirements in parallel."""
-    conn = get_db()
-    crits = load_criteria(conn)
-    criteria_keys = [c["key"] for c in crits] or ["clarity", "testability", "measurability"]
+def iter_rewrites(rows: List[Dict[str, str]], regenerate: bool = False) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Rewrite requirements on the shared pool, yielding (id, {"redefinedRequirement": text}) as each completes.
+    Rewrite rows are written in bulk every BATCH_SIZE results. regenerate bypasses the LLM
+    response cache so repeated requests get a fresh rewrite.
+    """
+    with db_session() as conn:
+        criteria_keys = _criteria_keys(conn)
 
     def worker(row: Dict[str, str]) -> Tuple[str, str, str]:
-        rid = row["id"]
         requirement_text = row["requirementText"]
         context = parse_context_cell(row.get("context", ""))
         eval_id, _ = ensure_evaluation_exists(requirement_text, context, criteria_keys)
         rewritten = llm_rewrite(requirement_text, context)
-        return rid, eval_id, rewritten
+        return row["id"], eval_id, rewritten
 
-    collected: List[Tuple[str, str, str]] = []
-    lg = logging.getLogger("app")
-    total = len(rows)
-    batch_size = settings.BATCH_SIZE
-    total_chunks = (total + batch_size - 1) // batch_size
+    pending: List[Tuple[str, str]] = []
 
-    for idx_batch, batch in enumerate(chunked(rows, settings.BATCH_SIZE), start=1):
-        json_log(
-            lg, logging.DEBUG, "batch.chunk.start",
-            kind="rewrite", chunk_index=idx_batch, total_chunks=total_chunks, chunk_size=len(batch),
-        )
-        ts_pool = time.time()
-        with futures.ThreadPoolExecutor(max_workers=settings.MAX_PARALLEL) as ex:
-            json_log(
-                lg, logging.DEBUG, "parallel.pool.start",
-                kind="rewrite", pool_size=settings.MAX_PARALLEL, queue_depth=len(batch),
-            )
-            futs = [ex.submit(worker, r) for r in batch]
-            processed = 0
-            for fut in futures.as_completed(futs):
-                collected.append(fut.result())
-                processed += 1
-            json_log(
-                lg, logging.DEBUG, "parallel.pool.end",
-                kind="rewrite", processed_count=processed,
-                duration_ms=int((time.time() - ts_pool) * 1000),
-            )
-        json_log(
-            lg, logging.DEBUG, "batch.chunk.end",
-            kind="rewrite", chunk_index=idx_batch, processed_count=processed,
-        )
+    def flush() -> None:
+        if pending:
+            with db_session() as conn, conn:
+                conn.executemany("INSERT INTO rewritten_requirement(evaluation_id, text) VALUES (?, ?)", pending)
+            pending.clear()
 
-    with get_db() as c2:
-        for rid, eval_id, rewritten in collected:
-            c2.execute(
-                "INSERT INTO rewritten_requirement(evaluation_id, text) VALUES (?, ?)",
-                (eval_id, rewritten),
+    try:
+        for rid, eval_id, rewritten in _stream(rows, worker, "rewrite", regenerate):
+            pending.append((eval_id, rewritten))
+            if len(pending) >= settings.BATCH_SIZE:
+                flush()
+            yield rid, {"redefinedRequirement": rewritten}
+    finally:
+        flush()
+
+
+def iter_fused(rows: List[Dict[str, str]], regenerate: bool = False) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Fused mode: one LLM call per requirement returns scores, suggestion atoms and a rewrite
+    (llm_evaluate_suggest_rewrite). Results go to the same evaluation, suggestion and
+    rewritten_requirement tables as the separate pipelines. Requirements that already have an
+    evaluation skip the fused call and reuse their stored suggestions and rewrite. Yields
+    (id, {"evaluationId", "score", "verdict", "model", "latencyMs", "suggestions", "redefinedRequirement"}),
+    or (id, {"error": message}) for a requirement whose processing failed; the others continue.
+    regenerate bypasses the LLM response cache and regenerates suggestions and rewrites of
+    already evaluated requirements instead of reusing the stored ones (scores are kept).
+    """
+    with db_session() as conn:
+        criteria_keys = _criteria_keys(conn)
+
+    def worker(row: Dict[str, str]) -> Tuple[str, Optional[str], Dict[str, Any], List[Dict[str, Any]], str, bool, bool]:
+        try:
+            with db_session() as tconn:
+                return process_row(row, tconn)
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Fused processing failed for {row['id']}: {e}")
+            return row["id"], None, {"error": str(e)}, [], "", False, False
+
+    def process_row(
+        row: Dict[str, str], tconn: sqlite3.Connection
+    ) -> Tuple[str, Optional[str], Dict[str, Any], List[Dict[str, Any]], str, bool, bool]:
+        requirement_text = row["requirementText"]
+        context = parse_context_cell(row.get("context", ""))
+        existing = get_latest_evaluation_by_checksum(tconn, sha256_text(requirement_text))
+        if existing is None:
+            ts = time.time()
+            fused = llm_evaluate_suggest_rewrite(requirement_text, criteria_keys, context)
+            eval_id, summ = ensure_evaluation_exists(
+                requirement_text, context, criteria_keys, conn=tconn,
+                details=fused["details"], latency_ms=int((time.time() - ts) * 1000),
             )
+            return row["id"], eval_id, summ, fused["suggestions"], fused["redefinedRequirement"], True, True
+
+        # Bereits bewertet: keine neuen Scores, gespeicherte Vorschläge/Rewrite wiederverwenden
+        # und nur Fehlendes (wie in den getrennten Pipelines) nachgenerieren
+        eval_id, summ = ensure_evaluation_exists(requirement_text, context, criteria_keys, conn=tconn)
+        atoms = [json.loads(s["text"]) for s in get_suggestions_for_eval(tconn, eval_id) if s["priority"] == "atom"]
+        rewritten = get_latest_rewrite_for_eval(tconn, eval_id)
+        new_atoms = regenerate or not atoms
+        new_rewrite = regenerate or rewritten is None
+        if new_atoms:
+            atoms = llm_suggest(requirement_text, context)
+        if new_rewrite:
+            rewritten = llm_rewrite(requirement_text, context)
+        return row["id"], eval_id, summ, atoms, rewritten, new_atoms, new_rewrite
+
+    sugg_rows: List[Tuple[str, str, str]] = []
+    rewrite_rows: List[Tuple[str, str]] = []
+
+    def flush() -> None:
+        if sugg_rows or rewrite_rows:
+            with db_session() as conn, conn:
+                if sugg_rows:
+                    conn.executemany("INSERT INTO suggestion(evaluation_id, text, priority) VALUES (?, ?, ?)", sugg_rows)
+                if rewrite_rows:
+                    conn.executemany("INSERT INTO rewritten_requirement(evaluation_id, text) VALUES (?, ?)", rewrite_rows)
+            sugg_rows.clear()
+            rewrite_rows.clear()
+
+    try:
+        for rid, eval_id, summ, atoms, rewritten, new_atoms, new_rewrite in _stream(rows, worker, "fused", regenerate):
+            if eval_id is None:
+                yield rid, summ
+                continue
+            if new_atoms:
+                sugg_rows.extend((eval_id, json.dumps(atom, ensure_ascii=False), "atom") for atom in atoms)
+            if new_rewrite:
+                rewrite_rows.append((eval_id, rewritten))
+            if len(sugg_rows) + len(rewrite_rows) >= settings.BATCH_SIZE:
+                flush()
+            yield rid, {
+                "evaluationId": eval_id,
+                **summ,
+                "suggestions": atoms,
+                "redefinedRequirement": rewritten,
+            }
+    finally:
+        flush()
+
+
+def process_evaluations(rows: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Evaluate a batch of requirements in parallel."""
+    return dict(iter_evaluations(rows))
+
+
+def process_suggestions(rows: List[Dict[str, str]], regenerate: bool = False) -> Dict[str, Any]:
+    """Generate suggestions for a batch of requirements in parallel."""
+    return dict(iter_suggestions(rows, regenerate))
+
+
+def process_rewrites(rows: List[Dict[str, str]], regenerate: bool = False) -> Dict[str, Any]:
+    """Rewrite a batch of requirements in parallel."""
+    return dict(iter_rewrites(rows, regenerate))
+
 
-    results: Dict[str, Any] = {}
-    for rid, eval_id, rewritten in collected:
-        results[rid] = {"redefinedRequirement": rewritten}
-    return results
+def process_fused(rows: List[Dict[str, str]], regenerate: bool = False) -> Dict[str, Any]:
+    """Evaluate, suggest and rewrite a batch of requirements with one LLM call each."""
+    return dict(iter_fused(rows, regenerate))
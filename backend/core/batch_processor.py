@@ -31,6 +31,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
 from backend.core import settings
+from backend.core.llm_clients import get_openai_client
 
 logger = logging.getLogger(__name__)
 
@@ -99,7 +100,7 @@ class OpenAIBatchProcessor:
             
             # Batch API only works with OpenAI directly, not OpenRouter
             if api_key and not (base_url and "openrouter" in base_url.lower()):
-                self.client = _OpenAIClient(api_key=api_key)
+                self.client = get_openai_client(api_key)
                 logger.info("OpenAIBatchProcessor initialized with OpenAI API")
             elif base_url and "openrouter" in base_url.lower():
                 logger.warning("OpenAIBatchProcessor: Batch API not available via OpenRouter, using direct OpenAI key required")
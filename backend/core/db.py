@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import contextlib
 import sqlite3
+import threading
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
 import os, json
 
 from . import settings
@@ -135,6 +137,7 @@ CREATE TABLE IF NOT EXISTS evidence_reference (
   chunk_index INTEGER,                            -- Position in chunked document (0-based)
   is_neighbor INTEGER DEFAULT 0,                  -- Boolean: is this ±1 neighbor context chunk
   evidence_metadata TEXT,                         -- JSON: additional evidence data
+  chunk_hash TEXT,                                -- Content hash of the chunk (ingest.chunk_hash)
   FOREIGN KEY (requirement_id) REFERENCES requirement_manifest(requirement_id) ON DELETE CASCADE
 );
 
@@ -310,12 +313,162 @@ CREATE INDEX IF NOT EXISTS idx_project_req_requirement ON project_requirements (
 """
 
 
-def get_db() -> sqlite3.Connection:
-    conn = sqlite3.connect(settings.SQLITE_PATH, timeout=10, isolation_level=None)
+# --- Connection-Pool ---
+#
+# get_db() liefert eine Connection aus einem Pool je SQLITE_PATH. close() gibt sie
+# zurück, statt sie zu schließen (offene Transaktionen werden dabei zurückgerollt).
+# Jede Connection läuft mit WAL, synchronous=NORMAL sowie größerem Page-Cache/mmap,
+# sodass Leser nicht mehr hinter den Evaluation-Schreibern warten.
+
+
+class _PooledConnection(sqlite3.Connection):
+    """sqlite3-Connection, deren close() sie an ihren Pool zurückgibt."""
+
+    _pool: Optional["_ConnectionPool"] = None
+    _checked_out = False
+    _inode: Optional[int] = None
+
+    def close(self) -> None:
+        if self._pool is None:
+            super().close()
+        elif self._checked_out:
+            self._checked_out = False
+            self._pool.release(self)
+        # bereits zurückgegeben → doppeltes close() ist ein No-op
+
+    def _close_now(self) -> None:
+        self._pool = None
+        try:
+            super().close()
+        except sqlite3.Error:
+            pass
+
+
+def _inode(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_ino
+    except OSError:
+        return None
+
+
+def _connect(path: str) -> _PooledConnection:
+    conn = sqlite3.connect(
+        path,
+        timeout=10,
+        isolation_level=None,
+        check_same_thread=False,  # wechselt zwischen Threads, ist aber immer nur einem ausgeliehen
+        cached_statements=int(getattr(settings, "SQLITE_STMT_CACHE", 256)),
+        factory=_PooledConnection,
+    )
     conn.row_factory = sqlite3.Row
+    for pragma in (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA cache_size=-{int(getattr(settings, 'SQLITE_CACHE_KB', 20000))}",
+        f"PRAGMA mmap_size={int(getattr(settings, 'SQLITE_MMAP_MB', 256)) * 1024 * 1024}",
+        "PRAGMA temp_store=MEMORY",
+    ):
+        try:
+            conn.execute(pragma)
+        except sqlite3.Error:
+            pass  # z. B. WAL auf Netzlaufwerken nicht verfügbar → Defaults
+    conn._inode = _inode(path)
     return conn
 
 
+class _ConnectionPool:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._idle: List[_PooledConnection] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> _PooledConnection:
+        current = _inode(self.path)
+        conn: Optional[_PooledConnection] = None
+        stale: List[_PooledConnection] = []
+        with self._lock:
+            while self._idle:
+                cand = self._idle.pop()
+                # DB-Datei gelöscht/ersetzt → alte Connections zeigen auf die falsche Datei
+                if cand._inode == current:
+                    conn = cand
+                    break
+                stale.append(cand)
+        for c in stale:
+            c._close_now()
+        if conn is None:
+            conn = _connect(self.path)
+            conn._pool = self
+        conn._checked_out = True
+        return conn
+
+    def release(self, conn: _PooledConnection) -> None:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            conn._close_now()
+            return
+        size = int(getattr(settings, "SQLITE_POOL_SIZE", 8))
+        with self._lock:
+            if len(self._idle) < size:
+                self._idle.append(conn)
+                return
+        conn._close_now()
+
+    def clear(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for c in idle:
+            c._close_now()
+
+
+_pools: Dict[str, _ConnectionPool] = {}
+_pools_pid = os.getpid()
+_pools_lock = threading.Lock()
+
+
+def _get_pool(path: str) -> _ConnectionPool:
+    global _pools, _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # nach fork(): geerbte Connections nicht weiterverwenden
+            _pools, _pools_pid = {}, os.getpid()
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = _ConnectionPool(path)
+        return pool
+
+
+def get_db() -> sqlite3.Connection:
+    """
+    Connection (Row-Factory, Autocommit) aus dem Pool für settings.SQLITE_PATH.
+    close() gibt sie an den Pool zurück; SQLITE_POOL_SIZE=0 schaltet das Pooling ab.
+    """
+    if int(getattr(settings, "SQLITE_POOL_SIZE", 8)) <= 0:
+        return _connect(settings.SQLITE_PATH)
+    return _get_pool(settings.SQLITE_PATH).acquire()
+
+
+@contextlib.contextmanager
+def db_session() -> Iterator[sqlite3.Connection]:
+    """Leiht eine Pool-Connection für die Dauer des Blocks aus (auch aus async-Code nutzbar)."""
+    conn = get_db()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def close_pools() -> None:
+    """Schließt alle ungenutzten Pool-Connections (Shutdown/Tests)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.clear()
+
+
 def ensure_schema_migrations(conn: sqlite3.Connection) -> None:
     """
     Idempotente Migrationen für bestehende Datenbanken.
@@ -391,6 +544,16 @@ def ensure_schema_migrations(conn: sqlite3.Connection) -> None:
         import logging
         logging.getLogger(__name__).debug(f"source_type migration skipped: {e}")
 
+    # Migration: Chunk-Inhalts-Hash je Evidenz (Delta-Mining)
+    try:
+        conn.execute("ALTER TABLE evidence_reference ADD COLUMN chunk_hash TEXT")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+    try:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_evidence_chunk_hash ON evidence_reference (source_file, chunk_hash)")
+    except Exception:
+        pass
+
     # Migration: Add validation columns to requirement_manifest
     try:
         conn.execute("ALTER TABLE requirement_manifest ADD COLUMN validation_score REAL")
@@ -730,7 +893,7 @@ def get_evidence_refs(conn: sqlite3.Connection, requirement_id: str) -> List[sql
     return conn.execute(
         """
         SELECT id, requirement_id, source_file, sha1, chunk_index,
-               is_neighbor, evidence_metadata
+               is_neighbor, evidence_metadata, chunk_hash
         FROM evidence_reference
         WHERE requirement_id = ?
         ORDER BY chunk_index ASC, is_neighbor ASC
@@ -743,7 +906,7 @@ def get_split_children(conn: sqlite3.Connection, parent_id: str) -> List[sqlite3
     """Get all child requirements created from splitting a parent"""
     return conn.execute(
         """
-        SELECT rs.child_id, rs.split_rationale, rs.split_timestamp, rs.split_model,
+        SELECT rs.parent_id, rs.child_id, rs.split_rationale, rs.split_timestamp, rs.split_model,
                rm.current_text, rm.current_stage
         FROM requirement_split rs
         JOIN requirement_manifest rm ON rs.child_id = rm.requirement_id
@@ -754,6 +917,145 @@ def get_split_children(conn: sqlite3.Connection, parent_id: str) -> List[sqlite3
     ).fetchall()
 
 
+# --- Bulk-Varianten (eine IN-Abfrage je Tabelle statt N Einzelabfragen) ---
+
+# SQLite erlaubt je nach Build nur 999 Parameter pro Statement
+_IN_CHUNK = 500
+
+
+def _in_chunks(values: Sequence[str]) -> Iterator[Sequence[str]]:
+    uniq = list(dict.fromkeys(values))
+    for i in range(0, len(uniq), _IN_CHUNK):
+        yield uniq[i : i + _IN_CHUNK]
+
+
+def _group_rows(conn: sqlite3.Connection, sql: str, key: str, values: Sequence[str]) -> Dict[str, List[sqlite3.Row]]:
+    """Führt sql (mit Platzhalter {marks}) chunkweise aus und gruppiert die Zeilen nach Spalte key."""
+    out: Dict[str, List[sqlite3.Row]] = {}
+    for part in _in_chunks(values):
+        marks = ",".join("?" * len(part))
+        for row in conn.execute(sql.format(marks=marks), tuple(part)).fetchall():
+            out.setdefault(row[key], []).append(row)
+    return out
+
+
+def get_manifests_by_ids(conn: sqlite3.Connection, requirement_ids: Sequence[str]) -> Dict[str, sqlite3.Row]:
+    """Manifests for many requirement_ids: {requirement_id: row}"""
+    grouped = _group_rows(
+        conn,
+        """
+        SELECT requirement_id, requirement_checksum, source_type, source_file,
+               source_file_sha1, chunk_index, original_text, current_text,
+               current_stage, parent_id, validation_score, validation_verdict,
+               created_at, updated_at, metadata
+        FROM requirement_manifest
+        WHERE requirement_id IN ({marks})
+        """,
+        "requirement_id",
+        requirement_ids,
+    )
+    return {rid: rows[0] for rid, rows in grouped.items()}
+
+
+def get_processing_stages_bulk(conn: sqlite3.Connection, requirement_ids: Sequence[str]) -> Dict[str, List[sqlite3.Row]]:
+    """Processing stages for many requirements: {requirement_id: [rows chronologically]}"""
+    return _group_rows(
+        conn,
+        """
+        SELECT id, requirement_id, stage_name, status, started_at, completed_at,
+               evaluation_id, score, verdict, atomic_score, was_split,
+               model_used, latency_ms, token_usage, error_message, stage_metadata
+        FROM processing_stage
+        WHERE requirement_id IN ({marks})
+        ORDER BY started_at ASC
+        """,
+        "requirement_id",
+        requirement_ids,
+    )
+
+
+def get_evidence_refs_bulk(conn: sqlite3.Connection, requirement_ids: Sequence[str]) -> Dict[str, List[sqlite3.Row]]:
+    """Evidence references for many requirements: {requirement_id: [rows]}"""
+    return _group_rows(
+        conn,
+        """
+        SELECT id, requirement_id, source_file, sha1, chunk_index,
+               is_neighbor, evidence_metadata, chunk_hash
+        FROM evidence_reference
+        WHERE requirement_id IN ({marks})
+        ORDER BY chunk_index ASC, is_neighbor ASC
+        """,
+        "requirement_id",
+        requirement_ids,
+    )
+
+
+def get_split_children_bulk(conn: sqlite3.Connection, parent_ids: Sequence[str]) -> Dict[str, List[sqlite3.Row]]:
+    """Split children for many parents: {parent_id: [rows]}"""
+    return _group_rows(
+        conn,
+        """
+        SELECT rs.parent_id, rs.child_id, rs.split_rationale, rs.split_timestamp, rs.split_model,
+               rm.current_text, rm.current_stage
+        FROM requirement_split rs
+        JOIN requirement_manifest rm ON rs.child_id = rm.requirement_id
+        WHERE rs.parent_id IN ({marks})
+        ORDER BY rs.split_timestamp ASC
+        """,
+        "parent_id",
+        parent_ids,
+    )
+
+
+def get_evaluations_for_checksums(conn: sqlite3.Connection, checksums: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Latest evaluation incl. criterion details per requirement checksum
+    (bulk variant of get_evaluation_for_requirement, same dict shape).
+    """
+    latest: Dict[str, sqlite3.Row] = {}
+    by_checksum = _group_rows(
+        conn,
+        """
+        SELECT id, requirement_checksum, score, verdict, created_at
+        FROM evaluation
+        WHERE requirement_checksum IN ({marks})
+        ORDER BY created_at ASC
+        """,
+        "requirement_checksum",
+        checksums,
+    )
+    for checksum, rows in by_checksum.items():
+        latest[checksum] = rows[-1]
+
+    details = _group_rows(
+        conn,
+        """
+        SELECT evaluation_id, criterion_key, score, passed, feedback
+        FROM evaluation_detail
+        WHERE evaluation_id IN ({marks})
+        """,
+        "evaluation_id",
+        [row["id"] for row in latest.values()],
+    )
+    return {
+        checksum: {
+            "evaluation_id": row["id"],
+            "score": row["score"],
+            "verdict": row["verdict"],
+            "details": [
+                {
+                    "criterion": d["criterion_key"],
+                    "score": d["score"],
+                    "passed": bool(d["passed"]),
+                    "feedback": d["feedback"],
+                }
+                for d in details.get(row["id"], [])
+            ],
+        }
+        for checksum, row in latest.items()
+    }
+
+
 def get_split_parent(conn: sqlite3.Connection, child_id: str) -> Optional[sqlite3.Row]:
     """Get the parent requirement that was split to create this child"""
     return conn.execute(
@@ -930,6 +1232,7 @@ def add_evidence_reference(
     chunk_index: int,
     is_neighbor: bool = False,
     evidence_metadata: Optional[Dict[str, Any]] = None,
+    chunk_hash: Optional[str] = None,
 ) -> int:
     """
     Add an evidence reference for a requirement.
@@ -940,14 +1243,32 @@ def add_evidence_reference(
     cursor = conn.execute(
         """
         INSERT INTO evidence_reference
-        (requirement_id, source_file, sha1, chunk_index, is_neighbor, evidence_metadata)
-        VALUES (?, ?, ?, ?, ?, ?)
+        (requirement_id, source_file, sha1, chunk_index, is_neighbor, evidence_metadata, chunk_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
         """,
-        (requirement_id, source_file, sha1, chunk_index, 1 if is_neighbor else 0, evidence_metadata_json),
+        (requirement_id, source_file, sha1, chunk_index, 1 if is_neighbor else 0, evidence_metadata_json, chunk_hash),
     )
     return cursor.lastrowid
 
 
+def get_mined_chunk_hashes(conn: sqlite3.Connection, source_files: Sequence[str]) -> Dict[str, Set[str]]:
+    """
+    Chunk-Hashes je Quelldatei ({source_file: {chunk_hash, ...}}), aus denen bereits
+    Requirements gemint wurden (nur direkte Evidenz, keine Nachbar-Chunks).
+    """
+    grouped = _group_rows(
+        conn,
+        """
+        SELECT DISTINCT source_file, chunk_hash
+        FROM evidence_reference
+        WHERE is_neighbor = 0 AND chunk_hash IS NOT NULL AND source_file IN ({marks})
+        """,
+        "source_file",
+        list(dict.fromkeys(source_files)),
+    )
+    return {src: {r["chunk_hash"] for r in rows} for src, rows in grouped.items()}
+
+
 def record_requirement_split(
     conn: sqlite3.Connection,
     parent_id: str,
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Duplikaterkennung für Requirement-Listen.
+
+Semantisch (Embeddings): Der Batch wird einmal eingebettet (build_embeddings, inkl.
+persistentem Cache), die Kosinus-Ähnlichkeit wird blockweise als Matrixprodukt
+berechnet und Paare über dem Schwellwert per Union-Find gruppiert. Keine
+Netzwerk-Round-Trips pro Requirement.
+
+Lexikalisch (Jaccard über Token-Mengen): NearDuplicateIndex tokenisiert jeden Text
+genau einmal, bildet MinHash-Signaturen und liefert über LSH-Banding nur
+Kandidatenpaare, die anschließend exakt per Jaccard geprüft werden. Damit wird
+die Dedupe gemineter Items nahezu linear statt quadratisch.
+
+NumPy ist optional (kommt i. d. R. über qdrant-client mit); ohne NumPy wird
+auf eine reine Python-Schleife zurückgefallen.
+"""
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+import random
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None  # type: ignore
+
+# Zeilen je Block des Ähnlichkeits-Matrixprodukts (Speicher: block x n float32)
+SIMILARITY_BLOCK_ROWS = 1024
+
+
+class UnionFind:
+    """Disjunkte Mengen mit Pfadkompression und Union-by-Size."""
+
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, x: int, y: int) -> None:
+        rx, ry = self.find(x), self.find(y)
+        if rx == ry:
+            return
+        if self.size[rx] < self.size[ry]:
+            rx, ry = ry, rx
+        self.parent[ry] = rx
+        self.size[rx] += self.size[ry]
+
+    def groups(self) -> List[List[int]]:
+        """Alle Mengen mit mehr als einem Element, Indizes aufsteigend, in Reihenfolge des ersten Elements."""
+        by_root: Dict[int, List[int]] = {}
+        for i in range(len(self.parent)):
+            by_root.setdefault(self.find(i), []).append(i)
+        return [members for members in by_root.values() if len(members) > 1]
+
+
+def similar_pairs(
+    vectors: Sequence[Sequence[float]],
+    threshold: float,
+    block_rows: int = SIMILARITY_BLOCK_ROWS,
+) -> List[Tuple[int, int, float]]:
+    """
+    Alle Paare (i, j, cos) mit i < j und Kosinus-Ähnlichkeit >= threshold.
+    Nullvektoren werden ignoriert.
+    """
+    n = len(vectors)
+    if n < 2:
+        return []
+    if np is None:
+        return _similar_pairs_py(vectors, threshold)
+
+    mat = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(mat, axis=1)
+    valid = norms > 0
+    mat = mat / np.where(valid, norms, 1.0)[:, None]
+    pairs: List[Tuple[int, int, float]] = []
+    step = max(1, int(block_rows))
+    for start in range(0, n, step):
+        stop = min(n, start + step)
+        sims = mat[start:stop] @ mat.T
+        # Nur obere Dreiecksmatrix (j > i)
+        cols = np.arange(n)
+        rows = np.arange(start, stop)[:, None]
+        mask = (sims >= threshold) & (cols[None, :] > rows) & valid[None, :] & valid[start:stop, None]
+        bi, bj = np.nonzero(mask)
+        vals = np.minimum(sims[bi, bj], 1.0)
+        pairs.extend(zip((bi + start).tolist(), bj.tolist(), vals.tolist()))
+    return pairs
+
+
+def _similar_pairs_py(vectors: Sequence[Sequence[float]], threshold: float) -> List[Tuple[int, int, float]]:
+    normed: List[Optional[List[float]]] = []
+    for v in vectors:
+        norm = math.sqrt(sum(x * x for x in v))
+        normed.append([x / norm for x in v] if norm > 0 else None)
+    pairs: List[Tuple[int, int, float]] = []
+    for i, a in enumerate(normed):
+        if a is None:
+            continue
+        for j in range(i + 1, len(normed)):
+            b = normed[j]
+            if b is None:
+                continue
+            sim = sum(x * y for x, y in zip(a, b))
+            if sim >= threshold:
+                pairs.append((i, j, min(1.0, sim)))
+    return pairs
+
+
+def group_pairs(n: int, pairs: Sequence[Tuple[int, int, float]]) -> List[Dict[str, object]]:
+    """
+    Union-Find über die Paare. Je Gruppe: {"indices": [...], "similarity": {idx: max. Ähnlichkeit zu einem Gruppenmitglied}}.
+    """
+    uf = UnionFind(n)
+    best: Dict[int, float] = {}
+    for i, j, sim in pairs:
+        uf.union(i, j)
+        best[i] = max(best.get(i, 0.0), sim)
+        best[j] = max(best.get(j, 0.0), sim)
+    return [{"indices": members, "similarity": {i: best.get(i, 0.0) for i in members}} for members in uf.groups()]
+
+
+def semantic_duplicate_groups(
+    texts: Sequence[str],
+    threshold: float = 0.90,
+    model: Optional[str] = None,
+) -> List[Dict[str, object]]:
+    """
+    Gruppiert semantische Duplikate einer Textliste (leere Texte werden übersprungen).
+    Rückgabe wie group_pairs(), Indizes beziehen sich auf `texts`.
+    """
+    from .embeddings import build_embeddings  # lazy: embeddings zieht requests/tenacity nach
+
+    idx = [i for i, t in enumerate(texts) if isinstance(t, str) and t.strip()]
+    if len(idx) < 2:
+        return []
+    vectors = build_embeddings([texts[i] for i in idx], model=model)
+    pairs = [(idx[i], idx[j], sim) for i, j, sim in similar_pairs(vectors, threshold)]
+    return group_pairs(len(texts), pairs)
+
+
+# -------- Lexikalische Near-Duplicates (MinHash/LSH) --------
+
+_TOKEN_STRIP = ",.:;()[]{}"
+_TOKEN_TABLE = str.maketrans(_TOKEN_STRIP, " " * len(_TOKEN_STRIP))
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def text_tokens(text: Any) -> frozenset:
+    """Kleingeschriebene Token-Menge (Satzzeichen ,.:;()[]{} als Trenner)."""
+    return frozenset(str(text or "").lower().translate(_TOKEN_TABLE).split())
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / (len(a | b) or 1)
+
+
+def _token_hash(tok: str) -> int:
+    return int.from_bytes(hashlib.blake2b(tok.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def _choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    (bands, rows) mit bands * rows == num_perm, deren LSH-Schwelle (1/b)^(1/r) knapp
+    (Marge 0.1) unter threshold liegt – hoher Recall bei wenigen Fehlkandidaten.
+    """
+    target = max(0.05, threshold - 0.1)
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1.0 / bands) ** (1.0 / rows) <= target:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH-Index über Token-Mengen.
+
+        idx = NearDuplicateIndex(threshold=0.88)
+        idx.extend(texts)
+        for i, j, sim in idx.similar_pairs(): ...
+
+    candidates(i) / candidate_pairs() liefern LSH-Kandidaten (ungeprüft),
+    similar_pairs() nur Paare mit exakter Jaccard-Ähnlichkeit >= threshold.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, seed: int = 1) -> None:
+        self.threshold = float(threshold)
+        self.num_perm = int(num_perm)
+        self.bands, self.rows = _choose_bands(self.num_perm, self.threshold)
+        rnd = random.Random(seed)
+        self._a = [rnd.randint(1, _MERSENNE - 1) for _ in range(self.num_perm)]
+        self._b = [rnd.randint(0, _MERSENNE - 1) for _ in range(self.num_perm)]
+        if np is not None:
+            self._a_np = np.array(self._a, dtype=np.uint64) & np.uint64(_MAX_HASH)
+            self._b_np = np.array(self._b, dtype=np.uint64) & np.uint64(_MAX_HASH)
+        self._tokens: List[frozenset] = []
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(self.bands)]
+        self._empty: List[int] = []
+        self._keys: List[Optional[List[Tuple[int, ...]]]] = []
+        self._hash_cache: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def _signature(self, toks: frozenset) -> List[int]:
+        hashes = []
+        for t in toks:
+            h = self._hash_cache.get(t)
+            if h is None:
+                h = self._hash_cache[t] = _token_hash(t)
+            hashes.append(h)
+        if np is not None:
+            x = np.array(hashes, dtype=np.uint64)
+            # a, b, x < 2^32 -> a*x+b passt in uint64
+            perm = (self._a_np[:, None] * x[None, :] + self._b_np[:, None]) % np.uint64(_MERSENNE)
+            return perm.min(axis=1).tolist()
+        return [
+            min(((a & _MAX_HASH) * h + (b & _MAX_HASH)) % _MERSENNE for h in hashes)
+            for a, b in zip(self._a, self._b)
+        ]
+
+    def add(self, text: Any) -> int:
+        """Fügt einen Text hinzu (einmalige Tokenisierung) und liefert seinen Index."""
+        idx = len(self._tokens)
+        toks = text_tokens(text)
+        self._tokens.append(toks)
+        if not toks:
+            # leere Mengen sind untereinander identisch (Jaccard 1.0)
+            self._empty.append(idx)
+            self._keys.append(None)
+            return idx
+        sig = self._signature(toks)
+        keys = [tuple(sig[b * self.rows:(b + 1) * self.rows]) for b in range(self.bands)]
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(idx)
+        self._keys.append(keys)
+        return idx
+
+    def extend(self, texts: Sequence[Any]) -> None:
+        for t in texts:
+            self.add(t)
+
+    def tokens(self, i: int) -> frozenset:
+        return self._tokens[i]
+
+    def similarity(self, i: int, j: int) -> float:
+        return jaccard(self._tokens[i], self._tokens[j])
+
+    def candidates(self, i: int) -> Set[int]:
+        """LSH-Kandidaten für Element i (ohne i selbst)."""
+        keys = self._keys[i]
+        if keys is None:
+            out = set(self._empty)
+        else:
+            out = set()
+            for band, key in enumerate(keys):
+                out.update(self._buckets[band].get(key, ()))
+        out.discard(i)
+        return out
+
+    def candidate_pairs(self) -> Iterator[Tuple[int, int]]:
+        """Alle Kandidatenpaare (i, j) mit i < j, jeweils einmal."""
+        for i in range(len(self._tokens)):
+            for j in sorted(self.candidates(i)):
+                if j > i:
+                    yield i, j
+
+    def similar_pairs(self) -> List[Tuple[int, int, float]]:
+        """Kandidatenpaare mit exakter Jaccard-Ähnlichkeit >= threshold."""
+        out: List[Tuple[int, int, float]] = []
+        for i, j in self.candidate_pairs():
+            sim = self.similarity(i, j)
+            if sim >= self.threshold:
+                out.append((i, j, sim))
+        return out
+
+
+def dedupe_keep_longest(items: Sequence[Dict[str, Any]], key: str, threshold: float) -> List[Dict[str, Any]]:
+    """
+    Greedy-Dedupe gemineter Items: Item i übernimmt alle späteren Items, deren Token-Jaccard
+    zum aktuellen Gewinner >= threshold ist; Gewinner ist jeweils der längere Text.
+    Verglichen werden nur LSH-Kandidaten (Index) statt aller Paare.
+    """
+    index = NearDuplicateIndex(threshold=threshold)
+    index.extend([it.get(key) for it in items])
+    used = [False] * len(items)
+    result: List[Dict[str, Any]] = []
+    for i, it in enumerate(items):
+        if used[i]:
+            continue
+        used[i] = True
+        winner, win_idx = it, i
+        heap = [j for j in index.candidates(i) if j > i]
+        heapq.heapify(heap)
+        last = i
+        while heap:
+            j = heapq.heappop(heap)
+            if j <= last or used[j]:
+                continue
+            last = j
+            if index.similarity(win_idx, j) < threshold:
+                continue
+            used[j] = True
+            if len(str(items[j].get(key) or "")) > len(str(winner.get(key) or "")):
+                winner, win_idx = items[j], j
+                for k in index.candidates(j):
+                    if k > j and not used[k]:
+                        heapq.heappush(heap, k)
+        result.append(winner)
+    return result
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Persistenter Embedding-Store für build_embeddings().
+
+Schlüssel: (model, sha256(text)). Vektoren liegen als float32-BLOB in einer
+eigenen SQLite-Datei (EMBEDDINGS_CACHE_PATH); davor sitzt ein begrenzter
+In-Memory-LRU (EMBEDDINGS_CACHE_MEM_ITEMS), der die Vektoren ebenfalls kompakt
+als float32-Bytes hält (~4 Byte je Dimension, bei 1536 Dimensionen ~6 KB je
+Eintrag, Default 10000 Einträge ~65 MB) und erst bei der Ausgabe in Listen
+umwandelt. Die Datei wird per LRU auf EMBEDDINGS_CACHE_MAX_ENTRIES Einträge begrenzt.
+
+Damit verursacht ein erneuter Ingest eines unveränderten Korpus keine
+Embedding-API-Calls mehr – unabhängig davon, ob über Retriever,
+RequirementsStore, QdrantKGClient, QdrantTraceSink oder den Vector-Ingest.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from . import settings
+
+logger = logging.getLogger("app.embeddings")
+
+# LRU-Trim der Datei nur alle N geschriebenen Vektoren
+_TRIM_EVERY = 1000
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _pack(vec: Sequence[float]) -> bytes:
+    return array("f", vec).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    arr = array("f")
+    arr.frombytes(blob)
+    return arr.tolist()
+
+
+class EmbeddingCache:
+    """
+    Zweistufiger Cache: begrenzter In-Memory-LRU vor einer SQLite-Datei.
+    """
+
+    def __init__(self, path: str, mem_items: int = 10000, max_entries: int = 0) -> None:
+        self.path = path
+        self.mem_items = max(0, int(mem_items or 0))
+        self.max_entries = int(max_entries or 0)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._mem: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._writes_since_trim = 0
+        self.counters: Dict[str, int] = {"mem_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            d = os.path.dirname(os.path.abspath(self.path))
+            if d:
+                os.makedirs(d, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings(
+                  model TEXT NOT NULL,
+                  text_hash TEXT NOT NULL,
+                  dim INTEGER NOT NULL,
+                  vec BLOB NOT NULL,
+                  last_access REAL NOT NULL,
+                  PRIMARY KEY(model, text_hash)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: Tuple[str, str], blob: bytes) -> None:
+        if not self.mem_items:
+            return
+        self._mem[key] = blob
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.mem_items:
+            self._mem.popitem(last=False)
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Liefert je Text den gecachten Vektor oder None.
+        """
+        out: List[Optional[List[float]]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, t in enumerate(texts):
+                key = (model, text_hash(t))
+                blob = self._mem.get(key)
+                if blob is not None:
+                    self._mem.move_to_end(key)
+                    out[i] = _unpack(blob)
+                    self.counters["mem_hits"] += 1
+                else:
+                    pending.setdefault(key[1], []).append(i)
+            if not pending:
+                return out
+            try:
+                conn = self._connect()
+                hashes = list(pending.keys())
+                found: List[str] = []
+                # SQLite-Parameterlimit beachten
+                for start in range(0, len(hashes), 500):
+                    part = hashes[start : start + 500]
+                    marks = ",".join("?" * len(part))
+                    rows = conn.execute(
+                        f"SELECT text_hash, vec FROM embeddings WHERE model = ? AND text_hash IN ({marks})",
+                        (model, *part),
+                    ).fetchall()
+                    for h, blob in rows:
+                        vec = _unpack(blob)
+                        self._remember((model, h), blob)
+                        for i in pending[h]:
+                            out[i] = vec
+                        found.append(h)
+                if found:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE model = ? AND text_hash = ?",
+                        [(now, model, h) for h in found],
+                    )
+                    conn.commit()
+                disk_hits = sum(len(pending[h]) for h in found)
+                self.counters["disk_hits"] += disk_hits
+                self.counters["misses"] += sum(len(v) for v in pending.values()) - disk_hits
+            except Exception as e:
+                logger.warning("embedding cache read failed: %s", e)
+        return out
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        now = time.time()
+        rows = []
+        with self._lock:
+            for t, vec in zip(texts, vectors):
+                h = text_hash(t)
+                blob = _pack(vec)
+                self._remember((model, h), blob)
+                rows.append((model, h, len(vec), blob, now))
+            if not rows:
+                return
+            try:
+                conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings(model, text_hash, dim, vec, last_access) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self.counters["writes"] += len(rows)
+                self._writes_since_trim += len(rows)
+                if self.max_entries and self._writes_since_trim >= _TRIM_EVERY:
+                    self._trim(conn)
+                conn.commit()
+            except Exception as e:
+                logger.warning("embedding cache write failed: %s", e)
+
+    def _trim(self, conn: sqlite3.Connection) -> None:
+        self._writes_since_trim = 0
+        (count,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        overflow = int(count) - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.counters["evictions"] += overflow
+
+    def stats(self) -> Dict[str, Any]:
+        entries: Optional[int] = None
+        try:
+            with self._lock:
+                (entries,) = self._connect().execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        except Exception:
+            pass
+        return {**self.counters, "entries": entries, "mem_items": len(self._mem), "path": self.path}
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Prozessweiter Embedding-Cache; None wenn per EMBEDDINGS_CACHE_ENABLED=false deaktiviert.
+    """
+    global _cache
+    if not settings.EMBEDDINGS_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(
+                    settings.EMBEDDINGS_CACHE_PATH,
+                    mem_items=settings.EMBEDDINGS_CACHE_MEM_ITEMS,
+                    max_entries=settings.EMBEDDINGS_CACHE_MAX_ENTRIES,
+                )
+    return _cache
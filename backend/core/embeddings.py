@@ -1,13 +1,22 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import time
-from typing import Iterable, List, Sequence
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
 
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential
+from requests.adapters import HTTPAdapter
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from . import settings
+from .embedding_cache import get_embedding_cache
+
+try:
+    import tiktoken
+except Exception:  # pragma: no cover
+    tiktoken = None  # type: ignore
 
 # Wir nutzen das Legacy OpenAI SDK 0.28.x nur für Chat, für Embeddings rufen wir die REST API,
 # damit text-embedding-3-small konsistent nutzbar ist und wir Timeout/Retry sauber kontrollieren können.
@@ -18,11 +27,94 @@ DEFAULT_EMBEDDINGS_MODEL = getattr(settings, "EMBEDDINGS_MODEL", "text-embedding
 # Embedding dimension von text-embedding-3-small ist i. d. R. 1536
 EMBEDDINGS_DIM = 1536
 
+logger = logging.getLogger("app.embeddings")
+
 
 def get_embeddings_dim() -> int:
     return EMBEDDINGS_DIM
 
 
+class EmbeddingsRetryableError(RuntimeError):
+    """
+    Transienter Fehler der Embeddings-API (429/5xx). retry_after kommt aus dem Retry-After-Header.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """
+    Prozessweite requests.Session mit Keep-Alive-Pool (eine TCP/TLS-Verbindung je In-Flight-Batch).
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool = max(1, int(settings.EMBEDDINGS_CONCURRENCY))
+                sess = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool)
+                sess.mount("https://", adapter)
+                sess.mount("http://", adapter)
+                _session = sess
+    return _session
+
+
+_encoding = None
+
+
+def _count_tokens(text: str) -> int:
+    """
+    Tokenanzahl (cl100k_base) für die Batch-Bildung; Fallback ~4 Zeichen pro Token.
+    """
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # pragma: no cover
+            _encoding = False
+    if _encoding:
+        try:
+            return max(1, len(_encoding.encode(text, disallowed_special=())))
+        except Exception:  # pragma: no cover
+            pass
+    return max(1, len(text) // 4)
+
+
+def _token_batches(texts: Sequence[str], max_tokens: int, max_items: int) -> Iterator[List[str]]:
+    """
+    Bildet Batches nach Tokenbudget (max_tokens) und Obergrenze der Eingaben (max_items).
+    Ein einzelner Text über dem Budget bildet einen eigenen Batch.
+    """
+    batch: List[str] = []
+    used = 0
+    for t in texts:
+        n = _count_tokens(t)
+        if batch and (used + n > max_tokens or len(batch) >= max_items):
+            yield batch
+            batch, used = [], 0
+        batch.append(t)
+        used += n
+    if batch:
+        yield batch
+
+
+def _wait_retry_after(retry_state) -> float:
+    """
+    Wartezeit zwischen Retries: Retry-After der API wenn vorhanden, sonst exponentiell.
+    """
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after:
+        return min(float(retry_after), 60.0)
+    return wait_exponential(multiplier=0.5, max=8)(retry_state)
+
+
 def _auth_headers() -> dict:
     if not settings.OPENAI_API_KEY:
         raise RuntimeError("OPENAI_API_KEY nicht gesetzt")
@@ -32,16 +124,31 @@ def _auth_headers() -> dict:
     }
 
 
-@retry(reraise=True, stop=stop_after_attempt(5), wait=wait_exponential(multiplier=0.5, max=8))
+@retry(
+    reraise=True,
+    stop=stop_after_attempt(6),
+    wait=_wait_retry_after,
+    retry=retry_if_exception_type((EmbeddingsRetryableError, requests.ConnectionError, requests.Timeout)),
+)
 def _embed_batch(texts: Sequence[str], model: str) -> List[List[float]]:
     """
-    Ruft die OpenAI Embeddings REST-API auf. Nutzt Retries bei Transienten Fehlern.
+    Ruft die OpenAI Embeddings REST-API über die gepoolte Session auf.
+    Retries nur bei 429/5xx und Verbindungsfehlern; 429 respektiert Retry-After.
     """
     payload = {
         "model": model,
         "input": list(texts),
     }
-    resp = requests.post(OPENAI_EMBEDDINGS_URL, headers=_auth_headers(), json=payload, timeout=60)
+    resp = _get_session().post(OPENAI_EMBEDDINGS_URL, headers=_auth_headers(), json=payload, timeout=60)
+    if resp.status_code == 429 or resp.status_code >= 500:
+        retry_after: Optional[float] = None
+        try:
+            retry_after = float(resp.headers.get("retry-after") or 0) or None
+        except (TypeError, ValueError):
+            retry_after = None
+        if resp.status_code == 429:
+            logger.warning("embeddings rate limited (retry_after=%s)", retry_after)
+        raise EmbeddingsRetryableError(f"OpenAI embeddings HTTP {resp.status_code}: {resp.text[:300]}", retry_after)
     if resp.status_code != 200:
         raise RuntimeError(f"OpenAI embeddings HTTP {resp.status_code}: {resp.text[:300]}")
     data = resp.json() or {}
@@ -58,21 +165,64 @@ def _embed_batch(texts: Sequence[str], model: str) -> List[List[float]]:
 
 def build_embeddings(
     texts: Sequence[str],
-    model: str = DEFAULT_EMBEDDINGS_MODEL,
-    batch_size: int = 64,
+    model: Optional[str] = DEFAULT_EMBEDDINGS_MODEL,
+    batch_size: Optional[int] = None,
+    use_cache: bool = True,
+    max_concurrency: Optional[int] = None,
 ) -> List[List[float]]:
     """
-    Baut Embeddings für eine Liste von Texten. Chunked-Batching mit Retries.
+    Baut Embeddings für eine Liste von Texten.
+
+    - Bereits bekannte (model, text)-Paare kommen aus dem persistenten Embedding-Cache
+      (backend/core/embedding_cache.py); an die API gehen nur fehlende, deduplizierte Texte.
+    - Batches werden nach Tokenbudget gebildet (EMBEDDINGS_BATCH_MAX_TOKENS, max. batch_size
+      bzw. EMBEDDINGS_BATCH_MAX_ITEMS Eingaben) und mit bis zu max_concurrency
+      (EMBEDDINGS_CONCURRENCY) gleichzeitig laufenden Requests über eine gepoolte Session geschickt.
     """
     if not texts:
         return []
-    out: List[List[float]] = []
-    n = len(texts)
-    bs = max(1, int(batch_size or 1))
-    for i in range(0, n, bs):
-        chunk = texts[i : i + bs]
-        vecs = _embed_batch(chunk, model=model)
-        out.extend(vecs)
-        # Light rate-limit smoothing
-        time.sleep(0.05)
-    return out
\ No newline at end of file
+    model = model or DEFAULT_EMBEDDINGS_MODEL
+    cache = get_embedding_cache() if use_cache else None
+    cached: List[Optional[List[float]]] = cache.get_many(model, texts) if cache else [None] * len(texts)
+
+    # Fehlende Texte deduplizieren (Reihenfolge der Erstvorkommen bleibt erhalten)
+    missing: Dict[str, List[int]] = {}
+    for i, (t, vec) in enumerate(zip(texts, cached)):
+        if vec is None:
+            missing.setdefault(t, []).append(i)
+    if not missing:
+        return cached  # type: ignore[return-value]
+
+    max_items = max(1, int(batch_size or settings.EMBEDDINGS_BATCH_MAX_ITEMS))
+    batches = _token_batches(list(missing.keys()), max(1, settings.EMBEDDINGS_BATCH_MAX_TOKENS), max_items)
+    workers = max(1, int(max_concurrency or settings.EMBEDDINGS_CONCURRENCY))
+
+    def _collect(chunk: List[str], vecs: List[List[float]]) -> None:
+        if len(vecs) != len(chunk):
+            raise RuntimeError(f"Embedding-Batch lieferte {len(vecs)} statt {len(chunk)} Vektoren")
+        if cache:
+            cache.put_many(model, chunk, vecs)
+        for t, vec in zip(chunk, vecs):
+            for idx in missing[t]:
+                cached[idx] = vec
+
+    if workers == 1:
+        for chunk in batches:
+            _collect(chunk, _embed_batch(chunk, model=model))
+    else:
+        # Pipeline: höchstens `workers` Batches gleichzeitig in Flight, der nächste startet sobald einer fertig ist
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed") as pool:
+            inflight: Dict[Future, List[str]] = {}
+            for chunk in batches:
+                if len(inflight) >= workers:
+                    done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        _collect(inflight.pop(fut), fut.result())
+                inflight[pool.submit(_embed_batch, chunk, model)] = chunk
+            for fut in list(inflight):
+                _collect(inflight.pop(fut), fut.result())
+    gaps = [i for i, vec in enumerate(cached) if vec is None]
+    if gaps:
+        # Nie kürzen: die Ausgabe muss Index für Index zu texts passen
+        raise RuntimeError(f"Kein Embedding für {len(gaps)} Text(e), z. B. Index {gaps[0]}")
+    return cached  # type: ignore[return-value]
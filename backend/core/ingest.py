@@ -1,14 +1,30 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import collections
+import concurrent.futures
+import concurrent.futures.process
+import contextlib
 import io
+import itertools
 import json
 import hashlib
+import logging
+import multiprocessing
+import os
+import queue as queue_mod
+import shutil
+import tempfile
+import threading
 import time
-from typing import Any, Dict, Iterable, List, Tuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
 
 from . import settings
 
+logger = logging.getLogger("app.ingest")
+
 # Optional heavy deps – beim Import fehlertolerant sein, erst beim Gebrauch prüfen.
 try:
     import fitz  # PyMuPDF
@@ -44,9 +60,11 @@ except Exception:  # pragma: no cover
 
 # -------- Encoding / Tokenisierung --------
 
+@lru_cache(maxsize=1)
 def _get_encoding():
     """
-    Liefert eine tiktoken-encoding Instanz (cl100k_base). Fällt auf naive Spaltlogik zurück, falls tiktoken fehlt.
+    Liefert eine (prozessweit gecachte) tiktoken-encoding Instanz (cl100k_base).
+    Fällt auf naive Spaltlogik zurück, falls tiktoken fehlt.
     """
     if tiktoken is None:
         return None
@@ -56,6 +74,14 @@ def _get_encoding():
         return None
 
 
+def _encode(enc, text: str) -> List[int]:
+    # encode_ordinary: Spezialtoken-Strings im Dokument (z. B. "<|endoftext|>") als Text behandeln
+    try:
+        return enc.encode_ordinary(text)
+    except AttributeError:  # pragma: no cover
+        return enc.encode(text)
+
+
 def tokenize_len(text: str) -> int:
     """
     Anzahl Tokens gemäß tiktoken cl100k_base; Fallback = Wörter zählen.
@@ -65,44 +91,27 @@ def tokenize_len(text: str) -> int:
         # Naive Fallback-Heuristik: Wortanzahl als Token-Approximation
         return max(1, len(text.split()))
     try:
-        return len(enc.encode(text))
+        return len(_encode(enc, text))
     except Exception:  # pragma: no cover
         return max(1, len(text.split()))
 
 
-def _split_by_tokens(text: str, max_tokens: int) -> List[str]:
+def token_windows(n_tokens: int, max_tokens: int, overlap_tokens: int) -> List[Tuple[int, int]]:
     """
-    Grobe Token-basierte Unterteilung eines Textes in Teile mit max_tokens Länge (keine Overlaps).
-    Wird als innerer Schritt beim Erstellen von Overlap-Chunks verwendet.
+    Fenster als Token-Offsets [start, end): Slices à max_tokens, ab dem zweiten
+    jeweils um overlap_tokens nach links in den Vorgänger verlängert.
     """
-    enc = _get_encoding()
-    if enc is None:
-        # Approx: Teile anhand von Wörtern
-        words = text.split()
-        out: List[str] = []
-        if not words:
-            return out
-        step = max(1, max_tokens)
-        for i in range(0, len(words), step):
-            out.append(" ".join(words[i:i+step]))
-        return out
-
-    tokens = enc.encode(text)
-    if not tokens:
-        return []
-    out: List[str] = []
-    for i in range(0, len(tokens), max_tokens):
-        chunk_tokens = tokens[i:i+max_tokens]
-        out.append(enc.decode(chunk_tokens))
+    out: List[Tuple[int, int]] = []
+    for i in range(0, n_tokens, max(1, max_tokens)):
+        out.append((max(0, i - overlap_tokens) if i else 0, min(n_tokens, i + max_tokens)))
     return out
 
 
-def chunk_text(text: str, min_tokens: int, max_tokens: int, overlap_tokens: int) -> List[str]:
+def chunk_text_with_lengths(text: str, min_tokens: int, max_tokens: int, overlap_tokens: int) -> List[Tuple[str, int]]:
     """
-    Erzeugt Chunks (200–400 Tokens empfohlen) mit Overlap (z. B. 50).
-    Heuristik:
-      - Schaffe zuerst grobe max_tokens-Slices,
-      - Danach füge Overlaps hinzu, indem wir vom vorherigen Ende overlap_tokens übernehmen.
+    Wie chunk_text(), liefert aber (chunk, tokenLen). Der Text wird genau einmal
+    encodiert; Overlaps entstehen als Offset-Fenster über der Tokenfolge, dekodiert
+    werden nur die finalen Fenster, die Länge ergibt sich aus den Offsets.
     """
     text = (text or "").strip()
     if not text:
@@ -114,57 +123,73 @@ def chunk_text(text: str, min_tokens: int, max_tokens: int, overlap_tokens: int)
     if overlap_tokens >= max_tokens:
         overlap_tokens = max_tokens // 4  # sane default
 
-    # Grobe Slices
-    base_slices = _split_by_tokens(text, max_tokens=max_tokens)
-    if not base_slices:
-        return []
-
-    # Falls keine Overlaps benötigt
-    if overlap_tokens == 0:
-        return [s for s in base_slices if tokenize_len(s) >= min_tokens or len(base_slices) == 1]
-
-    # Encoding für Overlap
     enc = _get_encoding()
     if enc is None:
-        # Best-effort Overlap per Wortanzahl
-        out: List[str] = []
-        prev_tail_words: List[str] = []
-        overlap_words = max(1, overlap_tokens)
-        for i, s in enumerate(base_slices):
-            words = s.split()
-            if i == 0:
-                out.append(s)
-                prev_tail_words = words[-overlap_words:] if len(words) > overlap_words else words
-            else:
-                merged = " ".join(prev_tail_words + words)
-                out.append(merged)
-                prev_tail_words = words[-overlap_words:] if len(words) > overlap_words else words
-        # Filter kurz-unter min_tokens – außer wenn es nur ein Chunk ist
-        out = [s for s in out if tokenize_len(s) >= min_tokens or len(out) == 1]
-        return out
-
-    # Mit tiktoken Overlap sauber auf Tokenbasis bilden
-    out_tok: List[List[int]] = []
-    prev_tail: List[int] = []
-    for i, s in enumerate(base_slices):
-        s_tok = enc.encode(s)
-        if i == 0:
-            out_tok.append(s_tok)
-            prev_tail = s_tok[-overlap_tokens:] if len(s_tok) > overlap_tokens else s_tok
-        else:
-            merged_tok = prev_tail + s_tok
-            out_tok.append(merged_tok)
-            prev_tail = s_tok[-overlap_tokens:] if len(s_tok) > overlap_tokens else s_tok
+        # Best-effort per Wortanzahl
+        units: Any = text.split()
+        decode = " ".join
+    else:
+        units = _encode(enc, text)
+        decode = enc.decode
+    windows = token_windows(len(units), max_tokens, overlap_tokens)
+    # Filter kurz-unter min_tokens – außer wenn es nur ein Chunk ist
+    if len(windows) > 1:
+        windows = [(a, b) for a, b in windows if b - a >= min_tokens]
+    return [(decode(units[a:b]), b - a) for a, b in windows]
 
-    out_txt = [enc.decode(toks) for toks in out_tok]
-    out_txt = [s for s in out_txt if tokenize_len(s) >= min_tokens or len(out_txt) == 1]
-    return out_txt
+
+def chunk_text(text: str, min_tokens: int, max_tokens: int, overlap_tokens: int) -> List[str]:
+    """
+    Erzeugt Chunks (200–400 Tokens empfohlen) mit Overlap (z. B. 50).
+    Heuristik:
+      - Schaffe zuerst grobe max_tokens-Slices,
+      - Danach füge Overlaps hinzu, indem wir vom vorherigen Ende overlap_tokens übernehmen.
+    """
+    return [ch for ch, _ in chunk_text_with_lengths(text, min_tokens, max_tokens, overlap_tokens)]
 
 
 # -------- Datei-Extraktion --------
 
-def _sha1(data: bytes) -> str:
-    return hashlib.sha1(data).hexdigest()
+Source = Union[bytes, "os.PathLike[str]"]
+
+_READ_BLOCK = 1 << 20
+
+
+def _sha1(data: Source) -> str:
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return hashlib.sha1(data).hexdigest()
+    # Datei blockweise hashen – Speicherbedarf unabhängig von der Dateigröße
+    h = hashlib.sha1()
+    with open(data, "rb") as f:
+        for block in iter(lambda: f.read(_READ_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_bytes(data: Source) -> bytes:
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return bytes(data)
+    with open(data, "rb") as f:
+        return f.read()
+
+
+@contextlib.contextmanager
+def spool_to_path(fileobj: BinaryIO, suffix: str = "") -> Iterator[Path]:
+    """
+    Kopiert einen Upload-Stream blockweise in eine temporäre Datei und liefert
+    deren Pfad (wird beim Verlassen gelöscht). So muss ein Upload nie komplett
+    als bytes im Speicher liegen.
+    """
+    fd, name = tempfile.mkstemp(prefix="ingest_", suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(fileobj, out, _READ_BLOCK)
+        yield Path(name)
+    finally:
+        try:
+            os.unlink(name)
+        except OSError:
+            pass
 
 
 def _now() -> int:
@@ -221,16 +246,27 @@ def extract_texts_from_json(text: str) -> List[str]:
     return items or [text]
 
 
-def extract_texts_from_pdf(data: bytes) -> List[str]:
+def iter_pdf_pages(data: Source) -> Iterator[str]:
+    """
+    Liefert die Seitentexte (nicht-leere Seiten) lazy, Seite für Seite.
+    Mit Pfad liest MuPDF die Datei bei Bedarf statt sie komplett zu laden;
+    je Seite bleibt nur deren Text im Speicher.
+    """
     if fitz is None:
         raise RuntimeError("PyMuPDF nicht installiert. Bitte PyMuPDF in requirements aufnehmen.")
-    out: List[str] = []
-    with fitz.open(stream=data, filetype="pdf") as doc:
-        for page in doc:
-            txt = page.get_text("text") or ""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        doc = fitz.open(stream=bytes(data), filetype="pdf")
+    else:
+        doc = fitz.open(os.fspath(data), filetype="pdf")
+    with doc:
+        for page_no in range(doc.page_count):
+            txt = doc.load_page(page_no).get_text("text") or ""
             if txt.strip():
-                out.append(txt)
-    return out or [""]
+                yield txt
+
+
+def extract_texts_from_pdf(data: Source) -> List[str]:
+    return list(iter_pdf_pages(data)) or [""]
 
 
 def extract_texts_from_docx(data: bytes) -> List[str]:
@@ -243,12 +279,15 @@ def extract_texts_from_docx(data: bytes) -> List[str]:
     return [text] if text else [""]
 
 
-def _magika_guess_ct(data: bytes) -> str | None:
+def _magika_guess_ct(data: Source) -> str | None:
     """Nutze Magika (falls vorhanden), um MIME zu bestimmen."""
     try:
         if _magika is None:
             return None
-        res = _magika.identify_bytes(data)
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            res = _magika.identify_bytes(bytes(data))
+        else:
+            res = _magika.identify_path(Path(data))
         return getattr(res, "mime_type", None) or None
     except Exception:
         return None
@@ -285,14 +324,16 @@ def _docling_convert(data: bytes, filename: str) -> List[str]:
         return []
 
 
-def extract_texts(
+def iter_texts(
     filename: str,
-    data: bytes,
+    data: Source,
     content_type: str = "",
-) -> List[Dict[str, Any]]:
+) -> Iterator[Dict[str, Any]]:
     """
-    Liefert eine Liste von {text, meta} mit Rohtexten und Metadaten pro Dokumentteil.
-    Für PDF wird pro Seite ein Eintrag erzeugt; für andere Typen idR ein Eintrag.
+    Liefert {text, meta} je Dokumentteil als Generator; data ist bytes oder ein Pfad.
+    PDF-Seiten werden lazy geparst und einzeln geliefert, sodass Chunking/Embedding
+    mit Seite 1 beginnen können, während spätere Seiten noch geparst werden.
+    Andere Formate (klein im Vergleich) werden komplett gelesen; idR ein Eintrag.
     """
     name_l = (filename or "").lower()
     ct = (content_type or "").lower()
@@ -318,72 +359,408 @@ def extract_texts(
             m.update(extra)
         return m
 
+    # PDF: seitenweise und lazy (auch direkt aus dem Pfad)
+    if name_l.endswith(".pdf") or "application/pdf" in ct:
+        n = 0
+        for n, b in enumerate(iter_pdf_pages(data), start=1):
+            yield {"text": b, "meta": base_meta({"sourceType": "pdf", "pageNo": n})}
+        if n == 0:
+            yield {"text": "", "meta": base_meta({"sourceType": "pdf", "pageNo": 1})}
+        return
+
+    raw = _read_bytes(data)
+
     # Erkennung anhand von Endung/MIME
     if name_l.endswith(".md") or "markdown" in ct:
-        text = data.decode("utf-8", errors="ignore")
+        text = raw.decode("utf-8", errors="ignore")
         blocks = extract_texts_from_md(text)
-        return [{"text": b, "meta": base_meta({"sourceType": "md"})} for b in blocks]
+        yield from ({"text": b, "meta": base_meta({"sourceType": "md"})} for b in blocks)
+        return
 
     if name_l.endswith(".txt") or "text/plain" in ct:
-        text = data.decode("utf-8", errors="ignore")
+        text = raw.decode("utf-8", errors="ignore")
         blocks = extract_texts_from_txt(text)
-        return [{"text": b, "meta": base_meta({"sourceType": "txt"})} for b in blocks]
+        yield from ({"text": b, "meta": base_meta({"sourceType": "txt"})} for b in blocks)
+        return
 
     if name_l.endswith(".json") or "application/json" in ct:
-        text = data.decode("utf-8", errors="ignore")
+        text = raw.decode("utf-8", errors="ignore")
         blocks = extract_texts_from_json(text)
-        return [{"text": b, "meta": base_meta({"sourceType": "json"})} for b in blocks]
-
-    if name_l.endswith(".pdf") or "application/pdf" in ct:
-        blocks = extract_texts_from_pdf(data)
-        out: List[Dict[str, Any]] = []
-        for i, b in enumerate(blocks):
-            out.append({"text": b, "meta": base_meta({"sourceType": "pdf", "pageNo": i + 1})})
-        return out
+        yield from ({"text": b, "meta": base_meta({"sourceType": "json"})} for b in blocks)
+        return
 
     if name_l.endswith(".docx") or "application/vnd.openxmlformats-officedocument.wordprocessingml.document" in ct:
         # Bevorzugt Docling, sonst python-docx
-        blocks = _docling_convert(data, filename)
+        blocks = _docling_convert(raw, filename)
         if not blocks:
-            blocks = extract_texts_from_docx(data)
-        return [{"text": b, "meta": base_meta({"sourceType": "docx"})} for b in blocks]
+            blocks = extract_texts_from_docx(raw)
+        yield from ({"text": b, "meta": base_meta({"sourceType": "docx"})} for b in blocks)
+        return
 
     # Falls Magika HTML meldet → Docling versuchen
     if "text/html" in ct or name_l.endswith(".html") or name_l.endswith(".htm"):
-        blocks = _docling_convert(data, filename)
+        blocks = _docling_convert(raw, filename)
         if blocks:
-            return [{"text": b, "meta": base_meta({"sourceType": "html"})} for b in blocks]
+            yield from ({"text": b, "meta": base_meta({"sourceType": "html"})} for b in blocks)
+            return
 
     # Fallback als Text
-    text = data.decode("utf-8", errors="ignore")
-    return [{"text": text, "meta": base_meta({"sourceType": "unknown"})}]
+    text = raw.decode("utf-8", errors="ignore")
+    yield {"text": text, "meta": base_meta({"sourceType": "unknown"})}
 
 
-def chunk_payloads(
-    records: List[Dict[str, Any]],
+def extract_texts(
+    filename: str,
+    data: Source,
+    content_type: str = "",
+) -> List[Dict[str, Any]]:
+    """
+    Liefert eine Liste von {text, meta} mit Rohtexten und Metadaten pro Dokumentteil.
+    Für PDF wird pro Seite ein Eintrag erzeugt; für andere Typen idR ein Eintrag.
+    """
+    return list(iter_texts(filename, data, content_type))
+
+
+# -------- Parallele Extraktion (Prozess-Pool) --------
+
+_PROCESS_EXTS = (".pdf", ".docx", ".html", ".htm")
+_PROCESS_CTS = ("application/pdf", "wordprocessingml", "text/html")
+_START_POLL_S = 0.25
+
+_pool: concurrent.futures.ProcessPoolExecutor | None = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+# Anzahl laufender iter_extract_texts()-Aufrufe je Pool (auch ausgemusterte Pools)
+_pool_users: Dict[concurrent.futures.ProcessPoolExecutor, int] = {}
+# Startmeldungen der Worker (Frist läuft ab Start, nicht ab Einreichen): Queue je Pool
+_pool_starts: Dict[concurrent.futures.ProcessPoolExecutor, Any] = {}
+_started: Dict[str, float] = {}
+_task_ids = itertools.count()
+_worker_starts: Any = None  # im Worker-Prozess gesetzt (_init_worker)
+
+
+def _init_worker(starts: Any) -> None:
+    global _worker_starts
+    _worker_starts = starts
+
+
+def _extract_started(task_id: str, fn: Any, filename: str, data: Source, content_type: str) -> List[Dict[str, Any]]:
+    """Worker-Einstieg: meldet den Start, dann fn(...) (= extract_texts)."""
+    _worker_starts.put((task_id, time.time()))
+    return fn(filename, data, content_type)
+
+
+def _poll_starts(pool: concurrent.futures.ProcessPoolExecutor) -> None:
+    starts = _pool_starts.get(pool)
+    if starts is None:
+        return
+    with _pool_lock:
+        try:
+            while True:
+                task_id, ts = starts.get_nowait()
+                _started[task_id] = ts
+        except (queue_mod.Empty, OSError, ValueError):
+            pass
+
+
+def _needs_process(filename: str, content_type: str) -> bool:
+    """
+    CPU-lastige Formate (PDF, DOCX, Docling/HTML) laufen im Prozess-Pool;
+    Text/Markdown/JSON sind billiger als der Transfer zum Worker.
+    """
+    name_l = (filename or "").lower()
+    ct = (content_type or "").lower()
+    return name_l.endswith(_PROCESS_EXTS) or any(c in ct for c in _PROCESS_CTS)
+
+
+def _acquire_pool(size: int) -> concurrent.futures.ProcessPoolExecutor:
+    """
+    Liefert den gemeinsamen Pool und zählt den Aufrufer als Nutzer.
+    Eine andere Größe ersetzt den Pool nur, wenn ihn gerade niemand nutzt.
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or (_pool_size != size and not _pool_users.get(_pool)):
+            old = _pool
+            # spawn: kein fork eines Prozesses mit laufenden Threads (HTTP-Pools, SQLite, Logging)
+            ctx = multiprocessing.get_context("spawn")
+            starts = ctx.Queue()
+            _pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=size, mp_context=ctx, initializer=_init_worker, initargs=(starts,)
+            )
+            _pool_starts[_pool] = starts
+            _pool_size = size
+            if old is not None:
+                _pool_starts.pop(old, None)
+                old.shutdown(wait=False)
+        _pool_users[_pool] = _pool_users.get(_pool, 0) + 1
+        return _pool
+
+
+def _retire_pool(pool: concurrent.futures.ProcessPoolExecutor) -> None:
+    """
+    Nimmt einen Pool mit hängendem/abgestürztem Worker aus dem Umlauf: neue
+    Aufrufe bekommen einen frischen Pool, laufende Dateien anderer Aufrufer
+    dürfen zu Ende laufen. Beendet wird er mit dem letzten _release_pool().
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+
+def _is_retired(pool: concurrent.futures.ProcessPoolExecutor) -> bool:
+    return pool is not _pool
+
+
+def _release_pool(pool: concurrent.futures.ProcessPoolExecutor) -> None:
+    with _pool_lock:
+        users = _pool_users.get(pool, 1) - 1
+        if users > 0:
+            _pool_users[pool] = users
+            return
+        _pool_users.pop(pool, None)
+        if pool is _pool:
+            return  # gemeinsamer Pool bleibt für den nächsten Aufruf warm
+        _pool_starts.pop(pool, None)
+    _kill(pool)
+
+
+def _kill(pool: concurrent.futures.ProcessPoolExecutor) -> None:
+    """Beendet einen Pool hart (hängende Parser lassen sich nicht anders stoppen)."""
+    for proc in list((getattr(pool, "_processes", None) or {}).values()):
+        try:
+            proc.kill()
+        except Exception:
+            pass
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _kill_pool() -> None:
+    """
+    Beendet den gemeinsamen Pool (Shutdown/Tests); der nächste Zugriff baut ihn neu.
+    """
+    global _pool
+    with _pool_lock:
+        old, _pool = _pool, None
+        if old is not None:
+            _pool_users.pop(old, None)
+            _pool_starts.pop(old, None)
+    if old is not None:
+        _kill(old)
+
+
+def iter_extract_texts(
+    files: Iterable[Dict[str, Any]],
+    *,
+    workers: int | None = None,
+    timeout_s: float | None = None,
+    raise_errors: bool = False,
+) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Extrahiert mehrere Dateien ({filename, data|path, content_type}) parallel und
+    liefert (datei_index, records) in Fertigstellungsreihenfolge.
+
+    PDF/DOCX/HTML laufen in einem persistenten Prozess-Pool mit INGEST_WORKERS
+    Prozessen; je Aufruf sind höchstens so viele Dateien gleichzeitig im Pool,
+    die Frist INGEST_FILE_TIMEOUT_S läuft erst ab Start im Worker. Eine Datei
+    über der Frist wird mit [] gemeldet und der Pool ausgemustert (siehe
+    _retire_pool); Dateien eines abgestürzten Pools werden einmal neu eingereicht.
+    Fehler werden geloggt und als [] gemeldet, außer raise_errors.
+
+    Je Datei kommt die vollständige Record-Liste zurück (aus dem Worker gepickelt),
+    d. h. Seiten/Text einer Datei liegen hier komplett im Speicher; seitenweise mit
+    begrenztem Speicher streamt nur iter_texts() (z. B. upload_ingest).
+    """
+    items = list(files)
+    workers = int(settings.INGEST_WORKERS if workers is None else workers)
+    timeout_s = float(settings.INGEST_FILE_TIMEOUT_S if timeout_s is None else timeout_s)
+
+    def _args(i: int) -> Tuple[str, Source, str]:
+        # "path" (z. B. aus spool_to_path) statt "data": der Worker liest selbst, nichts wird gepickelt
+        f = items[i]
+        src = Path(f["path"]) if f.get("path") else (f.get("data") or b"")
+        return str(f.get("filename") or "unknown"), src, str(f.get("content_type") or "")
+
+    def _failed(i: int, e: BaseException) -> List[Dict[str, Any]]:
+        if raise_errors:
+            raise e
+        logger.warning("extract_texts failed for %s: %s", items[i].get("filename"), e)
+        return []
+
+    heavy = [i for i in range(len(items)) if _needs_process(_args(i)[0], _args(i)[2])]
+    if workers <= 1 or len(heavy) < 2:
+        heavy = []
+
+    queue = collections.deque(heavy)
+    # Future → (datei_index, task_id, pool)
+    pending: Dict[concurrent.futures.Future, Tuple[int, str, concurrent.futures.ProcessPoolExecutor]] = {}
+    held: List[concurrent.futures.ProcessPoolExecutor] = []
+    resubmitted: set = set()
+
+    def _dispatch() -> None:
+        while queue and len(pending) < workers:
+            if not held or _is_retired(held[-1]):
+                held.append(_acquire_pool(workers))
+            i = queue.popleft()
+            task_id = f"{os.getpid()}-{next(_task_ids)}"
+            fut = held[-1].submit(_extract_started, task_id, extract_texts, *_args(i))
+            pending[fut] = (i, task_id, held[-1])
+
+    def _deadline(task_id: str) -> float:
+        start = _started.get(task_id)
+        return start + timeout_s if start is not None and timeout_s > 0 else float("inf")
+
+    try:
+        _dispatch()
+
+        # Leichte Formate inline, während der Pool arbeitet
+        heavy_set = set(heavy)
+        for i in range(len(items)):
+            if i in heavy_set:
+                continue
+            try:
+                yield i, extract_texts(*_args(i))
+            except Exception as e:
+                yield i, _failed(i, e)
+
+        while pending:
+            for pool in {pool for _, _, pool in pending.values()}:
+                _poll_starts(pool)
+            deadlines = [_deadline(task_id) for _, task_id, _ in pending.values()]
+            wait_s = None if min(deadlines) == float("inf") else max(0.0, min(deadlines) - time.time())
+            if timeout_s > 0 and any(task_id not in _started for _, task_id, _ in pending.values()):
+                # Noch nicht gestartete Dateien: Startmeldung regelmäßig abholen
+                wait_s = min(wait_s if wait_s is not None else _START_POLL_S, _START_POLL_S)
+            done, _ = concurrent.futures.wait(pending, timeout=wait_s, return_when=concurrent.futures.FIRST_COMPLETED)
+            for fut in done:
+                i, task_id, pool = pending.pop(fut)
+                _started.pop(task_id, None)
+                try:
+                    records = fut.result()
+                except concurrent.futures.process.BrokenProcessPool as e:
+                    # Worker-Absturz (z. B. OOM) reißt alle Dateien des Pools mit → einmal neu versuchen
+                    _retire_pool(pool)
+                    if i in resubmitted:
+                        yield i, _failed(i, e)
+                    else:
+                        resubmitted.add(i)
+                        queue.appendleft(i)
+                    continue
+                except Exception as e:
+                    yield i, _failed(i, e)
+                    continue
+                yield i, records
+            now = time.time()
+            for fut, (i, task_id, pool) in list(pending.items()):
+                if task_id not in _started:
+                    # Wartet in einem ausgemusterten Pool → in den frischen umziehen
+                    if _is_retired(pool) and fut.cancel():
+                        del pending[fut]
+                        queue.appendleft(i)
+                    continue
+                if _deadline(task_id) > now or fut.done():
+                    continue
+                del pending[fut]
+                _started.pop(task_id, None)
+                # Hängende Worker lassen sich nur mit dem Pool beenden → ausmustern
+                _retire_pool(pool)
+                yield i, _failed(i, TimeoutError(f"Extraktion > {timeout_s:.0f}s abgebrochen"))
+            _dispatch()
+    finally:
+        for fut, (_, task_id, _) in pending.items():
+            fut.cancel()
+            _started.pop(task_id, None)
+        for pool in held:
+            _release_pool(pool)
+
+
+def extract_texts_many(files: Iterable[Dict[str, Any]], **kwargs: Any) -> List[Dict[str, Any]]:
+    """
+    Wie iter_extract_texts(), aber als flache Record-Liste in Datei-Reihenfolge.
+    Hält alle Records aller Dateien im Speicher (kein Seiten-Streaming).
+    """
+    by_index: Dict[int, List[Dict[str, Any]]] = {}
+    for i, records in iter_extract_texts(files, **kwargs):
+        by_index[i] = records
+    return [rec for i in sorted(by_index) for rec in by_index[i]]
+
+
+def chunk_hash(text: str) -> str:
+    """
+    Inhalts-Hash eines Chunks (sha1 über whitespace-normalisierten Text).
+    Unabhängig von Datei-sha1 und chunkIndex: ein unveränderter Absatz in einer
+    editierten Datei behält seinen Hash.
+    """
+    return hashlib.sha1(" ".join(str(text or "").split()).encode("utf-8")).hexdigest()
+
+
+def iter_chunk_payloads(
+    records: Iterable[Dict[str, Any]],
     min_tokens: int | None = None,
     max_tokens: int | None = None,
     overlap_tokens: int | None = None,
-) -> List[Dict[str, Any]]:
+) -> Iterator[Dict[str, Any]]:
     """
-    Nimmt Rohtexte mit Meta und erzeugt daraus Chunk-Payloads:
-      [{ text, payload }, ...]
-    payload enthält merged Metadaten + chunkIndex + tokenLen
+    Generator-Variante von chunk_payloads(): chunked jeden Record, sobald er
+    eintrifft (z. B. direkt aus iter_texts()).
     """
     min_tokens = min_tokens if min_tokens is not None else getattr(settings, "CHUNK_TOKENS_MIN", 200)
     max_tokens = max_tokens if max_tokens is not None else getattr(settings, "CHUNK_TOKENS_MAX", 400)
     overlap_tokens = overlap_tokens if overlap_tokens is not None else getattr(settings, "CHUNK_OVERLAP_TOKENS", 50)
 
-    out: List[Dict[str, Any]] = []
     for rec in records:
         text = str(rec.get("text") or "").strip()
         meta = dict(rec.get("meta") or {})
         if not text:
             continue
-        chunks = chunk_text(text, int(min_tokens), int(max_tokens), int(overlap_tokens))
-        for idx, ch in enumerate(chunks):
+        chunks = chunk_text_with_lengths(text, int(min_tokens), int(max_tokens), int(overlap_tokens))
+        for idx, (ch, n_tok) in enumerate(chunks):
             payload = dict(meta)
             payload["chunkIndex"] = idx
-            payload["tokenLen"] = tokenize_len(ch)
-            out.append({"text": ch, "payload": payload})
-    return out
\ No newline at end of file
+            payload["tokenLen"] = n_tok
+            payload["chunkHash"] = chunk_hash(ch)
+            yield {"text": ch, "payload": payload}
+
+
+def chunk_payloads(
+    records: List[Dict[str, Any]],
+    min_tokens: int | None = None,
+    max_tokens: int | None = None,
+    overlap_tokens: int | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Nimmt Rohtexte mit Meta und erzeugt daraus Chunk-Payloads:
+      [{ text, payload }, ...]
+    payload enthält merged Metadaten + chunkIndex + tokenLen + chunkHash
+    """
+    return list(iter_chunk_payloads(records, min_tokens, max_tokens, overlap_tokens))
+
+
+def plan_delta(
+    payloads: Sequence[Dict[str, Any]],
+    existing: Dict[str, List[Any]],
+) -> Dict[str, List[Any]]:
+    """
+    Delta-Ingest: vergleicht neue Chunk-Payloads mit bereits gespeicherten
+    Punkten derselben Quelle ({chunkHash: [point_id, ...]}).
+
+    Rückgabe:
+      new:   Payloads ohne passenden Hash → embedden/upserten/minen
+      keep:  [(point_id, payload)] unveränderte Chunks (nur Position ggf. neu)
+      stale: point_ids, deren Hash nicht mehr vorkommt → löschen
+    Mehrfach vorkommende Chunks werden paarweise zugeordnet.
+    """
+    pool = {h: list(ids) for h, ids in existing.items()}
+    new: List[Dict[str, Any]] = []
+    keep: List[Tuple[Any, Dict[str, Any]]] = []
+    for p in payloads:
+        pl = p.get("payload") or {}
+        h = pl.get("chunkHash") or chunk_hash(p.get("text") or "")
+        ids = pool.get(h)
+        if ids:
+            keep.append((ids.pop(0), p))
+        else:
+            new.append(p)
+    stale = [pid for ids in pool.values() for pid in ids]
+    return {"new": new, "keep": keep, "stale": stale}
@@ -6,9 +6,10 @@ import json
 import os
 import re
 import logging
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
 
-from . import settings
+from . import llm_cache, settings
+from .llm_clients import get_llm_client
 
 # OpenAI optional
 try:
@@ -149,6 +150,37 @@ def _extract_json_string(raw: str) -> str:
     return candidate
 
 
+def _has_json(content: str) -> bool:
+    try:
+        _extract_json_string(content)
+        return True
+    except Exception:
+        return False
+
+
+def _cached_chat_content(
+    client: Any,
+    kind: str,
+    chat_kwargs: Dict[str, Any],
+    is_valid: Callable[[str], bool] = _has_json,
+) -> str:
+    """
+    v1 Chat-Call über den persistenten Response-Cache (llm_cache).
+    Nur Antworten, die is_valid bestehen, werden gecacht, damit Fehlantworten nicht hängen bleiben.
+    """
+    key = llm_cache.make_key(chat_kwargs, kind=kind, provider=getattr(client, "base_url", None))
+    cached = llm_cache.lookup(key)
+    if cached is not None:
+        if DEBUG_LLM:
+            LOGGER.info(json.dumps({"event": f"llm.{kind}.cache_hit", "key": key[:16]}))
+        return cached
+    resp = client.chat.completions.create(**chat_kwargs)
+    content = resp.choices[0].message.content or ""
+    if is_valid(content):
+        llm_cache.store(key, content, kind=kind, model=str(chat_kwargs.get("model") or ""))
+    return content
+
+
 def llm_evaluate(requirement_text: str, criteria_keys: List[str], context: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Bewertung einer Anforderung je Kriterium. Fällt auf Heuristik zurück, wenn kein LLM verfügbar.
@@ -197,11 +229,7 @@ def llm_evaluate(requirement_text: str, criteria_keys: List[str], context: Dict[
 
         # v1.x Client-Pfad erzwungen bei v1-Runtime
         if OPENAI_IS_V1_RUNTIME and _OpenAIClient is not None:
-            llm_config = settings.get_llm_config()
-            client = _OpenAIClient(
-                api_key=llm_config["api_key"],
-                base_url=llm_config["base_url"]
-            )
+            client = get_llm_client()
             if DEBUG_LLM:
                 try:
                     LOGGER.info(json.dumps({"event": "llm.evaluate.call", "model": settings.OPENAI_MODEL, "sdk": "v1", "openai_version": OPENAI_VERSION}))
@@ -215,8 +243,7 @@ def llm_evaluate(requirement_text: str, criteria_keys: List[str], context: Dict[
             }
             if "response_format" in chat_args:
                 v1_kwargs["response_format"] = chat_args["response_format"]
-            resp = client.chat.completions.create(**v1_kwargs)
-            content_raw = resp.choices[0].message.content or ""
+            content_raw = _cached_chat_content(client, "evaluate", v1_kwargs)
         else:
             if OPENAI_IS_V1_RUNTIME:
                 # Unter v1-Runtime darf Legacy nicht verwendet werden
@@ -359,11 +386,7 @@ def llm_evaluate_batch(
 
         # v1.x Client-Pfad
         if OPENAI_IS_V1_RUNTIME and _OpenAIClient is not None:
-            llm_config = settings.get_llm_config()
-            client = _OpenAIClient(
-                api_key=llm_config["api_key"],
-                base_url=llm_config["base_url"]
-            )
+            client = get_llm_client()
             if DEBUG_LLM:
                 try:
                     LOGGER.info(json.dumps({
@@ -383,8 +406,7 @@ def llm_evaluate_batch(
             }
             if "response_format" in chat_args:
                 v1_kwargs["response_format"] = chat_args["response_format"]
-            resp = client.chat.completions.create(**v1_kwargs)
-            content_raw = resp.choices[0].message.content or ""
+            content_raw = _cached_chat_content(client, "evaluate_batch", v1_kwargs)
         else:
             if OPENAI_IS_V1_RUNTIME:
                 if DEBUG_LLM:
@@ -563,11 +585,7 @@ def llm_suggest(requirement_text: str, context: Dict[str, Any]) -> List[Dict[str
         ]
 
         if OPENAI_IS_V1_RUNTIME and _OpenAIClient is not None:
-            llm_config = settings.get_llm_config()
-            client = _OpenAIClient(
-                api_key=llm_config["api_key"],
-                base_url=llm_config["base_url"]
-            )
+            client = get_llm_client()
             if DEBUG_LLM:
                 try:
                     LOGGER.info(json.dumps({"event": "llm.suggest.call", "model": settings.OPENAI_MODEL, "sdk": "v1", "openai_version": OPENAI_VERSION}))
@@ -579,8 +597,10 @@ def llm_suggest(requirement_text: str, context: Dict[str, Any]) -> List[Dict[str
                 "temperature": getattr(settings, "LLM_TEMPERATURE", 0.0),
                 "top_p": getattr(settings, "LLM_TOP_P", 1.0),
             }
-            resp = client.chat.completions.create(**v1_kwargs)
-            content_raw = resp.choices[0].message.content or ""
+            content_raw = _cached_chat_content(
+                client, "suggest", v1_kwargs,
+                is_valid=lambda c: bool(parse_suggestion_blocks(c)) or _has_json(c),
+            )
         else:
             if OPENAI_IS_V1_RUNTIME:
                 if DEBUG_LLM:
@@ -682,11 +702,7 @@ def llm_rewrite(requirement_text: str, context: Dict[str, Any]) -> str:
         }
 
         if OPENAI_IS_V1_RUNTIME and _OpenAIClient is not None:
-            llm_config = settings.get_llm_config()
-            client = _OpenAIClient(
-                api_key=llm_config["api_key"],
-                base_url=llm_config["base_url"]
-            )
+            client = get_llm_client()
             chat_kwargs: Dict[str, Any] = {
                 "model": settings.OPENAI_MODEL,
                 "messages": [
@@ -701,8 +717,7 @@ def llm_rewrite(requirement_text: str, context: Dict[str, Any]) -> str:
                     LOGGER.info(json.dumps({"event": "llm.rewrite.call", "model": chat_kwargs.get("model"), "sdk": "v1", "openai_version": OPENAI_VERSION}))
                 except Exception:
                     pass
-            resp = client.chat.completions.create(**chat_kwargs)
-            content = resp.choices[0].message.content or ""
+            content = _cached_chat_content(client, "rewrite", chat_kwargs)
         else:
             if OPENAI_IS_V1_RUNTIME:
                 if DEBUG_LLM:
@@ -733,6 +748,97 @@ def llm_rewrite(requirement_text: str, context: Dict[str, Any]) -> str:
             LOGGER.error(json.dumps({"event": "llm.rewrite.error", "message": str(e)}))
         return requirement_text
 
+def _fused_atoms(raw: Any) -> List[Dict[str, Any]]:
+    """
+    Normalisiert die "suggestions" des Fused-Calls auf das Atom-Schema von llm_suggest
+    (mind. "correction" und "acceptance_criteria").
+    """
+    atoms: List[Dict[str, Any]] = []
+    for obj in raw if isinstance(raw, list) else []:
+        if not isinstance(obj, dict):
+            continue
+        correction = obj.get("correction")
+        if not isinstance(correction, str) or not correction.strip():
+            continue
+        ac = obj.get("acceptance_criteria")
+        obj["acceptance_criteria"] = ac if isinstance(ac, list) else []
+        atoms.append(obj)
+    return atoms
+
+
+def llm_evaluate_suggest_rewrite(
+    requirement_text: str, criteria_keys: List[str], context: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Fused-Modus: Bewertung, Verbesserungsvorschläge und Umformulierung in EINEM LLM-Call.
+    Rückgabe: {"details": [...], "suggestions": [...], "redefinedRequirement": str, "fused": bool}
+    Formate entsprechen llm_evaluate / llm_suggest / llm_rewrite. Ohne LLM (kein Key, MOCK_MODE)
+    oder bei unbrauchbarer Antwort wird auf die drei Einzelfunktionen zurückgefallen (fused=False).
+    """
+    def _separate() -> Dict[str, Any]:
+        return {
+            "details": llm_evaluate(requirement_text, criteria_keys, context),
+            "suggestions": llm_suggest(requirement_text, context),
+            "redefinedRequirement": llm_rewrite(requirement_text, context),
+            "fused": False,
+        }
+
+    if (
+        getattr(settings, "MOCK_MODE", False)
+        or not settings.OPENROUTER_API_KEY
+        or not (OPENAI_IS_V1_RUNTIME and _OpenAIClient is not None)
+    ):
+        return _separate()
+
+    try:
+        system_prompt = (
+            "Du bist ein Qualitätsprüfer und erfahrener Requirements Engineer.\n"
+            "1) Bewerte die Anforderung je Kriterium mit Scores 0.0 bis 1.0.\n"
+            "2) Gib 1–3 atomare Verbesserungsvorschläge (suggestions) gemäß Atom-Schema.\n"
+            "3) Formuliere die Anforderung präzise, testbar und messbar um (redefinedRequirement).\n"
+            "Gib NUR JSON zurück: {details: [{criterion, score, passed, feedback}], "
+            "suggestions: [Atom], redefinedRequirement: string}. Atom-Schema:\n"
+            + SUGGEST_ATOM_JSON_SCHEMA_DOC
+        )
+        user_payload = {
+            "requirementText": requirement_text,
+            "criteriaKeys": criteria_keys,
+            "context": context or {},
+            "constraints": {"atomsPerRequirement": 3, "designIndependent": True, "measurable": True, "testable": True},
+        }
+        chat_args = _make_chat_args(system_prompt, user_payload)
+        if DEBUG_LLM:
+            LOGGER.info(json.dumps({"event": "llm.fused.call", "model": chat_args.get("model"), "sdk": "v1"}))
+        content_raw = _cached_chat_content(get_llm_client(), "fused", chat_args)
+        if DEBUG_LLM_RAW:
+            print("[LLM][fused][RAW]", content_raw)
+        parsed = json.loads(_extract_json_string(content_raw))
+
+        details: List[Dict[str, Any]] = []
+        for d in parsed.get("details") or []:
+            crit = d.get("criterion") if isinstance(d, dict) else None
+            if crit in criteria_keys:
+                sc = max(0.0, min(1.0, float(d.get("score", 0.0))))
+                details.append({
+                    "criterion": crit,
+                    "score": sc,
+                    "passed": bool(d.get("passed", sc >= 0.7)),
+                    "feedback": str(d.get("feedback", "")),
+                })
+        if not details:
+            raise ValueError("LLM fused returned no valid details")
+        rewritten = str(parsed.get("redefinedRequirement") or "").strip()
+        return {
+            "details": details,
+            "suggestions": _fused_atoms(parsed.get("suggestions")),
+            "redefinedRequirement": rewritten or requirement_text,
+            "fused": True,
+        }
+    except Exception as e:
+        if DEBUG_LLM:
+            LOGGER.error(json.dumps({"event": "llm.fused.error", "message": str(e)}))
+        return _separate()
+
 # --- Suggestion-Block-Parser und Konstanten ---
 
 SUGGEST_BLOCK_START = "<<<REQ_ATOM>>>"
@@ -901,11 +1007,7 @@ def llm_apply_with_suggestions(
         }
 
         if OPENAI_IS_V1_RUNTIME and _OpenAIClient is not None:
-            llm_config = settings.get_llm_config()
-            client = _OpenAIClient(
-                api_key=llm_config["api_key"],
-                base_url=llm_config["base_url"]
-            )
+            client = get_llm_client()
             if DEBUG_LLM:
                 try:
                     LOGGER.info(json.dumps({"event": "llm.apply.call", "model": settings.OPENAI_MODEL, "mode": user_payload.get("mode"), "sdk": "v1", "openai_version": OPENAI_VERSION}))
@@ -4,7 +4,6 @@ Async LLM Operations für FastAPI + AutoGen Integration
 """
 
 import asyncio
-import openai
 import logging
 import time
 from typing import Dict, List, Any, Optional
@@ -18,13 +17,14 @@ from .settings import (
     MOCK_MODE,
     MAX_PARALLEL,
     BATCH_SIZE,
-    get_llm_config
 )
 from .db_async import load_criteria_async
+from .llm_clients import get_llm_client
+from .llm_governor import llm_priority
 
 logger = logging.getLogger(__name__)
 
-# NOTE: OpenAI client configuration is now set dynamically in _sync_openai_call()
+# NOTE: _sync_openai_call() resolves the pooled client per call via get_llm_client()
 # to support runtime provider switching between OpenAI and OpenRouter
 
 @dataclass
@@ -100,18 +100,8 @@ class AsyncLLMService:
         temperature: float
     ) -> str:
         """Synchroner OpenAI Call (wird in thread ausgeführt)"""
-        # Read config fresh each time to support runtime provider switching
-        llm_config = get_llm_config()
-
-        # Set module-level config for legacy openai SDK
-        openai.api_key = llm_config["api_key"]
-        if llm_config["base_url"]:
-            openai.api_base = llm_config["base_url"]
-            logger.debug(f"Using base_url: {llm_config['base_url']}")
-        else:
-            # Reset to default if no base_url (e.g., switching from OpenRouter to OpenAI)
-            if hasattr(openai, 'api_base'):
-                openai.api_base = "https://api.openai.com/v1"
+        # Geteilter Client je (base_url, api_key) aus der Registry – Provider-Wechsel zur Laufzeit bleibt möglich
+        client = get_llm_client()
 
         messages = []
 
@@ -120,7 +110,7 @@ class AsyncLLMService:
 
         messages.append({"role": "user", "content": prompt})
 
-        response = openai.ChatCompletion.create(
+        response = client.chat.completions.create(
             model=self.model,
             messages=messages,
             max_tokens=max_tokens,
@@ -437,18 +427,19 @@ async def llm_batch_process_async(
         semaphore = asyncio.Semaphore(parallel_limit)
         
         async def process_single_requirement(req_data):
-            async with semaphore:
-                req_text = req_data.get("requirement_text", "")
-                context = req_data.get("context", {})
+            with llm_priority("batch"):
+                async with semaphore:
+                    req_text = req_data.get("requirement_text", "")
+                    context = req_data.get("context", {})
                 
-                if processing_type == "evaluation":
-                    return await llm_evaluate_async(req_text, context)
-                elif processing_type == "suggestion":
-                    return await llm_suggest_async(req_text, context)
-                elif processing_type == "rewrite":
-                    return await llm_rewrite_async(req_text, context)
-                else:
-                    raise ValueError(f"Unbekannter Processing-Type: {processing_type}")
+                    if processing_type == "evaluation":
+                        return await llm_evaluate_async(req_text, context)
+                    elif processing_type == "suggestion":
+                        return await llm_suggest_async(req_text, context)
+                    elif processing_type == "rewrite":
+                        return await llm_rewrite_async(req_text, context)
+                    else:
+                        raise ValueError(f"Unbekannter Processing-Type: {processing_type}")
         
         # Alle Requirements parallel verarbeiten
         tasks = [process_single_requirement(req) for req in requirements]
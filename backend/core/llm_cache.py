@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Inhaltsadressierter, persistenter Cache für LLM-Antworten.
+
+Schlüssel ist ein SHA-256 über (Provider-Endpunkt, model, messages/System-Prompt +
+User-Payload, temperature, top_p, response_format, tools-Schema). Identische Anfragen aus
+llm_evaluate/llm_suggest/llm_rewrite, ChunkMinerAgent und BatchCriteriaEvaluator
+werden so nur einmal an den Provider geschickt.
+
+Speicher: eigene SQLite-Datei (LLM_CACHE_PATH), getrennt von der App-DB.
+Eviction: TTL (LLM_CACHE_TTL_S, 0 = unbegrenzt) und LRU nach last_access
+(LLM_CACHE_MAX_ENTRIES).
+
+Bypass:
+- global über LLM_CACHE_ENABLED=false
+- lokal über den Kontextmanager `bypass()` (gilt für den aktuellen Thread/Task)
+"""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from . import settings
+
+logger = logging.getLogger("app.llm")
+
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+# Nur diese Request-Parameter beeinflussen die Antwort und gehen in den Schlüssel ein
+_KEY_FIELDS = ("model", "messages", "temperature", "top_p", "max_tokens", "response_format", "tools", "tool_choice")
+
+# LRU-Trim nur alle N Schreibvorgänge, nicht bei jedem put()
+_TRIM_EVERY = 200
+
+
+def make_key(request: Dict[str, Any], kind: str = "", provider: Optional[Any] = None) -> str:
+    """
+    Stabiler Cache-Schlüssel für einen Chat-Request (kwargs von chat.completions.create).
+    provider ist die base_url des Endpunkts (Default: konfigurierter LLM-Provider), damit
+    zwei Endpunkte mit gleichem Modellnamen keine Einträge teilen.
+    """
+    if provider is None:
+        provider = settings.get_llm_config().get("base_url")
+    material = {k: request.get(k) for k in _KEY_FIELDS if request.get(k) is not None}
+    material["kind"] = kind
+    material["provider"] = str(provider or "").rstrip("/")
+    raw = json.dumps(material, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Thread-sicherer SQLite-Cache (eine Verbindung, WAL, Lock).
+    """
+
+    def __init__(self, path: str, ttl_s: int = 0, max_entries: int = 0) -> None:
+        self.path = path
+        self.ttl_s = int(ttl_s or 0)
+        self.max_entries = int(max_entries or 0)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes_since_trim = 0
+        self.counters: Dict[str, int] = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            d = os.path.dirname(os.path.abspath(self.path))
+            if d:
+                os.makedirs(d, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache(
+                  key TEXT PRIMARY KEY,
+                  kind TEXT,
+                  model TEXT,
+                  response TEXT NOT NULL,
+                  created_at REAL NOT NULL,
+                  last_access REAL NOT NULL,
+                  hits INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None and self.ttl_s and now - float(row[1]) > self.ttl_s:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    conn.commit()
+                    self.counters["evictions"] += 1
+                    row = None
+                if row is None:
+                    self.counters["misses"] += 1
+                    return None
+                conn.execute("UPDATE llm_cache SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+                conn.commit()
+                self.counters["hits"] += 1
+                return str(row[0])
+        except Exception as e:
+            self.counters["errors"] += 1
+            logger.warning("llm cache read failed: %s", e)
+            return None
+
+    def put(self, key: str, response: str, kind: str = "", model: str = "") -> None:
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache(key, kind, model, response, created_at, last_access, hits) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                    (key, kind, model, response, now, now),
+                )
+                self.counters["writes"] += 1
+                self._writes_since_trim += 1
+                if self._writes_since_trim >= _TRIM_EVERY:
+                    self._trim(conn, now)
+                conn.commit()
+        except Exception as e:
+            self.counters["errors"] += 1
+            logger.warning("llm cache write failed: %s", e)
+
+    def _trim(self, conn: sqlite3.Connection, now: float) -> None:
+        self._writes_since_trim = 0
+        removed = 0
+        if self.ttl_s:
+            removed += conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_s,)).rowcount
+        if self.max_entries:
+            (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            overflow = int(count) - self.max_entries
+            if overflow > 0:
+                removed += conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                ).rowcount
+        self.counters["evictions"] += max(0, removed)
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        entries: Optional[int] = None
+        try:
+            with self._lock:
+                (entries,) = self._connect().execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        except Exception:
+            pass
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": entries,
+            "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else None,
+            "path": self.path,
+            "ttl_s": self.ttl_s,
+            "max_entries": self.max_entries,
+        }
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache(
+                    settings.LLM_CACHE_PATH,
+                    ttl_s=settings.LLM_CACHE_TTL_S,
+                    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                )
+    return _cache
+
+
+def is_enabled() -> bool:
+    return bool(settings.LLM_CACHE_ENABLED) and not _bypass.get()
+
+
+@contextlib.contextmanager
+def bypass() -> Iterator[None]:
+    """
+    Deaktiviert Lesen und Schreiben des Caches im aktuellen Kontext (z. B. für erzwungene Neubewertung).
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def lookup(key: str) -> Optional[str]:
+    if not is_enabled():
+        return None
+    return get_cache().get(key)
+
+
+def store(key: str, response: str, kind: str = "", model: str = "") -> None:
+    if not is_enabled() or not response:
+        return
+    get_cache().put(key, response, kind=kind, model=model)
+
+
+def stats() -> Dict[str, Any]:
+    if not settings.LLM_CACHE_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **get_cache().stats()}
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Prozessweite Registry für OpenAI-kompatible LLM-Clients (OpenRouter/OpenAI).
+
+Jeder Client hält einen eigenen httpx-Connection-Pool mit Keep-Alive. Statt
+pro Aufruf einen neuen Client (und damit einen neuen TLS-Handshake) zu bauen,
+teilen sich alle LLM-Aufrufer in backend/ und arch_team/ einen Client je
+(base_url, api_key).
+
+- Sync-Clients sind thread-safe und werden prozessweit geteilt.
+- Async-Clients werden zusätzlich je Event-Loop gehalten, da httpx-Pools an
+  den Loop gebunden sind, der die Verbindungen geöffnet hat.
+
+Pool-Tuning über ENV (siehe settings.py):
+- LLM_HTTP_MAX_CONNECTIONS, LLM_HTTP_MAX_KEEPALIVE,
+  LLM_HTTP_KEEPALIVE_EXPIRY, LLM_HTTP_TIMEOUT
+
+Mit LLM_GOVERNOR_ENABLED laufen alle Requests über den prozessweiten
+LLM-Governor (backend/core/llm_governor.py): RPM/TPM-Budget und adaptive
+Parallelität je Provider und Modell. Da httpx bei eigenem Transport keine
+Proxy-Variablen mehr auswertet, wird der Proxy für die base_url hier aus
+HTTP(S)_PROXY/ALL_PROXY/NO_PROXY aufgelöst. AutoGen-Model-Clients erhalten
+den Governor über get_governed_async_http_client().
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import urllib.parse
+import urllib.request
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+from . import settings
+
+try:
+    import httpx  # type: ignore
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI  # type: ignore
+    OPENAI_CLIENTS_AVAILABLE = True
+except Exception:
+    httpx = None  # type: ignore
+    OpenAI = AsyncOpenAI = DefaultHttpxClient = DefaultAsyncHttpxClient = None  # type: ignore
+    OPENAI_CLIENTS_AVAILABLE = False
+
+logger = logging.getLogger("app.llm")
+
+_ClientKey = Tuple[Optional[str], str]
+
+_LOCK = threading.Lock()
+_SYNC_CLIENTS: Dict[_ClientKey, Any] = {}
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[_ClientKey, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _client_key(api_key: str, base_url: Optional[str]) -> _ClientKey:
+    return ((base_url or "").rstrip("/") or None, api_key or "")
+
+
+def _http_limits() -> Any:
+    return httpx.Limits(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _http_timeout() -> Any:
+    return httpx.Timeout(settings.LLM_HTTP_TIMEOUT, connect=10.0)
+
+
+def _env_proxy(base_url: Optional[str]) -> Optional[str]:
+    """
+    Proxy-URL aus der Umgebung für base_url (wie httpx mit trust_env); None ohne
+    Proxy oder bei NO_PROXY-Treffer. Ohne base_url gilt der SDK-Default.
+    """
+    url = base_url or os.environ.get("OPENAI_BASE_URL") or "https://api.openai.com/v1"
+    parts = urllib.parse.urlsplit(url)
+    proxies = urllib.request.getproxies()
+    if parts.hostname and urllib.request.proxy_bypass_environment(parts.hostname, proxies):
+        return None
+    return proxies.get(parts.scheme) or proxies.get("all") or None
+
+
+def _sync_http_client(base_url: Optional[str] = None) -> Any:
+    if not settings.LLM_GOVERNOR_ENABLED:
+        return DefaultHttpxClient(limits=_http_limits(), timeout=_http_timeout())
+    from .llm_governor import GovernedTransport
+
+    transport = GovernedTransport(httpx.HTTPTransport(limits=_http_limits(), proxy=_env_proxy(base_url)))
+    return DefaultHttpxClient(transport=transport, timeout=_http_timeout())
+
+
+def _async_http_client(base_url: Optional[str] = None) -> Any:
+    if not settings.LLM_GOVERNOR_ENABLED:
+        return DefaultAsyncHttpxClient(limits=_http_limits(), timeout=_http_timeout())
+    from .llm_governor import AsyncGovernedTransport
+
+    transport = AsyncGovernedTransport(httpx.AsyncHTTPTransport(limits=_http_limits(), proxy=_env_proxy(base_url)))
+    return DefaultAsyncHttpxClient(transport=transport, timeout=_http_timeout())
+
+
+def _require_sdk() -> None:
+    if not OPENAI_CLIENTS_AVAILABLE:
+        raise RuntimeError("openai>=1.x SDK nicht installiert")
+
+
+def get_openai_client(api_key: str, base_url: Optional[str] = None) -> Any:
+    """
+    Liefert den geteilten synchronen OpenAI-Client für (base_url, api_key).
+    """
+    _require_sdk()
+    key = _client_key(api_key, base_url)
+    client = _SYNC_CLIENTS.get(key)
+    if client is not None:
+        return client
+    with _LOCK:
+        client = _SYNC_CLIENTS.get(key)
+        if client is None:
+            client = OpenAI(
+                api_key=api_key,
+                base_url=key[0],
+                http_client=_sync_http_client(key[0]),
+            )
+            _SYNC_CLIENTS[key] = client
+            logger.debug("llm client pool created (sync, base_url=%s)", key[0])
+    return client
+
+
+def get_async_openai_client(api_key: str, base_url: Optional[str] = None) -> Any:
+    """
+    Liefert den geteilten AsyncOpenAI-Client für (base_url, api_key) auf dem laufenden Event-Loop.
+    Muss innerhalb einer Coroutine aufgerufen werden.
+    """
+    _require_sdk()
+    loop = asyncio.get_running_loop()
+    key = _client_key(api_key, base_url)
+    with _LOCK:
+        clients = _ASYNC_CLIENTS.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=key[0],
+                http_client=_async_http_client(key[0]),
+            )
+            clients[key] = client
+            logger.debug("llm client pool created (async, base_url=%s)", key[0])
+    return client
+
+
+def get_governed_async_http_client(base_url: Optional[str] = None) -> Any:
+    """
+    Neuer Async-httpx-Client (Pool-Limits, Governor-Transport) für SDKs, die ihren
+    AsyncOpenAI-Client selbst bauen, z. B. AutoGens OpenAIChatCompletionClient(http_client=...).
+    Nicht geteilt: gehört dem aufrufenden Client und dessen Event-Loop.
+    """
+    _require_sdk()
+    return _async_http_client((base_url or "").rstrip("/") or None)
+
+
+def get_llm_client() -> Any:
+    """
+    Geteilter Sync-Client für den konfigurierten Chat-Provider (settings.get_llm_config()).
+    """
+    cfg = settings.get_llm_config()
+    return get_openai_client(cfg["api_key"], cfg["base_url"])
+
+
+def get_async_llm_client() -> Any:
+    """
+    Geteilter Async-Client für den konfigurierten Chat-Provider (settings.get_llm_config()).
+    """
+    cfg = settings.get_llm_config()
+    return get_async_openai_client(cfg["api_key"], cfg["base_url"])
+
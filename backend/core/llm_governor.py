@@ -0,0 +1,613 @@
+# -*- coding: utf-8 -*-
+"""
+Prozessweiter LLM-Governor: ein gemeinsames Budget je (Provider-Host, Modell).
+
+Alle LLM-Clients aus backend/core/llm_clients.py schicken ihre Requests über
+GovernedTransport/AsyncGovernedTransport. Jeder Request holt vorher einen Slot:
+
+- Token-Buckets für RPM und TPM (0 = unbegrenzt). Die Token-Kosten werden aus
+  Request-Größe + max_tokens geschätzt und nach der Antwort über usage korrigiert.
+- AIMD-Parallelität: je erfolgreicher Antwort +1/limit, bei 429, Timeout oder
+  Latenz über LLM_GOVERNOR_LATENCY_TARGET_S wird das Limit mit
+  LLM_GOVERNOR_BACKOFF multipliziert (höchstens einmal je Stau-Fenster).
+  Retry-After pausiert die Vergabe neuer Slots.
+- Streaming-Antworten (text/event-stream) halten ihren Slot, bis der Stream
+  geschlossen wird; Latenz und usage aus den SSE-Events fließen dann ein.
+- Prioritätsklassen: "interactive" (Default) vor "batch". Batch-Aufrufe dürfen
+  höchstens LLM_GOVERNOR_BATCH_SHARE des Limits belegen, damit interaktive
+  Requests nicht hinter großen Läufen warten.
+
+Die Klasse wird per ContextVar gesetzt (with llm_priority("batch"): ...). Sie
+vererbt sich an asyncio-Tasks und asyncio.to_thread; Thread-Pools müssen den
+Kontext explizit mitgeben (contextvars.copy_context().run).
+
+Sync-Clients warten höchstens LLM_GOVERNOR_ACQUIRE_TIMEOUT_S auf einen Slot
+(danach httpx.PoolTimeout). Läuft auf dem Thread ein Event-Loop, wird nie
+gewartet: ohne freien Slot geht der Request mit Fehler-Log ungedrosselt raus,
+statt den Loop (und damit die Slot-Rückgabe der Async-Requests) zu blockieren.
+Sync-Aufrufe aus Coroutinen gehören in asyncio.to_thread oder den Async-Client.
+
+Konfiguration über ENV (siehe settings.py): LLM_GOVERNOR_*.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import settings
+
+try:
+    import httpx  # type: ignore
+except Exception:  # pragma: no cover
+    httpx = None  # type: ignore
+
+logger = logging.getLogger("app.llm")
+
+PRIORITIES: Dict[str, int] = {"interactive": 0, "batch": 1}
+
+_PRIORITY: contextvars.ContextVar[str] = contextvars.ContextVar("llm_priority", default="interactive")
+
+# Burst-Kapazität der Token-Buckets in Sekunden der Nennrate
+_BURST_S = 10.0
+
+
+@contextmanager
+def llm_priority(name: str) -> Iterator[None]:
+    """
+    Setzt die Prioritätsklasse für alle LLM-Aufrufe im aktuellen Kontext.
+    """
+    if name not in PRIORITIES:
+        raise ValueError(f"unbekannte LLM-Priorität: {name}")
+    token = _PRIORITY.set(name)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def current_priority() -> str:
+    return _PRIORITY.get()
+
+
+class _TokenBucket:
+    """Token-Bucket mit Nennrate je Minute; tokens darf nach Korrekturen negativ werden."""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * _BURST_S)
+        self.tokens = self.capacity
+        self._ts = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._ts) * self.rate)
+        self._ts = now
+
+    def delay(self, cost: float, now: float) -> float:
+        """Wartezeit bis cost verfügbar ist (0 = sofort)."""
+        self._refill(now)
+        cost = min(cost, self.capacity)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def take(self, cost: float) -> float:
+        cost = min(cost, self.capacity)
+        self.tokens -= cost
+        return cost
+
+    def adjust(self, delta: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + delta)
+
+
+class _Waiter:
+    __slots__ = ("key", "cost", "priority", "granted", "cancelled", "event", "loop")
+
+    def __init__(self, key: Tuple[int, int], cost: float, priority: int, loop: Optional[asyncio.AbstractEventLoop]):
+        self.key = key
+        self.cost = cost
+        self.priority = priority
+        self.granted = False
+        self.cancelled = False
+        self.loop = loop
+        self.event: Any = asyncio.Event() if loop is not None else threading.Event()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.key < other.key
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self.event.set)
+            except RuntimeError:
+                pass  # Loop bereits geschlossen
+
+
+class Lease:
+    """Vergebener Slot; wird mit LLMGovernor.release() zurückgegeben."""
+
+    __slots__ = ("priority", "tokens", "started")
+
+    def __init__(self, priority: int, tokens: float):
+        self.priority = priority
+        self.tokens = tokens
+        self.started = time.monotonic()
+
+
+class LLMGovernor:
+    """
+    Slot-Vergabe für einen (Provider, Modell)-Schlüssel. Thread-safe; sync und async nutzbar.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        *,
+        rpm: float = 0,
+        tpm: float = 0,
+        initial_concurrency: float = 16,
+        min_concurrency: float = 1,
+        max_concurrency: float = 64,
+        backoff: float = 0.5,
+        latency_target_s: float = 0.0,
+        batch_share: float = 0.8,
+    ):
+        self.name = name
+        self.min_concurrency = max(1.0, float(min_concurrency))
+        self.max_concurrency = max(self.min_concurrency, float(max_concurrency))
+        self.limit = min(self.max_concurrency, max(self.min_concurrency, float(initial_concurrency)))
+        self.backoff = min(max(float(backoff), 0.05), 1.0)
+        self.latency_target_s = float(latency_target_s)
+        self.batch_share = min(max(float(batch_share), 0.0), 1.0)
+        self._rpm = _TokenBucket(rpm) if rpm and rpm > 0 else None
+        self._tpm = _TokenBucket(tpm) if tpm and tpm > 0 else None
+        self._lock = threading.Lock()
+        self._heap: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._stats = {"granted": 0, "throttled": 0, "decreases": 0}
+
+    # --- Vergabe -------------------------------------------------------------
+
+    def _slots(self, priority: int) -> int:
+        cap = max(1, int(self.limit))
+        if priority > 0:
+            cap = max(1, int(cap * self.batch_share))
+        return cap
+
+    def _dispatch_locked(self, caller: Optional[_Waiter] = None) -> Optional[float]:
+        """
+        Vergibt Slots an wartende Requests in Prioritätsreihenfolge.
+        Rückgabe: Wartezeit, falls der Kopf der Warteschlange an Zeit (Bucket/Pause) hängt.
+        """
+        while self._heap:
+            head = self._heap[0]
+            if head.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            if self._in_flight >= self._slots(head.priority):
+                return None
+            now = time.monotonic()
+            delay = max(
+                self._paused_until - now,
+                self._rpm.delay(1, now) if self._rpm else 0.0,
+                self._tpm.delay(head.cost, now) if self._tpm else 0.0,
+            )
+            if delay > 0:
+                if head is not caller:
+                    head.wake()  # Kopf wartet ggf. ohne Timeout → selbst nachrechnen lassen
+                return delay
+            heapq.heappop(self._heap)
+            if self._rpm:
+                self._rpm.take(1)
+            if self._tpm:
+                head.cost = self._tpm.take(head.cost)
+            self._in_flight += 1
+            self._stats["granted"] += 1
+            head.granted = True
+            if head is not caller:
+                head.wake()
+        return None
+
+    def _enqueue(self, cost: float, priority: Optional[str], loop: Optional[asyncio.AbstractEventLoop]) -> _Waiter:
+        prio = PRIORITIES.get(priority or current_priority(), 0)
+        w = _Waiter((prio, next(self._seq)), max(0.0, float(cost)), prio, loop)
+        heapq.heappush(self._heap, w)
+        return w
+
+    def _abandon_locked(self, w: _Waiter) -> None:
+        if w.granted:
+            self._in_flight -= 1
+            if self._tpm:
+                self._tpm.adjust(w.cost)
+        else:
+            w.cancelled = True
+        self._dispatch_locked()
+
+    def acquire(self, tokens: float = 0, priority: Optional[str] = None, timeout: Optional[float] = None) -> Lease:
+        """Blockierende Slot-Anforderung (Threads)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            w = self._enqueue(tokens, priority, None)
+            delay = self._dispatch_locked(w)
+        while True:
+            if w.granted:
+                return Lease(w.priority, w.cost)
+            wait = delay
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                wait = left if wait is None else min(wait, left)
+            w.event.wait(timeout=None if wait is None else max(0.0, wait))
+            with self._lock:
+                w.event.clear()
+                if not w.granted:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        self._abandon_locked(w)
+                        raise TimeoutError(f"LLM-Governor {self.name}: kein Slot innerhalb {timeout}s")
+                    delay = self._dispatch_locked(w)
+
+    async def acquire_async(self, tokens: float = 0, priority: Optional[str] = None) -> Lease:
+        """Slot-Anforderung ohne den Event-Loop zu blockieren."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            w = self._enqueue(tokens, priority, loop)
+            delay = self._dispatch_locked(w)
+        try:
+            while not w.granted:
+                try:
+                    await asyncio.wait_for(w.event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                with self._lock:
+                    w.event.clear()
+                    if not w.granted:
+                        delay = self._dispatch_locked(w)
+        except BaseException:
+            with self._lock:
+                self._abandon_locked(w)
+            raise
+        return Lease(w.priority, w.cost)
+
+    # --- Rückgabe und AIMD ---------------------------------------------------
+
+    def release(
+        self,
+        lease: Lease,
+        *,
+        status: Optional[int] = None,
+        latency_s: Optional[float] = None,
+        used_tokens: Optional[int] = None,
+        retry_after_s: Optional[float] = None,
+        timed_out: bool = False,
+    ) -> None:
+        """
+        Gibt den Slot zurück und passt das Limit an (AIMD).
+        status None ohne timed_out (z. B. Verbindungsfehler) ändert das Limit nicht.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight -= 1
+            if self._tpm and used_tokens is not None:
+                self._tpm.adjust(lease.tokens - used_tokens)
+            congested = status == 429 or timed_out or (
+                self.latency_target_s > 0 and latency_s is not None and latency_s > self.latency_target_s
+            )
+            if status == 429:
+                self._stats["throttled"] += 1
+                if retry_after_s:
+                    self._paused_until = max(self._paused_until, now + retry_after_s)
+            if congested:
+                # Nur einmal je Fenster: Requests, die vor der letzten Absenkung starteten, zählen nicht erneut
+                if lease.started > self._last_decrease:
+                    self.limit = max(self.min_concurrency, self.limit * self.backoff)
+                    self._last_decrease = now
+                    self._stats["decreases"] += 1
+            elif status is not None and status < 400:
+                self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+            self._dispatch_locked()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self._in_flight,
+                "waiting": sum(1 for w in self._heap if not w.cancelled),
+                "rpm_tokens": round(self._rpm.tokens, 1) if self._rpm else None,
+                "tpm_tokens": round(self._tpm.tokens, 1) if self._tpm else None,
+                **self._stats,
+            }
+
+
+# --- Registry ---------------------------------------------------------------
+
+_LOCK = threading.Lock()
+_GOVERNORS: Dict[Tuple[str, str], LLMGovernor] = {}
+
+
+def _overrides(host: str, model: str) -> Dict[str, Any]:
+    raw = settings.LLM_GOVERNOR_LIMITS
+    if not raw:
+        return {}
+    try:
+        limits = json.loads(raw)
+    except ValueError:
+        logger.warning("LLM_GOVERNOR_LIMITS ist kein gültiges JSON")
+        return {}
+    out: Dict[str, Any] = {}
+    for key in (host, model, f"{host}/{model}"):
+        if isinstance(limits.get(key), dict):
+            out.update(limits[key])
+    return out
+
+
+def get_governor(host: Optional[str], model: Optional[str]) -> LLMGovernor:
+    """Prozessweiter Governor für (Provider-Host, Modell)."""
+    key = ((host or "").lower(), model or "")
+    gov = _GOVERNORS.get(key)
+    if gov is not None:
+        return gov
+    with _LOCK:
+        gov = _GOVERNORS.get(key)
+        if gov is None:
+            cfg = {
+                "rpm": settings.LLM_GOVERNOR_RPM,
+                "tpm": settings.LLM_GOVERNOR_TPM,
+                "initial_concurrency": settings.LLM_GOVERNOR_INITIAL_CONCURRENCY,
+                "min_concurrency": settings.LLM_GOVERNOR_MIN_CONCURRENCY,
+                "max_concurrency": settings.LLM_GOVERNOR_MAX_CONCURRENCY,
+                "backoff": settings.LLM_GOVERNOR_BACKOFF,
+                "latency_target_s": settings.LLM_GOVERNOR_LATENCY_TARGET_S,
+                "batch_share": settings.LLM_GOVERNOR_BATCH_SHARE,
+            }
+            cfg.update({k: v for k, v in _overrides(*key).items() if k in cfg})
+            gov = LLMGovernor(f"{key[0]}/{key[1]}", **cfg)
+            _GOVERNORS[key] = gov
+    return gov
+
+
+def reset_governors() -> None:
+    """Verwirft alle Governor (z. B. nach Konfigurationsänderung oder in Tests)."""
+    with _LOCK:
+        _GOVERNORS.clear()
+
+
+def stats() -> Dict[str, Any]:
+    with _LOCK:
+        items = list(_GOVERNORS.items())
+    return {
+        "enabled": settings.LLM_GOVERNOR_ENABLED,
+        "governors": {f"{h}/{m}": g.stats() for (h, m), g in items},
+    }
+
+
+# --- httpx-Transports ---------------------------------------------------------
+
+def _request_budget(request: Any) -> Tuple[LLMGovernor, float]:
+    """Governor und geschätzte Token-Kosten (≈ 4 Byte/Token + max_tokens) eines Requests."""
+    body = request.content if request.method == "POST" else b""
+    model, max_tokens = "", 0
+    if body:
+        try:
+            data = json.loads(body)
+            model = str(data.get("model") or "")
+            max_tokens = int(data.get("max_tokens") or data.get("max_completion_tokens") or 0)
+        except (ValueError, TypeError, AttributeError):
+            pass
+    return get_governor(request.url.host, model), len(body) / 4.0 + max_tokens
+
+
+def _on_event_loop() -> bool:
+    """True, wenn auf diesem Thread ein asyncio-Loop läuft (dann darf nicht blockiert werden)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _retry_after(headers: Any) -> Optional[float]:
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return max(0.0, float(value) * scale)
+            except ValueError:
+                continue
+    return None
+
+
+def _used_tokens(response: Any) -> Optional[int]:
+    if "json" not in response.headers.get("content-type", ""):
+        return None
+    try:
+        usage = json.loads(response.content).get("usage") or {}
+        total = usage.get("total_tokens")
+        return int(total) if total is not None else None
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _is_event_stream(response: Any) -> bool:
+    return "event-stream" in response.headers.get("content-type", "")
+
+
+class _LeaseRelease:
+    """Gibt eine Lease genau einmal zurück; Status/Usage werden bis dahin gesammelt."""
+
+    def __init__(self, gov: LLMGovernor, lease: Lease):
+        self.gov = gov
+        self.lease = lease
+        self.status: Optional[int] = None
+        self.retry: Optional[float] = None
+        self.used: Optional[int] = None
+        self._done = False
+        self._tail = b""
+
+    def feed_sse(self, chunk: bytes) -> None:
+        """Liest usage.total_tokens aus SSE-Events (z. B. stream_options.include_usage)."""
+        lines = (self._tail + chunk).split(b"\n")
+        self._tail = lines.pop()
+        for line in lines:
+            if line.startswith(b"data:") and b'"usage"' in line:
+                try:
+                    usage = json.loads(line[5:]).get("usage") or {}
+                    if usage.get("total_tokens") is not None:
+                        self.used = int(usage["total_tokens"])
+                except (ValueError, TypeError, AttributeError):
+                    pass
+
+    def __call__(self, timed_out: bool = False) -> None:
+        if self._done:
+            return
+        self._done = True
+        self.gov.release(self.lease, status=self.status, latency_s=time.monotonic() - self.lease.started,
+                         used_tokens=self.used, retry_after_s=self.retry, timed_out=timed_out)
+
+
+if httpx is not None:
+
+    class _GovernedStream(httpx.SyncByteStream):
+        """SSE-Body: der Slot bleibt belegt, bis der Stream geschlossen wird."""
+
+        def __init__(self, inner: Any, release: _LeaseRelease):
+            self._inner = inner
+            self._release = release
+
+        def __iter__(self) -> Iterator[bytes]:
+            try:
+                for chunk in self._inner:
+                    self._release.feed_sse(chunk)
+                    yield chunk
+            except httpx.TimeoutException:
+                self._release(timed_out=True)
+                raise
+
+        def close(self) -> None:
+            try:
+                self._inner.close()
+            finally:
+                self._release()
+
+    class _AsyncGovernedStream(httpx.AsyncByteStream):
+        """Async-Variante von _GovernedStream."""
+
+        def __init__(self, inner: Any, release: _LeaseRelease):
+            self._inner = inner
+            self._release = release
+
+        async def __aiter__(self) -> Any:
+            try:
+                async for chunk in self._inner:
+                    self._release.feed_sse(chunk)
+                    yield chunk
+            except httpx.TimeoutException:
+                self._release(timed_out=True)
+                raise
+
+        async def aclose(self) -> None:
+            try:
+                await self._inner.aclose()
+            finally:
+                self._release()
+
+    class GovernedTransport(httpx.BaseTransport):
+        """Sync-Transport: jeder Request holt vorher einen Governor-Slot."""
+
+        def __init__(self, inner: Any):
+            self._inner = inner
+
+        def handle_request(self, request: Any) -> Any:
+            gov, cost = _request_budget(request)
+            if _on_event_loop():
+                try:
+                    lease = gov.acquire(cost, timeout=0)
+                except TimeoutError:
+                    logger.error(
+                        "Sync-LLM-Request auf dem Event-Loop-Thread ohne freien Slot (%s): "
+                        "sende ungedrosselt statt den Loop zu blockieren - "
+                        "Aufruf in asyncio.to_thread oder den Async-Client verlagern",
+                        gov.name,
+                    )
+                    return self._inner.handle_request(request)
+            else:
+                try:
+                    lease = gov.acquire(cost, timeout=settings.LLM_GOVERNOR_ACQUIRE_TIMEOUT_S or None)
+                except TimeoutError as e:
+                    raise httpx.PoolTimeout(str(e), request=request) from e
+            release = _LeaseRelease(gov, lease)
+            timed_out = streaming = False
+            try:
+                response = self._inner.handle_request(request)
+                release.status, release.retry = response.status_code, _retry_after(response.headers)
+                if release.status < 400 and _is_event_stream(response):
+                    # Slot erst beim Schließen des Streams freigeben (Latenz/Usage inkl. Body)
+                    response.stream = _GovernedStream(response.stream, release)
+                    streaming = True
+                    return response
+                if release.status < 400:
+                    response.read()
+                    release.used = _used_tokens(response)
+                return response
+            except httpx.TimeoutException:
+                timed_out = True
+                raise
+            finally:
+                if not streaming:
+                    release(timed_out=timed_out)
+
+        def close(self) -> None:
+            self._inner.close()
+
+    class AsyncGovernedTransport(httpx.AsyncBaseTransport):
+        """Async-Transport: wartet auf den Governor-Slot, ohne den Loop zu blockieren."""
+
+        def __init__(self, inner: Any):
+            self._inner = inner
+
+        async def handle_async_request(self, request: Any) -> Any:
+            gov, cost = _request_budget(request)
+            release = _LeaseRelease(gov, await gov.acquire_async(cost))
+            timed_out = streaming = False
+            try:
+                response = await self._inner.handle_async_request(request)
+                release.status, release.retry = response.status_code, _retry_after(response.headers)
+                if release.status < 400 and _is_event_stream(response):
+                    response.stream = _AsyncGovernedStream(response.stream, release)
+                    streaming = True
+                    return response
+                if release.status < 400:
+                    await response.aread()
+                    release.used = _used_tokens(response)
+                return response
+            except httpx.TimeoutException:
+                timed_out = True
+                raise
+            finally:
+                if not streaming:
+                    release(timed_out=timed_out)
+
+        async def aclose(self) -> None:
+            await self._inner.aclose()
+
+
+__all__ = [
+    "LLMGovernor",
+    "Lease",
+    "PRIORITIES",
+    "llm_priority",
+    "current_priority",
+    "get_governor",
+    "reset_governors",
+    "stats",
+]
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Prozessweiter Pool langlebiger Qdrant-Clients.
+
+Ein QdrantClient hält einen eigenen HTTP-(bzw. gRPC-)Connection-Pool; ihn pro
+Aufruf neu zu bauen kostet Verbindungsaufbau plus Health-Check. Hier wird je
+(Client-Klasse, URL, API-Key, gRPC) genau ein Client erzeugt und geteilt von
+vector_store, Retriever, QdrantKGClient, RequirementsStore und QdrantTraceSink.
+
+Zusätzlich merkt sich das Modul je Client die Collections, deren Existenz
+bereits bestätigt wurde, damit ensure_collection() nicht vor jeder Suche
+einen Round-Trip auslöst.
+
+Kein harter Import von qdrant_client auf Modulebene: arch_team reicht seine
+(lazy importierte) Client-Klasse als factory durch.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from . import settings
+
+logger = logging.getLogger("app.vector")
+
+_clients: Dict[Tuple[Any, str, Optional[str], bool], Any] = {}
+_known: "weakref.WeakKeyDictionary[Any, Set[str]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _default_factory() -> Callable[..., Any]:
+    from qdrant_client import QdrantClient  # type: ignore
+
+    return QdrantClient
+
+
+def get_shared_client(
+    url: str,
+    api_key: Optional[str] = None,
+    *,
+    timeout: Optional[float] = None,
+    prefer_grpc: Optional[bool] = None,
+    factory: Optional[Callable[..., Any]] = None,
+) -> Any:
+    """
+    Liefert den geteilten Client für url (erzeugt ihn beim ersten Aufruf).
+    prefer_grpc=None übernimmt settings.QDRANT_PREFER_GRPC; timeout gilt nur bei der Erzeugung.
+    """
+    factory = factory or _default_factory()
+    grpc = settings.QDRANT_PREFER_GRPC if prefer_grpc is None else bool(prefer_grpc)
+    key = (factory, str(url), api_key or None, grpc)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            kwargs: Dict[str, Any] = {"url": str(url), "api_key": api_key or None}
+            if timeout is not None:
+                kwargs["timeout"] = timeout
+            if grpc:
+                kwargs["prefer_grpc"] = True
+                kwargs["grpc_port"] = settings.QDRANT_GRPC_PORT
+            client = factory(**kwargs)
+            _clients[key] = client
+            logger.info("qdrant client created url=%s grpc=%s", url, grpc)
+    return client
+
+
+def invalidate(url: Optional[str] = None) -> int:
+    """
+    Verwirft gepoolte Clients (alle oder nur die für url) samt Collection-Memo.
+    Der nächste get_shared_client()-Aufruf baut die Verbindung neu auf (Lazy-Reconnect).
+
+    Die Clients werden nur aus dem Pool genommen, nicht geschlossen: andere
+    Threads und Halter (self._qdrant in Retriever, QdrantKGClient, ...) nutzen
+    sie evtl. noch; ihr HTTP-Pool verbindet sich bei Bedarf selbst neu.
+    """
+    with _lock:
+        keys = [k for k in _clients if url is None or k[1] == str(url)]
+        for k in keys:
+            forget_collection(_clients.pop(k))
+    return len(keys)
+
+
+def collection_known(client: Any, name: str) -> bool:
+    try:
+        return name in _known.get(client, ())
+    except TypeError:
+        return False
+
+
+def remember_collection(client: Any, name: str) -> None:
+    try:
+        _known.setdefault(client, set()).add(name)
+    except TypeError:
+        # Client nicht weak-referenzierbar → kein Memo
+        pass
+
+
+def forget_collection(client: Any, name: Optional[str] = None) -> None:
+    try:
+        if name is None:
+            _known.pop(client, None)
+        else:
+            _known.get(client, set()).discard(name)
+    except TypeError:
+        pass
@@ -32,6 +32,10 @@ OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 
 # Embeddings-Modell für Vektorindex (RAG) - Always uses OpenAI
 EMBEDDINGS_MODEL = os.environ.get("EMBEDDINGS_MODEL", "text-embedding-3-small")
+# Embedding-Pipeline (backend/core/embeddings.py): Tokenbudget je Request, Eingaben je Request, Requests in Flight
+EMBEDDINGS_BATCH_MAX_TOKENS = int(os.environ.get("EMBEDDINGS_BATCH_MAX_TOKENS", "100000"))
+EMBEDDINGS_BATCH_MAX_ITEMS = int(os.environ.get("EMBEDDINGS_BATCH_MAX_ITEMS", "512"))
+EMBEDDINGS_CONCURRENCY = int(os.environ.get("EMBEDDINGS_CONCURRENCY", "4"))
 MOCK_MODE = os.environ.get("MOCK_MODE", "false").lower() in ("1", "true", "yes")
 
 
@@ -50,15 +54,25 @@ def get_llm_config() -> dict:
 # DB
 SQLITE_PATH = os.environ.get("SQLITE_PATH", "app.db")
 PURGE_RETENTION_H = int(os.environ.get("PURGE_RETENTION_H", "24"))
+# Connection-Pool (backend/core/db.py::get_db): max. ungenutzte Connections je DB (0 = kein Pooling)
+SQLITE_POOL_SIZE = int(os.environ.get("SQLITE_POOL_SIZE", "8"))
+SQLITE_CACHE_KB = int(os.environ.get("SQLITE_CACHE_KB", "20000"))  # Page-Cache je Connection
+SQLITE_MMAP_MB = int(os.environ.get("SQLITE_MMAP_MB", "256"))
+SQLITE_STMT_CACHE = int(os.environ.get("SQLITE_STMT_CACHE", "256"))  # Prepared Statements je Connection
 
 # Vektor-DB (Qdrant) - Use centralized configuration
 QDRANT_URL = _ports.QDRANT_URL if _ports else os.environ.get("QDRANT_URL", "http://localhost")
 QDRANT_PORT = _ports.QDRANT_PORT if _ports else int(os.environ.get("QDRANT_PORT", "6333"))
 QDRANT_COLLECTION = os.environ.get("QDRANT_COLLECTION", "requirements_v1")
+# Geteilte Qdrant-Clients (backend/core/qdrant_pool.py): optional gRPC statt HTTP
+QDRANT_PREFER_GRPC = os.environ.get("QDRANT_PREFER_GRPC", "false").lower() in ("1", "true", "yes", "on")
+QDRANT_GRPC_PORT = int(os.environ.get("QDRANT_GRPC_PORT", "6334"))
 
 # Batch and files
 BATCH_SIZE = int(os.environ.get("BATCH_SIZE", "10"))
 MAX_PARALLEL = int(os.environ.get("MAX_PARALLEL", "10"))
+# Fused-Modus: evaluate+suggest+rewrite in einem LLM-Call je Requirement (backend/core/batch.py::process_fused)
+BATCH_FUSED_MODE = os.environ.get("BATCH_FUSED_MODE", "false").lower() in ("1", "true", "yes", "on")
 
 # Requirement validation optimization settings
 # FIX_BATCH_SIZE: Number of failing criteria to fix in parallel (1=sequential, 3=recommended)
@@ -73,11 +87,50 @@ CHUNK_TOKENS_MIN = int(os.environ.get("CHUNK_TOKENS_MIN", "200"))
 CHUNK_TOKENS_MAX = int(os.environ.get("CHUNK_TOKENS_MAX", "400"))
 CHUNK_OVERLAP_TOKENS = int(os.environ.get("CHUNK_OVERLAP_TOKENS", "50"))
 
+# Parallele Dateiextraktion (backend/core/ingest.py::iter_extract_texts): Prozesse, Timeout je Datei
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+INGEST_FILE_TIMEOUT_S = float(os.environ.get("INGEST_FILE_TIMEOUT_S", "120"))  # 0 = kein Timeout
+# Delta-Ingest als Default für /api/v1/files/ingest: nur neue/geänderte Chunks (chunkHash) embedden und upserten
+# (nur bei chunkMode=token oder preserveSources; im kombinierten Modus wird Delta ignoriert)
+INGEST_DELTA = os.environ.get("INGEST_DELTA", "false").lower() in ("1", "true", "yes", "on")
+
 # LLM Feineinstellungen und Konfigpfade
 LLM_TEMPERATURE = float(os.environ.get("LLM_TEMPERATURE", "0.0"))
 LLM_TOP_P = float(os.environ.get("LLM_TOP_P", "1.0"))
 LLM_MAX_TOKENS = int(os.environ.get("LLM_MAX_TOKENS", "0"))  # 0 = SDK Default
 
+# HTTP-Connection-Pool der geteilten LLM-Clients (backend/core/llm_clients.py)
+LLM_HTTP_MAX_CONNECTIONS = int(os.environ.get("LLM_HTTP_MAX_CONNECTIONS", "100"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.environ.get("LLM_HTTP_MAX_KEEPALIVE", "20"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+LLM_HTTP_TIMEOUT = float(os.environ.get("LLM_HTTP_TIMEOUT", "120"))
+
+# Prozessweiter LLM-Governor (backend/core/llm_governor.py): Budget je Provider-Host und Modell
+LLM_GOVERNOR_ENABLED = os.environ.get("LLM_GOVERNOR_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+LLM_GOVERNOR_RPM = float(os.environ.get("LLM_GOVERNOR_RPM", "0"))  # Requests/Minute, 0 = unbegrenzt
+LLM_GOVERNOR_TPM = float(os.environ.get("LLM_GOVERNOR_TPM", "0"))  # Tokens/Minute, 0 = unbegrenzt
+LLM_GOVERNOR_INITIAL_CONCURRENCY = int(os.environ.get("LLM_GOVERNOR_INITIAL_CONCURRENCY", "16"))
+LLM_GOVERNOR_MIN_CONCURRENCY = int(os.environ.get("LLM_GOVERNOR_MIN_CONCURRENCY", "1"))
+LLM_GOVERNOR_MAX_CONCURRENCY = int(os.environ.get("LLM_GOVERNOR_MAX_CONCURRENCY", "64"))
+LLM_GOVERNOR_BACKOFF = float(os.environ.get("LLM_GOVERNOR_BACKOFF", "0.5"))  # Faktor bei 429/Timeout
+LLM_GOVERNOR_LATENCY_TARGET_S = float(os.environ.get("LLM_GOVERNOR_LATENCY_TARGET_S", "0"))  # 0 = Latenz ignorieren
+LLM_GOVERNOR_BATCH_SHARE = float(os.environ.get("LLM_GOVERNOR_BATCH_SHARE", "0.8"))  # max. Slot-Anteil für Batch
+LLM_GOVERNOR_ACQUIRE_TIMEOUT_S = float(os.environ.get("LLM_GOVERNOR_ACQUIRE_TIMEOUT_S", "300"))  # Sync-Wartezeit, 0 = unbegrenzt
+# JSON je Host/Modell, z. B. {"openai/gpt-4o-mini": {"rpm": 500, "tpm": 200000, "max_concurrency": 32}}
+LLM_GOVERNOR_LIMITS = os.environ.get("LLM_GOVERNOR_LIMITS", "")
+
+# Persistenter LLM-Response-Cache (backend/core/llm_cache.py)
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "llm_cache.db")
+LLM_CACHE_TTL_S = int(os.environ.get("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))  # 0 = kein Ablauf
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "100000"))  # 0 = unbegrenzt
+
+# Persistenter Embedding-Cache (backend/core/embedding_cache.py)
+EMBEDDINGS_CACHE_ENABLED = os.environ.get("EMBEDDINGS_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+EMBEDDINGS_CACHE_PATH = os.environ.get("EMBEDDINGS_CACHE_PATH", "embeddings_cache.db")
+EMBEDDINGS_CACHE_MEM_ITEMS = int(os.environ.get("EMBEDDINGS_CACHE_MEM_ITEMS", "10000"))  # In-Memory-LRU (float32, ~6 KB je 1536-dim Vektor)
+EMBEDDINGS_CACHE_MAX_ENTRIES = int(os.environ.get("EMBEDDINGS_CACHE_MAX_ENTRIES", "500000"))  # 0 = unbegrenzt
+
 # Logging
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")  # json|console
@@ -167,6 +220,32 @@ def get_system_prompt(kind: str) -> str:
             "Keinen zusätzlichen Text, keine Code-Fences, keine Erklärungen."
         )
     return ""
+def _llm_cache_stats() -> dict:
+    try:
+        from .llm_cache import stats  # lazy import (llm_cache importiert settings)
+        return stats()
+    except Exception as e:
+        return {"enabled": LLM_CACHE_ENABLED, "error": str(e)}
+
+
+def _llm_governor_stats() -> dict:
+    try:
+        from .llm_governor import stats  # lazy import (llm_governor importiert settings)
+        return stats()
+    except Exception as e:
+        return {"enabled": LLM_GOVERNOR_ENABLED, "error": str(e)}
+
+
+def _embeddings_cache_stats() -> dict:
+    if not EMBEDDINGS_CACHE_ENABLED:
+        return {"enabled": False}
+    try:
+        from .embedding_cache import get_embedding_cache  # lazy import
+        return {"enabled": True, **get_embedding_cache().stats()}
+    except Exception as e:
+        return {"enabled": True, "error": str(e)}
+
+
 def get_runtime_config() -> dict:
     """
     Snapshot der aktuellen Runtime-Konfiguration.
@@ -251,11 +330,16 @@ def get_runtime_config() -> dict:
         "db": {
             "sqlite_path": SQLITE_PATH,
             "purge_retention_h": PURGE_RETENTION_H,
+            "pool_size": SQLITE_POOL_SIZE,
+            "cache_kb": SQLITE_CACHE_KB,
+            "mmap_mb": SQLITE_MMAP_MB,
+            "stmt_cache": SQLITE_STMT_CACHE,
         },
         "vector": {
             "qdrant_url": QDRANT_URL,
             "qdrant_port": QDRANT_PORT,
             "collection": QDRANT_COLLECTION,
+            "prefer_grpc": QDRANT_PREFER_GRPC,
             # Autodetect-Erweiterungen
             "effective_url": q_effective_url,
             "detected_dim": q_coll_dim,
@@ -267,6 +351,7 @@ def get_runtime_config() -> dict:
         "batch": {
             "batch_size": BATCH_SIZE,
             "max_parallel": MAX_PARALLEL,
+            "fused_mode": BATCH_FUSED_MODE,
             "verdict_threshold": VERDICT_THRESHOLD,
         },
         "llm": {
@@ -277,12 +362,17 @@ def get_runtime_config() -> dict:
             "temperature": LLM_TEMPERATURE,
             "top_p": LLM_TOP_P,
             "max_tokens": LLM_MAX_TOKENS,
+            "http_max_connections": LLM_HTTP_MAX_CONNECTIONS,
+            "http_max_keepalive": LLM_HTTP_MAX_KEEPALIVE,
         },
+        "llm_cache": _llm_cache_stats(),
+        "llm_governor": _llm_governor_stats(),
         "embeddings": {
             "provider": "openai",
             "model": EMBEDDINGS_MODEL,
             # Autodetect-Erweiterung
             "detected_dim": embeddings_detected_dim,
+            "cache": _embeddings_cache_stats(),
         },
         "prompts": {
             "evaluate_path": EVAL_SYSTEM_PROMPT_PATH,
@@ -301,6 +391,9 @@ def get_runtime_config() -> dict:
             "min_tokens": CHUNK_TOKENS_MIN,
             "max_tokens": CHUNK_TOKENS_MAX,
             "overlap_tokens": CHUNK_OVERLAP_TOKENS,
+            "ingest_workers": INGEST_WORKERS,
+            "ingest_file_timeout_s": INGEST_FILE_TIMEOUT_S,
+            "ingest_delta": INGEST_DELTA,
         },
         "hints": {
             "unused_env": unused_env_hints,
@@ -2,12 +2,14 @@
 from __future__ import annotations
 
 import os
+import threading
 import time
 import uuid
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
+import httpx
 from qdrant_client import QdrantClient
-from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
 from qdrant_client.models import (
     Distance,
     VectorParams,
@@ -16,9 +18,20 @@ from qdrant_client.models import (
     FieldCondition,
     Range,
     MatchValue,
+    Direction,
+    OrderBy,
+    PayloadSchemaType,
+    PointIdsList,
+    SetPayload,
+    SetPayloadOperation,
 )
 
-from . import settings
+from . import qdrant_pool, settings
+
+try:
+    import grpc  # nur bei QDRANT_PREFER_GRPC relevant
+except ImportError:  # pragma: no cover
+    grpc = None  # type: ignore
 
 # Import centralized port configuration for fallback logic
 try:
@@ -45,41 +58,80 @@ def _build_url_with_port(base_url: str, port: int) -> str:
     return f"{base}:{port}"
 
 
+# Einmal aufgelöster Endpunkt (Port nach Health-Check); None = noch nicht/erneut auflösen
+_resolved: Optional[Tuple[str, int]] = None
+_resolve_lock = threading.Lock()
+
+
+def _resolve_port(base_url: str, port: int, fallback_port: int, timeout: float) -> int:
+    """
+    Health-Check auf Primär-, dann Fallback-Port. Läuft nur beim ersten Zugriff
+    bzw. nach invalidate_qdrant_client().
+    """
+    candidates = [port] + ([fallback_port] if fallback_port and fallback_port != port else [])
+    for p in candidates:
+        try:
+            client = qdrant_pool.get_shared_client(
+                _build_url_with_port(base_url, p), timeout=timeout, factory=QdrantClient
+            )
+            _ = client.get_collections()
+            return p
+        except Exception:
+            qdrant_pool.invalidate(_build_url_with_port(base_url, p))
+    # Letzte Option: Fehler auf Primär-Port durchreichen
+    return port
+
+
 def get_qdrant_client(timeout: float = 5.0) -> Tuple[QdrantClient, int]:
     """
-    Liefert einen Qdrant-Client. Versucht Fallback auf QDRANT_PORT_FALLBACK, falls primär nicht erreichbar.
+    Liefert den prozessweit geteilten Qdrant-Client (backend/core/qdrant_pool.py).
+    Beim ersten Aufruf wird per Health-Check zwischen Primär-Port und
+    QDRANT_PORT_FALLBACK gewählt; danach kein Round-Trip mehr.
     Gibt (client, effektiver_port) zurück.
     Hinweis: 6334 ist gRPC, HTTP bleibt 6333. Alternativer HTTP-Fallback kann 6401 sein.
     """
+    global _resolved
     base_url = getattr(settings, "QDRANT_URL", "http://localhost")
     port = int(getattr(settings, "QDRANT_PORT", 6333))
     # Get fallback port from centralized config
     fallback_port = _ports.QDRANT_PORT_FALLBACK if _ports else int(os.environ.get("QDRANT_PORT_FALLBACK", "6401"))
 
-    # Primär
-    try:
-        url = _build_url_with_port(base_url, port)
-        client = QdrantClient(url=url, timeout=timeout)
-        # Health-Check
-        _ = client.get_collections()
-        return client, port
-    except Exception:
-        pass
+    resolved = _resolved
+    if resolved is None or resolved[0] != base_url:
+        with _resolve_lock:
+            resolved = _resolved
+            if resolved is None or resolved[0] != base_url:
+                resolved = (base_url, _resolve_port(base_url, port, fallback_port, timeout))
+                _resolved = resolved
+    eff_port = resolved[1]
+    client = qdrant_pool.get_shared_client(
+        _build_url_with_port(base_url, eff_port), timeout=timeout, factory=QdrantClient
+    )
+    return client, eff_port
 
-    # Fallback auf configured fallback port
-    if fallback_port and fallback_port != port:
+
+def invalidate_qdrant_client() -> None:
+    """
+    Verwirft den geteilten Client und die Port-Auflösung; der nächste
+    get_qdrant_client() verbindet neu (Lazy-Reconnect nach Verbindungsfehlern).
+    """
+    global _resolved
+    with _resolve_lock:
+        resolved, _resolved = _resolved, None
+    if resolved is not None:
+        qdrant_pool.invalidate(_build_url_with_port(*resolved))
+
+
+def _connection_error(e: Exception) -> bool:
+    """Nur Transportfehler lösen einen Reconnect aus (keine Payload-/Anwendungsfehler)."""
+    if isinstance(e, (ResponseHandlingException, httpx.TransportError, ConnectionError)):
+        return True
+    if grpc is not None and isinstance(e, grpc.RpcError):
         try:
-            url = _build_url_with_port(base_url, fallback_port)
-            client = QdrantClient(url=url, timeout=timeout)
-            _ = client.get_collections()
-            return client, fallback_port
+            return e.code() in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
         except Exception:
-            pass
-
-    # Letzte Option: Fehler auf Primär-Port durchreichen
-    url = _build_url_with_port(base_url, port)
-    client = QdrantClient(url=url, timeout=timeout)
-    return client, port
+            return False
+    return False
 
 
 def ensure_collection(
@@ -93,6 +145,8 @@ def ensure_collection(
     """
     coll = collection_name or getattr(settings, "QDRANT_COLLECTION", "requirements_v1")
     cli = client or get_qdrant_client()[0]
+    if qdrant_pool.collection_known(cli, coll):
+        return
     try:
         info = cli.get_collection(collection_name=coll)
         # Optional: Vektorparam prüfen (dim/distance)
@@ -107,13 +161,13 @@ def ensure_collection(
                     pass
             except Exception:
                 pass
-        return
     except UnexpectedResponse:
         # Collection fehlt → erstellen
         cli.recreate_collection(
             collection_name=coll,
             vectors_config=VectorParams(size=dim, distance=distance),
         )
+    qdrant_pool.remember_collection(cli, coll)
 
 
 def upsert_points(
@@ -161,7 +215,12 @@ def upsert_points(
     if not points:
         return 0
 
-    cli.upsert(collection_name=coll, points=points, wait=True)
+    try:
+        cli.upsert(collection_name=coll, points=points, wait=True)
+    except Exception as e:
+        if client is None and _connection_error(e):
+            invalidate_qdrant_client()
+        raise
     return len(points)
 
 
@@ -177,8 +236,21 @@ def search(
     """
     coll = collection_name or getattr(settings, "QDRANT_COLLECTION", "requirements_v1")
     cli = client or get_qdrant_client()[0]
-    ensure_collection(cli, coll, dim=len(query_vector) if query_vector else DEFAULT_EMBEDDING_DIM)
-    results = cli.search(collection_name=coll, query_vector=list(query_vector), limit=int(top_k or 5))
+    dim = len(query_vector) if query_vector else DEFAULT_EMBEDDING_DIM
+    ensure_collection(cli, coll, dim=dim)
+    try:
+        results = cli.search(collection_name=coll, query_vector=list(query_vector), limit=int(top_k or 5))
+    except UnexpectedResponse as e:
+        if getattr(e, "status_code", None) != 404 or not qdrant_pool.collection_known(cli, coll):
+            raise
+        # Collection wurde extern gelöscht → Memo verwerfen, neu anlegen, einmal wiederholen
+        qdrant_pool.forget_collection(cli, coll)
+        ensure_collection(cli, coll, dim=dim)
+        results = cli.search(collection_name=coll, query_vector=list(query_vector), limit=int(top_k or 5))
+    except Exception as e:
+        if client is None and _connection_error(e):
+            invalidate_qdrant_client()
+        raise
     out: List[Dict[str, Any]] = []
     for r in results:
         _pl = getattr(r, "payload", {}) or {}
@@ -211,6 +283,8 @@ def healthcheck(client: Optional[QdrantClient] = None) -> Dict[str, Any]:
         cols = list_collections(cli)
         return {"status": "ok", "collections": cols}
     except Exception as e:
+        if client is None and _connection_error(e):
+            invalidate_qdrant_client()
         return {"status": "error", "error": str(e)}
 
 
@@ -230,6 +304,7 @@ def reset_collection(
         collection_name=coll,
         vectors_config=VectorParams(size=int(dim), distance=distance),
     )
+    qdrant_pool.remember_collection(cli, coll)
     # Versuche Distanznamen aus der Collection zu lesen (best effort)
     try:
         info = cli.get_collection(collection_name=coll)
@@ -295,4 +370,141 @@ def fetch_window_by_source_and_index(
             return 0
 
     out.sort(key=_idx)
-    return out
\ No newline at end of file
+    return out
+
+
+def iter_source_chunks(
+    source_file: str,
+    client: Optional[QdrantClient] = None,
+    collection_name: Optional[str] = None,
+    page_size: int = 256,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Liest alle Chunks eines sourceFile in einem gefilterten Scroll, sortiert nach
+    chunkIndex (order_by, nur Payload-Felder chunkIndex/text). Liefert
+    {chunkIndex, text} je Index genau einmal (erster Treffer gewinnt) –
+    Speicherbedarf: eine Seite. Fehlt der für order_by nötige Integer-Index
+    auf chunkIndex, wird er einmalig angelegt. Fehlt die Collection, ist das
+    Ergebnis leer.
+    """
+    coll = collection_name or getattr(settings, "QDRANT_COLLECTION", "requirements_v1")
+    cli = client or get_qdrant_client()[0]
+    flt = Filter(must=[FieldCondition(key="sourceFile", match=MatchValue(value=str(source_file)))])
+
+    last: Optional[int] = None
+    indexed = False
+    while True:
+        try:
+            res, _ = cli.scroll(
+                collection_name=coll,
+                scroll_filter=flt,
+                with_payload=["chunkIndex", "text"],
+                with_vectors=False,
+                limit=page_size,
+                order_by=OrderBy(key="chunkIndex", direction=Direction.ASC, start_from=None if last is None else last + 1),
+            )
+        except UnexpectedResponse as e:
+            status = getattr(e, "status_code", None)
+            if status == 404:
+                return
+            if status != 400 or indexed:
+                raise
+            # order_by braucht einen Range-Index auf chunkIndex
+            cli.create_payload_index(
+                collection_name=coll,
+                field_name="chunkIndex",
+                field_schema=PayloadSchemaType.INTEGER,
+                wait=True,
+            )
+            indexed = True
+            continue
+        except Exception as e:
+            if client is None and _connection_error(e):
+                invalidate_qdrant_client()
+            raise
+
+        for r in res:
+            _pl = getattr(r, "payload", {}) or {}
+            try:
+                ci = int(_pl.get("chunkIndex"))
+            except Exception:
+                continue
+            if last is not None and ci <= last:
+                continue
+            last = ci
+            yield {"chunkIndex": ci, "text": str(_pl.get("text") or "")}
+        # Mit start_from = last + 1 ist jede volle Seite ein Fortschritt; kürzere Seite = Ende
+        if len(res) < page_size or last is None:
+            return
+
+def fetch_chunk_hashes(
+    source_file: str,
+    client: Optional[QdrantClient] = None,
+    collection_name: Optional[str] = None,
+    limit: int = 512,
+) -> Dict[str, List[Any]]:
+    """
+    Liefert {chunkHash: [point_id, ...]} aller Punkte eines sourceFile (nur das
+    Payload-Feld chunkHash, keine Vektoren). Punkte ohne chunkHash (Altbestand)
+    landen unter "" und gelten beim Delta-Ingest damit als veraltet.
+    Fehlt die Collection, ist das Ergebnis leer.
+    """
+    coll = collection_name or getattr(settings, "QDRANT_COLLECTION", "requirements_v1")
+    cli = client or get_qdrant_client()[0]
+    flt = Filter(must=[FieldCondition(key="sourceFile", match=MatchValue(value=str(source_file)))])
+
+    out: Dict[str, List[Any]] = {}
+    next_offset = None
+    while True:
+        try:
+            res, next_offset = cli.scroll(
+                collection_name=coll,
+                scroll_filter=flt,
+                with_payload=["chunkHash"],
+                with_vectors=False,
+                limit=limit,
+                offset=next_offset,
+            )
+        except UnexpectedResponse as e:
+            if getattr(e, "status_code", None) == 404:
+                return {}
+            raise
+        for r in res:
+            h = str((getattr(r, "payload", None) or {}).get("chunkHash") or "")
+            out.setdefault(h, []).append(getattr(r, "id", None))
+        if next_offset is None:
+            break
+    return out
+
+
+def delete_points(
+    ids: Sequence[Any],
+    client: Optional[QdrantClient] = None,
+    collection_name: Optional[str] = None,
+) -> int:
+    """Löscht Punkte per ID. Returns: Anzahl gelöschter IDs."""
+    if not ids:
+        return 0
+    coll = collection_name or getattr(settings, "QDRANT_COLLECTION", "requirements_v1")
+    cli = client or get_qdrant_client()[0]
+    cli.delete(collection_name=coll, points_selector=PointIdsList(points=list(ids)), wait=True)
+    return len(ids)
+
+
+def set_payloads(
+    updates: Sequence[Tuple[Any, Dict[str, Any]]],
+    client: Optional[QdrantClient] = None,
+    collection_name: Optional[str] = None,
+) -> int:
+    """
+    Überschreibt einzelne Payload-Felder mehrerer Punkte in einem Request
+    (z. B. chunkIndex/sha1 unveränderter Chunks nach einem Delta-Ingest).
+    updates: [(point_id, {feld: wert, ...}), ...]
+    """
+    ops = [SetPayloadOperation(set_payload=SetPayload(payload=dict(pl), points=[pid])) for pid, pl in updates if pl]
+    if not ops:
+        return 0
+    coll = collection_name or getattr(settings, "QDRANT_COLLECTION", "requirements_v1")
+    cli = client or get_qdrant_client()[0]
+    cli.batch_update_points(collection_name=coll, update_operations=ops, wait=True)
+    return len(ops)
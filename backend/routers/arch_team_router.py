@@ -15,6 +15,7 @@ Enthält:
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import json
 import logging
 import mimetypes
@@ -174,12 +175,14 @@ def _truthy(s: str | None) -> bool:
         return False
     return s.strip().lower() in ("1", "true", "yes", "on")
 
-async def _file_to_record(file: UploadFile) -> Dict[str, Any]:
-    """Convert UploadFile to record dict."""
+def _file_to_record(file: UploadFile, stack: contextlib.ExitStack) -> Dict[str, Any]:
+    """Spool UploadFile to a temp file (removed when stack closes) and return a path record."""
+    from backend.core.ingest import spool_to_path
+
     filename = file.filename or "upload.bin"
-    data = await file.read()
+    path = stack.enter_context(spool_to_path(file.file, os.path.splitext(filename)[1]))
     ct = file.content_type or mimetypes.guess_type(filename)[0] or ""
-    return {"filename": filename, "data": data, "content_type": ct}
+    return {"filename": filename, "path": path, "content_type": ct}
 
 def _persist_kg_async(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> None:
     """Persist nodes/edges asynchronously to Qdrant."""
@@ -212,6 +215,7 @@ async def mining_upload(
     neighbor_refs: Optional[str] = Form(default=None),
     chunk_size: Optional[str] = Form(default=None),
     chunk_overlap: Optional[str] = Form(default=None),
+    delta: Optional[str] = Form(default=None),
 ):
     """Multipart Upload for requirements mining."""
     try:
@@ -238,24 +242,41 @@ async def mining_upload(
             except ValueError:
                 pass
         
-        records: List[Dict[str, Any]] = []
-        for f in all_files:
-            try:
-                records.append(await _file_to_record(f))
-            except Exception as e:
-                logger.warning(f"[mining] read failed for {f.filename}: {e}")
+        # Uploads auf Platte spoolen: der Extraktions-Pool liest per Pfad, nichts liegt komplett im RAM
+        with contextlib.ExitStack() as stack:
+            records: List[Dict[str, Any]] = []
+            for f in all_files:
+                try:
+                    records.append(_file_to_record(f, stack))
+                except Exception as e:
+                    logger.warning(f"[mining] read failed for {f.filename}: {e}")
         
-        if not records:
-            return JSONResponse({"success": False, "message": "Failed to read uploads"}, status_code=400)
+            if not records:
+                return JSONResponse({"success": False, "message": "Failed to read uploads"}, status_code=400)
         
-        ChunkMinerAgent = _get_chunk_miner()
-        agent = ChunkMinerAgent(source="web", default_model=os.environ.get("MODEL_NAME"))
-        items = agent.mine_files_or_texts_collect(
-            records,
-            model=model,
-            neighbor_refs=use_neighbor_refs,
-            chunk_options=chunk_options
-        )
+            # Delta-Mining: Chunks, deren chunkHash bereits im Manifest steht, nicht erneut minen
+            use_delta = _truthy(delta)
+            skip_hashes = None
+            if use_delta:
+                try:
+                    _, _db = _get_manifest_integration()
+                    conn = _db.get_db()
+                    try:
+                        skip_hashes = _db.get_mined_chunk_hashes(conn, [r["filename"] for r in records])
+                    finally:
+                        conn.close()
+                except Exception as e:
+                    logger.warning(f"[mining] Delta lookup failed, mining all chunks: {e}")
+
+            ChunkMinerAgent = _get_chunk_miner()
+            agent = ChunkMinerAgent(source="web", default_model=os.environ.get("MODEL_NAME"))
+            items = agent.mine_files_or_texts_collect(
+                records,
+                model=model,
+                neighbor_refs=use_neighbor_refs,
+                chunk_options=chunk_options,
+                skip_chunk_hashes=skip_hashes,
+            )
         
         manifest_ids = []
         try:
@@ -273,7 +294,8 @@ async def mining_upload(
             "success": True,
             "count": len(items),
             "items": items,
-            "manifest_ids": manifest_ids
+            "manifest_ids": manifest_ids,
+            "delta": use_delta,
         }
     
     except Exception as e:
@@ -420,9 +442,10 @@ async def kg_neighbors(
     node_id: str = Query(...),
     rel: Optional[str] = Query(default=None),
     dir: str = Query(default="both"),
-    limit: int = Query(default=200)
+    limit: int = Query(default=200),
+    depth: int = Query(default=1, ge=1, le=5)
 ):
-    """1-hop neighborhood of a node."""
+    """Neighborhood of a node (1 hop by default, up to `depth` hops)."""
     try:
         if not node_id.strip():
             return JSONResponse({"success": False, "message": "node_id required"}, status_code=400)
@@ -433,7 +456,10 @@ async def kg_neighbors(
             rels = [r.strip() for r in rel.split(",") if r.strip()]
         
         client = _get_qdrant_client()
-        data = client.neighbors(node_id=node_id, rels=rels, direction=direction, limit=limit)
+        if depth > 1:
+            data = client.neighborhood([node_id], depth=depth, rels=rels, direction=direction, limit=limit)
+        else:
+            data = client.neighbors(node_id=node_id, rels=rels, direction=direction, limit=limit)
         return {
             "success": True,
             "nodes": data.get("nodes", []),
@@ -950,6 +976,9 @@ async def clarification_answer(request: ClarificationAnswerRequest):
         tmp_dir.mkdir(parents=True, exist_ok=True)
         response_file = tmp_dir / f"clarification_{correlation_id}.txt"
         response_file.write_text(answer, encoding='utf-8')
+        # Wake in-process waiters (ask_user, orchestrator) instead of letting them poll
+        from backend.services.clarification_service import answer_notifier
+        answer_notifier.notify(correlation_id)
         logger.info(f"[Clarification] Answer received for {correlation_id}: {answer[:50]}...")
         return {"success": True, "correlation_id": correlation_id, "message": "Answer received"}
     except Exception as e:
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import contextlib
 from typing import Any, Dict, List, Tuple, Optional
 
 from fastapi import APIRouter, Request
@@ -12,6 +13,7 @@ from backend.core.db import (
     get_latest_rewrite_row_for_eval,
     get_latest_evaluation_by_checksum,
 )
+from backend.core import llm_cache
 from backend.core.llm import llm_apply_with_suggestions
 from backend.core.utils import sha256_text
 from backend.core.batch import ensure_evaluation_exists
@@ -106,7 +108,8 @@ async def apply_corrections_v2(request: Request) -> JSONResponse:
         evaluationId?: string,
         selectedSuggestions?: Atom[],
         mode?: "merge"|"split",
-        context?: {}
+        context?: {},
+        force?: bool   # LLM-Response-Cache umgehen, neue Umschreibung erzeugen
       }
     """
     try:
@@ -116,6 +119,7 @@ async def apply_corrections_v2(request: Request) -> JSONResponse:
         selected = data.get("selectedSuggestions") or data.get("selectedAtoms") or []
         mode = str(data.get("mode", "merge")).lower()
         context = data.get("context") or {}
+        force_flag = str(data.get("force", "")).lower() in ("1", "true", "yes")
 
         if not isinstance(selected, list):
             selected = []
@@ -133,14 +137,15 @@ async def apply_corrections_v2(request: Request) -> JSONResponse:
         if not (isinstance(original_text, str) and original_text.strip()):
             return JSONResponse(content={"error": "invalid_request", "message": "originalText fehlt"}, status_code=400)
 
-        if selected:
-            items = llm_apply_with_suggestions(original_text, context, selected, mode)
-        else:
-            try:
-                rewritten = str(llm_rewrite(original_text, context) or "").strip()
-            except Exception:
-                rewritten = ""
-            items = [{"redefinedRequirement": rewritten}] if rewritten else []
+        with llm_cache.bypass() if force_flag else contextlib.nullcontext():
+            if selected:
+                items = llm_apply_with_suggestions(original_text, context, selected, mode)
+            else:
+                try:
+                    rewritten = str(llm_rewrite(original_text, context) or "").strip()
+                except Exception:
+                    rewritten = ""
+                items = [{"redefinedRequirement": rewritten}] if rewritten else []
 
         results = []
         with conn:
@@ -11,7 +11,7 @@ from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import JSONResponse
 
 from backend.core import settings
-from backend.core.ingest import extract_texts, chunk_payloads
+from backend.core.ingest import extract_texts, chunk_payloads, spool_to_path
 # Absatzbasiertes Chunking (v2-Hilfsfunktion)
 from backend.api_v2 import build_chunks_absatz
 # Reuse v2-Helfer – wir verwenden die bereits etablierte Normalisierung/Speicherlogik
@@ -83,10 +83,11 @@ async def lx_extract_v2(
             # multipart: Dateien einlesen und in Records konvertieren
             raw_records: List[Dict[str, Any]] = []
             for f in files:
-                data = await f.read()
                 fname = f.filename or "upload"
                 ctype = f.content_type or ""
-                parts = extract_texts(fname, data, ctype)
+                # Upload blockweise auf Platte spoolen; PDFs werden seitenweise aus der Datei gelesen
+                with spool_to_path(f.file, os.path.splitext(fname)[1]) as path:
+                    parts = extract_texts(fname, path, ctype)
                 raw_records.extend(parts)
 
             # Chunking
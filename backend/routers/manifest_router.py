@@ -242,17 +242,10 @@ async def query_manifests(
 
             rows = conn.execute(query, params).fetchall()
 
-            # Convert to Pydantic models
+            # Convert to Pydantic models (bulk hydration: one query per related table)
             service = ManifestService()
-            manifests = []
-
-            for row in rows:
-                ctx = RequestContext(request_id=f"query-{row['requirement_id']}")
-                manifest = service.get_full_manifest(conn, row["requirement_id"], ctx=ctx)
-                if manifest:
-                    manifests.append(manifest)
-
-            return manifests
+            ctx = RequestContext(request_id="query-manifests")
+            return service.get_full_manifests(conn, rows, ctx=ctx)
 
         finally:
             conn.close()
@@ -7,7 +7,7 @@ from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import JSONResponse
 
-from backend.core.ingest import extract_texts
+from backend.core.ingest import extract_texts, spool_to_path
 from backend.api_v2_part2 import (
     _analyze_structure,
     _build_graph_from_components,
@@ -35,10 +35,11 @@ async def structure_analyze_endpoint_fastapi(
                 return JSONResponse(content={"error": "invalid_request", "message": "keine Dateien übergeben"}, status_code=400)
             parts = []
             for f in files:
-                data = await f.read()
                 fname = f.filename or "upload"
                 ctype = f.content_type or ""
-                parts.extend(extract_texts(fname, data, ctype))
+                # Upload blockweise auf Platte spoolen; PDFs werden seitenweise aus der Datei gelesen
+                with spool_to_path(f.file, os.path.splitext(fname)[1]) as path:
+                    parts.extend(extract_texts(fname, path, ctype))
             text = "\n\n".join([str(p.get("text") or "") for p in parts])
             # optional flag per form
             # use_wtpsplit wird bereits als Form-Parameter entgegengenommen
@@ -107,10 +108,11 @@ async def structure_graph_export_fastapi(
                 return JSONResponse(content={"error": "invalid_request", "message": "keine Dateien übergeben"}, status_code=400)
             parts = []
             for f in files:
-                data = await f.read()
                 fname = f.filename or "upload"
                 ctype = f.content_type or ""
-                parts.extend(extract_texts(fname, data, ctype))
+                # Upload blockweise auf Platte spoolen; PDFs werden seitenweise aus der Datei gelesen
+                with spool_to_path(f.file, os.path.splitext(fname)[1]) as path:
+                    parts.extend(extract_texts(fname, path, ctype))
             text = "\n\n".join([str(p.get("text") or "") for p in parts])
             comps = _analyze_structure(text)
         else:
@@ -1,5 +1,4 @@
 import asyncio
-import concurrent.futures as futures
 from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse, StreamingResponse, Response
@@ -8,12 +7,15 @@ import json
 import time
 
 from backend.core.batch import (
+    iter_fused,
     process_evaluations,
+    process_fused,
     process_rewrites,
     process_suggestions,
     ensure_evaluation_exists,
+    stream_rows,
 )
-from backend.core.db import get_db, load_criteria
+from backend.core.db import db_session, load_criteria
 from backend.core.llm import llm_rewrite, llm_suggest
 from backend.core import settings
 from backend import schemas
@@ -82,13 +84,16 @@ async def _read_json_tolerant(request: Request) -> Any:
 async def validate_suggest_v2(request: Request):
     """
     FastAPI-Port von validate_suggest:
-    - Erwartet Array[string] oder { items: string[] }
+    - Erwartet Array[string] oder { items: string[], force?: bool }
+    - force: LLM-Response-Cache umgehen und Vorschläge neu generieren
     - Antwort: { items: { REQ_n: { suggestions: Atom[] } } }
     """
     try:
         payload = await _read_json_tolerant(request)
+        force_flag = False
         if isinstance(payload, dict) and isinstance(payload.get("items"), list):
             items = payload.get("items")
+            force_flag = str(payload.get("force", "")).lower() in ("1", "true", "yes")
         else:
             items = payload
         if not isinstance(items, list) or not all(isinstance(x, str) for x in items):
@@ -101,7 +106,7 @@ async def validate_suggest_v2(request: Request):
         for idx, txt in enumerate(items, start=1):
             rows.append({"id": f"REQ_{idx}", "requirementText": txt, "context": "{}"})
 
-        sug_map = process_suggestions(rows)
+        sug_map = process_suggestions(rows, regenerate=force_flag)
         return {"items": sug_map}
     except Exception as e:
         return JSONResponse(content={"error": "internal_error", "message": str(e)}, status_code=500)
@@ -114,15 +119,21 @@ async def validate_suggest_v2(request: Request):
 async def validate_batch_v2(request: Request):
     """
     FastAPI-Port von validate_batch_optimized:
-    - Erwartet Array[string] ODER { items: string[], includeSuggestions?: bool }
+    - Erwartet Array[string] ODER { items: string[], includeSuggestions?: bool, fused?: bool, force?: bool }
+    - fused (Default: BATCH_FUSED_MODE): ein LLM-Call je Requirement für evaluate+suggest+rewrite
+    - force: LLM-Response-Cache umgehen, Vorschläge/Rewrites neu generieren
     - Antwort: Array von Ergebnissen mit Feldern:
       { id, originalText, correctedText, status, evaluation, score, verdict, suggestions? }
     """
     try:
         payload = await _read_json_tolerant(request)
-        include_flag = False
+        include_flag = force_flag = False
+        fused_flag = settings.BATCH_FUSED_MODE
         if isinstance(payload, dict):
             include_flag = str(payload.get("includeSuggestions", "")).lower() in ("1", "true", "yes")
+            force_flag = str(payload.get("force", "")).lower() in ("1", "true", "yes")
+            if "fused" in payload:
+                fused_flag = str(payload.get("fused", "")).lower() in ("1", "true", "yes")
             items = payload.get("items")
         else:
             items = payload
@@ -137,17 +148,21 @@ async def validate_batch_v2(request: Request):
         for idx, txt in enumerate(items, start=1):
             rows.append({"id": f"REQ_{idx}", "requirementText": txt, "context": "{}"})
 
-        eval_results = process_evaluations(rows)
-        rewrite_results = process_rewrites(rows)
-
         sug_map: Dict[str, Any] = {}
-        if include_flag:
+        if fused_flag:
+            eval_results = process_fused(rows, regenerate=force_flag)
+            rewrite_results = eval_results
+            sug_map = eval_results
+        else:
+            eval_results = process_evaluations(rows)
+            rewrite_results = process_rewrites(rows, regenerate=force_flag)
+
+        if include_flag and not fused_flag:
             try:
-                sug_map = process_suggestions(rows)
+                sug_map = process_suggestions(rows, regenerate=force_flag)
             except Exception:
                 sug_map = {}
 
-        conn = get_db()
         results: List[Dict[str, Any]] = []
         for idx, row in enumerate(rows, start=1):
             req_id = row["id"]
@@ -158,18 +173,7 @@ async def validate_batch_v2(request: Request):
             ev_id = eval_data.get("evaluationId")
             if ev_id:
                 try:
-                    detail_rows = conn.execute(
-                        "SELECT criterion_key, score, passed, feedback FROM evaluation_detail WHERE evaluation_id = ?",
-                        (ev_id,),
-                    ).fetchall()
-                    for d in detail_rows:
-                        evaluation_details.append(
-                            {
-                                "criterion": d["criterion_key"],
-                                "isValid": bool(d["passed"]),
-                                "reason": "" if d["passed"] else d["feedback"],
-                            }
-                        )
+                    evaluation_details = _evaluation_details(ev_id)
                 except Exception:
                     pass
 
@@ -194,12 +198,13 @@ async def validate_batch_v2(request: Request):
 
 @router.post("/api/v1/validate/suggest/stream")
 async def validate_suggest_stream_v2(request: Request) -> StreamingResponse:
-    """NDJSON-Stream: sendet pro Requirement Suggestions (Atoms) als einzelne JSON-Zeile."""
+    """NDJSON-Stream: sendet pro Requirement Suggestions (Atoms) als einzelne JSON-Zeile (force: ohne LLM-Cache)."""
     lg = logging.getLogger("app")
     payload = await _read_json_tolerant(request)
+    force_flag = False
     if isinstance(payload, dict):
         items = payload.get("items")
-        _ = str(payload.get("force", "")).lower() in ("1", "true", "yes")
+        force_flag = str(payload.get("force", "")).lower() in ("1", "true", "yes")
     else:
         items = payload
 
@@ -220,13 +225,14 @@ async def validate_suggest_stream_v2(request: Request) -> StreamingResponse:
             t0 = time.time()
             try:
                 try:
-                    criteria_keys = [c["key"] for c in load_criteria(get_db())] or DEFAULT_CRITERIA_KEYS
+                    with db_session() as conn:
+                        criteria_keys = [c["key"] for c in load_criteria(conn)] or DEFAULT_CRITERIA_KEYS
                 except Exception:
                     criteria_keys = DEFAULT_CRITERIA_KEYS
                 eval_id, _ = ensure_evaluation_exists(requirement_text, context_obj, criteria_keys)
                 atoms = llm_suggest(requirement_text, context_obj) or []
                 try:
-                    with get_db() as c2:
+                    with db_session() as c2:
                         for atom in atoms:
                             c2.execute(
                                 "INSERT INTO suggestion(evaluation_id, text, priority) VALUES (?, ?, ?)",
@@ -245,29 +251,68 @@ async def validate_suggest_stream_v2(request: Request) -> StreamingResponse:
             except Exception as e:
                 return {"event": "error", "reqId": rid, "message": str(e)}
 
-        with futures.ThreadPoolExecutor(max_workers=settings.MAX_PARALLEL) as ex:
-            futs = [ex.submit(worker, r) for r in rows]
-            for fut in futures.as_completed(futs):
-                processed += 1
-                try:
-                    result = fut.result()
-                except Exception as e:
-                    result = {"event": "error", "message": str(e)}
-                yield json.dumps(result, ensure_ascii=False) + "\n"
+        # Shared batch pool (backend/core/batch.py); worker() already reports per-row errors
+        for result in stream_rows(rows, worker, "suggest_stream", regenerate=force_flag):
+            processed += 1
+            yield json.dumps(result, ensure_ascii=False) + "\n"
 
         yield json.dumps({"event": "end", "processed": processed}, ensure_ascii=False) + "\n"
 
     return StreamingResponse(gen(), media_type="application/x-ndjson")
 
 
+def _evaluation_details(eval_id: str) -> List[Dict[str, Any]]:
+    """Per-criterion result lines of an evaluation (criterion, isValid, reason)."""
+    with db_session() as conn:
+        rows = conn.execute(
+            "SELECT criterion_key, score, passed, feedback FROM evaluation_detail WHERE evaluation_id = ?",
+            (eval_id,),
+        ).fetchall()
+    return [
+        {"criterion": d["criterion_key"], "isValid": bool(d["passed"]), "reason": "" if d["passed"] else d["feedback"]}
+        for d in rows
+    ]
+
+
+def _fused_line(rid: str, requirement_text: str, res: Dict[str, Any], include_flag: bool) -> Dict[str, Any]:
+    """NDJSON line of /validate/batch/stream for one iter_fused() result."""
+    if "error" in res:
+        return {"event": "error", "reqId": rid, "message": res["error"]}
+    try:
+        eval_details = _evaluation_details(res["evaluationId"])
+    except Exception:
+        eval_details = []
+    out = {
+        "reqId": rid,
+        "originalText": requirement_text,
+        "status": "accepted" if res.get("verdict") == "pass" else "rejected",
+        "score": res.get("score", 0.0),
+        "verdict": res.get("verdict", "fail"),
+        "redefinedRequirement": res.get("redefinedRequirement") or requirement_text,
+        "evaluation": eval_details,
+        "latencyMs": res.get("latencyMs"),
+    }
+    if include_flag:
+        out["suggestions"] = res.get("suggestions") or []
+    return out
+
+
 @router.post("/api/v1/validate/batch/stream")
 async def validate_batch_stream_v2(request: Request) -> StreamingResponse:
-    """NDJSON-Stream: sendet pro Requirement ein Ergebnis als einzelne JSON-Zeile."""
+    """
+    NDJSON-Stream: sendet pro Requirement ein Ergebnis als einzelne JSON-Zeile, sobald es fertig ist.
+    fused (Default: BATCH_FUSED_MODE): evaluate+suggest+rewrite in einem LLM-Call je Requirement.
+    force: LLM-Response-Cache umgehen, Vorschläge/Rewrites neu generieren.
+    """
     lg = logging.getLogger("app")
     payload = await _read_json_tolerant(request)
-    include_flag = False
+    include_flag = force_flag = False
+    fused_flag = settings.BATCH_FUSED_MODE
     if isinstance(payload, dict):
         include_flag = str(payload.get("includeSuggestions", "")).lower() in ("1", "true", "yes")
+        force_flag = str(payload.get("force", "")).lower() in ("1", "true", "yes")
+        if "fused" in payload:
+            fused_flag = str(payload.get("fused", "")).lower() in ("1", "true", "yes")
         items = payload.get("items")
     else:
         items = payload
@@ -278,6 +323,7 @@ async def validate_batch_stream_v2(request: Request) -> StreamingResponse:
         return StreamingResponse(bad(), media_type="application/x-ndjson")
 
     rows = [{"id": f"REQ_{i}", "requirementText": txt, "context": "{}"} for i, txt in enumerate(items, start=1)]
+    texts = {r["id"]: r["requirementText"] for r in rows}
 
     def gen():
         processed = 0
@@ -289,26 +335,16 @@ async def validate_batch_stream_v2(request: Request) -> StreamingResponse:
             t0 = time.time()
             try:
                 try:
-                    criteria_keys = [c["key"] for c in load_criteria(get_db())] or DEFAULT_CRITERIA_KEYS
+                    with db_session() as conn:
+                        criteria_keys = [c["key"] for c in load_criteria(conn)] or DEFAULT_CRITERIA_KEYS
                 except Exception:
                     criteria_keys = DEFAULT_CRITERIA_KEYS
                 eval_id, summ = ensure_evaluation_exists(requirement_text, context_obj, criteria_keys)
 
-                eval_details: List[Dict[str, Any]] = []
                 try:
-                    conn = get_db()
-                    detail_rows = conn.execute(
-                        "SELECT criterion_key, score, passed, feedback FROM evaluation_detail WHERE evaluation_id = ?",
-                        (eval_id,),
-                    ).fetchall()
-                    for d in detail_rows:
-                        eval_details.append({
-                            "criterion": d["criterion_key"],
-                            "isValid": bool(d["passed"]),
-                            "reason": "" if d["passed"] else d["feedback"],
-                        })
+                    eval_details = _evaluation_details(eval_id)
                 except Exception:
-                    pass
+                    eval_details = []
 
                 rewritten = llm_rewrite(requirement_text, context_obj)
 
@@ -317,7 +353,7 @@ async def validate_batch_stream_v2(request: Request) -> StreamingResponse:
                     try:
                         suggestions = llm_suggest(requirement_text, context_obj) or []
                         try:
-                            with get_db() as c2:
+                            with db_session() as c2:
                                 for atom in suggestions:
                                     c2.execute(
                                         "INSERT INTO suggestion(evaluation_id, text, priority) VALUES (?, ?, ?)",
@@ -345,15 +381,19 @@ async def validate_batch_stream_v2(request: Request) -> StreamingResponse:
             except Exception as e:
                 return {"event": "error", "reqId": rid, "message": str(e)}
 
-        with futures.ThreadPoolExecutor(max_workers=settings.MAX_PARALLEL) as ex:
-            futs = [ex.submit(worker, r) for r in rows]
-            for fut in futures.as_completed(futs):
-                processed += 1
-                try:
-                    result = fut.result()
-                except Exception as e:
-                    result = {"event": "error", "message": str(e)}
-                yield json.dumps(result, ensure_ascii=False) + "\n"
+        try:
+            if fused_flag:
+                # One LLM call per requirement (batch.iter_fused), lines in completion order
+                for rid, res in iter_fused(rows, regenerate=force_flag):
+                    processed += 1
+                    yield json.dumps(_fused_line(rid, texts[rid], res, include_flag), ensure_ascii=False) + "\n"
+            else:
+                # Shared batch pool (backend/core/batch.py); worker() already reports per-row errors
+                for result in stream_rows(rows, worker, "validate_stream", regenerate=force_flag):
+                    processed += 1
+                    yield json.dumps(result, ensure_ascii=False) + "\n"
+        except Exception as e:
+            yield json.dumps({"event": "error", "message": str(e)}, ensure_ascii=False) + "\n"
 
         yield json.dumps({"event": "end", "processed": processed}, ensure_ascii=False) + "\n"
 
@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import os
-from typing import Any, Dict, List, Optional
+import json
+from typing import Optional
 
 from fastapi import APIRouter, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from backend.core import settings
 # Service-Layer
@@ -31,6 +31,9 @@ def vs_search(vector, top_k: int, collection_name: str):
 def fetch_window_by_source_and_index(source: str, start: int, end: int):
     return _vector_service._vs.fetch_window_by_source_and_index(source, int(start), int(end))
 
+def iter_source_chunks(source: str):
+    return _vector_service.iter_source(source)
+
 def build_embeddings(texts, model: str = None):
     return _vector_service._emb.build_embeddings(list(texts), model=model)
 
@@ -119,46 +122,39 @@ def vector_reset_get_v2(
 
 
 @router.get("/api/v1/vector/source/full")
-def vector_source_full_v2(source: Optional[str] = Query(None)) -> JSONResponse:
+def vector_source_full_v2(
+    request: Request,
+    source: Optional[str] = Query(None),
+    format: Optional[str] = Query(None),
+):
     """
     Liefert alle Chunks eines sourceFile zusammen mit aggregiertem Text.
     Response: { sourceFile, chunks: [{chunkIndex,text}], text }
+
+    Mit format=ndjson (oder Accept: application/x-ndjson) werden die Chunks als
+    NDJSON gestreamt – eine Zeile {chunkIndex,text} je Chunk, zuletzt
+    {"event":"end","sourceFile","count"}; Speicherbedarf unabhängig von der Dokumentgröße.
     """
     try:
         if not isinstance(source, str) or not source.strip():
             return JSONResponse(content={"error": "invalid_request", "message": "source fehlt"}, status_code=400)
 
-        window = 256
-        start = 0
-        out_chunks: List[Dict[str, Any]] = []
-        seen = set()
-        while True:
-            batch = fetch_window_by_source_and_index(source, start, start + window)
-            if not batch:
-                break
-            added = 0
-            for c in batch:
-                p = c.get("payload") or {}
-                ci = p.get("chunkIndex")
+        as_ndjson = (format or "").strip().lower() == "ndjson" or "application/x-ndjson" in (request.headers.get("accept") or "").lower()
+        if as_ndjson:
+            def gen():
+                count = 0
                 try:
-                    ci = int(ci)
-                except Exception:
-                    ci = None
-                t = str(p.get("text") or "")
-                if ci is None:
-                    continue
-                if ci in seen:
-                    continue
-                seen.add(ci)
-                out_chunks.append({"chunkIndex": ci, "text": t})
-                added += 1
-            if added == 0:
-                break
-            start += window + 1
-            if len(seen) > 5000:
-                break
-
-        out_chunks.sort(key=lambda x: (x["chunkIndex"] if x["chunkIndex"] is not None else 0))
+                    for c in iter_source_chunks(source):
+                        count += 1
+                        yield json.dumps(c, ensure_ascii=False) + "\n"
+                except Exception as e:
+                    yield json.dumps({"event": "error", "message": str(e)}, ensure_ascii=False) + "\n"
+                    return
+                yield json.dumps({"event": "end", "sourceFile": source, "count": count}, ensure_ascii=False) + "\n"
+
+            return StreamingResponse(gen(), media_type="application/x-ndjson")
+
+        out_chunks = list(iter_source_chunks(source))
         full_text = "\n".join([c["text"] for c in out_chunks if c["text"]])
         return JSONResponse(content={"sourceFile": source, "chunks": out_chunks, "text": full_text}, status_code=200)
     except Exception as e:
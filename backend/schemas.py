@@ -44,6 +44,7 @@ class EvidenceReference(BaseModel):
     sha1: Optional[str] = Field(default=None, description="SHA1 hash of source document (from ChunkMiner)")
     chunk_index: Optional[int] = Field(default=None, description="Position in chunked document (0-based)")
     is_neighbor: bool = Field(default=False, description="Flag indicating ±1 chunk context (neighbor evidence)")
+    chunk_hash: Optional[str] = Field(default=None, description="Content hash of the evidence chunk (delta ingest/mining)")
     evidence_metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional evidence metadata (JSON)")
 
 
@@ -17,7 +17,7 @@ Hinweise
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Mapping, Optional, Sequence
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
 
 from .ports import (
     EmbeddingsPort,
@@ -38,6 +38,7 @@ from backend.core.vector_store import (
     upsert_points as _vs_upsert_points,
     search as _vs_search,
     fetch_window_by_source_and_index as _vs_fetch_window_by_source_and_index,
+    iter_source_chunks as _vs_iter_source_chunks,
 )
 # DB Functions
 from backend.core.db import get_db as _get_db, load_criteria as _db_load_criteria
@@ -185,6 +186,21 @@ class VectorStoreAdapter(VectorStorePort):
                 },
             )
 
+    def iter_source_chunks(
+        self,
+        source: str,
+        *,
+        ctx: Optional[RequestContext] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        try:
+            yield from _vs_iter_source_chunks(source)
+        except Exception as e:
+            raise ServiceError(
+                "vector_source_read_failed",
+                "Failed to read chunks of source",
+                details={"request_id": safe_request_id(ctx), "source": source, "error": str(e)},
+            )
+
 
 class PersistenceAdapter(PersistencePort):
     """Adapter für PersistencePort via backend_app.db"""
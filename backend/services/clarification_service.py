@@ -13,17 +13,112 @@ Part of the Requirements-Management-System.
 """
 from __future__ import annotations
 
+import asyncio
+import itertools
 import json
 import logging
 import sqlite3
+import threading
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
 
 from backend.core import db as _db
 
 logger = logging.getLogger("backend.services.clarification_service")
 
 
+class AnswerNotifier:
+    """
+    In-process wakeup channel for clarification answers.
+
+    Keys are validation ids (clarification_question.validation_id) or SSE
+    correlation ids. Waiters take a snapshot() before checking the database
+    and then wait() on it, so an answer that lands in between wakes them
+    immediately. Waiting costs nothing while idle; cross-process setups rely
+    on the caller's timeout as a DB/file fallback check.
+    """
+
+    _MAX_KEYS = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self._versions: Dict[str, int] = {}
+        self._waiters: Dict[str, Set[Callable[[], None]]] = {}
+
+    def snapshot(self, keys: Iterable[Optional[str]]) -> Dict[str, int]:
+        """Current versions of keys (empty keys are ignored)."""
+        with self._lock:
+            return {k: self._versions.get(k, 0) for k in keys if k}
+
+    def notify(self, key: Optional[str]) -> None:
+        """Signal a new answer/skip for key and wake all its waiters."""
+        if not key:
+            return
+        with self._lock:
+            self._versions[key] = next(self._counter)
+            if len(self._versions) > self._MAX_KEYS:
+                # Globally increasing versions: a dropped key only causes a spurious wakeup
+                for k in [k for k in self._versions if k not in self._waiters][: self._MAX_KEYS // 2]:
+                    del self._versions[k]
+            wakers = list(self._waiters.get(key, ()))
+        for wake in wakers:
+            wake()
+
+    def _register(self, snapshot: Dict[str, int], wake: Callable[[], None]) -> bool:
+        """Register wake for all keys; returns False if a key already changed."""
+        with self._lock:
+            if any(self._versions.get(k, 0) != v for k, v in snapshot.items()):
+                return False
+            for k in snapshot:
+                self._waiters.setdefault(k, set()).add(wake)
+            return True
+
+    def _unregister(self, snapshot: Dict[str, int], wake: Callable[[], None]) -> None:
+        with self._lock:
+            for k in snapshot:
+                waiters = self._waiters.get(k)
+                if waiters is not None:
+                    waiters.discard(wake)
+                    if not waiters:
+                        del self._waiters[k]
+
+    async def wait(self, snapshot: Dict[str, int], timeout: Optional[float] = None) -> bool:
+        """Wait until any key in snapshot changes. Returns False on timeout."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        def wake() -> None:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # loop already closed
+
+        if not self._register(snapshot, wake):
+            return True
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._unregister(snapshot, wake)
+
+    def wait_sync(self, snapshot: Dict[str, int], timeout: Optional[float] = None) -> bool:
+        """Blocking variant of wait() for worker threads."""
+        event = threading.Event()
+        if not self._register(snapshot, event.set):
+            return True
+        try:
+            return event.wait(timeout)
+        finally:
+            self._unregister(snapshot, event.set)
+
+
+# Process-wide channel, fired by ClarificationService and /api/clarification/answer
+answer_notifier = AnswerNotifier()
+
+
 class ClarificationService:
     """
     Service for managing clarification questions.
@@ -290,6 +385,8 @@ class ClarificationService:
                     (applied_text, question_id)
                 )
         
+        answer_notifier.notify(question.get("validation_id"))
+
         # Return updated question
         return self.get_question_by_id(conn, question_id)
     
@@ -321,7 +418,10 @@ class ClarificationService:
         )
         
         logger.info(f"Question {question_id} skipped")
-        return self.get_question_by_id(conn, question_id)
+        updated = self.get_question_by_id(conn, question_id)
+        if updated:
+            answer_notifier.notify(updated.get("validation_id"))
+        return updated
     
     def expire_old_questions(
         self,
@@ -543,4 +643,4 @@ class ClarificationService:
         return d
 
 
-__all__ = ["ClarificationService"]
\ No newline at end of file
+__all__ = ["ClarificationService", "AnswerNotifier", "answer_notifier"]
\ No newline at end of file
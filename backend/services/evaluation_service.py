@@ -24,6 +24,7 @@ from .adapters import EmbeddingsAdapter, PersistenceAdapter
 from .adapters import LLMAdapter
 from backend.core import utils as _utils
 from backend.core import settings as _settings
+from backend.core.llm_governor import llm_priority
 
 # All 9 quality criteria (fallback when no criteria specified)
 DEFAULT_CRITERIA_KEYS = [
@@ -243,12 +244,14 @@ class EvaluationService:
             max_workers = min(len(batches), int(os.environ.get("MAX_PARALLEL", "5")))
             
             def process_batch(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-                return self._llm.evaluate_batch(
-                    batch,
-                    crit_keys,
-                    context=dict(context or {}),
-                    ctx=ctx,
-                )
+                # Batch-Priorität im globalen LLM-Governor (Pool-Threads erben keinen Kontext)
+                with llm_priority("batch"):
+                    return self._llm.evaluate_batch(
+                        batch,
+                        crit_keys,
+                        context=dict(context or {}),
+                        ctx=ctx,
+                    )
             
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
                 futures = [executor.submit(process_batch, batch) for batch in batches]
@@ -39,7 +39,7 @@ def create_manifests_from_chunkminer(
               "req_id": "REQ-<sha1[:6]>-<chunkIndex:03d>",
               "title": "Requirement text",
               "tag": "functional|security|performance|ux|ops",
-              "evidence_refs": [{"sourceFile": "...", "sha1": "...", "chunkIndex": 0}]
+              "evidence_refs": [{"sourceFile": "...", "sha1": "...", "chunkIndex": 0, "chunkHash": "..."}]
             }
         ctx: Request context (optional)
 
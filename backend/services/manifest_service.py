@@ -18,6 +18,7 @@ Operations:
 - update_stage() - Add/complete processing stages
 - record_split() - Track AtomicityAgent splits
 - get_full_manifest() - Retrieve complete manifest with relationships
+- get_full_manifests() - Bulk hydration for a page of manifests
 - get_timeline() - Get processing history
 - get_children() - Get split children
 """
@@ -129,7 +130,7 @@ class ManifestService:
             source_file_sha1: Document SHA1 hash (optional)
             chunk_index: Position in chunked document (optional)
             metadata: Additional metadata (optional)
-            evidence_refs: List of evidence references [{sourceFile, sha1, chunkIndex, isNeighbor?}]
+            evidence_refs: List of evidence references [{sourceFile, sha1, chunkIndex, chunkHash?, isNeighbor?}]
             ctx: Request context (optional)
 
         Returns:
@@ -166,6 +167,7 @@ class ManifestService:
                         chunk_index=evidence.get("chunkIndex"),
                         is_neighbor=evidence.get("isNeighbor", False),
                         evidence_metadata=evidence.get("metadata"),
+                        chunk_hash=evidence.get("chunkHash"),
                     )
 
             # Add initial "input" stage
@@ -474,8 +476,71 @@ class ManifestService:
         if not manifest_row:
             return None
 
-        # Get processing stages
-        stages = _db.get_processing_stages(conn, requirement_id)
+        eval_data = None
+        current_text = manifest_row["current_text"]
+        if current_text:
+            eval_data = _db.get_evaluation_for_requirement(conn, current_text)
+
+        return self._build_manifest(
+            manifest_row,
+            _db.get_processing_stages(conn, requirement_id),
+            _db.get_evidence_refs(conn, requirement_id),
+            _db.get_split_children(conn, requirement_id),
+            eval_data,
+        )
+
+    def get_full_manifests(
+        self,
+        conn: sqlite3.Connection,
+        manifest_rows: Sequence[sqlite3.Row],
+        *,
+        ctx: Optional[RequestContext] = None,
+    ) -> List[RequirementManifest]:
+        """
+        Bulk variant of get_full_manifest() for a page of manifest rows.
+
+        Loads stages, evidence, split children and evaluations for all rows with
+        one IN (...) query per table instead of ~5 queries per manifest.
+
+        Args:
+            conn: SQLite connection
+            manifest_rows: requirement_manifest rows (columns as in get_manifest_by_id)
+            ctx: Request context (optional)
+
+        Returns:
+            RequirementManifest list in the order of manifest_rows
+        """
+        ids = [r["requirement_id"] for r in manifest_rows]
+        if not ids:
+            return []
+        stages = _db.get_processing_stages_bulk(conn, ids)
+        evidence = _db.get_evidence_refs_bulk(conn, ids)
+        children = _db.get_split_children_bulk(conn, ids)
+        checksum_of = {
+            r["requirement_id"]: sha256_text(r["current_text"]) for r in manifest_rows if r["current_text"]
+        }
+        evaluations = _db.get_evaluations_for_checksums(conn, list(checksum_of.values()))
+
+        return [
+            self._build_manifest(
+                r,
+                stages.get(r["requirement_id"], []),
+                evidence.get(r["requirement_id"], []),
+                children.get(r["requirement_id"], []),
+                evaluations.get(checksum_of.get(r["requirement_id"], "")),
+            )
+            for r in manifest_rows
+        ]
+
+    def _build_manifest(
+        self,
+        manifest_row: sqlite3.Row,
+        stages: Sequence[sqlite3.Row],
+        evidence: Sequence[sqlite3.Row],
+        children_rows: Sequence[sqlite3.Row],
+        eval_data: Optional[Dict[str, Any]],
+    ) -> RequirementManifest:
+        """Assemble a RequirementManifest from already loaded rows."""
         processing_stages = [
             ProcessingStage(
                 id=s["id"],
@@ -498,42 +563,34 @@ class ManifestService:
             for s in stages
         ]
 
-        # Get evidence references
-        evidence = _db.get_evidence_refs(conn, requirement_id)
         evidence_refs = [
             EvidenceReference(
                 source_file=e["source_file"],
                 sha1=e["sha1"],
                 chunk_index=e["chunk_index"],
                 is_neighbor=bool(e["is_neighbor"]),
+                chunk_hash=e["chunk_hash"],
                 evidence_metadata=json.loads(e["evidence_metadata"]) if e["evidence_metadata"] else {},
             )
             for e in evidence
         ]
 
-        # Get split children
-        children_rows = _db.get_split_children(conn, requirement_id)
         split_children = [c["child_id"] for c in children_rows]
 
-        # Get evaluation criteria details
         evaluation_details = []
-        current_text = manifest_row["current_text"]
-        if current_text:
-            eval_data = _db.get_evaluation_for_requirement(conn, current_text)
-            if eval_data and eval_data.get("details"):
-                evaluation_details = [
-                    EvaluationDetail(
-                        criterion=d.get("criterion", ""),
-                        isValid=d.get("passed", False),
-                        passed=d.get("passed", False),
-                        score=float(d.get("score", 0.0)),
-                        reason=d.get("feedback", ""),
-                        feedback=d.get("feedback", ""),
-                    )
-                    for d in eval_data["details"]
-                ]
+        if eval_data and eval_data.get("details"):
+            evaluation_details = [
+                EvaluationDetail(
+                    criterion=d.get("criterion", ""),
+                    isValid=d.get("passed", False),
+                    passed=d.get("passed", False),
+                    score=float(d.get("score", 0.0)),
+                    reason=d.get("feedback", ""),
+                    feedback=d.get("feedback", ""),
+                )
+                for d in eval_data["details"]
+            ]
 
-        # Build manifest
         return RequirementManifest(
             requirement_id=manifest_row["requirement_id"],
             requirement_checksum=manifest_row["requirement_checksum"],
@@ -623,12 +680,13 @@ class ManifestService:
         # Get split children
         children_rows = _db.get_split_children(conn, parent_id)
 
-        # Get child manifests
-        children_manifests = []
-        for child_row in children_rows:
-            child_manifest = self.get_full_manifest(conn, child_row["child_id"], ctx=ctx)
-            if child_manifest:
-                children_manifests.append(child_manifest)
+        # Get child manifests (bulk hydration)
+        manifest_rows = _db.get_manifests_by_ids(conn, [c["child_id"] for c in children_rows])
+        children_manifests = self.get_full_manifests(
+            conn,
+            [manifest_rows[c["child_id"]] for c in children_rows if c["child_id"] in manifest_rows],
+            ctx=ctx,
+        )
 
         # Get split relationships
         split_relationships = [
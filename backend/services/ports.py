@@ -20,7 +20,7 @@ Nutzung
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Mapping, Optional, Protocol, Sequence, Tuple
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Protocol, Sequence, Tuple
 
 
 # -----------------------
@@ -113,6 +113,15 @@ class VectorStorePort(Protocol):
         """Fenster (start..end) aus einer Quelle lesen, typ. für Dokument-Preview."""
         ...
 
+    def iter_source_chunks(
+        self,
+        source: str,
+        *,
+        ctx: Optional[RequestContext] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Alle Chunks einer Quelle nach chunkIndex sortiert streamen: {chunkIndex, text}."""
+        ...
+
 
 # -----------------------
 # Persistence-Port (DB)
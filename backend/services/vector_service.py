@@ -18,7 +18,7 @@ Hinweis
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, Optional
 
 from .ports import EmbeddingsPort, VectorStorePort, RequestContext, ServiceError, safe_request_id
 from .adapters import EmbeddingsAdapter, VectorStoreAdapter
@@ -69,39 +69,14 @@ class VectorService:
     # Source Full (Dokument-Fenster)
     # -----------------------
 
-    def source_full(self, source: str, *, ctx: Optional[RequestContext] = None, window: int = 256, limit: int = 5000) -> Dict[str, Any]:
+    def iter_source(self, source: str, *, ctx: Optional[RequestContext] = None) -> Iterator[Dict[str, Any]]:
+        """Chunks eines sourceFile nach chunkIndex (ein Scroll, seitenweise): {chunkIndex, text}."""
         if not isinstance(source, str) or not source.strip():
             raise ServiceError("invalid_request", "source fehlt", details={"request_id": safe_request_id(ctx)})
-        start = 0
-        out_chunks: List[Dict[str, Any]] = []
-        seen = set()
-        while True:
-            batch = self._vs.fetch_window_by_source_and_index(source, start, start + window, ctx=ctx)
-            if not batch:
-                break
-            added = 0
-            for c in batch:
-                p = dict(c.get("payload") or {})
-                ci = p.get("chunkIndex")
-                try:
-                    ci = int(ci)
-                except Exception:
-                    ci = None
-                t = str(p.get("text") or "")
-                if ci is None:
-                    continue
-                if ci in seen:
-                    continue
-                seen.add(ci)
-                out_chunks.append({"chunkIndex": ci, "text": t})
-                added += 1
-            if added == 0:
-                break
-            start += window + 1
-            if len(seen) > limit:
-                break
-
-        out_chunks.sort(key=lambda x: (x["chunkIndex"] if x["chunkIndex"] is not None else 0))
+        return self._vs.iter_source_chunks(source, ctx=ctx)
+
+    def source_full(self, source: str, *, ctx: Optional[RequestContext] = None) -> Dict[str, Any]:
+        out_chunks = list(self.iter_source(source, ctx=ctx))
         full_text = "\n".join([c["text"] for c in out_chunks if c["text"]])
         return {"sourceFile": source, "chunks": out_chunks, "text": full_text}
 
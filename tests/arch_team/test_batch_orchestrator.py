@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import time
+
+from arch_team.agents import requirement_orchestrator as ro
+
+
+def test_process_batch_runs_concurrently_in_input_order(monkeypatch):
+    active = 0
+    peak = 0
+
+    async def fake_process(self, requirement_id, requirement_text, context=None, session_id=None):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await self._stream_event("evaluation_started", {"requirement_id": requirement_id})
+        # Spätere Requirements sind schneller fertig → Reihenfolge muss trotzdem stimmen
+        await asyncio.sleep(0.1 if requirement_id.endswith(("0", "1")) else 0.05)
+        active -= 1
+        result = ro.RequirementValidationResult(requirement_id, requirement_text)
+        result.passed = requirement_id != "R3"
+        return result
+
+    monkeypatch.setattr(ro.RequirementOrchestrator, "process", fake_process)
+    events = []
+
+    async def callback(event_type, data):
+        events.append((event_type, data))
+
+    batch = ro.BatchOrchestrator(stream_callback=callback, max_concurrent=3)
+    reqs = [{"id": f"R{i}", "text": f"Req {i}"} for i in range(9)] + [{"id": "leer", "text": ""}]
+
+    t0 = time.monotonic()
+    results = asyncio.run(batch.process_batch(reqs, session_id="s1"))
+    elapsed = time.monotonic() - t0
+
+    assert [r.requirement_id for r in results] == [f"R{i}" for i in range(9)]
+    assert peak == 3
+    assert elapsed < 0.4  # sequenziell wären es ≥ 0.55 s
+
+    started = {d["requirement_id"]: d["batch_index"] for t, d in events if t == "evaluation_started"}
+    assert started == {f"R{i}": i for i in range(9)}
+    assert events[0] == ("batch_started", {"total": 9, "concurrency": 3})
+    assert [d["completed"] for t, d in events if t == "batch_progress"] == list(range(1, 10))
+    done = events[-1]
+    assert done[0] == "batch_completed" and done[1]["passed"] == 8 and done[1]["failed"] == 1
+
+
+def test_blocking_batch_evaluator_does_not_serialize_workers(monkeypatch):
+    import threading
+
+    from arch_team.agents import batch_criteria_evaluator as bce
+    from backend.core import llm_governor
+
+    calls = []
+
+    class BlockingEvaluator(bce.BatchCriteriaEvaluator):
+        def _get_client(self):
+            return object()
+
+        def _complete(self, client, prompt, max_tokens, keys=()):
+            calls.append((threading.current_thread() is threading.main_thread(), llm_governor.current_priority()))
+            time.sleep(0.1)  # blockierender Sync-Call wie beim OpenAI-Client
+            return json.dumps({c: {"score": 0.9} for c in bce.CRITERIA_DEFINITIONS})
+
+    async def fake_process(self, requirement_id, requirement_text, context=None, session_id=None):
+        result = ro.RequirementValidationResult(requirement_id, requirement_text)
+        result.final_scores = await self._score_criteria(requirement_text, {}, list(self.specialists))
+        return result
+
+    monkeypatch.setattr(ro, "USE_BATCH_EVALUATOR", True)
+    monkeypatch.setattr(ro, "get_batch_evaluator", lambda: BlockingEvaluator(model="m"))
+    monkeypatch.setattr(ro.RequirementOrchestrator, "process", fake_process)
+
+    batch = ro.BatchOrchestrator(max_concurrent=4)
+    t0 = time.monotonic()
+    results = asyncio.run(batch.process_batch([{"id": f"R{i}", "text": f"Req {i}"} for i in range(4)]))
+    elapsed = time.monotonic() - t0
+
+    assert all(r.final_scores["clarity"] == 0.9 for r in results)
+    assert elapsed < 0.3  # auf dem Loop-Thread wären es ≥ 0.4 s
+    assert calls == [(False, "batch")] * 4
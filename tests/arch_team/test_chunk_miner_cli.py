@@ -94,4 +94,52 @@ async def test_chunk_miner_cli_neighbor_evidence(tmp_path, monkeypatch):
     assert count >= 1
 
     # Mindestens ein DTO sollte mehr als 1 evidence_ref erhalten haben (Nachbarschaft)
-    assert any(isinstance(dto.get("evidence_refs"), list) and len(dto["evidence_refs"]) > 1 for dto in captured)
\ No newline at end of file
+    assert any(isinstance(dto.get("evidence_refs"), list) and len(dto["evidence_refs"]) > 1 for dto in captured)
+
+def test_chunk_miner_concurrent_mining_keeps_chunk_order(monkeypatch):
+    """
+    Paralleles Mining (max_concurrency>1) muss die Chunk-Reihenfolge und die req_id-Suffixe
+    deterministisch beibehalten, auch wenn spätere Chunks früher fertig werden.
+    """
+    import random
+    import time
+
+    import arch_team.agents.chunk_miner as cm
+
+    payloads = [
+        {"text": f"The system shall do thing {i}.", "payload": {"sha1": "abcdef123", "sourceFile": "spec.txt", "chunkIndex": i}}
+        for i in range(12)
+    ]
+    monkeypatch.setattr(cm, "extract_texts_many", lambda *a, **k: [{"text": "x", "meta": {}}])
+    monkeypatch.setattr(cm, "chunk_payloads", lambda *a, **k: payloads)
+
+    def fake_create(self, messages, temperature=None, model=None, tools=None, **kwargs):
+        time.sleep(random.uniform(0, 0.02))
+        return '{"items":[{"title":"first","tag":"functional"},{"title":"second","tag":"functional"}]}'
+
+    monkeypatch.setattr(cm.OpenAIAdapter, "create", fake_create, raising=True)
+
+    agent = cm.ChunkMinerAgent(source="test")
+    items = agent.mine_files_or_texts_collect(["ignored"], neighbor_refs=True, max_concurrency=6)
+
+    assert [it["req_id"] for it in items] == [
+        f"REQ-abcdef-{i:03d}{suffix}" for i in range(12) for suffix in ("", "-a")
+    ]
+    # Nachbarschaftsbelege: erster Chunk hat 1 Nachbarn, mittlere 2
+    assert len(items[0]["evidence_refs"]) == 2
+    assert len(items[2]["evidence_refs"]) == 3
+
+
+def test_chunk_miner_passes_spooled_paths_to_extraction(monkeypatch, tmp_path):
+    """Gespoolte Uploads ({filename, path}) gehen als Pfad an die Extraktion, ohne Bytes im Speicher."""
+    import arch_team.agents.chunk_miner as cm
+
+    seen = []
+    monkeypatch.setattr(cm, "extract_texts_many", lambda files, **k: seen.extend(files) or [])
+    spooled = tmp_path / "spec.pdf"
+    spooled.write_bytes(b"%PDF")
+
+    assert cm.ChunkMinerAgent(source="test").mine_files_or_texts_collect(
+        [{"filename": "spec.pdf", "path": spooled, "content_type": "application/pdf"}]
+    ) == []
+    assert seen == [{"filename": "spec.pdf", "path": spooled, "content_type": "application/pdf"}]
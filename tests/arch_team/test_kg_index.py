@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+from arch_team.memory import kg_index
+from arch_team.memory.kg_index import KGAdjacencyIndex
+
+
+def _edge(eid, fr, to, rel="NEXT"):
+    return {"edge_id": eid, "from_node_id": fr, "to_node_id": to, "rel": rel}
+
+
+def _ids(payloads, key):
+    return sorted(p[key] for p in payloads)
+
+
+@pytest.fixture()
+def idx():
+    i = KGAdjacencyIndex(compact_threshold=2)
+    i.add_nodes([{"node_id": n, "name": n} for n in "ABCDX"])
+    i.add_edges([_edge("AB", "A", "B"), _edge("BC", "B", "C"), _edge("CD", "C", "D"), _edge("XA", "X", "A", "TAG")])
+    return i
+
+
+def test_neighbors_degree_and_rel_filter(idx):
+    data = idx.neighbors("A")
+    assert _ids(data["edges"], "edge_id") == ["AB", "XA"]
+    assert _ids(data["nodes"], "node_id") == ["A", "B", "X"]
+    assert idx.degree("A") == 2 and idx.degree("A", "out") == 1 and idx.degree("D", "out") == 0
+    assert _ids(idx.neighbors("A", rels=["TAG"])["edges"], "edge_id") == ["XA"]
+    assert idx.neighbors("A", rels=["UNKNOWN"]) == {"nodes": [], "edges": []}
+
+
+def test_neighborhood_subgraph_and_export(idx):
+    data = idx.neighborhood(["A"], depth=2, direction="out")
+    assert _ids(data["edges"], "edge_id") == ["AB", "BC"]
+    assert _ids(idx.neighborhood(["A"], depth=5)["edges"], "edge_id") == ["AB", "BC", "CD", "XA"]
+    assert len(idx.neighborhood(["A"], depth=5, limit=2)["edges"]) == 2
+
+    sub = idx.subgraph(["A", "B", "C"])
+    assert _ids(sub["edges"], "edge_id") == ["AB", "BC"]
+    assert _ids(sub["nodes"], "node_id") == ["A", "B", "C"]
+
+    exp = idx.export()
+    assert len(exp["nodes"]) == 5 and len(exp["edges"]) == 4
+
+
+def test_incremental_update_moves_edge_before_and_after_compaction():
+    i = KGAdjacencyIndex(compact_threshold=1000)
+    i.add_edges([_edge("e1", "A", "B")])
+    assert i.degree("B", "in") == 1
+    # gleiche edge_id mit neuem Ziel: alte Kante per Tombstone entfernt (noch im Delta)
+    i.add_edges([_edge("e1", "A", "C")])
+    assert i.degree("B", "in") == 0 and i.degree("C", "in") == 1
+    i.compact()
+    i.add_edges([_edge("e1", "A", "D")])
+    assert i.degree("C", "in") == 0 and i.degree("D", "in") == 1 and i.degree("A", "out") == 1
+    i.compact()
+    assert i.counts() == (0, 1)
+
+
+def test_snapshot_roundtrip(idx, tmp_path):
+    path = str(tmp_path / "kg" / "index.json")
+    idx.save(path)
+    other = KGAdjacencyIndex()
+    assert other.load(path)
+    assert other.counts() == idx.counts() == (5, 4)
+    assert _ids(other.neighbors("B")["edges"], "edge_id") == ["AB", "BC"]
+    assert not KGAdjacencyIndex().load(str(tmp_path / "missing.json"))
+
+
+def test_client_serves_traversals_from_index_after_upserts(monkeypatch):
+    qdrant_client = pytest.importorskip("qdrant_client")
+    from arch_team.memory.qdrant_kg import QdrantKGClient
+
+    monkeypatch.setattr(kg_index, "_indexes", {})
+    c = QdrantKGClient(qdrant_url="http://unused:2", nodes_collection="n_idx", edges_collection="e_idx", dim=3)
+    c._qdrant = qdrant_client.QdrantClient(location=":memory:")
+    c._embed_texts = lambda texts: [[1.0, 0.0, 0.0] for _ in texts]
+    c.upsert_nodes([{"id": n, "type": "T", "name": n} for n in "AB"])
+    c.upsert_edges([{"id": "AB", "from": "A", "to": "B", "rel": "NEXT"}])
+
+    assert _ids(c.neighbors("A")["edges"], "edge_id") == ["AB"]  # Index aus Qdrant aufgebaut
+    c.upsert_nodes([{"id": "C", "type": "T", "name": "C"}])
+    c.upsert_edges([{"id": "BC", "from": "B", "to": "C", "rel": "NEXT"}])
+
+    calls = []
+    monkeypatch.setattr(c._qdrant, "scroll", lambda *a, **k: calls.append(1))
+    assert _ids(c.neighborhood(["A"], depth=2)["edges"], "edge_id") == ["AB", "BC"]
+    assert c.degree("B") == 2
+    assert len(c.export_all()["nodes"]) == 3
+    assert calls == []
+
+
+def test_client_rebuilds_stale_index_and_snapshots_lazily(monkeypatch, tmp_path):
+    qdrant_client = pytest.importorskip("qdrant_client")
+    from qdrant_client import models
+
+    from arch_team.memory.qdrant_kg import QdrantKGClient, _point_id
+
+    monkeypatch.setattr(kg_index, "_indexes", {})
+    snap = tmp_path / "kg.json"
+    c = QdrantKGClient(qdrant_url="http://unused:3", nodes_collection="n_st", edges_collection="e_st", dim=3)
+    c._qdrant = qdrant_client.QdrantClient(location=":memory:")
+    c._embed_texts = lambda texts: [[1.0, 0.0, 0.0] for _ in texts]
+    c.index_snapshot = str(snap)
+    c.upsert_edges([{"id": "AB", "from": "A", "to": "B", "rel": "NEXT"}])
+    assert c.degree("A") == 1  # Index gebaut, Snapshot geschrieben
+    written = snap.read_text(encoding="utf-8")
+
+    c.upsert_edges([{"id": "AC", "from": "A", "to": "C", "rel": "NEXT"}])
+    assert snap.read_text(encoding="utf-8") == written  # kein Snapshot je Upsert
+    assert kg_index.peek_kg_index(c.qdrant_url, "n_st", "e_st").dirty
+
+    # Schreibzugriff eines anderen Workers direkt in Qdrant
+    payload = {"edge_id": "AD", "from_node_id": "A", "to_node_id": "D", "rel": "NEXT"}
+    c._qdrant.upsert("e_st", points=[models.PointStruct(id=_point_id("AD"), vector=[1.0, 0.0, 0.0], payload=payload)])
+    assert c.degree("A") == 2  # innerhalb von KG_INDEX_CHECK_S noch der alte Stand
+    c.index_check_s = 0
+    c.degree("A")  # stößt den Rebuild im Hintergrund an
+    c._index_rebuild.join(5)
+    assert c.degree("A") == 3
+
+    # Altersgrenze: der Request wartet nicht auf einen langsamen Scroll
+    gate = threading.Event()
+    scroll = c._scroll_all
+    monkeypatch.setattr(c, "_scroll_all", lambda coll: gate.wait(5) and scroll(coll))
+    c._qdrant.upsert("e_st", points=[models.PointStruct(id=_point_id("AE"), vector=[1.0, 0.0, 0.0], payload=dict(payload, edge_id="AE", to_node_id="E"))])
+    c.index_check_s, c.index_max_age_s = 3600, 0.001
+    kg_index.peek_kg_index(c.qdrant_url, "n_st", "e_st").checked_at = kg_index.NEVER
+    assert c.degree("A") == 3
+    gate.set()
+    c._index_rebuild.join(5)
+    assert c.degree("A") == 4
+
+
+def test_skipped_points_do_not_mark_index_stale(monkeypatch, tmp_path):
+    qdrant_client = pytest.importorskip("qdrant_client")
+    from qdrant_client import models
+
+    from arch_team.memory.qdrant_kg import QdrantKGClient, _point_id
+
+    monkeypatch.setattr(kg_index, "_indexes", {})
+    c = QdrantKGClient(qdrant_url="http://unused:4", nodes_collection="n_sk", edges_collection="e_sk", dim=3)
+    c._qdrant = qdrant_client.QdrantClient(location=":memory:")
+    c._embed_texts = lambda texts: [[1.0, 0.0, 0.0] for _ in texts]
+    c.index_snapshot = str(tmp_path / "kg.json")
+    c.upsert_edges([{"id": "AB", "from": "A", "to": "B", "rel": "NEXT"}])
+    # Altlast ohne Endpunkt: zählt in Qdrant, fehlt aber im Index
+    broken = {"edge_id": "A?", "from_node_id": "A", "to_node_id": "", "rel": "NEXT"}
+    c._qdrant.upsert("e_sk", points=[models.PointStruct(id=_point_id("A?"), vector=[1.0, 0.0, 0.0], payload=broken)])
+
+    c.index_check_s = 0
+    for _ in range(3):
+        assert c.degree("A") == 1
+    assert c._index_rebuild is None  # jeder Check passt, kein Rebuild
+    idx = kg_index.peek_kg_index(c.qdrant_url, "n_sk", "e_sk")
+    assert idx.counts()[1] == 1 and idx.point_counts()[1] == 2
+
+    reloaded = KGAdjacencyIndex()
+    assert reloaded.load(c.index_snapshot) and reloaded.point_counts() == idx.point_counts()
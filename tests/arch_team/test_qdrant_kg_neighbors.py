@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from arch_team.memory.qdrant_kg import QdrantKGClient
+
+qdrant_client = pytest.importorskip("qdrant_client")
+
+
+class _CountingClient:
+    """Zählt Round-Trips gegen einen echten In-Memory-Qdrant."""
+
+    def __init__(self):
+        self._inner = qdrant_client.QdrantClient(location=":memory:")
+        self.calls = {"scroll": 0, "retrieve": 0}
+
+    def scroll(self, *args, **kwargs):
+        self.calls["scroll"] += 1
+        return self._inner.scroll(*args, **kwargs)
+
+    def retrieve(self, *args, **kwargs):
+        self.calls["retrieve"] += 1
+        return self._inner.retrieve(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+@pytest.fixture()
+def kg():
+    c = QdrantKGClient(qdrant_url="http://unused:1", nodes_collection="n_test", edges_collection="e_test", dim=3)
+    c.use_index = False  # Qdrant-Pfad testen (Index: test_kg_index.py)
+    c._qdrant = _CountingClient()
+    c._embed_texts = lambda texts: [[1.0, 0.0, 0.0] for _ in texts]
+    # Kette A -> B -> C -> D plus Seitenkante X -[TAG]-> A
+    c.upsert_nodes([{"id": n, "type": "T", "name": n} for n in ("A", "B", "C", "D", "X")])
+    c.upsert_edges([
+        {"id": "AB", "from": "A", "to": "B", "rel": "NEXT"},
+        {"id": "BC", "from": "B", "to": "C", "rel": "NEXT"},
+        {"id": "CD", "from": "C", "to": "D", "rel": "NEXT"},
+        {"id": "XA", "from": "X", "to": "A", "rel": "TAG"},
+    ])
+    c._qdrant.calls.update(scroll=0, retrieve=0)
+    return c
+
+
+def _ids(payloads, key):
+    return sorted(p[key] for p in payloads)
+
+
+def test_neighbors_both_directions_is_or(kg):
+    data = kg.neighbors("A")
+    assert _ids(data["edges"], "edge_id") == ["AB", "XA"]
+    assert _ids(data["nodes"], "node_id") == ["A", "B", "X"]
+    assert kg._qdrant.calls == {"scroll": 1, "retrieve": 1}
+
+
+def test_neighbors_multiple_rels_single_scroll(kg):
+    data = kg.neighbors("B", rels=["NEXT", "TAG"], direction="out")
+    assert _ids(data["edges"], "edge_id") == ["BC"]
+    assert kg._qdrant.calls["scroll"] == 1
+    assert _ids(kg.neighbors("A", rels=["TAG"])["edges"], "edge_id") == ["XA"]
+
+
+def test_neighborhood_round_trips_scale_with_depth(kg):
+    data = kg.neighborhood(["A"], depth=2, direction="out")
+    assert _ids(data["edges"], "edge_id") == ["AB", "BC"]
+    assert _ids(data["nodes"], "node_id") == ["A", "B", "C"]
+    assert kg._qdrant.calls == {"scroll": 2, "retrieve": 1}
+
+    full = kg.neighborhood(["A"], depth=5)
+    assert _ids(full["edges"], "edge_id") == ["AB", "BC", "CD", "XA"]
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+from arch_team.agents import criterion_specialists as cs
+from arch_team.agents import requirement_orchestrator as ro
+from arch_team.agents.batch_criteria_evaluator import CRITERIA_DEFINITIONS
+
+
+def _score(criterion, text):
+    if criterion == "clarity":
+        return 0.9 if "user" in text else 0.4
+    if criterion == "testability":
+        return 0.9 if "within" in text else 0.4
+    return 0.9
+
+
+class _FakeEvaluator:
+    def __init__(self):
+        self.calls = []
+
+    async def evaluate(self, text, context=None, criteria=None, **kwargs):
+        self.calls.append(None if criteria is None else sorted(criteria))
+        keys = criteria or list(CRITERIA_DEFINITIONS)
+        return {c: _score(c, text) for c in keys}
+
+
+class _FakeSpecialist:
+    def __init__(self, name):
+        self.name = name
+        self.attempts = 0
+
+    async def evaluate(self, text, context=None, **kwargs):
+        return _score(self.name, text)
+
+    async def suggest_fix(self, text, score, context=None):
+        self.attempts += 1
+        return self.name
+
+    async def apply_fix(self, text, suggestion, context=None):
+        if self.name == "clarity":
+            return text + " for the user"
+        # Erster Versuch verbessert nichts, erst der zweite greift
+        return text + (" quickly" if self.attempts == 1 else " within 2 s")
+
+
+def _run(monkeypatch, incremental):
+    evaluator = _FakeEvaluator()
+    monkeypatch.setattr(ro, "USE_BATCH_EVALUATOR", True)
+    monkeypatch.setattr(ro, "get_batch_evaluator", lambda: evaluator)
+    orch = ro.RequirementOrchestrator(max_iterations=3, incremental_eval=incremental)
+    orch.specialists = {name: _FakeSpecialist(name) for name in orch.specialists}
+    result = asyncio.run(orch.process("REQ-1", "The app must respond fast"))
+    return result, evaluator.calls
+
+
+def test_incremental_reevaluation_scores_only_what_changed(monkeypatch):
+    result, calls = _run(monkeypatch, incremental=True)
+
+    assert result.passed
+    assert result.final_text == "The app must respond fast for the user within 2 s"
+    assert all(s >= 0.9 for s in result.final_scores.values())
+    others = sorted(c for c in result.final_scores if c != "testability")
+    # Iteration 1: voller Lauf; danach nur noch einmal alles Ungemessene auf dem Endtext
+    assert calls == [None, others]
+
+
+def test_full_reevaluation_still_skips_identical_texts(monkeypatch):
+    result, calls = _run(monkeypatch, incremental=False)
+
+    assert result.passed
+    others = sorted(c for c in result.final_scores if c != "testability")
+    assert calls == [None, sorted(c for c in result.final_scores if c != "clarity"), others]
+
+
+def test_failed_scores_are_not_cached(monkeypatch):
+    evaluator = _FakeEvaluator()
+    real = evaluator.evaluate
+
+    async def flaky(text, context=None, criteria=None, **kwargs):
+        scores = await real(text, context, criteria, **kwargs)
+        if len(evaluator.calls) == 1:
+            scores.pop("clarity")  # LLM liefert für clarity keinen Score
+        return scores
+
+    class _Broken(_FakeSpecialist):
+        async def evaluate(self, text, context=None, **kwargs):
+            raise RuntimeError("llm down")
+
+    monkeypatch.setattr(ro, "USE_BATCH_EVALUATOR", True)
+    monkeypatch.setattr(ro, "get_batch_evaluator", lambda: type("E", (), {"evaluate": staticmethod(flaky)})())
+    orch = ro.RequirementOrchestrator()
+    orch.specialists = {name: _Broken(name) for name in orch.specialists}
+    cache = {}
+
+    first = asyncio.run(orch._evaluate_all_criteria("The user app", {}, cache))
+    assert first["clarity"] == 0.5 and "clarity" not in cache[ro._text_key("The user app")]
+
+    second = asyncio.run(orch._evaluate_all_criteria("The user app", {}, cache))
+    assert second["clarity"] == 0.9 and evaluator.calls[-1] == ["clarity"]
+
+
+def test_specialist_fallback_scores_are_not_cached(monkeypatch):
+    down = {"clarity"}
+
+    async def chat(self, chat_args):
+        if self.criterion_name in down:
+            raise RuntimeError("llm down")
+        return '{"score": 0.9}'
+
+    monkeypatch.setattr(ro, "USE_BATCH_EVALUATOR", False)
+    monkeypatch.setattr(cs, "MOCK_MODE", False)
+    monkeypatch.setattr(cs.CriterionSpecialistAgent, "_chat", chat)
+    orch = ro.RequirementOrchestrator()
+    for specialist in orch.specialists.values():
+        specialist.client = ("key", None)
+    cache = {}
+
+    first = asyncio.run(orch._evaluate_all_criteria("The user app", {}, cache))
+    assert first["clarity"] == 0.5 and "clarity" not in cache[ro._text_key("The user app")]
+
+    # Verifikation eines Fixes schlägt fehl → Fix verworfen, nichts gecacht
+    clarity = orch.specialists["clarity"]
+
+    async def suggest(text, score, context=None):
+        return "name the user"
+
+    async def apply(text, suggestion, context=None):
+        return text + " for the user"
+
+    monkeypatch.setattr(clarity, "suggest_fix", suggest)
+    monkeypatch.setattr(clarity, "apply_fix", apply)
+    fix = asyncio.run(orch._fix_criterion("REQ-1", "clarity", "The app", 0.4, {}, 1, cache))
+    assert not fix["fixed"] and fix["new_text"] == "The app"
+    assert ro._text_key("The app for the user") not in cache
+
+    down.clear()
+    second = asyncio.run(orch._evaluate_all_criteria("The user app", {}, cache))
+    assert second["clarity"] == 0.9 and cache[ro._text_key("The user app")]["clarity"] == 0.9
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from arch_team.agents.validation_delegator import ValidationDelegatorAgent
+from arch_team.tools import validation_transport as vt
+
+
+class _FakeService:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def evaluate_single(self, text, *, criteria_keys=None, **kw):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        if text == "boom":
+            raise RuntimeError("llm down")
+        return {"requirementText": text, "score": 0.9, "verdict": "pass", "evaluation": [], "keys": criteria_keys}
+
+
+@pytest.fixture(autouse=True)
+def _reset_transport():
+    yield
+    vt.set_validation_transport(None)
+
+
+def test_inprocess_transport_caps_llm_concurrency(monkeypatch):
+    monkeypatch.delenv("VALIDATION_MAX_CONCURRENT", raising=False)
+    svc = _FakeService()
+    transport = vt.InProcessValidationTransport(service=svc, max_concurrency=3)
+    assert ValidationDelegatorAgent(transport=transport).max_concurrent == 3
+
+    reqs = [{"req_id": f"R{i}", "title": "boom" if i == 4 else f"Req {i}"} for i in range(12)]
+    result = asyncio.run(ValidationDelegatorAgent(max_concurrent=12, transport=transport).validate_batch(reqs))
+    transport.close()
+
+    assert svc.peak == 3  # begrenzt durch den Executor, nicht durch den Delegator
+    assert result.passed_count == 11
+    failed = result.results[4]
+    assert failed.verdict == "fail" and "llm down" in failed.error
+
+
+def test_http_transport_reuses_pooled_client(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"score": 0.5, "verdict": "fail", "evaluation": []})
+
+    orig = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kw: orig(transport=httpx.MockTransport(handler), **kw))
+    transport = vt.HttpValidationTransport(api_base="http://backend:8087/", max_concurrency=4)
+
+    async def run():
+        out = await asyncio.gather(*[transport.evaluate(f"Req {i}") for i in range(5)])
+        assert len(transport._clients) == 1
+        await transport.aclose()
+        return out
+
+    out = asyncio.run(run())
+    assert [o["verdict"] for o in out] == ["fail"] * 5
+    assert calls == ["/api/v2/evaluate/single"] * 5
+
+
+def test_transport_selection(monkeypatch):
+    monkeypatch.delenv("VALIDATION_TRANSPORT", raising=False)
+    monkeypatch.delenv("VALIDATION_API_BASE", raising=False)
+    vt.set_validation_transport(None)
+    assert vt.get_validation_transport().name == "inprocess"
+    assert vt.get_validation_transport() is vt.get_validation_transport()
+
+    monkeypatch.setenv("VALIDATION_API_BASE", "http://remote:8087")
+    vt.set_validation_transport(None)
+    assert vt.get_validation_transport().name == "http"
+
+    monkeypatch.setenv("VALIDATION_TRANSPORT", "inprocess")
+    vt.set_validation_transport(None)
+    assert vt.get_validation_transport().name == "inprocess"
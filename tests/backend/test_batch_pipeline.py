@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+import json
+import time
+
+import pytest
+
+from backend.core import batch, db, settings
+
+
+@pytest.fixture()
+def batch_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SQLITE_PATH", str(tmp_path / "app.db"))
+    monkeypatch.setattr(settings, "MAX_PARALLEL", 3)
+    monkeypatch.setattr(settings, "BATCH_SIZE", 2)
+    db.init_db()
+
+    def fake_evaluate(text, criteria_keys, context):
+        if text.startswith("slow"):
+            time.sleep(0.3)
+        return [{"criterion": k, "score": 0.9, "passed": True, "feedback": ""} for k in criteria_keys]
+
+    monkeypatch.setattr(batch, "llm_evaluate", fake_evaluate)
+    monkeypatch.setattr(batch, "llm_rewrite", lambda text, ctx: text.upper())
+    monkeypatch.setattr(batch, "llm_suggest", lambda text, ctx: [{"correction": text}])
+    return settings.SQLITE_PATH
+
+
+def _rows(*texts):
+    return [{"id": f"R{i}", "requirementText": t} for i, t in enumerate(texts)]
+
+
+def test_slow_item_does_not_block_following_items(batch_db):
+    rows = _rows("slow one", *[f"fast {i}" for i in range(6)])
+    order = [rid for rid, _ in batch.iter_evaluations(rows)]
+    assert sorted(order) == sorted(r["id"] for r in rows)
+    # ohne Chunk-Barriere laufen alle schnellen Items vor dem langsamen durch
+    assert order[-1] == "R0"
+
+
+def test_resizing_the_pool_does_not_break_a_running_batch(batch_db, monkeypatch):
+    running = batch.iter_evaluations(_rows(*[f"item {i}" for i in range(10)]))
+    first = next(running)
+    monkeypatch.setattr(settings, "MAX_PARALLEL", 5)
+    assert len(batch.process_evaluations(_rows("other"))) == 1
+    # der laufende Batch reicht weiter in seinen (nun ersetzten) Pool ein
+    assert len([first, *running]) == 10
+
+
+def test_rewrites_and_suggestions_are_persisted_in_bulk(batch_db):
+    rows = _rows("a", "b", "c")
+    rewrites = batch.process_rewrites(rows)
+    assert rewrites == {"R0": {"redefinedRequirement": "A"}, "R1": {"redefinedRequirement": "B"}, "R2": {"redefinedRequirement": "C"}}
+    suggestions = batch.process_suggestions(rows)
+    assert suggestions["R1"] == {"suggestions": [{"correction": "b"}]}
+
+    conn = db.get_db()
+    assert conn.execute("SELECT COUNT(*) FROM evaluation").fetchone()[0] == 3
+    assert conn.execute("SELECT COUNT(*) FROM rewritten_requirement").fetchone()[0] == 3
+    assert conn.execute("SELECT COUNT(*) FROM suggestion").fetchone()[0] == 3
+
+
+def test_fused_mode_persists_all_three_tables(batch_db, monkeypatch):
+    calls = []
+
+    def fake_fused(text, criteria_keys, context):
+        calls.append(text)
+        return {
+            "details": [{"criterion": k, "score": 0.4, "passed": False, "feedback": "vage"} for k in criteria_keys],
+            "suggestions": [{"correction": text + "!", "acceptance_criteria": []}],
+            "redefinedRequirement": text.upper(),
+            "fused": True,
+        }
+
+    monkeypatch.setattr(batch, "llm_evaluate_suggest_rewrite", fake_fused)
+    monkeypatch.setattr(batch, "llm_evaluate", lambda *a: pytest.fail("separate evaluate call"))
+
+    out = batch.process_fused(_rows("x", "y"))
+    assert sorted(calls) == ["x", "y"]
+    assert out["R0"]["redefinedRequirement"] == "X"
+    assert out["R1"]["suggestions"] == [{"correction": "y!", "acceptance_criteria": []}]
+    assert out["R0"]["verdict"] == "fail"
+
+    conn = db.get_db()
+    assert conn.execute("SELECT COUNT(*) FROM evaluation_detail").fetchone()[0] > 0
+    assert conn.execute("SELECT COUNT(*) FROM suggestion").fetchone()[0] == 2
+    assert conn.execute("SELECT text FROM rewritten_requirement WHERE evaluation_id = ?", (out["R1"]["evaluationId"],)).fetchone()[0] == "Y"
+
+
+def test_fused_mode_reuses_existing_evaluation(batch_db, monkeypatch):
+    def fake_fused(text, criteria_keys, context):
+        return {
+            "details": [{"criterion": k, "score": 0.4, "passed": False, "feedback": ""} for k in criteria_keys],
+            "suggestions": [{"correction": text + "!"}],
+            "redefinedRequirement": text.upper(),
+        }
+
+    monkeypatch.setattr(batch, "llm_evaluate_suggest_rewrite", fake_fused)
+    first = batch.process_fused(_rows("x"))
+    batch.process_evaluations(_rows("y"))
+
+    monkeypatch.setattr(batch, "llm_evaluate_suggest_rewrite", lambda *a: pytest.fail("fused call for evaluated text"))
+    again = batch.process_fused(_rows("x", "y"))
+    assert again["R0"] == first["R0"]
+    # y hat nur Scores: Vorschläge/Rewrite werden nachgeneriert und an die bestehende Bewertung gehängt
+    assert again["R1"]["score"] > 0.5
+    assert again["R1"]["suggestions"] == [{"correction": "y"}] and again["R1"]["redefinedRequirement"] == "Y"
+
+    conn = db.get_db()
+    assert conn.execute("SELECT COUNT(*) FROM evaluation").fetchone()[0] == 2
+    assert conn.execute("SELECT COUNT(*) FROM suggestion").fetchone()[0] == 2
+    assert conn.execute("SELECT COUNT(*) FROM rewritten_requirement").fetchone()[0] == 2
+
+
+def test_batch_stream_route_emits_fused_results_as_ndjson(batch_db, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.routers import validate_router
+
+    def fake_fused(text, criteria_keys, context):
+        if text.startswith("slow"):
+            time.sleep(0.3)
+        return {
+            "details": [{"criterion": k, "score": 0.9, "passed": True, "feedback": ""} for k in criteria_keys],
+            "suggestions": [{"correction": text + "!"}],
+            "redefinedRequirement": text.upper(),
+        }
+
+    monkeypatch.setattr(batch, "llm_evaluate_suggest_rewrite", fake_fused)
+    app = FastAPI()
+    app.include_router(validate_router.router)
+    body = {"items": ["slow one", "fast"], "fused": True, "includeSuggestions": True}
+    with TestClient(app).stream("POST", "/api/v1/validate/batch/stream", json=body) as resp:
+        lines = [json.loads(line) for line in resp.iter_lines() if line]
+
+    # Ergebnisse in Fertigstellungsreihenfolge, danach das End-Event
+    assert [line.get("reqId") for line in lines] == ["REQ_2", "REQ_1", None]
+    assert lines[0]["redefinedRequirement"] == "FAST" and lines[0]["suggestions"] == [{"correction": "fast!"}]
+    assert lines[0]["status"] == "accepted" and lines[0]["evaluation"]
+    assert lines[-1] == {"event": "end", "processed": 2}
+
+
+def test_fused_stream_reports_failing_row_and_continues(batch_db, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.routers import validate_router
+
+    def fake_fused(text, criteria_keys, context):
+        if text == "kaputt":
+            raise RuntimeError("LLM down")
+        return {
+            "details": [{"criterion": k, "score": 0.9, "passed": True, "feedback": ""} for k in criteria_keys],
+            "suggestions": [],
+            "redefinedRequirement": text.upper(),
+        }
+
+    monkeypatch.setattr(batch, "llm_evaluate_suggest_rewrite", fake_fused)
+    app = FastAPI()
+    app.include_router(validate_router.router)
+    body = {"items": ["kaputt", "gut"], "fused": True}
+    with TestClient(app).stream("POST", "/api/v1/validate/batch/stream", json=body) as resp:
+        lines = [json.loads(line) for line in resp.iter_lines() if line]
+
+    by_id = {line.get("reqId"): line for line in lines}
+    assert by_id["REQ_1"] == {"event": "error", "reqId": "REQ_1", "message": "LLM down"}
+    assert by_id["REQ_2"]["redefinedRequirement"] == "GUT"
+    assert lines[-1] == {"event": "end", "processed": 2}
+
+
+def test_batches_return_pool_connections(batch_db, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.routers import validate_router
+
+    borrowed = []
+    real_get_db = db.get_db
+    monkeypatch.setattr(db, "get_db", lambda: borrowed.append(real_get_db()) or borrowed[-1])
+    monkeypatch.setattr(batch, "llm_evaluate_suggest_rewrite", lambda text, keys, ctx: {
+        "details": [{"criterion": k, "score": 0.9, "passed": True, "feedback": ""} for k in keys],
+        "suggestions": [{"correction": text}],
+        "redefinedRequirement": text.upper(),
+    })
+
+    batch.process_evaluations(_rows("a", "b"))
+    batch.process_suggestions(_rows("a", "b"))
+    batch.process_rewrites(_rows("a", "b"))
+    batch.process_fused(_rows("c", "d"))
+    app = FastAPI()
+    app.include_router(validate_router.router)
+    for fused in (True, False):
+        body = {"items": ["e", "f"], "fused": fused, "includeSuggestions": True}
+        with TestClient(app).stream("POST", "/api/v1/validate/batch/stream", json=body) as resp:
+            assert len([line for line in resp.iter_lines() if line]) == 3
+
+    assert borrowed and not any(c._checked_out for c in borrowed)
+
+
+def test_force_regenerates_without_response_cache(batch_db, monkeypatch):
+    from backend.core import llm_cache
+
+    seen = []
+
+    def fake_rewrite(text, ctx):
+        seen.append(llm_cache._bypass.get())
+        return f"{text.upper()}{len(seen)}"
+
+    monkeypatch.setattr(batch, "llm_rewrite", fake_rewrite)
+    monkeypatch.setattr(batch, "llm_evaluate_suggest_rewrite", lambda text, keys, ctx: {
+        "details": [{"criterion": k, "score": 0.9, "passed": True, "feedback": ""} for k in keys],
+        "suggestions": [{"correction": text}],
+        "redefinedRequirement": text.upper(),
+    })
+
+    assert batch.process_rewrites(_rows("x"))["R0"]["redefinedRequirement"] == "X1"
+    assert batch.process_rewrites(_rows("x"), regenerate=True)["R0"]["redefinedRequirement"] == "X2"
+    assert seen == [False, True]
+
+    first = batch.process_fused(_rows("y"))
+    assert batch.process_fused(_rows("y"))["R0"] == first["R0"]  # gespeicherter Rewrite
+    again = batch.process_fused(_rows("y"), regenerate=True)
+    assert again["R0"]["redefinedRequirement"] == "Y3" and seen[-1] is True
+
+
+def test_suggest_route_force_flag_bypasses_response_cache(batch_db, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.core import llm_cache
+    from backend.routers import validate_router
+
+    seen = []
+    monkeypatch.setattr(batch, "llm_suggest", lambda text, ctx: seen.append(llm_cache._bypass.get()) or [])
+    app = FastAPI()
+    app.include_router(validate_router.router)
+    client = TestClient(app)
+    assert client.post("/api/v1/validate/suggest", json={"items": ["a"]}).status_code == 200
+    assert client.post("/api/v1/validate/suggest", json={"items": ["a"], "force": True}).status_code == 200
+    assert seen == [False, True]
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import os
+import threading
+
+import pytest
+
+from backend.core import db, settings
+
+
+@pytest.fixture()
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "app.db")
+    monkeypatch.setattr(settings, "SQLITE_PATH", path)
+    monkeypatch.setattr(settings, "SQLITE_POOL_SIZE", 4)
+    c = db.get_db()
+    c.execute("CREATE TABLE t (v INTEGER)")
+    c.close()
+    yield path
+    db.close_pools()
+
+
+def test_connections_are_reused_with_tuned_pragmas(db_path):
+    c1 = db.get_db()
+    assert c1.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert c1.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert c1.execute("PRAGMA cache_size").fetchone()[0] == -settings.SQLITE_CACHE_KB
+    c1.close()
+    c1.close()  # doppeltes close() darf die Pool-Connection nicht schließen
+
+    c2 = db.get_db()
+    assert c2 is c1
+    c3 = db.get_db()  # parallel ausgeliehen → eigene Connection
+    assert c3 is not c2
+    c2.close()
+    c3.close()
+
+
+def test_release_rolls_back_open_transaction(db_path):
+    c = db.get_db()
+    c.execute("BEGIN")
+    c.execute("INSERT INTO t VALUES (1)")
+    c.close()
+    with db.db_session() as c2:
+        assert not c2.in_transaction
+        assert c2.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_wal_readers_do_not_block_writer(db_path):
+    reader = db.get_db()
+    reader.execute("BEGIN")
+    assert reader.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+    def write():
+        with db.db_session() as w:
+            w.execute("PRAGMA busy_timeout=500")
+            w.execute("INSERT INTO t VALUES (1)")
+
+    t = threading.Thread(target=write)
+    t.start()
+    t.join(5)
+    # Leser sieht weiterhin seinen Snapshot; der Schreiber musste nicht warten
+    assert reader.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    reader.execute("COMMIT")
+    assert reader.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    reader.close()
+
+
+def test_replaced_db_file_gets_fresh_connection(db_path):
+    pooled = db.get_db()
+    pooled.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    fresh = db.get_db()
+    assert fresh is not pooled
+    assert fresh.execute("SELECT name FROM sqlite_master WHERE name='t'").fetchone() is None
+    fresh.close()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from backend.core import dedupe
+
+
+def test_similar_pairs_blocked_matches_unblocked():
+    vecs = [[1.0, 0.0], [0.99, 0.05], [0.0, 1.0], [0.0, 0.0], [1.0, 0.01], [0.02, 1.0]]
+    full = dedupe.similar_pairs(vecs, 0.95, block_rows=100)
+    blocked = dedupe.similar_pairs(vecs, 0.95, block_rows=2)
+    assert sorted((i, j) for i, j, _ in full) == sorted((i, j) for i, j, _ in blocked)
+    assert sorted((i, j) for i, j, _ in full) == [(0, 1), (0, 4), (1, 4), (2, 5)]
+    assert sorted((i, j) for i, j, _ in dedupe._similar_pairs_py(vecs, 0.95)) == [(0, 1), (0, 4), (1, 4), (2, 5)]
+
+
+def test_semantic_duplicate_groups_embeds_once(monkeypatch):
+    from backend.core import embeddings
+
+    calls = []
+
+    def fake_build(texts, model=None):
+        calls.append(list(texts))
+        table = {"login": [1.0, 0.0], "sign in": [0.98, 0.1], "export": [0.0, 1.0]}
+        return [table[t] for t in texts]
+
+    monkeypatch.setattr(embeddings, "build_embeddings", fake_build)
+    groups = dedupe.semantic_duplicate_groups(["login", "", "export", "sign in"], threshold=0.9)
+    assert len(calls) == 1
+    assert [g["indices"] for g in groups] == [[0, 3]]
+    assert groups[0]["similarity"][3] > 0.9
+
+
+def _reference_dedupe(items, key, threshold):
+    used = [False] * len(items)
+    out = []
+    for i, it in enumerate(items):
+        if used[i]:
+            continue
+        ti = dedupe.text_tokens(it.get(key))
+        winner = it
+        used[i] = True
+        for j in range(i + 1, len(items)):
+            if used[j]:
+                continue
+            tj = dedupe.text_tokens(items[j].get(key))
+            if dedupe.jaccard(ti, tj) >= threshold:
+                if len(str(items[j].get(key) or "")) > len(str(winner.get(key) or "")):
+                    winner, ti = items[j], tj
+                used[j] = True
+        out.append(winner)
+    return out
+
+
+def test_near_duplicate_index_finds_similar_pairs():
+    texts = [
+        "Das System muss Benutzer innerhalb von 2 Sekunden authentifizieren.",
+        "das System muss Benutzer innerhalb von 2 Sekunden authentifizieren",
+        "Der Export erzeugt eine CSV-Datei mit allen Anforderungen.",
+        "",
+        "   ",
+    ]
+    idx = dedupe.NearDuplicateIndex(threshold=0.85)
+    idx.extend(texts)
+    assert [(i, j) for i, j, _ in idx.similar_pairs()] == [(0, 1), (3, 4)]
+
+
+def test_dedupe_keep_longest_matches_quadratic_reference():
+    import random
+
+    rnd = random.Random(7)
+    vocab = [f"w{i}" for i in range(60)]
+    items = []
+    for _ in range(80):
+        base = rnd.sample(vocab, 12)
+        items.append({"requirementText": " ".join(base)})
+        if rnd.random() < 0.5:
+            variant = base[:11] + [rnd.choice(vocab), "extra"]
+            items.append({"requirementText": " ".join(variant)})
+    got = dedupe.dedupe_keep_longest(items, "requirementText", 0.8)
+    assert got == _reference_dedupe(items, "requirementText", 0.8)
+    assert len(got) < len(items)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from backend.core import embedding_cache, embeddings, settings
+
+
+@pytest.fixture()
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDINGS_CACHE_ENABLED", True)
+    c = embedding_cache.EmbeddingCache(str(tmp_path / "emb.db"), mem_items=2, max_entries=0)
+    monkeypatch.setattr(embedding_cache, "_cache", c)
+    return c
+
+
+def test_roundtrip_survives_memory_eviction(cache, tmp_path):
+    cache.put_many("m", ["a", "b", "c"], [[0.5, 1.0], [2.0, 3.0], [4.0, 5.0]])
+    assert len(cache._mem) == 2  # In-Memory-LRU ist begrenzt
+    assert all(isinstance(v, bytes) for v in cache._mem.values())  # kompakt als float32
+    assert cache.get_many("m", ["a", "c", "x"]) == [[0.5, 1.0], [4.0, 5.0], None]
+    assert cache.get_many("other-model", ["a"]) == [None]
+    # Neue Instanz auf derselben Datei (Neustart)
+    fresh = embedding_cache.EmbeddingCache(cache.path)
+    assert fresh.get_many("m", ["b"]) == [[2.0, 3.0]]
+
+
+def test_build_embeddings_only_embeds_missing_texts(cache, monkeypatch):
+    calls = []
+
+    def fake_embed_batch(texts, model):
+        calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    monkeypatch.setattr(embeddings, "_embed_batch", fake_embed_batch)
+
+    first = embeddings.build_embeddings(["aa", "b", "aa"], model="m")
+    assert first == [[2.0, 1.0], [1.0, 1.0], [2.0, 1.0]]
+    assert calls == [["aa", "b"]]
+
+    again = embeddings.build_embeddings(["b", "aa", "ccc"], model="m")
+    assert again == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+    assert calls[1:] == [["ccc"]]
+
+    embeddings.build_embeddings(["aa", "b", "ccc"], model="m")
+    assert len(calls) == 2  # unveränderter Korpus -> keine API-Calls
+
+
+def test_lru_trim_bounds_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_cache, "_TRIM_EVERY", 1)
+    c = embedding_cache.EmbeddingCache(str(tmp_path / "lru.db"), mem_items=0, max_entries=2)
+    c.put_many("m", ["a"], [[1.0]])
+    c.put_many("m", ["b"], [[2.0]])
+    c.put_many("m", ["c"], [[3.0]])
+    assert c.get_many("m", ["a", "b", "c"]) == [None, [2.0], [3.0]]
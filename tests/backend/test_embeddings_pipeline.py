@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+import pytest
+
+from backend.core import embeddings, settings
+
+
+def test_token_batches_respect_budget_and_item_cap(monkeypatch):
+    monkeypatch.setattr(embeddings, "_count_tokens", lambda t: len(t))
+    batches = list(embeddings._token_batches(["aaaa", "bb", "cc", "d", "eeeeeeeeee", "f"], max_tokens=5, max_items=3))
+    assert batches == [["aaaa"], ["bb", "cc", "d"], ["eeeeeeeeee"], ["f"]]
+
+
+def test_build_embeddings_pipelines_batches_and_keeps_order(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDINGS_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "EMBEDDINGS_BATCH_MAX_TOKENS", 10**6)
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def fake_embed_batch(texts, model):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        return [[float(t)] for t in texts]
+
+    monkeypatch.setattr(embeddings, "_embed_batch", fake_embed_batch)
+    texts = [str(i) for i in range(40)]
+    out = embeddings.build_embeddings(texts, model="m", batch_size=4, max_concurrency=3)
+    assert out == [[float(i)] for i in range(40)]
+    assert 1 < state["peak"] <= 3
+
+
+def test_build_embeddings_raises_instead_of_dropping_vectors(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDINGS_CACHE_ENABLED", False)
+    monkeypatch.setattr(embeddings, "_embed_batch", lambda texts, model: [[1.0] for _ in texts[1:]])
+    with pytest.raises(RuntimeError):
+        embeddings.build_embeddings(["a", "b", "c"], model="m", max_concurrency=1)
+
+
+def test_embed_batch_retries_only_on_rate_limit(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(embeddings._embed_batch.retry, "wait", lambda rs: 0)
+
+    class Resp:
+        def __init__(self, status, body=None):
+            self.status_code = status
+            self.headers = {"retry-after": "0"}
+            self.text = ""
+            self._body = body or {}
+
+        def json(self):
+            return self._body
+
+    calls = []
+    responses = [Resp(429), Resp(200, {"data": [{"embedding": [1.0]}]})]
+
+    class Sess:
+        def post(self, *a, **kw):
+            calls.append(1)
+            return responses.pop(0)
+
+    monkeypatch.setattr(embeddings, "_get_session", lambda: Sess())
+    assert embeddings._embed_batch(["x"], model="m") == [[1.0]]
+    assert len(calls) == 2
+
+    calls.clear()
+    responses[:] = [Resp(400), Resp(200, {"data": [{"embedding": [1.0]}]})]
+    with pytest.raises(RuntimeError):
+        embeddings._embed_batch(["x"], model="m")
+    assert len(calls) == 1
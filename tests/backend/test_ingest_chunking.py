@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from backend.core import ingest
+
+
+class _CountingEncoder:
+    """Ein "Token" je 3 Zeichen; zählt encode/decode-Aufrufe."""
+
+    def __init__(self):
+        self.encodes = 0
+        self.decodes = 0
+
+    def encode_ordinary(self, text):
+        self.encodes += 1
+        return [text[i : i + 3] for i in range(0, len(text), 3)]
+
+    def decode(self, tokens):
+        self.decodes += 1
+        return "".join(tokens)
+
+
+@pytest.fixture()
+def enc(monkeypatch):
+    e = _CountingEncoder()
+    monkeypatch.setattr(ingest, "_get_encoding", lambda: e)
+    return e
+
+
+def test_token_windows_overlap_offsets():
+    assert ingest.token_windows(1000, 400, 50) == [(0, 400), (350, 800), (750, 1000)]
+    assert ingest.token_windows(0, 400, 50) == []
+
+
+def test_chunk_payloads_encodes_each_document_once(enc):
+    text = "x" * 3000  # 1000 Tokens
+    out = ingest.chunk_payloads([{"text": text, "meta": {"sourceFile": "a.md"}}], 200, 400, 50)
+    assert enc.encodes == 1 and enc.decodes == 3
+    assert [c["payload"]["tokenLen"] for c in out] == [400, 450, 250]
+    assert [c["payload"]["chunkIndex"] for c in out] == [0, 1, 2]
+    # Overlap: Chunk 2 beginnt mit den letzten 50 Tokens von Chunk 1
+    assert out[1]["text"].startswith(text[350 * 3 : 400 * 3])
+
+
+def test_short_tail_dropped_unless_single_chunk(enc):
+    assert len(ingest.chunk_text("x" * 3 * 410, 200, 400, 0)) == 1  # Rest (10 Tokens) verworfen
+    assert ingest.chunk_text_with_lengths("x" * 3 * 20, 200, 400, 50) == [("x" * 60, 20)]
+
+
+def test_word_fallback_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(ingest, "_get_encoding", lambda: None)
+    words = [f"w{i}" for i in range(120)]
+    out = ingest.chunk_text_with_lengths(" ".join(words), 10, 50, 5)
+    assert [n for _, n in out] == [50, 55, 25]
+    assert out[1][0].split()[0] == "w45"
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from backend.core import db, ingest, settings
+from backend.services.manifest_integration import create_manifests_from_chunkminer
+
+
+def _payloads(texts, src="doc.md"):
+    return [
+        {"text": t, "payload": {"sourceFile": src, "chunkIndex": i, "chunkHash": ingest.chunk_hash(t)}}
+        for i, t in enumerate(texts)
+    ]
+
+
+def test_chunk_hash_ignores_whitespace_only():
+    assert ingest.chunk_hash("Das System  muss\nloggen.") == ingest.chunk_hash(" Das System muss loggen. ")
+    assert ingest.chunk_hash("A") != ingest.chunk_hash("B")
+
+
+def test_plan_delta_keeps_unchanged_and_drops_stale():
+    old = _payloads(["Eins", "Zwei", "Drei", "Zwei"])
+    existing = {}
+    for i, p in enumerate(old):
+        existing.setdefault(p["payload"]["chunkHash"], []).append(f"id{i}")
+    existing[""] = ["legacy"]  # Altbestand ohne chunkHash
+
+    new = _payloads(["Null", "Eins", "Zwei", "Drei neu"])
+    plan = ingest.plan_delta(new, existing)
+    assert [p["text"] for p in plan["new"]] == ["Null", "Drei neu"]
+    assert [(pid, p["payload"]["chunkIndex"]) for pid, p in plan["keep"]] == [("id0", 1), ("id1", 2)]
+    assert sorted(plan["stale"]) == ["id2", "id3", "legacy"]
+
+
+def test_vector_store_delta_roundtrip():
+    qdrant_client = pytest.importorskip("qdrant_client")
+    from backend.core import vector_store as vs
+
+    cli = qdrant_client.QdrantClient(location=":memory:")
+    vs.reset_collection(client=cli, collection_name="delta", dim=3)
+    items = [
+        {"id": i + 1, "vector": [1.0, 0.0, 0.0], "payload": p["payload"] | {"text": p["text"]}}
+        for i, p in enumerate(_payloads(["Eins", "Zwei"]) + _payloads(["Andere"], src="other.md"))
+    ]
+    vs.upsert_points(items, client=cli, collection_name="delta", dim=3)
+
+    hashes = vs.fetch_chunk_hashes("doc.md", client=cli, collection_name="delta")
+    assert hashes == {ingest.chunk_hash("Eins"): [1], ingest.chunk_hash("Zwei"): [2]}
+
+    vs.set_payloads([(2, {"chunkIndex": 5})], client=cli, collection_name="delta")
+    assert vs.delete_points([1], client=cli, collection_name="delta") == 1
+    pts = cli.retrieve("delta", ids=[1, 2, 3])
+    assert [(p.id, p.payload["chunkIndex"], p.payload["text"]) for p in pts] == [(2, 5, "Zwei"), (3, 0, "Andere")]
+
+
+def test_mined_chunk_hashes_from_manifest(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SQLITE_PATH", str(tmp_path / "app.db"))
+    db.init_db()
+    conn = db.get_db()
+    h0, h1 = ingest.chunk_hash("Eins"), ingest.chunk_hash("Zwei")
+    items = [
+        {
+            "req_id": "REQ-abc123-000",
+            "title": "Das System muss Eins.",
+            "evidence_refs": [
+                {"sourceFile": "doc.md", "sha1": "abc123", "chunkIndex": 0, "chunkHash": h0},
+                {"sourceFile": "doc.md", "sha1": "abc123", "chunkIndex": 1, "chunkHash": h1, "isNeighbor": True},
+            ],
+        },
+        {
+            "req_id": "REQ-def456-000",
+            "title": "Das System muss Anderes.",
+            "evidence_refs": [{"sourceFile": "other.md", "sha1": "def456", "chunkIndex": 0, "chunkHash": "x"}],
+        },
+    ]
+    assert len(create_manifests_from_chunkminer(conn, items)) == 2
+    # Nachbar-Evidenz zählt nicht als gemint
+    assert db.get_mined_chunk_hashes(conn, ["doc.md"]) == {"doc.md": {h0}}
+    assert db.get_mined_chunk_hashes(conn, ["doc.md", "other.md"]) == {"doc.md": {h0}, "other.md": {"x"}}
+    conn.close()
+
+
+def test_chunk_miner_skips_known_chunks(monkeypatch):
+    from arch_team.agents import chunk_miner as cm
+
+    monkeypatch.setattr(cm, "extract_texts_many", lambda files: [{"text": "", "meta": {}}])
+    monkeypatch.setattr(cm, "chunk_payloads", lambda recs, **kw: _payloads(["Eins", "Zwei", "Drei"]) + _payloads(["Zwei"], src="b.md"))
+    mined = []
+
+    def _fake_mine(self, text, payload, model_override):
+        mined.append(text)
+        return [{"title": f"Das System muss {text}.", "tag": "functional"}]
+
+    monkeypatch.setattr(cm.ChunkMinerAgent, "_mine_chunk", _fake_mine)
+    agent = cm.ChunkMinerAgent.__new__(cm.ChunkMinerAgent)
+    out = agent.mine_files_or_texts_collect(["x"], skip_chunk_hashes={"doc.md": {ingest.chunk_hash("Zwei")}})
+    # Gleicher Text in b.md ist dort noch nicht gemint und wird nicht übersprungen
+    assert mined == ["Eins", "Drei", "Zwei"]
+    assert [o["evidence_refs"][0]["chunkHash"] for o in out] == [ingest.chunk_hash(t) for t in ("Eins", "Drei", "Zwei")]
+    assert out[-1]["evidence_refs"][0]["sourceFile"] == "b.md"
+
+
+def test_combined_mode_delta_keeps_earlier_documents(monkeypatch):
+    flask = pytest.importorskip("flask")
+    qdrant_client = pytest.importorskip("qdrant_client")
+    import io
+
+    import backend.api_v2_part2 as v2
+    from backend.core import vector_store as vs
+
+    cli = qdrant_client.QdrantClient(location=":memory:")
+    vs.reset_collection(client=cli, collection_name="combined", dim=3)
+    monkeypatch.setattr(v2, "get_qdrant_client", lambda: (cli, 0))
+    monkeypatch.setattr(v2, "build_embeddings", lambda texts, model=None: [[1.0, 0.0, 0.0] for _ in texts])
+    monkeypatch.setattr(v2, "get_embeddings_dim", lambda: 3)
+    app = flask.Flask(__name__)
+    app.register_blueprint(v2.api_bp)
+    client = app.test_client()
+
+    def _ingest(name, text):
+        data = {"files": (io.BytesIO(text.encode("utf-8")), name), "delta": "1", "collection": "combined"}
+        resp = client.post("/api/v1/files/ingest", data=data, content_type="multipart/form-data")
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+        return resp.get_json()
+
+    first = _ingest("a.txt", "Das System muss Berichte exportieren.")
+    second = _ingest("b.txt", "Das System muss Benutzer sperren.")
+    assert second["deltaIgnored"] is True and second["deleted"] == 0
+
+    texts = {p.payload["text"] for p in cli.scroll("combined", limit=10)[0]}
+    assert first["upserted"] == 1 and "Das System muss Berichte exportieren." in texts
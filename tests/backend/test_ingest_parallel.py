@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+import pytest
+
+from backend.core import ingest
+
+fitz = pytest.importorskip("fitz")
+
+
+def _pdf(text: str) -> bytes:
+    doc = fitz.open()
+    for line in text.split("|"):
+        doc.new_page().insert_text((72, 72), line)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _slow_extract(filename, data, content_type=""):
+    # Läuft im Worker-Prozess (per Referenz gepickelt)
+    if filename.startswith("hang"):
+        time.sleep(60)
+    elif filename.startswith("slow"):
+        time.sleep(2)
+    return [{"text": filename, "meta": {"sourceFile": filename}}]
+
+
+def _strip(recs):
+    return [(r["text"].strip(), r["meta"]["sourceFile"], r["meta"].get("pageNo")) for r in recs]
+
+
+@pytest.fixture(autouse=True)
+def _shutdown_pool():
+    yield
+    ingest._kill_pool()
+
+
+def test_parallel_extraction_matches_sequential_order():
+    files = [
+        {"filename": "a.pdf", "data": _pdf("Alpha eins|Alpha zwei"), "content_type": "application/pdf"},
+        {"filename": "b.md", "data": b"# Beta", "content_type": ""},
+        {"filename": "c.pdf", "data": _pdf("Gamma"), "content_type": "application/pdf"},
+    ]
+    expected = [r for f in files for r in ingest.extract_texts(f["filename"], f["data"], f["content_type"])]
+    got = ingest.extract_texts_many(files, workers=2)
+    assert _strip(got) == _strip(expected)
+    assert [r["meta"]["sourceFile"] for r in got] == ["a.pdf", "a.pdf", "b.md", "c.pdf"]
+
+
+def test_broken_file_is_skipped_or_raised():
+    files = [
+        {"filename": "bad.pdf", "data": b"not a pdf", "content_type": "application/pdf"},
+        {"filename": "ok.pdf", "data": _pdf("Delta"), "content_type": "application/pdf"},
+    ]
+    got = ingest.extract_texts_many(files, workers=2)
+    assert [r["meta"]["sourceFile"] for r in got] == ["ok.pdf"]
+    with pytest.raises(Exception):
+        ingest.extract_texts_many(files, workers=2, raise_errors=True)
+
+
+def test_hanging_file_times_out_and_others_finish(monkeypatch):
+    monkeypatch.setattr(ingest, "extract_texts", _slow_extract)
+    files = [{"filename": n, "data": b"", "content_type": "application/pdf"} for n in ("hang.pdf", "x.pdf", "y.pdf")]
+    t0 = time.monotonic()
+    got = dict(ingest.iter_extract_texts(files, workers=2, timeout_s=8))
+    assert time.monotonic() - t0 < 40
+    assert got[0] == []
+    assert got[1][0]["text"] == "x.pdf" and got[2][0]["text"] == "y.pdf"
+
+
+def test_queued_files_do_not_count_against_timeout(monkeypatch):
+    # 6 Dateien à 2 s auf 2 Workern: die letzten warten ~4 s, laufen aber je nur 2 s
+    monkeypatch.setattr(ingest, "extract_texts", _slow_extract)
+    files = [{"filename": f"slow{i}.pdf", "data": b"", "content_type": "application/pdf"} for i in range(6)]
+    got = dict(ingest.iter_extract_texts(files, workers=2, timeout_s=5, raise_errors=True))
+    assert [got[i][0]["text"] for i in range(6)] == [f"slow{i}.pdf" for i in range(6)]
+
+
+def test_timeout_in_one_call_spares_concurrent_calls(monkeypatch):
+    monkeypatch.setattr(ingest, "extract_texts", _slow_extract)
+    pdf = "application/pdf"
+    other = {}
+
+    def run_other():
+        files = [{"filename": f"slow{i}.pdf", "data": b"", "content_type": pdf} for i in range(4)]
+        other.update(ingest.iter_extract_texts(files, workers=2, timeout_s=5, raise_errors=True))
+
+    t = threading.Thread(target=run_other)
+    t.start()
+    files = [{"filename": n, "data": b"", "content_type": pdf} for n in ("hang.pdf", "slow-a.pdf")]
+    got = dict(ingest.iter_extract_texts(files, workers=2, timeout_s=5))
+    t.join(60)
+
+    assert got[0] == [] and got[1][0]["text"] == "slow-a.pdf"
+    assert [other[i][0]["text"] for i in range(4)] == [f"slow{i}.pdf" for i in range(4)]
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import io
+
+import pytest
+
+from backend.core import ingest
+
+fitz = pytest.importorskip("fitz")
+
+
+def _pdf(pages) -> bytes:
+    doc = fitz.open()
+    for line in pages:
+        page = doc.new_page()
+        if line:
+            page.insert_text((72, 72), line)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _strip(recs):
+    return [(r["text"].strip(), r["meta"]["pageNo"], r["meta"]["sha1"]) for r in recs]
+
+
+def test_pdf_pages_stream_lazily_from_path(tmp_path, monkeypatch):
+    data = _pdf(["Seite eins", "", "Seite drei"])
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(data)
+
+    loaded = []
+    orig = fitz.Document.load_page
+    monkeypatch.setattr(fitz.Document, "load_page", lambda self, n: loaded.append(n) or orig(self, n))
+
+    it = ingest.iter_texts("doc.pdf", path, "application/pdf")
+    first = next(it)
+    assert first["text"].strip() == "Seite eins" and loaded == [0]
+
+    rest = list(it)
+    # pageNo zählt wie bisher nur nicht-leere Seiten; Hash identisch zum bytes-Pfad
+    assert _strip([first] + rest) == _strip(ingest.extract_texts("doc.pdf", data, "application/pdf"))
+    assert [r["meta"]["pageNo"] for r in [first] + rest] == [1, 2]
+
+
+def test_empty_pdf_yields_single_empty_record():
+    recs = ingest.extract_texts("leer.pdf", _pdf([""]), "application/pdf")
+    assert [(r["text"], r["meta"]["pageNo"]) for r in recs] == [("", 1)]
+
+
+def test_spool_to_path_copies_stream_and_cleans_up():
+    with ingest.spool_to_path(io.BytesIO(b"# Titel\nText"), ".md") as path:
+        assert path.suffix == ".md" and path.read_bytes() == b"# Titel\nText"
+        recs = ingest.extract_texts("a.md", path)
+        assert recs[0]["text"] == "# Titel\nText" and recs[0]["meta"]["sourceType"] == "md"
+    assert not path.exists()
+
+
+def test_iter_chunk_payloads_consumes_records_incrementally(monkeypatch):
+    monkeypatch.setattr(ingest, "_get_encoding", lambda: None)
+    seen = []
+
+    def records():
+        for i in range(3):
+            seen.append(i)
+            yield {"text": f"Text {i}", "meta": {"pageNo": i + 1}}
+
+    it = ingest.iter_chunk_payloads(records(), 1, 50, 0)
+    assert next(it)["payload"]["pageNo"] == 1 and seen == [0]
+    assert [p["payload"]["pageNo"] for p in it] == [2, 3]
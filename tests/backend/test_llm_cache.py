@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from backend.core import llm_cache, settings
+
+
+@pytest.fixture()
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", True)
+    c = llm_cache.LLMResponseCache(str(tmp_path / "llm_cache.db"), ttl_s=0, max_entries=0)
+    monkeypatch.setattr(llm_cache, "_cache", c)
+    return c
+
+
+def test_make_key_is_stable_and_content_addressed():
+    req = {"model": "m", "messages": [{"role": "user", "content": "a"}], "temperature": 0.0}
+    same = {"temperature": 0.0, "messages": [{"role": "user", "content": "a"}], "model": "m", "stream": False}
+    other = {"model": "m", "messages": [{"role": "user", "content": "b"}], "temperature": 0.0}
+    assert llm_cache.make_key(req) == llm_cache.make_key(same)
+    assert llm_cache.make_key(req) != llm_cache.make_key(other)
+    assert llm_cache.make_key(req, kind="evaluate") != llm_cache.make_key(req, kind="suggest")
+
+
+def test_lookup_store_counts_hits_and_misses(cache):
+    key = llm_cache.make_key({"model": "m", "messages": []})
+    assert llm_cache.lookup(key) is None
+    llm_cache.store(key, '{"ok": true}', kind="evaluate", model="m")
+    assert llm_cache.lookup(key) == '{"ok": true}'
+    st = llm_cache.stats()
+    assert st["hits"] == 1 and st["misses"] == 1 and st["entries"] == 1
+
+
+def test_bypass_skips_read_and_write(cache):
+    key = llm_cache.make_key({"model": "m", "messages": []})
+    with llm_cache.bypass():
+        llm_cache.store(key, "x")
+        assert llm_cache.lookup(key) is None
+    assert llm_cache.lookup(key) is None
+
+
+def test_lru_trim_keeps_most_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_TRIM_EVERY", 1)
+    c = llm_cache.LLMResponseCache(str(tmp_path / "lru.db"), max_entries=2)
+    c.put("a", "1")
+    c.put("b", "2")
+    assert c.get("a") == "1"  # a ist jetzt jünger als b
+    c.put("c", "3")
+    assert c.get("b") is None
+    assert c.get("a") == "1" and c.get("c") == "3"
+
+
+def test_make_key_separates_providers():
+    req = {"model": "m", "messages": [{"role": "user", "content": "a"}]}
+    assert llm_cache.make_key(req, provider="https://a.example/v1") != llm_cache.make_key(req, provider="https://b.example/v1")
+    assert llm_cache.make_key(req, provider="https://a.example/v1/") == llm_cache.make_key(req, provider="https://a.example/v1")
+
+
+def test_chunk_miner_does_not_cache_empty_fallback_parse(cache, monkeypatch):
+    from arch_team.agents import chunk_miner as cm
+
+    replies = iter(["kein JSON", '{"items": [{"title": "SSO support", "tag": "security"}]}'])
+    monkeypatch.setattr(cm.OpenAIAdapter, "create", lambda self, messages, **kwargs: next(replies))
+    agent = cm.ChunkMinerAgent()
+    payload = {"sha1": "abc123", "chunkIndex": 0, "sourceFile": "spec.txt"}
+
+    assert agent._mine_chunk("The system shall support SSO.", payload, None) == []
+    # Die kaputte Antwort wurde nicht gecacht → zweiter Aufruf fragt erneut an
+    assert len(agent._mine_chunk("The system shall support SSO.", payload, None)) == 1
+    assert llm_cache.stats()["entries"] == 1
+
+
+def test_batch_evaluator_does_not_cache_incomplete_scores(cache):
+    import asyncio
+    import json
+    from types import SimpleNamespace
+
+    from arch_team.agents.batch_criteria_evaluator import BatchCriteriaEvaluator
+
+    replies = iter([{"clarity": {"score": 0.8}}, {"clarity": {"score": 0.8}, "testability": 0.6}])
+
+    def create(**request):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(next(replies))))])
+
+    client = SimpleNamespace(base_url="https://llm.example/v1", chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    evaluator = BatchCriteriaEvaluator(model="m")
+    evaluator._get_client = lambda: client
+
+    def run():
+        return asyncio.run(evaluator.evaluate("R", criteria=["clarity", "testability"], neutral_fallback=False))
+
+    assert run() == {"clarity": 0.8}
+    # Unvollständige Antwort nicht gecacht → der Retry fragt erneut an, die vollständige wird gecacht
+    assert run() == {"clarity": 0.8, "testability": 0.6}
+    assert run() == {"clarity": 0.8, "testability": 0.6}
+    assert llm_cache.stats()["entries"] == 1
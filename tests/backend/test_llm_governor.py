@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from backend.core import llm_governor as lg
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry():
+    lg.reset_governors()
+    yield
+    lg.reset_governors()
+
+
+def test_interactive_requests_overtake_queued_batch():
+    gov = lg.LLMGovernor("t", initial_concurrency=1, max_concurrency=1)
+    first = gov.acquire()
+    order = []
+
+    def call(prio):
+        lease = gov.acquire(priority=prio)
+        order.append(prio)
+        gov.release(lease, status=200)
+
+    batch = threading.Thread(target=call, args=("batch",))
+    batch.start()
+    time.sleep(0.05)
+    inter = threading.Thread(target=call, args=("interactive",))
+    inter.start()
+    time.sleep(0.05)
+    assert order == []
+
+    gov.release(first, status=200)
+    batch.join(2)
+    inter.join(2)
+    assert order == ["interactive", "batch"]
+
+
+def test_batch_share_leaves_room_for_interactive():
+    gov = lg.LLMGovernor("t", initial_concurrency=5, max_concurrency=5, batch_share=0.4)
+    leases = [gov.acquire(priority="batch") for _ in range(2)]
+    with pytest.raises(TimeoutError):
+        gov.acquire(priority="batch", timeout=0.1)
+    leases += [gov.acquire(priority="interactive") for _ in range(3)]
+    assert gov.stats()["in_flight"] == 5 and gov.stats()["waiting"] == 0
+    for lease in leases:
+        gov.release(lease, status=200)
+
+
+def test_aimd_halves_once_per_window_and_recovers():
+    gov = lg.LLMGovernor("t", initial_concurrency=8, max_concurrency=8)
+    leases = [gov.acquire() for _ in range(4)]
+    for lease in leases:
+        gov.release(lease, status=429)  # gleichzeitig gestartete Requests senken nur einmal
+    assert gov.limit == 4 and gov.stats()["throttled"] == 4
+
+    gov.release(gov.acquire(), status=429)
+    assert gov.limit == 2
+    for _ in range(6):
+        gov.release(gov.acquire(), status=200)
+    assert 4 < gov.limit < 5
+
+
+def test_retry_after_pauses_new_grants():
+    gov = lg.LLMGovernor("t")
+    gov.release(gov.acquire(), status=429, retry_after_s=0.3)
+    t0 = time.monotonic()
+    gov.release(gov.acquire(), status=200)
+    assert time.monotonic() - t0 >= 0.25
+
+
+def test_rpm_and_tpm_buckets_throttle():
+    gov = lg.LLMGovernor("t", rpm=120)  # 2/s, Burst 20
+    t0 = time.monotonic()
+    for _ in range(21):
+        gov.release(gov.acquire(), status=200)
+    assert time.monotonic() - t0 >= 0.4
+
+    gov = lg.LLMGovernor("t", tpm=6000)  # 100 Tokens/s, Burst 1000
+    lease = gov.acquire(tokens=900)
+    gov.release(lease, status=200, used_tokens=100)  # Schätzung zu hoch → Rückbuchung
+    t0 = time.monotonic()
+    gov.release(gov.acquire(tokens=900), status=200)
+    assert time.monotonic() - t0 < 0.2
+
+
+def test_async_acquire_does_not_block_loop():
+    gov = lg.LLMGovernor("t", initial_concurrency=2, max_concurrency=2)
+    peak = 0
+    active = 0
+
+    async def call():
+        nonlocal peak, active
+        lease = await gov.acquire_async()
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        gov.release(lease, status=200)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        t = asyncio.create_task(ticker())
+        await asyncio.gather(*[call() for _ in range(10)])
+        t.cancel()
+        return ticks
+
+    assert asyncio.run(main()) > 5
+    assert peak == 2
+
+
+def test_governed_transports_feed_status_and_usage():
+    def handler(request):
+        body = json.loads(request.content)
+        if body["messages"][0]["content"] == "slow down":
+            return httpx.Response(429, headers={"retry-after-ms": "10"}, json={"error": "rate"})
+        return httpx.Response(200, json={"choices": [], "usage": {"total_tokens": 42}})
+
+    req = {"model": "m1", "max_tokens": 50, "messages": [{"role": "user", "content": "hi"}]}
+    with httpx.Client(transport=lg.GovernedTransport(httpx.MockTransport(handler))) as client:
+        assert client.post("https://llm.example/v1/chat/completions", json=req).json()["usage"]["total_tokens"] == 42
+        bad = dict(req, messages=[{"role": "user", "content": "slow down"}])
+        assert client.post("https://llm.example/v1/chat/completions", json=bad).status_code == 429
+
+    async def run_async():
+        transport = lg.AsyncGovernedTransport(httpx.MockTransport(handler))
+        async with httpx.AsyncClient(transport=transport) as client:
+            resp = await client.post("https://llm.example/v1/chat/completions", json=dict(req, model="m2"))
+            return resp.status_code
+
+    assert asyncio.run(run_async()) == 200
+    govs = lg.stats()["governors"]
+    assert govs["llm.example/m1"]["granted"] == 2 and govs["llm.example/m1"]["throttled"] == 1
+    assert govs["llm.example/m1"]["in_flight"] == 0
+    assert govs["llm.example/m2"]["granted"] == 1
+
+
+def test_sync_request_on_event_loop_never_blocks(caplog):
+    gov = lg.get_governor("llm.example", "m1")
+    gov.limit = 1.0
+    req = {"model": "m1", "messages": [{"role": "user", "content": "hi"}]}
+    handler = lambda request: httpx.Response(200, json={"choices": []})  # noqa: E731
+
+    async def main():
+        held = await gov.acquire_async()
+        try:
+            with httpx.Client(transport=lg.GovernedTransport(httpx.MockTransport(handler))) as client:
+                return client.post("https://llm.example/v1/chat/completions", json=req).status_code
+        finally:
+            gov.release(held, status=200)
+
+    with caplog.at_level("ERROR", logger="app.llm"):
+        assert asyncio.run(main()) == 200
+    assert "Event-Loop" in caplog.text
+    assert gov.stats()["in_flight"] == 0
+
+
+def test_sync_acquire_times_out(monkeypatch):
+    from backend.core import settings
+
+    monkeypatch.setattr(settings, "LLM_GOVERNOR_ACQUIRE_TIMEOUT_S", 0.05)
+    gov = lg.get_governor("llm.example", "m1")
+    gov.limit = 1.0
+    held = gov.acquire()
+    req = {"model": "m1", "messages": [{"role": "user", "content": "hi"}]}
+    handler = lambda request: httpx.Response(200, json={"choices": []})  # noqa: E731
+    with httpx.Client(transport=lg.GovernedTransport(httpx.MockTransport(handler))) as client:
+        with pytest.raises(httpx.PoolTimeout):
+            client.post("https://llm.example/v1/chat/completions", json=req)
+    gov.release(held, status=200)
+    assert gov.stats()["in_flight"] == 0
+
+
+def test_governed_clients_keep_environment_proxies(monkeypatch):
+    pytest.importorskip("openai")
+    import httpcore
+
+    from backend.core import llm_clients, settings
+
+    monkeypatch.setattr(settings, "LLM_GOVERNOR_ENABLED", True)
+    for name in ("ALL_PROXY", "all_proxy", "HTTP_PROXY", "http_proxy", "https_proxy", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.internal:3128")
+    monkeypatch.setenv("NO_PROXY", "llm.local")
+
+    proxied = llm_clients._sync_http_client("https://llm.example/v1")
+    assert isinstance(proxied._transport._inner._pool, httpcore.HTTPProxy)
+    direct = llm_clients._sync_http_client("https://llm.local/v1")
+    assert not isinstance(direct._transport._inner._pool, httpcore.HTTPProxy)
+    assert isinstance(llm_clients._async_http_client("https://llm.example/v1")._transport._inner._pool, httpcore.AsyncHTTPProxy)
+
+
+def test_autogen_model_client_uses_governed_transport(monkeypatch):
+    openai_ext = pytest.importorskip("autogen_ext.models.openai")
+    from backend.core import llm_clients, settings
+
+    monkeypatch.setattr(settings, "LLM_GOVERNOR_ENABLED", True)
+    client = openai_ext.OpenAIChatCompletionClient(
+        model="gpt-4o-mini",
+        api_key="k",
+        base_url="https://llm.example/v1",
+        http_client=llm_clients.get_governed_async_http_client("https://llm.example/v1/"),
+    )
+    assert isinstance(client._client._client._transport, lg.AsyncGovernedTransport)
+
+
+def test_streaming_response_holds_slot_until_closed(monkeypatch):
+    events = [b'data: {"choices": []}\n\n', b'data: {"choices": [], "usage": {"total', b'_tokens": 7}}\n\ndata: [DONE]\n\n']
+
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=iter(events))
+
+    async def ahandler(request):
+        async def body():
+            for e in events:
+                yield e
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body())
+
+    released = []
+    gov = lg.get_governor("llm.example", "m1")
+    real_release = gov.release
+    monkeypatch.setattr(gov, "release", lambda lease, **kw: (released.append(kw), real_release(lease, **kw)))
+    req = {"model": "m1", "stream": True, "messages": [{"role": "user", "content": "hi"}]}
+
+    with httpx.Client(transport=lg.GovernedTransport(httpx.MockTransport(handler))) as client:
+        with client.stream("POST", "https://llm.example/v1/chat/completions", json=req) as resp:
+            assert gov.stats()["in_flight"] == 1 and released == []
+            resp.read()
+        assert gov.stats()["in_flight"] == 0
+    assert released[0]["status"] == 200 and released[0]["used_tokens"] == 7
+
+    async def run_async():
+        async with httpx.AsyncClient(transport=lg.AsyncGovernedTransport(httpx.MockTransport(ahandler))) as client:
+            async with client.stream("POST", "https://llm.example/v1/chat/completions", json=req) as resp:
+                held = gov.stats()["in_flight"]
+                await resp.aread()
+            return held
+
+    assert asyncio.run(run_async()) == 1
+    assert gov.stats()["in_flight"] == 0 and len(released) == 2 and released[1]["used_tokens"] == 7
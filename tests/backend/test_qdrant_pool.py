@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import types
+
+import httpx
+import pytest
+
+from backend.core import qdrant_pool, settings
+from backend.core import vector_store as vs
+
+
+class _FakeClient:
+    created = 0
+
+    def __init__(self, url=None, api_key=None, timeout=None, **kwargs):
+        type(self).created += 1
+        self.url = url
+        self.kwargs = kwargs
+        self.calls = {"get_collections": 0, "get_collection": 0, "search": 0}
+        self.closed = False
+
+    def get_collections(self):
+        self.calls["get_collections"] += 1
+        return types.SimpleNamespace(collections=[])
+
+    def get_collection(self, collection_name):
+        self.calls["get_collection"] += 1
+        params = types.SimpleNamespace(vectors=types.SimpleNamespace(size=3, distance="Cosine"))
+        return types.SimpleNamespace(config=types.SimpleNamespace(params=params))
+
+    def search(self, collection_name, query_vector, limit):
+        self.calls["search"] += 1
+        return [types.SimpleNamespace(id="p1", score=0.9, payload={"text": "a"})]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pool(monkeypatch):
+    _FakeClient.created = 0
+    monkeypatch.setattr(vs, "QdrantClient", _FakeClient)
+    monkeypatch.setattr(vs, "_resolved", None)
+    monkeypatch.setattr(qdrant_pool, "_clients", {})
+    yield
+    qdrant_pool._clients.clear()
+
+
+def test_shared_client_is_reused_per_url():
+    a = qdrant_pool.get_shared_client("http://h:1", factory=_FakeClient)
+    b = qdrant_pool.get_shared_client("http://h:1", factory=_FakeClient)
+    c = qdrant_pool.get_shared_client("http://h:2", factory=_FakeClient)
+    assert a is b and a is not c
+    assert _FakeClient.created == 2
+
+
+def test_prefer_grpc_passes_grpc_port(monkeypatch):
+    monkeypatch.setattr(settings, "QDRANT_GRPC_PORT", 7334)
+    cli = qdrant_pool.get_shared_client("http://h:1", prefer_grpc=True, factory=_FakeClient)
+    assert cli.kwargs == {"prefer_grpc": True, "grpc_port": 7334}
+    assert cli is not qdrant_pool.get_shared_client("http://h:1", prefer_grpc=False, factory=_FakeClient)
+
+
+def test_repeated_search_costs_one_round_trip_each():
+    for _ in range(3):
+        hits = vs.search([0.0, 0.0, 0.0], top_k=1, collection_name="c1")
+        assert hits[0]["id"] == "p1"
+    client, _ = vs.get_qdrant_client()
+    assert _FakeClient.created == 1
+    # Health-Check und Collection-Check nur beim ersten Zugriff
+    assert client.calls == {"get_collections": 1, "get_collection": 1, "search": 3}
+
+
+def test_invalidate_reconnects_lazily():
+    other = qdrant_pool.get_shared_client("http://kg:6333", factory=_FakeClient)
+    first, _ = vs.get_qdrant_client()
+    vs.invalidate_qdrant_client()
+    # Nur der eigene Endpunkt wird verworfen, und nicht geschlossen (Halter nutzen ihn evtl. noch)
+    assert not first.closed
+    assert qdrant_pool.get_shared_client("http://kg:6333", factory=_FakeClient) is other
+    second, _ = vs.get_qdrant_client()
+    assert second is not first
+    assert second.calls["get_collections"] == 1
+    assert not qdrant_pool.collection_known(second, "c1")
+
+
+def test_only_transport_errors_invalidate(monkeypatch):
+    first, _ = vs.get_qdrant_client()
+
+    def boom(*a, **k):
+        raise ValueError("bad payload")
+
+    monkeypatch.setattr(first, "search", boom)
+    with pytest.raises(ValueError):
+        vs.search([0.0, 0.0, 0.0], collection_name="c1")
+    assert vs.get_qdrant_client()[0] is first
+
+    def down(*a, **k):
+        raise httpx.ConnectError("refused")
+
+    monkeypatch.setattr(first, "search", down)
+    with pytest.raises(httpx.ConnectError):
+        vs.search([0.0, 0.0, 0.0], collection_name="c1")
+    assert vs.get_qdrant_client()[0] is not first
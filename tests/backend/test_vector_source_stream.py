@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+import qdrant_client
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core import vector_store as vs
+from backend.routers import vector_router
+
+
+class _CountingClient:
+    def __init__(self):
+        self._inner = qdrant_client.QdrantClient(location=":memory:")
+        self.scrolls = 0
+
+    def scroll(self, *args, **kwargs):
+        self.scrolls += 1
+        return self._inner.scroll(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+@pytest.fixture()
+def cli():
+    c = _CountingClient()
+    vs.reset_collection(client=c._inner, collection_name="src", dim=2)
+    items = [
+        {"id": i + 1, "vector": [1.0, 0.0], "payload": {"sourceFile": "big.md", "chunkIndex": (i * 7) % 600, "text": f"t{(i * 7) % 600}"}}
+        for i in range(600)
+    ]
+    # Doppelter chunkIndex (z. B. aus zwei PDF-Seiten) und eine fremde Quelle
+    items.append({"id": 1001, "vector": [1.0, 0.0], "payload": {"sourceFile": "big.md", "chunkIndex": 3, "text": "dup"}})
+    items.append({"id": 1002, "vector": [1.0, 0.0], "payload": {"sourceFile": "other.md", "chunkIndex": 0, "text": "x"}})
+    vs.upsert_points(items, client=c._inner, collection_name="src", dim=2)
+    return c
+
+
+def test_iter_source_chunks_single_ordered_pass(cli):
+    chunks = list(vs.iter_source_chunks("big.md", client=cli, collection_name="src", page_size=256))
+    assert [c["chunkIndex"] for c in chunks] == list(range(600))
+    assert all(c["text"] in (f"t{c['chunkIndex']}", "dup") for c in chunks)
+    assert cli.scrolls == 3  # 601 Punkte / 256 je Seite, kein Fenster-Loop und keine 5000er-Grenze
+    assert list(vs.iter_source_chunks("missing.md", client=cli, collection_name="src")) == []
+
+
+def test_source_full_endpoint_json_and_ndjson(monkeypatch):
+    chunks = [{"chunkIndex": 0, "text": "Eins"}, {"chunkIndex": 1, "text": "Zwei"}]
+    monkeypatch.setattr(vector_router, "iter_source_chunks", lambda source: iter(chunks))
+    app = FastAPI()
+    app.include_router(vector_router.router)
+    client = TestClient(app)
+
+    body = client.get("/api/v1/vector/source/full", params={"source": "a.md"}).json()
+    assert body == {"sourceFile": "a.md", "chunks": chunks, "text": "Eins\nZwei"}
+
+    resp = client.get("/api/v1/vector/source/full", params={"source": "a.md", "format": "ndjson"})
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert lines == chunks + [{"event": "end", "sourceFile": "a.md", "count": 2}]
+
+    assert client.get("/api/v1/vector/source/full").status_code == 400
@@ -130,4 +130,15 @@ def _install_backend_fakes(dim: int = 8) -> None:
 
 
 # Perform installation at import time so it takes effect before test collection imports modules.
-_install_backend_fakes()
\ No newline at end of file
+_install_backend_fakes()
+
+
+def pytest_configure(config):
+    """
+    Disable the persistent LLM/embedding caches (stubs answer differently per test).
+    Runs before collection, i.e. before backend.core.settings reads the environment.
+    """
+    import os
+
+    os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+    os.environ.setdefault("EMBEDDINGS_CACHE_ENABLED", "false")
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+
+from backend.core import db, settings
+from backend.services.clarification_service import AnswerNotifier, ClarificationService
+
+
+def test_notifier_wakes_async_and_sync_waiters():
+    n = AnswerNotifier()
+    seen = n.snapshot(["wf-1", None])
+    assert seen == {"wf-1": 0}
+
+    n.notify("wf-1")  # zwischen Snapshot und wait() → sofort zurück
+    assert asyncio.run(n.wait(seen, timeout=5)) is True
+    assert n.wait_sync(n.snapshot(["wf-1"]), timeout=0.05) is False
+
+    async def waiter():
+        seen = n.snapshot(["wf-2", "corr-2"])
+        threading.Timer(0.05, n.notify, args=("corr-2",)).start()
+        t0 = time.monotonic()
+        assert await n.wait(seen, timeout=5) is True
+        return time.monotonic() - t0
+
+    assert asyncio.run(waiter()) < 1.0
+    assert n._waiters == {}
+
+
+def test_orchestrator_wakes_on_answer_without_polling(tmp_path, monkeypatch):
+    from arch_team.agents.requirements_orchestrator import (
+        OrchestratorConfig,
+        RequirementsOrchestrator,
+    )
+
+    monkeypatch.setattr(settings, "SQLITE_PATH", str(tmp_path / "app.db"))
+    db.init_db()
+    svc = ClarificationService()
+    with db.db_session() as conn:
+        qid = svc.create_question(conn, "REQ-1", "clarity", "Welche Einheit?", validation_id="wf-42")
+
+    orch = RequirementsOrchestrator(config=OrchestratorConfig(wait_for_answers_timeout=20, answer_poll_fallback_s=30))
+    orch.workflow_id = "wf-42"
+    reads = []
+    orig = svc.get_questions_summary
+    monkeypatch.setattr(
+        ClarificationService, "get_questions_summary",
+        lambda self, conn, **kw: reads.append(1) or orig(conn, **kw),
+    )
+
+    def answer():
+        with db.db_session() as conn:
+            svc.answer_question(conn, qid, "Millisekunden", apply_to_requirement=False)
+
+    async def run():
+        threading.Timer(0.2, answer).start()
+        t0 = time.monotonic()
+        result = await orch._wait_for_answers([{"id": qid}], correlation_id=None)
+        return result, time.monotonic() - t0
+
+    result, elapsed = asyncio.run(run())
+    assert elapsed < 2.0
+    assert len(reads) == 2  # einmal vor dem Warten, einmal nach dem Wecken
+    assert [a["answer_text"] for a in result["answers"]] == ["Millisekunden"]
+    db.close_pools()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from backend.core import db, settings
+from backend.core.utils import sha256_text
+from backend.services.manifest_service import ManifestService
+
+
+@pytest.fixture()
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SQLITE_PATH", str(tmp_path / "app.db"))
+    db.init_db()
+    c = db.get_db()
+    for i in range(5):
+        text = f"Das System muss Anforderung {i} erfüllen."
+        rid = f"REQ-{i:03d}"
+        db.create_manifest(c, rid, text, sha256_text(text), "chunk_miner", "doc.md", "sha", i)
+        db.add_evidence_reference(c, rid, "doc.md", "sha", i)
+        db.add_processing_stage(c, rid, "evaluation", status="completed", score=0.5)
+        if i % 2 == 0:
+            c.execute(
+                "INSERT INTO evaluation(id, requirement_checksum, model, latency_ms, score, verdict) VALUES (?, ?, 'm', 1, 0.5, 'fail')",
+                (f"ev_{i}", sha256_text(text)),
+            )
+            c.execute(
+                "INSERT INTO evaluation_detail(evaluation_id, criterion_key, score, passed, feedback) VALUES (?, 'clarity', 0.5, 0, 'vage')",
+                (f"ev_{i}",),
+            )
+    child_text = "Kind-Anforderung"
+    db.create_manifest(c, "REQ-000-a", child_text, sha256_text(child_text), "api")
+    db.record_requirement_split(c, "REQ-000", "REQ-000-a", "split")
+    yield c
+    c.close()
+
+
+def test_bulk_hydration_matches_single_manifest(conn):
+    service = ManifestService()
+    rows = conn.execute("SELECT * FROM requirement_manifest ORDER BY requirement_id").fetchall()
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    bulk = service.get_full_manifests(conn, rows)
+    conn.set_trace_callback(None)
+
+    single = [service.get_full_manifest(conn, r["requirement_id"]) for r in rows]
+    assert [m.model_dump() for m in bulk] == [m.model_dump() for m in single]
+    assert bulk[0].split_children == ["REQ-000-a"]
+    assert bulk[0].evaluation and not bulk[1].evaluation
+    assert len(statements) <= 6
+
+
+def test_get_children_uses_bulk_hydration(conn):
+    children = ManifestService().get_children(conn, "REQ-000")
+    assert [m.requirement_id for m in children.children] == ["REQ-000-a"]
+    assert children.split_relationships[0].parent_id == "REQ-000"
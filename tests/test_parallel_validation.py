@@ -199,7 +199,8 @@ class TestValidationDelegatorAgent:
         from arch_team.agents.validation_delegator import ValidationDelegatorAgent
         
         delegator = ValidationDelegatorAgent()
-        assert delegator.max_concurrent == 5
+        # Without VALIDATION_MAX_CONCURRENT only the transport's LLM concurrency limits fan-out
+        assert delegator.max_concurrent == delegator.transport.max_concurrency
     
     def test_delegator_init_custom_concurrent(self):
         """Test delegator with custom max_concurrent."""
@@ -339,8 +340,8 @@ class TestPerformanceBenchmark:
         # Mock API with 100ms delay to simulate network latency
         mock_result = {"score": 0.8, "verdict": "pass", "evaluation": []}
         
-        def slow_api(*args, **kwargs):
-            time.sleep(0.1)  # 100ms per call
+        async def slow_api(*args, **kwargs):
+            await asyncio.sleep(0.1)  # 100ms per call
             return mock_result
         
         # === Sequential baseline (estimated) ===
@@ -381,8 +382,8 @@ class TestPerformanceBenchmark:
         
         mock_result = {"score": 0.8, "verdict": "pass", "evaluation": []}
         
-        def fast_api(*args, **kwargs):
-            time.sleep(0.05)  # 50ms per call
+        async def fast_api(*args, **kwargs):
+            await asyncio.sleep(0.05)  # 50ms per call
             return mock_result
         
         results = {}